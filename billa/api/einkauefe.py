@@ -0,0 +1,79 @@
+# billa/api/einkauefe.py
+"""
+JSON-API der Einkaufsliste mit Cursor-Pagination (config.pagination).
+
+GET /billa/api/einkauefe/?start_date=..&end_date=..&filiale=..&cursor=..&limit=..[&format=html]
+
+Sortierung: datum, zeit (NULL zuletzt), id - jeweils absteigend. Die
+Artikelanzahl kommt als Annotation aus derselben Query. Mit format=html
+enthält die Antwort die gerenderten Tabellenzeilen und Mobile-Karten.
+"""
+from django.contrib.auth.decorators import login_required
+from django.db.models import Count
+from django.http import JsonResponse
+from django.template.loader import render_to_string
+from django.urls import reverse
+
+from billa.models import BillaEinkauf
+from config.conditional import conditional_json
+from config.pagination import InvalidCursor, keyset_paginate, parse_limit
+from finance.data_generation import BILLA
+
+EINKAUF_ORDERING = ['-datum', '-zeit', '-id']
+EINKAUF_PAGE_SIZE = 50
+
+
+def filter_einkaeufe(params):
+    """Einkäufe gemäß Listen-Filter (start_date, end_date, filiale)"""
+    einkaufe = BillaEinkauf.objects.select_related('filiale').annotate(artikel_anzahl=Count('artikel'))
+
+    if params.get('start_date'):
+        einkaufe = einkaufe.filter(datum__gte=params['start_date'])
+    if params.get('end_date'):
+        einkaufe = einkaufe.filter(datum__lte=params['end_date'])
+
+    filiale_id = params.get('filiale')
+    if filiale_id and filiale_id != 'alle':
+        einkaufe = einkaufe.filter(filiale__filial_nr=filiale_id)
+    return einkaufe
+
+
+def paginate_einkaeufe(einkaufe, cursor=None, limit=EINKAUF_PAGE_SIZE):
+    return keyset_paginate(einkaufe, EINKAUF_ORDERING, cursor, limit, nullable={'zeit'})
+
+
+def serialize_einkauf(einkauf):
+    return {
+        'id': einkauf.id,
+        'datum': einkauf.datum.isoformat(),
+        'zeit': einkauf.zeit.isoformat() if einkauf.zeit else None,
+        'filiale': str(einkauf.filiale),
+        'artikel_anzahl': einkauf.artikel_anzahl,
+        'gesamt_preis': str(einkauf.gesamt_preis),
+        'gesamt_ersparnis': str(einkauf.gesamt_ersparnis),
+        'url': reverse('billa:billa_einkauf_detail', args=[einkauf.id]),
+    }
+
+
+@login_required
+@conditional_json(BILLA)
+def billa_api_einkauefe(request):
+    """API: Eine Seite der Einkaufsliste"""
+    try:
+        page = paginate_einkaeufe(
+            filter_einkaeufe(request.GET),
+            request.GET.get('cursor'),
+            parse_limit(request.GET.get('limit'), EINKAUF_PAGE_SIZE),
+        )
+    except InvalidCursor as e:
+        return JsonResponse({'error': str(e)}, status=400)
+
+    data = {
+        'results': [serialize_einkauf(einkauf) for einkauf in page.items],
+        'next_cursor': page.next_cursor,
+    }
+    if request.GET.get('format') == 'html':
+        context = {'einkaufe': page.items}
+        data['rows_html'] = render_to_string('billa/_einkauf_rows.html', context, request)
+        data['cards_html'] = render_to_string('billa/_einkauf_cards.html', context, request)
+    return JsonResponse(data)
@@ -0,0 +1,98 @@
+# billa/api/preise.py
+"""
+JSON-API des Preis-Trackers - liest nur die vorberechneten Tabellen
+(BillaPreisIndex, BillaPreisStand), siehe billa/services/preise.py.
+
+GET /billa/api/preisindex/
+GET /billa/api/preisaenderungen/?richtung=teurer|billiger&filiale=..&cursor=..&limit=..[&format=html]
+"""
+from django.contrib.auth.decorators import login_required
+from django.http import JsonResponse
+from django.template.loader import render_to_string
+from django.urls import reverse
+
+from billa.models import BillaPreisIndex, BillaPreisStand
+from config.conditional import conditional_json
+from config.pagination import InvalidCursor, keyset_paginate, parse_limit
+from finance.data_generation import BILLA
+
+AENDERUNG_ORDERING = ['-letzte_aenderung', '-id']
+AENDERUNG_PAGE_SIZE = 50
+
+
+def filter_aenderungen(params):
+    """Preisstände mit Preisänderung gemäß Filter (richtung, filiale)"""
+    staende = BillaPreisStand.objects.select_related('produkt', 'filiale').filter(
+        vorheriger_preis__isnull=False
+    )
+
+    richtung = params.get('richtung')
+    if richtung == 'teurer':
+        staende = staende.filter(aenderung_prozent__gt=0)
+    elif richtung == 'billiger':
+        staende = staende.filter(aenderung_prozent__lt=0)
+
+    filiale_id = params.get('filiale')
+    if filiale_id and filiale_id != 'alle':
+        staende = staende.filter(filiale_id=filiale_id)
+    return staende
+
+
+def paginate_aenderungen(staende, cursor=None, limit=AENDERUNG_PAGE_SIZE):
+    return keyset_paginate(staende, AENDERUNG_ORDERING, cursor, limit)
+
+
+def serialize_stand(stand):
+    return {
+        'produkt_id': stand.produkt_id,
+        'produkt': stand.produkt.name_korrigiert,
+        'filiale': str(stand.filiale),
+        'letzter_preis': str(stand.letzter_preis),
+        'vorheriger_preis': str(stand.vorheriger_preis) if stand.vorheriger_preis is not None else None,
+        'aenderung_prozent': str(stand.aenderung_prozent) if stand.aenderung_prozent is not None else None,
+        'min_preis_12m': str(stand.min_preis_12m),
+        'max_preis_12m': str(stand.max_preis_12m),
+        'erster_kauf': stand.erster_kauf.isoformat(),
+        'letzter_kauf': stand.letzter_kauf.isoformat(),
+        'letzte_aenderung': stand.letzte_aenderung.isoformat(),
+        'url': reverse('billa:billa_produkt_detail', args=[stand.produkt_id]),
+    }
+
+
+def preisindex_data():
+    monate = list(BillaPreisIndex.objects.order_by('monat'))
+    return {
+        'monate': [m.monat.strftime('%Y-%m') for m in monate],
+        'index': [float(m.index_wert) for m in monate],
+        'veraenderung': [float(m.veraenderung_prozent) if m.veraenderung_prozent is not None else None for m in monate],
+        'anzahl_produkte': [m.anzahl_produkte for m in monate],
+    }
+
+
+@login_required
+@conditional_json(BILLA)
+def billa_api_preisindex(request):
+    """API: Persönlicher Preisindex pro Monat"""
+    return JsonResponse(preisindex_data())
+
+
+@login_required
+@conditional_json(BILLA)
+def billa_api_preisaenderungen(request):
+    """API: Eine Seite der letzten Preisänderungen"""
+    try:
+        page = paginate_aenderungen(
+            filter_aenderungen(request.GET),
+            request.GET.get('cursor'),
+            parse_limit(request.GET.get('limit'), AENDERUNG_PAGE_SIZE),
+        )
+    except InvalidCursor as e:
+        return JsonResponse({'error': str(e)}, status=400)
+
+    data = {
+        'results': [serialize_stand(stand) for stand in page.items],
+        'next_cursor': page.next_cursor,
+    }
+    if request.GET.get('format') == 'html':
+        data['rows_html'] = render_to_string('billa/_preis_rows.html', {'staende': page.items}, request)
+    return JsonResponse(data)
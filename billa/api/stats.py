@@ -6,9 +6,12 @@ from django.http import JsonResponse
 from django.shortcuts import get_object_or_404
 
 from billa.models import BillaEinkauf, BillaProdukt
+from config.conditional import conditional_json
+from finance.data_generation import BILLA
 
 
 @login_required
+@conditional_json(BILLA)
 def billa_api_preisverlauf(request, produkt_id):
     """API: Preisverlauf eines Produkts"""
     produkt = get_object_or_404(BillaProdukt, pk=produkt_id)
@@ -26,6 +29,7 @@ def billa_api_preisverlauf(request, produkt_id):
 
 
 @login_required
+@conditional_json(BILLA)
 def billa_api_stats(request):
     """API: Aktuelle Statistiken"""
 
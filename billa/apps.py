@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class BillaConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'billa'
+
+    def ready(self):
+        """
+        Signals für den Analytics-Mart registrieren
+        """
+        import billa.signals  # noqa
@@ -2,6 +2,8 @@
 
 from django.core.management.base import BaseCommand
 from billa.models import BillaPreisHistorie, BillaArtikel
+from billa.services import preise
+from finance.data_generation import BILLA, bump_generation
 
 
 class Command(BaseCommand):
@@ -35,6 +37,11 @@ class Command(BaseCommand):
             if count % 100 == 0:
                 self.stdout.write(f'  {count} Einträge verarbeitet...')
 
+        # Preisstände und Index basieren auf der Historie
+        if updated:
+            preise.rebuild()
+            bump_generation(BILLA)
+
         self.stdout.write(
             self.style.SUCCESS(
                 f'✅ Fertig! {count} Einträge verarbeitet, {updated} aktualisiert'
@@ -0,0 +1,35 @@
+# billa/management/commands/backfill_billa_preise.py
+"""
+Berechnet Preisstände (pro Produkt und Filiale) und den persönlichen
+Preisindex aus der gesamten Preishistorie neu - ein sortierter Durchlauf,
+siehe billa/services/preise.py.
+
+Beispiel:
+    python manage.py backfill_billa_preise
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from billa.models import BillaPreisHistorie, BillaPreisIndex, BillaPreisStand
+from billa.services import preise
+from finance.data_generation import BILLA, bump_generation
+
+
+class Command(BaseCommand):
+    help = 'Berechnet Billa-Preisstände und Preisindex aus der gesamten Preishistorie'
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        self.stdout.write(f'📜 Preishistorie: {BillaPreisHistorie.objects.count():,} Einträge')
+
+        anzahl = preise.rebuild()
+        bump_generation(BILLA)
+
+        self.stdout.write(self.style.SUCCESS('✅ Preisstände und Preisindex neu berechnet'))
+        self.stdout.write(f'   🏷️  Preisstände: {anzahl:,}')
+        self.stdout.write(
+            f'   📈 Geänderte Preise: {BillaPreisStand.objects.filter(vorheriger_preis__isnull=False).count():,}'
+        )
+        self.stdout.write(f'   📅 Index-Monate: {BillaPreisIndex.objects.count():,}')
+        self.stdout.write(f'⏱️  Dauer: {time.perf_counter() - start:.1f}s')
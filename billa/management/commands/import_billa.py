@@ -6,7 +6,7 @@ from pathlib import Path
 
 from billa.models import BillaEinkauf
 from billa.services.parser import BillaReceiptParser  # ←
-from billa.views.import_views import _create_einkauf_with_artikel  # ← Gemeinsame Logik
+from billa.views.import_views import _create_einkauf_with_artikel, _delete_existing  # ← Gemeinsame Logik
 
 
 class Command(BaseCommand):
@@ -83,9 +83,7 @@ class Command(BaseCommand):
 
         # Bei force: Alte Rechnung löschen
         if force and data.get('re_nr'):
-            alte_rechnung = BillaEinkauf.objects.filter(re_nr=data['re_nr']).first()
-            if alte_rechnung:
-                alte_rechnung.delete()
+            _delete_existing(data['re_nr'])
 
         # Verwende gemeinsame Logik (keine Duplizierung!)
         _create_einkauf_with_artikel(data)
@@ -9,7 +9,7 @@ import boto3
 
 from finance.storages.r2_storage import CloudflareR2Storage
 from billa.services.parser import BillaReceiptParser
-from billa.views.import_views import _create_einkauf_with_artikel
+from billa.views.import_views import _create_einkauf_with_artikel, _delete_existing
 from billa.models import BillaEinkauf
 
 
@@ -128,7 +128,7 @@ class Command(BaseCommand):
                         # Import in Transaktion
                         with transaction.atomic():
                             if force and data.get('re_nr'):
-                                BillaEinkauf.objects.filter(re_nr=data['re_nr']).delete()
+                                _delete_existing(data['re_nr'])
 
                             _create_einkauf_with_artikel(data)
 
@@ -6,6 +6,7 @@ from django.core.management.base import BaseCommand
 from django.db import transaction
 from django.db.models import Count
 from billa.models import BillaProdukt, BillaArtikel, BillaPreisHistorie
+from billa.services import mart, preise
 
 
 class Command(BaseCommand):
@@ -64,6 +65,12 @@ class Command(BaseCommand):
 
             if not dry_run:
                 with transaction.atomic():
+                    # Betroffene Tage für den Analytics-Mart merken
+                    tage = set(
+                        BillaArtikel.objects.filter(produkt__in=duplicates_to_merge)
+                        .values_list('einkauf__datum', flat=True)
+                    )
+
                     # Verschiebe alle Artikel zum Master-Produkt
                     artikel_count = BillaArtikel.objects.filter(produkt__in=duplicates_to_merge).update(produkt=master)
 
@@ -78,6 +85,8 @@ class Command(BaseCommand):
 
                     # Aktualisiere Master-Statistiken
                     master.update_statistiken()
+                    mart.refresh_days(tage)
+                    preise.refresh(preise.paare(master.preishistorie.all()))
 
                     self.stdout.write(
                         self.style.SUCCESS(
@@ -0,0 +1,29 @@
+# billa/management/commands/rebuild_billa_mart.py
+"""
+Baut den Billa Analytics-Mart (billa/services/mart.py) neu auf - z.B. nach
+manuellen Datenkorrekturen im Admin.
+
+Beispiel:
+    python manage.py rebuild_billa_mart
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from billa.models import BillaMartArtikelTag, BillaMartEinkaufTag
+from billa.services import mart
+from finance.data_generation import BILLA, bump_generation
+
+
+class Command(BaseCommand):
+    help = 'Baut den Billa Analytics-Mart aus Einkäufen und Artikeln neu auf'
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        mart.rebuild()
+        bump_generation(BILLA)
+
+        self.stdout.write(self.style.SUCCESS('✅ Analytics-Mart neu aufgebaut'))
+        self.stdout.write(f'   📅 Einkauf-Tage: {BillaMartEinkaufTag.objects.count():,}')
+        self.stdout.write(f'   📦 Artikel-Zeilen: {BillaMartArtikelTag.objects.count():,}')
+        self.stdout.write(f'⏱️  Dauer: {time.perf_counter() - start:.1f}s')
@@ -6,6 +6,7 @@ from billa.models import (
     BillaEinkauf, BillaArtikel, BillaProdukt,
     BillaPreisHistorie, BillaFiliale
 )
+from billa.services import mart, preise
 
 
 class Command(BaseCommand):
@@ -105,6 +106,11 @@ class Command(BaseCommand):
                     self.style.SUCCESS(f'   ✓ {deleted_einkauf[0]:,} Einkäufe gelöscht')
                 )
 
+                # Analytics-Mart leeren (baut aus den verbliebenen Daten neu auf)
+                mart.rebuild()
+                preise.rebuild()
+                self.stdout.write(self.style.SUCCESS('   ✓ Analytics-Mart und Preisindex geleert'))
+
                 # 4. Optional: Produkte löschen
                 if not keep_products:
                     deleted_produkt = BillaProdukt.objects.all().delete()
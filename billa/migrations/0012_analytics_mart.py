@@ -0,0 +1,65 @@
+# Generated by Django 5.2.18 on 2026-10-19 09:58
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_mart(apps, schema_editor):
+    from billa.services.mart import rebuild
+    rebuild(apps)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('billa', '0011_remove_old_kategorie_fields'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BillaMartArtikelTag',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('datum', models.DateField(verbose_name='Datum')),
+                ('marke', models.CharField(blank=True, max_length=200, null=True)),
+                ('rabatt_typ', models.CharField(blank=True, max_length=100, null=True)),
+                ('anzahl_artikel', models.IntegerField(default=0)),
+                ('anzahl_einkaeufe', models.IntegerField(default=0)),
+                ('anzahl_rabattiert', models.IntegerField(default=0)),
+                ('menge', models.DecimalField(decimal_places=3, default=0, max_digits=14)),
+                ('ausgaben', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('rabatt', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('filiale', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='billa.billafiliale')),
+                ('produkt', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='billa.billaprodukt')),
+                ('produktgruppe', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='billa.billaproduktgruppe')),
+                ('ueberkategorie', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='billa.billaueberkategorie')),
+            ],
+            options={
+                'verbose_name': 'Mart: Artikel pro Tag',
+                'verbose_name_plural': 'Mart: Artikel pro Tag',
+                'db_table': 'billa_mart_artikel_tag',
+                'ordering': ['datum'],
+                'indexes': [models.Index(fields=['datum', 'filiale'], name='billa_mart__datum_810221_idx'), models.Index(fields=['ueberkategorie', 'datum'], name='billa_mart__ueberka_4ec582_idx'), models.Index(fields=['produktgruppe', 'datum'], name='billa_mart__produkt_201634_idx'), models.Index(fields=['produkt'], name='billa_mart__produkt_11c0b3_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='BillaMartEinkaufTag',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('datum', models.DateField(verbose_name='Datum')),
+                ('anzahl_einkaeufe', models.IntegerField(default=0)),
+                ('anzahl_artikel', models.IntegerField(default=0)),
+                ('ausgaben', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('ersparnis', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('filiale', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='billa.billafiliale')),
+            ],
+            options={
+                'verbose_name': 'Mart: Einkäufe pro Tag',
+                'verbose_name_plural': 'Mart: Einkäufe pro Tag',
+                'db_table': 'billa_mart_einkauf_tag',
+                'ordering': ['datum', 'filiale'],
+                'constraints': [models.UniqueConstraint(fields=('datum', 'filiale'), name='billa_mart_einkauf_tag_unique')],
+            },
+        ),
+        migrations.RunPython(backfill_mart, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-19 10:01
+#
+# NULLS LAST im Index nur auf PostgreSQL; andere Datenbanken (z.B. SQLite)
+# erlauben den Modifier in CREATE INDEX nicht und bekommen einen einfachen
+# Index auf denselben Spalten.
+
+from django.db import migrations, models
+
+LISTE_INDEX = models.Index(models.OrderBy(models.F('datum'), descending=True), models.OrderBy(models.F('zeit'), descending=True, nulls_last=True), models.OrderBy(models.F('id'), descending=True), name='billa_einkauf_liste_idx')
+
+
+def add_index(apps, schema_editor):
+    model = apps.get_model('billa', 'BillaEinkauf')
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.add_index(model, LISTE_INDEX)
+    else:
+        schema_editor.add_index(model, models.Index(fields=['-datum', '-zeit', '-id'], name=LISTE_INDEX.name))
+
+
+def remove_index(apps, schema_editor):
+    schema_editor.remove_index(apps.get_model('billa', 'BillaEinkauf'), LISTE_INDEX)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('billa', '0012_analytics_mart'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AddIndex(model_name='billaeinkauf', index=LISTE_INDEX),
+            ],
+            database_operations=[
+                migrations.RunPython(add_index, remove_index),
+            ],
+        ),
+    ]
@@ -0,0 +1,62 @@
+# Generated by Django 5.2.18 on 2026-10-19 10:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_preise(apps, schema_editor):
+    from billa.services.preise import rebuild
+    rebuild(apps)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('billa', '0013_einkauf_liste_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BillaPreisIndex',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('monat', models.DateField(unique=True, verbose_name='Monat')),
+                ('index_wert', models.DecimalField(decimal_places=2, max_digits=10, verbose_name='Index')),
+                ('veraenderung_prozent', models.DecimalField(blank=True, decimal_places=2, max_digits=8, null=True, verbose_name='Veränderung zum Vormonat %')),
+                ('anzahl_produkte', models.IntegerField(default=0, verbose_name='Vergleichbare Produkte')),
+                ('ausgaben', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+            ],
+            options={
+                'verbose_name': 'Preisindex',
+                'verbose_name_plural': 'Preisindex',
+                'db_table': 'billa_preis_index',
+                'ordering': ['monat'],
+            },
+        ),
+        migrations.CreateModel(
+            name='BillaPreisStand',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('letzter_preis', models.DecimalField(decimal_places=2, max_digits=10, verbose_name='Letzter Preis')),
+                ('vorheriger_preis', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True, verbose_name='Vorheriger Preis')),
+                ('aenderung_prozent', models.DecimalField(blank=True, decimal_places=2, max_digits=8, null=True, verbose_name='Änderung %')),
+                ('min_preis_12m', models.DecimalField(decimal_places=2, max_digits=10, verbose_name='Min. Preis (12 Monate)')),
+                ('max_preis_12m', models.DecimalField(decimal_places=2, max_digits=10, verbose_name='Max. Preis (12 Monate)')),
+                ('erster_kauf', models.DateField(verbose_name='Erstmals gekauft')),
+                ('letzter_kauf', models.DateField(verbose_name='Zuletzt gekauft')),
+                ('letzte_aenderung', models.DateField(verbose_name='Letzte Preisänderung')),
+                ('anzahl_kaeufe', models.IntegerField(default=0)),
+                ('filiale', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='billa.billafiliale')),
+                ('produkt', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='preisstaende', to='billa.billaprodukt')),
+            ],
+            options={
+                'verbose_name': 'Preisstand',
+                'verbose_name_plural': 'Preisstände',
+                'db_table': 'billa_preis_stand',
+                'ordering': ['-letzte_aenderung'],
+                'indexes': [models.Index(fields=['-letzte_aenderung', '-id'], name='billa_preis_stand_aend_idx')],
+                'constraints': [models.UniqueConstraint(fields=('produkt', 'filiale'), name='billa_preis_stand_unique')],
+            },
+        ),
+        migrations.RunPython(backfill_preise, migrations.RunPython.noop),
+    ]
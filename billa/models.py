@@ -104,6 +104,13 @@ class BillaEinkauf(models.Model):
         indexes = [
             models.Index(fields=['datum', 'filiale']),
             models.Index(fields=['re_nr']),
+            # Keyset-Pagination der Einkaufsliste (billa/api/einkauefe.py)
+            models.Index(
+                models.F('datum').desc(),
+                models.F('zeit').desc(nulls_last=True),
+                models.F('id').desc(),
+                name='billa_einkauf_liste_idx',
+            ),
         ]
 
     def __str__(self):
@@ -388,3 +395,137 @@ class BillaFiliale(models.Model):
         """Gibt den vollen Namen mit Filialnummer zurück"""
         typ_name = "Billa Plus" if self.typ == 'billa_plus' else "Billa"
         return f"{self.filial_nr} - {typ_name} - {self.name}"
+
+
+class BillaMartEinkaufTag(models.Model):
+    """
+    Analytics-Mart: Einkäufe pro Tag und Filiale.
+    Wird von billa/services/mart.py gepflegt - nicht direkt bearbeiten.
+    """
+    datum = models.DateField(verbose_name="Datum")
+    filiale = models.ForeignKey(BillaFiliale, on_delete=models.CASCADE, related_name='+')
+    anzahl_einkaeufe = models.IntegerField(default=0)
+    anzahl_artikel = models.IntegerField(default=0)
+    ausgaben = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    ersparnis = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+
+    class Meta:
+        app_label = 'billa'
+        db_table = 'billa_mart_einkauf_tag'
+        verbose_name = "Mart: Einkäufe pro Tag"
+        verbose_name_plural = "Mart: Einkäufe pro Tag"
+        ordering = ['datum', 'filiale']
+        constraints = [
+            models.UniqueConstraint(fields=['datum', 'filiale'], name='billa_mart_einkauf_tag_unique'),
+        ]
+
+    def __str__(self):
+        return f"{self.datum} {self.filiale_id}: € {self.ausgaben}"
+
+
+class BillaMartArtikelTag(models.Model):
+    """
+    Analytics-Mart: Artikel pro Tag und (Filiale, Überkategorie,
+    Produktgruppe, Produkt, Marke, Rabatt-Typ).
+    Kategorie und Marke sind vom Produkt denormalisiert.
+    """
+    datum = models.DateField(verbose_name="Datum")
+    filiale = models.ForeignKey(BillaFiliale, on_delete=models.CASCADE, related_name='+')
+    ueberkategorie = models.ForeignKey(
+        BillaUeberkategorie, on_delete=models.SET_NULL, null=True, blank=True, related_name='+'
+    )
+    produktgruppe = models.ForeignKey(
+        BillaProduktgruppe, on_delete=models.SET_NULL, null=True, blank=True, related_name='+'
+    )
+    produkt = models.ForeignKey(
+        BillaProdukt, on_delete=models.SET_NULL, null=True, blank=True, related_name='+'
+    )
+    marke = models.CharField(max_length=200, null=True, blank=True)
+    rabatt_typ = models.CharField(max_length=100, null=True, blank=True)
+
+    anzahl_artikel = models.IntegerField(default=0)
+    anzahl_einkaeufe = models.IntegerField(default=0)
+    anzahl_rabattiert = models.IntegerField(default=0)
+    menge = models.DecimalField(max_digits=14, decimal_places=3, default=0)
+    ausgaben = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    rabatt = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+
+    class Meta:
+        app_label = 'billa'
+        db_table = 'billa_mart_artikel_tag'
+        verbose_name = "Mart: Artikel pro Tag"
+        verbose_name_plural = "Mart: Artikel pro Tag"
+        ordering = ['datum']
+        indexes = [
+            models.Index(fields=['datum', 'filiale']),
+            models.Index(fields=['ueberkategorie', 'datum']),
+            models.Index(fields=['produktgruppe', 'datum']),
+            models.Index(fields=['produkt']),
+        ]
+
+    def __str__(self):
+        return f"{self.datum} {self.produkt_id}: € {self.ausgaben}"
+
+
+class BillaPreisStand(models.Model):
+    """
+    Aktueller Preisstand eines Produkts in einer Filiale.
+    Wird von billa/services/preise.py gepflegt - nicht direkt bearbeiten.
+    """
+    produkt = models.ForeignKey(BillaProdukt, on_delete=models.CASCADE, related_name='preisstaende')
+    filiale = models.ForeignKey(BillaFiliale, on_delete=models.CASCADE, related_name='+')
+
+    letzter_preis = models.DecimalField(max_digits=10, decimal_places=2, verbose_name="Letzter Preis")
+    vorheriger_preis = models.DecimalField(
+        max_digits=10, decimal_places=2, null=True, blank=True, verbose_name="Vorheriger Preis"
+    )
+    aenderung_prozent = models.DecimalField(
+        max_digits=8, decimal_places=2, null=True, blank=True, verbose_name="Änderung %"
+    )
+    min_preis_12m = models.DecimalField(max_digits=10, decimal_places=2, verbose_name="Min. Preis (12 Monate)")
+    max_preis_12m = models.DecimalField(max_digits=10, decimal_places=2, verbose_name="Max. Preis (12 Monate)")
+
+    erster_kauf = models.DateField(verbose_name="Erstmals gekauft")
+    letzter_kauf = models.DateField(verbose_name="Zuletzt gekauft")
+    letzte_aenderung = models.DateField(verbose_name="Letzte Preisänderung")
+    anzahl_kaeufe = models.IntegerField(default=0)
+
+    class Meta:
+        app_label = 'billa'
+        db_table = 'billa_preis_stand'
+        verbose_name = "Preisstand"
+        verbose_name_plural = "Preisstände"
+        ordering = ['-letzte_aenderung']
+        constraints = [
+            models.UniqueConstraint(fields=['produkt', 'filiale'], name='billa_preis_stand_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['-letzte_aenderung', '-id'], name='billa_preis_stand_aend_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.produkt_id} @ {self.filiale_id}: € {self.letzter_preis}"
+
+
+class BillaPreisIndex(models.Model):
+    """
+    Persönlicher Warenkorb-Preisindex pro Monat (verkettet, erster Monat = 100).
+    Wird von billa/services/preise.py gepflegt - nicht direkt bearbeiten.
+    """
+    monat = models.DateField(unique=True, verbose_name="Monat")
+    index_wert = models.DecimalField(max_digits=10, decimal_places=2, verbose_name="Index")
+    veraenderung_prozent = models.DecimalField(
+        max_digits=8, decimal_places=2, null=True, blank=True, verbose_name="Veränderung zum Vormonat %"
+    )
+    anzahl_produkte = models.IntegerField(default=0, verbose_name="Vergleichbare Produkte")
+    ausgaben = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+
+    class Meta:
+        app_label = 'billa'
+        db_table = 'billa_preis_index'
+        verbose_name = "Preisindex"
+        verbose_name_plural = "Preisindex"
+        ordering = ['monat']
+
+    def __str__(self):
+        return f"{self.monat:%Y-%m}: {self.index_wert}"
@@ -0,0 +1,168 @@
+# billa/services/mart.py
+"""
+Billa Analytics-Mart: vorverdichtete Tageswerte für Dashboard und Drilldowns.
+
+- BillaMartEinkaufTag: Einkäufe pro (Tag, Filiale) - Anzahl, Ausgaben,
+  Ersparnis, Artikelanzahl
+- BillaMartArtikelTag: Artikel pro (Tag, Filiale, Überkategorie,
+  Produktgruppe, Produkt, Marke, Rabatt-Typ) - Ausgaben, Menge, Rabatt,
+  Anzahl Artikel/Einkäufe
+
+Gepflegt wird tageweise: refresh_days() ersetzt die Zeilen der betroffenen
+Tage (Import, Re-Import). Ändern sich Kategorie oder Marke eines Produkts,
+zieht sync_produkte() die denormalisierten Spalten nach (Remap). rebuild()
+baut alles neu auf (manage.py rebuild_billa_mart).
+
+Monatswerte werden per TruncMonth aus der (kleinen) Tagestabelle gebildet.
+"""
+from django.apps import apps as global_apps
+from django.db import transaction
+from django.db.models import Count, OuterRef, Q, Subquery, Sum
+
+from finance.data_generation import BILLA, bump_generation
+
+BATCH_SIZE = 1000
+
+
+def _models(apps):
+    return (
+        apps.get_model('billa', 'BillaEinkauf'),
+        apps.get_model('billa', 'BillaArtikel'),
+        apps.get_model('billa', 'BillaMartEinkaufTag'),
+        apps.get_model('billa', 'BillaMartArtikelTag'),
+    )
+
+
+def _build(days=None, apps=global_apps):
+    """Mart-Zeilen für days (None = alle) aus Einkäufen/Artikeln erzeugen"""
+    Einkauf, Artikel, EinkaufTag, ArtikelTag = _models(apps)
+
+    einkaufe = Einkauf.objects.all()
+    artikel = Artikel.objects.all()
+    if days is not None:
+        einkaufe = einkaufe.filter(datum__in=days)
+        artikel = artikel.filter(einkauf__datum__in=days)
+
+    # Artikelanzahl separat - ein JOIN im selben GROUP BY würde die Summen vervielfachen
+    artikel_counts = {
+        (row['einkauf__datum'], row['einkauf__filiale_id']): row['n']
+        for row in artikel.order_by().values('einkauf__datum', 'einkauf__filiale_id').annotate(n=Count('id'))
+    }
+
+    EinkaufTag.objects.bulk_create(
+        (
+            EinkaufTag(
+                datum=row['datum'],
+                filiale_id=row['filiale_id'],
+                anzahl_einkaeufe=row['anzahl'],
+                anzahl_artikel=artikel_counts.get((row['datum'], row['filiale_id']), 0),
+                ausgaben=row['ausgaben'] or 0,
+                ersparnis=row['ersparnis'] or 0,
+            )
+            for row in einkaufe.order_by().values('datum', 'filiale_id').annotate(
+                anzahl=Count('id'),
+                ausgaben=Sum('gesamt_preis'),
+                ersparnis=Sum('gesamt_ersparnis'),
+            ).iterator()
+        ),
+        batch_size=BATCH_SIZE,
+    )
+
+    rabattiert = Q(rabatt__gt=0)
+    ArtikelTag.objects.bulk_create(
+        (
+            ArtikelTag(
+                datum=row['einkauf__datum'],
+                filiale_id=row['einkauf__filiale_id'],
+                ueberkategorie_id=row['produkt__ueberkategorie_id'],
+                produktgruppe_id=row['produkt__produktgruppe_id'],
+                produkt_id=row['produkt_id'],
+                marke=row['produkt__marke'],
+                rabatt_typ=row['rabatt_typ'],
+                anzahl_artikel=row['anzahl_artikel'],
+                anzahl_einkaeufe=row['anzahl_einkaeufe'],
+                anzahl_rabattiert=row['anzahl_rabattiert'],
+                menge=row['menge'] or 0,
+                ausgaben=row['ausgaben'] or 0,
+                rabatt=row['rabatt'] or 0,
+            )
+            for row in artikel.order_by().values(
+                'einkauf__datum', 'einkauf__filiale_id',
+                'produkt__ueberkategorie_id', 'produkt__produktgruppe_id', 'produkt_id',
+                'produkt__marke', 'rabatt_typ',
+            ).annotate(
+                anzahl_artikel=Count('id'),
+                anzahl_einkaeufe=Count('einkauf_id', distinct=True),
+                anzahl_rabattiert=Count('id', filter=rabattiert),
+                menge=Sum('menge'),
+                ausgaben=Sum('gesamtpreis'),
+                rabatt=Sum('rabatt', filter=rabattiert),
+            ).iterator()
+        ),
+        batch_size=BATCH_SIZE,
+    )
+
+
+def refresh_days(days, apps=global_apps):
+    """Mart-Zeilen der angegebenen Tage neu berechnen"""
+    days = {d for d in days if d is not None}
+    if not days:
+        return
+    _, _, EinkaufTag, ArtikelTag = _models(apps)
+    with transaction.atomic():
+        EinkaufTag.objects.filter(datum__in=days).delete()
+        ArtikelTag.objects.filter(datum__in=days).delete()
+        _build(days, apps)
+
+
+def rebuild(apps=global_apps):
+    """Mart komplett neu aufbauen"""
+    _, _, EinkaufTag, ArtikelTag = _models(apps)
+    with transaction.atomic():
+        EinkaufTag.objects.all().delete()
+        ArtikelTag.objects.all().delete()
+        _build(None, apps)
+
+
+def sync_produkte(produkt_ids=None):
+    """Überkategorie/Produktgruppe/Marke aus BillaProdukt übernehmen (None = alle)"""
+    from billa.models import BillaMartArtikelTag, BillaProdukt
+
+    rows = BillaMartArtikelTag.objects.filter(produkt__isnull=False)
+    if produkt_ids is not None:
+        rows = rows.filter(produkt_id__in=produkt_ids)
+
+    produkt = BillaProdukt.objects.filter(pk=OuterRef('produkt_id'))
+    updated = rows.update(
+        ueberkategorie=Subquery(produkt.values('ueberkategorie_id')[:1]),
+        produktgruppe=Subquery(produkt.values('produktgruppe_id')[:1]),
+        marke=Subquery(produkt.values('marke')[:1]),
+    )
+    bump_generation(BILLA)
+    return updated
+
+
+def filter_mart(queryset, start_date=None, end_date=None, filiale_id=None):
+    """Dashboard-Filter (Zeitraum, Filiale) auf eine Mart-Tabelle anwenden"""
+    if start_date:
+        queryset = queryset.filter(datum__gte=start_date)
+    if end_date:
+        queryset = queryset.filter(datum__lte=end_date)
+    if filiale_id and filiale_id != 'alle':
+        queryset = queryset.filter(filiale_id=filiale_id)
+    return queryset
+
+
+def einkauf_summary(start_date=None, end_date=None, filiale_id=None):
+    """Kennzahlen (Anzahl, Ausgaben, Ersparnis, Ø Warenkorb) aus der Tagestabelle"""
+    from billa.models import BillaMartEinkaufTag
+
+    stats = filter_mart(BillaMartEinkaufTag.objects.all(), start_date, end_date, filiale_id).aggregate(
+        anzahl=Sum('anzahl_einkaeufe'),
+        gesamt_ausgaben=Sum('ausgaben'),
+        gesamt_ersparnis=Sum('ersparnis'),
+    )
+    stats['anzahl'] = stats['anzahl'] or 0
+    stats['avg_warenkorb'] = stats['gesamt_ausgaben'] / stats['anzahl'] if stats['anzahl'] else None
+    return stats
+
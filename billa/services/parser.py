@@ -5,10 +5,14 @@ Wird sowohl von der View als auch vom Management Command verwendet.
 """
 
 import re
-import pdfplumber
 from datetime import datetime
 from decimal import Decimal
 import logging
+
+from config.lazy import lazy_module
+
+# pdfplumber (inkl. pdfminer) erst beim ersten Parsen laden
+pdfplumber = lazy_module('pdfplumber')
 logger = logging.getLogger(__name__)
 
 class BillaReceiptParser:
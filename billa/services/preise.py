@@ -0,0 +1,220 @@
+# billa/services/preise.py
+"""
+Preis-Tracker: Preisstand pro (Produkt, Filiale) und persönlicher
+Warenkorb-Preisindex pro Monat.
+
+- BillaPreisStand: letzter und vorheriger Preis, Änderung in %, Min/Max
+  der letzten 12 Monate, erster/letzter Kauf. Berechnet in einem sortierten
+  Durchlauf über BillaPreisHistorie - beim Import nur für die Paare des
+  Bons (refresh), im Backfill für alle (rebuild).
+- BillaPreisIndex: verketteter Monatsindex, erster Monat = 100. Jedes
+  Glied ist ein Törnqvist-Index über die Produkte, die in beiden Monaten
+  gekauft wurden, gewichtet mit ihrem Ausgabenanteil. Die Monatswerte
+  stammen aus dem Analytics-Mart; gerechnet wird mit numpy auf der ganzen
+  Monat×Produkt-Matrix.
+
+"Vorheriger Preis" ist der letzte *abweichende* Preis - die Änderung
+bleibt also sichtbar, auch wenn danach mehrmals zum neuen Preis gekauft
+wurde.
+"""
+from collections import deque
+from datetime import timedelta
+from decimal import Decimal
+from itertools import groupby, islice
+from operator import itemgetter
+
+from django.apps import apps as global_apps
+from django.db import transaction
+from django.db.models import Q, Sum
+from django.db.models.functions import TruncMonth
+
+from config.lazy import lazy_module
+
+np = lazy_module('numpy')
+
+BATCH_SIZE = 1000
+CHUNK_SIZE = 2000
+ROLLING_TAGE = 365
+
+_CENT = Decimal('0.01')
+
+
+class _Stand:
+    """Laufender Preisstand eines (Produkt, Filiale)-Paars"""
+
+    __slots__ = ('erster_kauf', 'letzter_kauf', 'letzte_aenderung', 'letzter_preis',
+                 'vorheriger_preis', 'anzahl_kaeufe', 'fenster')
+
+    def __init__(self, datum, preis):
+        self.erster_kauf = self.letzter_kauf = self.letzte_aenderung = datum
+        self.letzter_preis = preis
+        self.vorheriger_preis = None
+        self.anzahl_kaeufe = 1
+        self.fenster = deque([(datum, preis)])
+
+    def add(self, datum, preis):
+        if preis != self.letzter_preis:
+            self.vorheriger_preis = self.letzter_preis
+            self.letzter_preis = preis
+            self.letzte_aenderung = datum
+        self.letzter_kauf = datum
+        self.anzahl_kaeufe += 1
+
+        self.fenster.append((datum, preis))
+        grenze = datum - timedelta(days=ROLLING_TAGE)
+        while self.fenster[0][0] < grenze:
+            self.fenster.popleft()
+
+    @property
+    def aenderung_prozent(self):
+        if not self.vorheriger_preis:
+            return None
+        return ((self.letzter_preis - self.vorheriger_preis) / self.vorheriger_preis * 100).quantize(_CENT)
+
+
+def _staende(historie, Stand):
+    """
+    Ein Durchlauf über die Historie, sortiert nach (Produkt, Filiale, Datum).
+    Im Speicher liegt immer nur das 12-Monats-Fenster des aktuellen Paars.
+    """
+    rows = historie.order_by('produkt_id', 'filiale_id', 'datum', 'id').values_list(
+        'produkt_id', 'filiale_id', 'datum', 'preis'
+    ).iterator(chunk_size=CHUNK_SIZE)
+
+    for (produkt_id, filiale_id), gruppe in groupby(rows, key=itemgetter(0, 1)):
+        stand = None
+        for _, _, datum, preis in gruppe:
+            if stand is None:
+                stand = _Stand(datum, preis)
+            else:
+                stand.add(datum, preis)
+
+        preise = [preis for _, preis in stand.fenster]
+        yield Stand(
+            produkt_id=produkt_id,
+            filiale_id=filiale_id,
+            letzter_preis=stand.letzter_preis,
+            vorheriger_preis=stand.vorheriger_preis,
+            aenderung_prozent=stand.aenderung_prozent,
+            min_preis_12m=min(preise),
+            max_preis_12m=max(preise),
+            erster_kauf=stand.erster_kauf,
+            letzter_kauf=stand.letzter_kauf,
+            letzte_aenderung=stand.letzte_aenderung,
+            anzahl_kaeufe=stand.anzahl_kaeufe,
+        )
+
+
+def _bulk_create(model, objs):
+    # bulk_create() würde den Generator komplett in eine Liste laden
+    objs = iter(objs)
+    count = 0
+    while batch := list(islice(objs, BATCH_SIZE)):
+        model.objects.bulk_create(batch)
+        count += len(batch)
+    return count
+
+
+def berechne_index(ausgaben, mengen):
+    """
+    Verketteter Törnqvist-Index aus zwei Monat×Produkt-Matrizen.
+
+    Rückgabe: (index, anzahl) je Monat - index[0] = 100, anzahl = Produkte,
+    die in diesem und im Vormonat gekauft wurden. Monate ohne gemeinsame
+    Produkte übernehmen den Indexwert des Vormonats.
+    """
+    with np.errstate(divide='ignore', invalid='ignore'):
+        preise = np.where(mengen > 0, ausgaben / mengen, np.nan)
+        gekauft = (ausgaben > 0) & (mengen > 0)
+        beide = gekauft[1:] & gekauft[:-1]
+
+        vorher = np.where(beide, ausgaben[:-1], 0.0)
+        jetzt = np.where(beide, ausgaben[1:], 0.0)
+        anteile = (
+            vorher / vorher.sum(axis=1, keepdims=True)
+            + jetzt / jetzt.sum(axis=1, keepdims=True)
+        ) / 2
+        log_relativ = np.where(beide, np.log(preise[1:] / preise[:-1]), 0.0)
+        glieder = np.exp(np.nansum(np.where(beide, anteile * log_relativ, 0.0), axis=1))
+
+    index = 100 * np.concatenate(([1.0], np.cumprod(glieder)))
+    anzahl = np.concatenate(([0], beide.sum(axis=1)))
+    return index, anzahl
+
+
+def rebuild_index(apps=global_apps):
+    """Monatsindex aus dem Analytics-Mart neu berechnen"""
+    ArtikelTag = apps.get_model('billa', 'BillaMartArtikelTag')
+    PreisIndex = apps.get_model('billa', 'BillaPreisIndex')
+
+    rows = list(
+        ArtikelTag.objects.filter(produkt__isnull=False)
+        .annotate(monat=TruncMonth('datum')).order_by()
+        .values_list('monat', 'produkt_id')
+        .annotate(ausgaben=Sum('ausgaben'), menge=Sum('menge'))
+    )
+
+    with transaction.atomic():
+        PreisIndex.objects.all().delete()
+        if not rows:
+            return 0
+
+        monate = sorted({row[0] for row in rows})
+        produkte = sorted({row[1] for row in rows})
+        m_pos = {monat: i for i, monat in enumerate(monate)}
+        p_pos = {produkt_id: i for i, produkt_id in enumerate(produkte)}
+
+        ausgaben = np.zeros((len(monate), len(produkte)))
+        mengen = np.zeros_like(ausgaben)
+        zeilen = [m_pos[row[0]] for row in rows]
+        spalten = [p_pos[row[1]] for row in rows]
+        ausgaben[zeilen, spalten] = [float(row[2]) for row in rows]
+        mengen[zeilen, spalten] = [float(row[3]) for row in rows]
+
+        index, anzahl = berechne_index(ausgaben, mengen)
+        summen = ausgaben.clip(min=0).sum(axis=1)
+
+        PreisIndex.objects.bulk_create([
+            PreisIndex(
+                monat=monat,
+                index_wert=Decimal(f'{index[i]:.2f}'),
+                veraenderung_prozent=Decimal(f'{(index[i] / index[i - 1] - 1) * 100:.2f}') if i else None,
+                anzahl_produkte=int(anzahl[i]),
+                ausgaben=Decimal(f'{summen[i]:.2f}'),
+            )
+            for i, monat in enumerate(monate)
+        ])
+    return len(monate)
+
+
+def paare(historie):
+    """(produkt_id, filiale_id)-Paare eines BillaPreisHistorie-Querysets"""
+    return set(historie.order_by().values_list('produkt_id', 'filiale_id').distinct())
+
+
+def refresh(keys, apps=global_apps):
+    """Preisstände der angegebenen (produkt_id, filiale_id)-Paare und den Index neu berechnen"""
+    Historie = apps.get_model('billa', 'BillaPreisHistorie')
+    Stand = apps.get_model('billa', 'BillaPreisStand')
+
+    bedingung = Q(pk__in=[])
+    for produkt_id, filiale_id in keys:
+        bedingung |= Q(produkt_id=produkt_id, filiale_id=filiale_id)
+
+    with transaction.atomic():
+        if keys:
+            Stand.objects.filter(bedingung).delete()
+            _bulk_create(Stand, _staende(Historie.objects.filter(bedingung), Stand))
+        rebuild_index(apps)
+
+
+def rebuild(apps=global_apps):
+    """Alle Preisstände und den Index neu aufbauen. Rückgabe: Anzahl Preisstände"""
+    Historie = apps.get_model('billa', 'BillaPreisHistorie')
+    Stand = apps.get_model('billa', 'BillaPreisStand')
+
+    with transaction.atomic():
+        Stand.objects.all().delete()
+        count = _bulk_create(Stand, _staende(Historie.objects.all(), Stand))
+        rebuild_index(apps)
+    return count
@@ -0,0 +1,35 @@
+# billa/signals.py
+"""
+Hält die denormalisierten Produkt-Spalten (Überkategorie, Produktgruppe,
+Marke) im Analytics-Mart aktuell, siehe billa/services/mart.py, und erhöht
+die Daten-Generation BILLA (ETags der Chart-APIs) bei Änderungen.
+"""
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from finance.data_generation import BILLA, bump_generation
+
+from .models import BillaEinkauf, BillaFiliale, BillaProdukt, BillaProduktgruppe, BillaUeberkategorie
+from .services.mart import sync_produkte
+
+# Nur diese Felder landen im Mart
+_MART_FIELDS = {'ueberkategorie', 'produktgruppe', 'marke'}
+
+
+@receiver(post_save, sender=BillaProdukt)
+def produkt_saved(sender, instance, created=False, update_fields=None, raw=False, **kwargs):
+    # Neue Produkte haben noch keine Mart-Zeilen
+    if raw or created or (update_fields and not set(update_fields) & _MART_FIELDS):
+        return
+    sync_produkte([instance.pk])
+
+
+# Artikel hängen immer an einem Einkauf - dessen Anlage/Löschung reicht
+@receiver([post_save, post_delete], sender=BillaEinkauf)
+@receiver([post_save, post_delete], sender=BillaProdukt)
+@receiver([post_save, post_delete], sender=BillaFiliale)
+@receiver([post_save, post_delete], sender=BillaProduktgruppe)
+@receiver([post_save, post_delete], sender=BillaUeberkategorie)
+def bump_billa_generation(sender, raw=False, **kwargs):
+    if not raw:
+        bump_generation(BILLA)
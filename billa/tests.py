@@ -1,17 +1,31 @@
 import copy
+import json
 from datetime import date, time
 from decimal import Decimal
 
-from django.test import TestCase
+from django.contrib.auth.models import User
+from django.test import RequestFactory, TestCase
 
 from billa.models import (
     BillaArtikel,
     BillaEinkauf,
     BillaFiliale,
+    BillaMartArtikelTag,
+    BillaMartEinkaufTag,
     BillaPreisHistorie,
+    BillaPreisIndex,
+    BillaPreisStand,
     BillaProdukt,
+    BillaProduktgruppe,
+    BillaUeberkategorie,
 )
-from billa.views.import_views import _create_einkauf_with_artikel
+from billa.api.einkauefe import billa_api_einkauefe
+from billa.api.preise import billa_api_preisaenderungen
+from billa.services import mart, preise
+from billa.views.einkauefe import billa_einkauefe_liste
+from billa.views.dashboard import billa_dashboard, billa_dashboard_produktgruppen_ajax
+from billa.views.import_views import _create_einkauf_with_artikel, _delete_existing
+from billa.views.preise import billa_preise
 
 
 class BillaImportTests(TestCase):
@@ -74,3 +88,127 @@ class BillaImportTests(TestCase):
         artikel = produkt.artikel.get()
         self.assertEqual(artikel.produkt_name_normalisiert, 'billa bio apfel')
         self.assertEqual(artikel.produkt, produkt)
+
+
+class BillaMartTests(TestCase):
+    def _rechnung(self, re_nr, datum, artikel):
+        return {
+            'datum': datum, 'zeit': time(10, 0), 'filiale': '1234', 'kassa': 1, 'bon_nr': '1',
+            're_nr': re_nr,
+            'gesamt_preis': sum(a[1] for a in artikel),
+            'gesamt_ersparnis': sum(a[2] for a in artikel),
+            'zwischensumme': None, 'mwst_b': None, 'mwst_c': None, 'mwst_g': None, 'mwst_d': None,
+            'oe_punkte_gesammelt': 0, 'oe_punkte_eingeloest': 0, 'pdf_datei': None,
+            'artikel': [
+                {
+                    'position': idx, 'produkt_name': name, 'produkt_name_normalisiert': name.lower(),
+                    'menge': Decimal('1.000'), 'einheit': 'Stk', 'einzelpreis': preis, 'gesamtpreis': preis,
+                    'rabatt': rabatt, 'rabatt_typ': 'Aktion' if rabatt else None, 'mwst_kategorie': 'B',
+                    'ist_gewichtsartikel': False, 'ist_mehrfachgebinde': False,
+                }
+                for idx, (name, preis, rabatt) in enumerate(artikel)
+            ],
+        }
+
+    def setUp(self):
+        _create_einkauf_with_artikel(self._rechnung('R1', date(2025, 3, 1), [
+            ('Milch', Decimal('1.50'), Decimal('0')),
+            ('Apfel', Decimal('2.00'), Decimal('0.50')),
+        ]))
+        _create_einkauf_with_artikel(self._rechnung('R2', date(2025, 3, 1), [
+            ('Milch', Decimal('1.50'), Decimal('0')),
+        ]))
+
+    def test_import_pflegt_tageswerte(self):
+        tag = BillaMartEinkaufTag.objects.get()
+        self.assertEqual((tag.anzahl_einkaeufe, tag.anzahl_artikel), (2, 3))
+        self.assertEqual(tag.ausgaben, Decimal('5.00'))
+
+        milch = BillaMartArtikelTag.objects.get(produkt__name_normalisiert='milch')
+        self.assertEqual((milch.anzahl_artikel, milch.anzahl_einkaeufe), (2, 2))
+        apfel = BillaMartArtikelTag.objects.get(produkt__name_normalisiert='apfel')
+        self.assertEqual((apfel.anzahl_rabattiert, apfel.rabatt), (1, Decimal('0.50')))
+
+        # Re-Import ersetzt die Werte des Tages
+        _delete_existing('R2')
+        self.assertEqual(BillaMartEinkaufTag.objects.get().anzahl_einkaeufe, 1)
+
+    def test_remap_und_drilldown_lesen_aus_mart(self):
+        obst = BillaUeberkategorie.objects.create(name='Obst')
+        gruppe = BillaProduktgruppe.objects.create(name='Äpfel', ueberkategorie=obst)
+        apfel = BillaProdukt.objects.get(name_normalisiert='apfel')
+        apfel.ueberkategorie = obst
+        apfel.produktgruppe = gruppe
+        apfel.save(update_fields=['ueberkategorie', 'produktgruppe'])
+
+        request = RequestFactory().get('/billa/', {'ueberkategorie': 'Obst', 'filiale': '1234'})
+        request.user = User.objects.create_user('sigi', password='x')
+        data = json.loads(billa_dashboard_produktgruppen_ajax(request).content)
+
+        self.assertEqual(data['produktgruppen'], [{'name': 'Äpfel', 'ausgaben': 2.0, 'anzahl_kaeufe': 1}])
+        self.assertEqual(billa_dashboard(request).status_code, 200)
+
+        # Vollständiger Neuaufbau liefert dieselben Zeilen
+        vorher = list(BillaMartArtikelTag.objects.values_list('produkt_id', 'ueberkategorie_id', 'ausgaben').order_by('produkt_id'))
+        mart.rebuild()
+        nachher = list(BillaMartArtikelTag.objects.values_list('produkt_id', 'ueberkategorie_id', 'ausgaben').order_by('produkt_id'))
+        self.assertEqual(vorher, nachher)
+
+    def test_einkaufsliste_blaettert_per_cursor(self):
+        _create_einkauf_with_artikel(self._rechnung('R3', date(2025, 3, 2), [('Brot', Decimal('3.00'), Decimal('0'))]))
+        user = User.objects.create_user('sigi', password='x')
+
+        def api(**params):
+            request = RequestFactory().get('/billa/api/einkauefe/', params)
+            request.user = user
+            return json.loads(billa_api_einkauefe(request).content)
+
+        erste = api(limit=2)
+        zweite = api(limit=2, cursor=erste['next_cursor'], format='html')
+
+        self.assertEqual([e['datum'] for e in erste['results']], ['2025-03-02', '2025-03-01'])
+        self.assertEqual(erste['results'][0]['artikel_anzahl'], 1)
+        self.assertEqual(len(zweite['results']), 1)
+        self.assertIsNone(zweite['next_cursor'])
+        self.assertIn('mobile-card', zweite['cards_html'])
+
+        request = RequestFactory().get('/billa/einkauefe/')
+        request.user = user
+        self.assertContains(billa_einkauefe_liste(request), 'Alle Einkäufe (3)')
+
+    def test_preis_tracker_pflegt_staende_und_index(self):
+        _create_einkauf_with_artikel(self._rechnung('R3', date(2025, 4, 2), [
+            ('Milch', Decimal('1.80'), Decimal('0')),
+            ('Apfel', Decimal('2.00'), Decimal('0')),
+        ]))
+
+        milch = BillaPreisStand.objects.get(produkt__name_normalisiert='milch')
+        self.assertEqual((milch.letzter_preis, milch.vorheriger_preis), (Decimal('1.80'), Decimal('1.50')))
+        self.assertEqual(milch.aenderung_prozent, Decimal('20.00'))
+        self.assertEqual((milch.min_preis_12m, milch.max_preis_12m), (Decimal('1.50'), Decimal('1.80')))
+        self.assertEqual((milch.erster_kauf, milch.letzte_aenderung, milch.anzahl_kaeufe),
+                         (date(2025, 3, 1), date(2025, 4, 2), 3))
+        self.assertIsNone(BillaPreisStand.objects.get(produkt__name_normalisiert='apfel').vorheriger_preis)
+
+        # Törnqvist: Milch +20% mit Ø Ausgabenanteil (0.6 + 1.8/3.8) / 2
+        april = BillaPreisIndex.objects.get(monat=date(2025, 4, 1))
+        self.assertEqual((april.index_wert, april.anzahl_produkte), (Decimal('110.28'), 2))
+        self.assertEqual(BillaPreisIndex.objects.get(monat=date(2025, 3, 1)).index_wert, Decimal('100.00'))
+
+        # Backfill liefert dieselben Stände
+        vorher = list(BillaPreisStand.objects.values_list('produkt_id', 'letzter_preis', 'aenderung_prozent').order_by('produkt_id'))
+        preise.rebuild()
+        nachher = list(BillaPreisStand.objects.values_list('produkt_id', 'letzter_preis', 'aenderung_prozent').order_by('produkt_id'))
+        self.assertEqual(vorher, nachher)
+
+        request = RequestFactory().get('/billa/api/preisaenderungen/', {'richtung': 'teurer', 'format': 'html'})
+        request.user = User.objects.create_user('sigi', password='x')
+        data = json.loads(billa_api_preisaenderungen(request).content)
+        self.assertEqual([r['produkt_id'] for r in data['results']], [milch.produkt_id])
+        self.assertIn('+20,0%', data['rows_html'])
+        self.assertContains(billa_preise(request), '110,3')
+
+        # Re-Import ohne den April-Bon: keine Änderung mehr
+        _delete_existing('R3')
+        self.assertIsNone(BillaPreisStand.objects.get(produkt__name_normalisiert='milch').vorheriger_preis)
+        self.assertEqual(BillaPreisIndex.objects.count(), 1)
@@ -1,6 +1,6 @@
 from django.urls import path
 from billa import views
-from billa.api import stats
+from billa.api import einkauefe, preise, stats
 
 app_name = 'billa'
 
@@ -8,6 +8,8 @@ urlpatterns = [
 
     path('', views.billa_dashboard, name='billa_dashboard'),
     path('import/', views.billa_import_upload, name='billa_import'),
+    path('import/upload-url/', views.billa_import_upload_url, name='billa_import_upload_url'),
+    path('import/confirm/', views.billa_import_confirm, name='billa_import_confirm'),
 
     # Einkäufe
     path('einkauefe/', views.billa_einkauefe_liste, name='billa_einkauefe_liste'),
@@ -33,9 +35,15 @@ urlpatterns = [
     path('marken/', views.billa_marken_liste, name='billa_marken_liste'),
     path('marke/<str:marke>/', views.billa_marke_detail, name='billa_marke_detail'),
 
+    # Preise
+    path('preise/', views.billa_preise, name='billa_preise'),
+
     # Billa API Endpoints
     path('api/preisverlauf/<int:produkt_id>/', stats.billa_api_preisverlauf, name='billa_api_preisverlauf'),
     path('api/stats/', stats.billa_api_stats, name='api_stats'),
+    path('api/einkauefe/', einkauefe.billa_api_einkauefe, name='billa_api_einkauefe'),
+    path('api/preisindex/', preise.billa_api_preisindex, name='billa_api_preisindex'),
+    path('api/preisaenderungen/', preise.billa_api_preisaenderungen, name='billa_api_preisaenderungen'),
     path('api/bulk-update-by-name/', views.bulk_update_by_name, name='bulk_update_by_name'),
     path('api/produktgruppen/', views.billa_dashboard_produktgruppen_ajax, name='billa_dashboard_produktgruppen_ajax'),
     path('api/produkte/', views.billa_dashboard_produkte_ajax, name='billa_dashboard_produkte_ajax'),
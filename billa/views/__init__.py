@@ -8,7 +8,8 @@ from .produkte import (
     billa_produktgruppen_mapper, ajax_create_kategorie,
     bulk_update_by_name
 )
-from .import_views import billa_import_upload
+from .preise import billa_preise
+from .import_views import billa_import_upload, billa_import_upload_url, billa_import_confirm
 
 __all__ = [
     'billa_dashboard', 'billa_dashboard_produktgruppen_ajax', 'billa_dashboard_produkte_ajax',
@@ -17,7 +18,8 @@ __all__ = [
     'billa_produktgruppen_liste', 'billa_produktgruppe_detail',
     'billa_ueberkategorien_liste', 'billa_ueberkategorie_detail',
     'billa_marken_liste', 'billa_marke_detail',
+    'billa_preise',
     'billa_produktgruppen_mapper', 'ajax_create_kategorie',
-    'billa_import_upload',
+    'billa_import_upload', 'billa_import_upload_url', 'billa_import_confirm',
     'bulk_update_by_name',
 ]
\ No newline at end of file
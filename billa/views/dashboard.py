@@ -1,12 +1,15 @@
 import json
 from django.shortcuts import render
 from django.contrib.auth.decorators import login_required
-from django.db.models import Count, Sum, Avg, Q
-from django.db.models.functions import TruncDate, TruncMonth
+from django.db.models import Sum, Q
+from django.db.models.functions import TruncMonth
 from django.http import JsonResponse
 from billa.models import (
-    BillaEinkauf, BillaArtikel, BillaProdukt, BillaFiliale
+    BillaProdukt, BillaFiliale, BillaMartArtikelTag, BillaMartEinkaufTag
 )
+from billa.services.mart import einkauf_summary, filter_mart
+from config.conditional import conditional_json
+from finance.data_generation import BILLA
 
 
 @login_required
@@ -18,88 +21,57 @@ def billa_dashboard(request):
     end_date = request.GET.get('end_date')
     filiale_id = request.GET.get('filiale')
 
-    # Basis-Queryset
-    einkaufe = BillaEinkauf.objects.select_related('filiale')
-    artikel = BillaArtikel.objects.select_related(
-        'einkauf__filiale',
-        'produkt__ueberkategorie',
-        'produkt__produktgruppe'
-    )
-
-    # Datum-Filter
-    if start_date:
-        einkaufe = einkaufe.filter(datum__gte=start_date)
-        artikel = artikel.filter(einkauf__datum__gte=start_date)
-    if end_date:
-        einkaufe = einkaufe.filter(datum__lte=end_date)
-        artikel = artikel.filter(einkauf__datum__lte=end_date)
-
-    # Filialen-Filter
-    if filiale_id and filiale_id != 'alle':
-        einkaufe = einkaufe.filter(filiale__filial_nr=filiale_id)
-        artikel = artikel.filter(einkauf__filiale__filial_nr=filiale_id)
+    # Basis-Querysets auf dem Analytics-Mart (billa/services/mart.py)
+    einkaufe = filter_mart(BillaMartEinkaufTag.objects.all(), start_date, end_date, filiale_id)
+    artikel = filter_mart(BillaMartArtikelTag.objects.all(), start_date, end_date, filiale_id)
 
     # Kennzahlen
-    stats = einkaufe.aggregate(
-        anzahl=Count('id'),
-        gesamt_ausgaben=Sum('gesamt_preis'),
-        gesamt_ersparnis=Sum('gesamt_ersparnis'),
-        avg_warenkorb=Avg('gesamt_preis')
-    )
+    stats = einkauf_summary(start_date, end_date, filiale_id)
 
     # Ausgaben im Zeitverlauf (täglich)
-    daily_spending_raw = einkaufe.annotate(
-        tag=TruncDate('datum')
-    ).values('tag').annotate(
-        ausgaben=Sum('gesamt_preis')
-    ).order_by('tag')
+    daily_spending_raw = einkaufe.values('datum').annotate(
+        ausgaben=Sum('ausgaben')
+    ).order_by('datum')
 
     daily_spending = [
         {
-            'tag': item['tag'].strftime('%Y-%m-%d'),
+            'tag': item['datum'].strftime('%Y-%m-%d'),
             'ausgaben': float(item['ausgaben']) if item['ausgaben'] else 0
         }
         for item in daily_spending_raw
     ]
 
-    # Durchschnittliche Kosten pro Produkt und Einkauf
-    avg_cost_per_purchase_raw = einkaufe.annotate(
-        artikelanzahl=Count('artikel')
-    ).order_by('datum', 'id')
-
+    # Durchschnittliche Kosten pro Produkt und Einkauf (pro Tag und Filiale)
     avg_cost_per_purchase = []
-    for einkauf in avg_cost_per_purchase_raw:
-        artikelanzahl = einkauf.artikelanzahl or 0
-        gesamt_preis = float(einkauf.gesamt_preis) if einkauf.gesamt_preis is not None else 0.0
-        durchschnitt = gesamt_preis / artikelanzahl if artikelanzahl else 0
-
+    for tag in einkaufe.select_related('filiale').order_by('datum', 'filiale_id'):
+        gesamt_preis = float(tag.ausgaben)
         avg_cost_per_purchase.append({
-            'datum': einkauf.datum.strftime('%Y-%m-%d'),
-            'durchschnitt': durchschnitt,
-            'anzahl_produkte': artikelanzahl,
+            'datum': tag.datum.strftime('%Y-%m-%d'),
+            'durchschnitt': gesamt_preis / tag.anzahl_artikel if tag.anzahl_artikel else 0,
+            'anzahl_produkte': tag.anzahl_artikel,
             'gesamt_preis': gesamt_preis,
-            'filiale': str(einkauf.filiale) if einkauf.filiale else ''
+            'filiale': str(tag.filiale)
         })
 
     # Monatliche Ausgaben nach Überkategorie
     monthly_by_group_raw = artikel.annotate(
-        monat=TruncMonth('einkauf__datum')
-    ).values('monat', 'produkt__ueberkategorie__name').annotate(
-        ausgaben=Sum('gesamtpreis')
-    ).order_by('monat', 'produkt__ueberkategorie__name')
+        monat=TruncMonth('datum')
+    ).values('monat', 'ueberkategorie__name').annotate(
+        ausgaben=Sum('ausgaben')
+    ).order_by('monat', 'ueberkategorie__name')
 
     monthly_data = {}
     all_ueberkategorien = set()
 
     for item in monthly_by_group_raw:
         monat_str = item['monat'].strftime('%Y-%m') if item['monat'] else 'Unbekannt'
-        ueberkategorie = item['produkt__ueberkategorie__name'] or 'Ohne Kategorie'
+        ueberkategorie = item['ueberkategorie__name'] or 'Ohne Kategorie'
         ausgaben = float(item['ausgaben']) if item['ausgaben'] else 0
 
         if monat_str not in monthly_data:
             monthly_data[monat_str] = {}
 
-        monthly_data[monat_str][ueberkategorie] = ausgaben
+        monthly_data[monat_str][ueberkategorie] = monthly_data[monat_str].get(ueberkategorie, 0) + ausgaben
         all_ueberkategorien.add(ueberkategorie)
 
     kategorie_totals = {}
@@ -154,9 +126,9 @@ def billa_dashboard(request):
     monthly_spending_raw = einkaufe.annotate(
         monat=TruncMonth('datum')
     ).values('monat').annotate(
-        ausgaben=Sum('gesamt_preis'),
-        ersparnis=Sum('gesamt_ersparnis'),
-        anzahl=Count('id')
+        ausgaben=Sum('ausgaben'),
+        ersparnis=Sum('ersparnis'),
+        anzahl=Sum('anzahl_einkaeufe')
     ).order_by('monat')
 
     monthly_spending = [
@@ -169,100 +141,55 @@ def billa_dashboard(request):
         for item in monthly_spending_raw
     ]
 
-    top_produkte_anzahl_raw = artikel.values(
+    top_produkte_raw = artikel.values(
         'produkt__name_korrigiert',
-        'produkt__ueberkategorie__name'
+        'ueberkategorie__name'
     ).annotate(
-        anzahl=Count('id'),
-        ausgaben=Sum('gesamtpreis')
-    ).order_by('-anzahl')[:15]
+        anzahl=Sum('anzahl_artikel'),
+        ausgaben=Sum('ausgaben')
+    )
 
     top_produkte_anzahl = [
         {
             'produkt__name_korrigiert': item['produkt__name_korrigiert'],
-            'produkt__ueberkategorie': item['produkt__ueberkategorie__name'],
+            'produkt__ueberkategorie': item['ueberkategorie__name'],
             'anzahl': item['anzahl'],
             'ausgaben': float(item['ausgaben']) if item['ausgaben'] else 0
         }
-        for item in top_produkte_anzahl_raw
+        for item in top_produkte_raw.order_by('-anzahl')[:15]
     ]
 
-    top_produkte_ausgaben_raw = artikel.values(
-        'produkt__name_korrigiert',
-        'produkt__ueberkategorie__name'
-    ).annotate(
-        ausgaben=Sum('gesamtpreis'),
-        anzahl=Count('id')
-    ).order_by('-ausgaben')[:15]
-
     top_produkte_ausgaben = [
         {
             'produkt__name_korrigiert': item['produkt__name_korrigiert'],
-            'produkt__ueberkategorie': item['produkt__ueberkategorie__name'],
+            'produkt__ueberkategorie': item['ueberkategorie__name'],
             'ausgaben': float(item['ausgaben']) if item['ausgaben'] else 0,
             'anzahl': item['anzahl']
         }
-        for item in top_produkte_ausgaben_raw
+        for item in top_produkte_raw.order_by('-ausgaben')[:15]
     ]
 
     # Ausgaben nach Kategorie (Überkategorien)
     ausgaben_kategorie_raw = artikel.values(
-        'produkt__ueberkategorie__name'
+        'ueberkategorie__name'
     ).annotate(
-        ausgaben=Sum('gesamtpreis')
+        ausgaben=Sum('ausgaben')
     ).order_by('-ausgaben')
 
     ausgaben_kategorie = [
         {
-            'produkt__ueberkategorie': item['produkt__ueberkategorie__name'] or 'Ohne Kategorie',
+            'produkt__ueberkategorie': item['ueberkategorie__name'] or 'Ohne Kategorie',
             'ausgaben': float(item['ausgaben']) if item['ausgaben'] else 0
         }
         for item in ausgaben_kategorie_raw
     ]
 
-    # ========================================
-    # ✅ NEU: Produktgruppen nach Überkategorie für Drill-Down
-    # ========================================
-    produktgruppen_nach_kategorie = {}
-
-    # Hole alle Überkategorien mit Ausgaben
-    ueberkategorien_mit_ausgaben = artikel.values(
-        'produkt__ueberkategorie__name'
-    ).annotate(
-        ausgaben=Sum('gesamtpreis')
-    ).order_by('-ausgaben')
-
-    for ueberkategorie_item in ueberkategorien_mit_ausgaben:
-        ueberkategorie_name = ueberkategorie_item['produkt__ueberkategorie__name']
-        if not ueberkategorie_name:
-            ueberkategorie_name = 'Ohne Kategorie'
-
-        # Aggregiere Produktgruppen für diese Überkategorie
-        if ueberkategorie_name == 'Ohne Kategorie':
-            produktgruppen = artikel.filter(
-                produkt__ueberkategorie__isnull=True
-            ).values(
-                'produkt__produktgruppe__name'
-            ).annotate(
-                ausgaben=Sum('gesamtpreis'),
-                anzahl_kaeufe=Count('id')
-            ).order_by('-ausgaben')
-        else:
-            produktgruppen = artikel.filter(
-                produkt__ueberkategorie__name=ueberkategorie_name
-            ).values(
-                'produkt__produktgruppe__name'
-            ).annotate(
-                ausgaben=Sum('gesamtpreis'),
-                anzahl_kaeufe=Count('id')
-            ).order_by('-ausgaben')
-
     # Rabatte nach Typ
     rabatte_raw = artikel.filter(
-        rabatt__gt=0
+        anzahl_rabattiert__gt=0
     ).values('rabatt_typ').annotate(
         ersparnis=Sum('rabatt'),
-        anzahl=Count('id')
+        anzahl=Sum('anzahl_rabattiert')
     ).order_by('-ersparnis')
 
     rabatte = [
@@ -309,6 +236,7 @@ def billa_dashboard(request):
 
 
 @login_required
+@conditional_json(BILLA)
 def billa_dashboard_produktgruppen_ajax(request):
     """API Endpoint für Produktgruppen einer Überkategorie"""
     ueberkategorie = request.GET.get('ueberkategorie')
@@ -321,46 +249,25 @@ def billa_dashboard_produktgruppen_ajax(request):
     end_date = request.GET.get('end_date')
     filiale_id = request.GET.get('filiale')
 
-    # Basis-Queryset
-    artikel = BillaArtikel.objects.select_related(
-        'produkt__ueberkategorie',
-        'produkt__produktgruppe'
-    )
-
-    # Datum-Filter
-    if start_date:
-        artikel = artikel.filter(einkauf__datum__gte=start_date)
-    if end_date:
-        artikel = artikel.filter(einkauf__datum__lte=end_date)
-
-    # Filialen-Filter
-    if filiale_id and filiale_id != 'alle':
-        artikel = artikel.filter(einkauf__filiale__filial_nr=filiale_id)
+    artikel = filter_mart(BillaMartArtikelTag.objects.all(), start_date, end_date, filiale_id)
 
     # Aggregiere Produktgruppen für diese Überkategorie
     if ueberkategorie == 'Ohne Kategorie':
-        produktgruppen = artikel.filter(
-            produkt__ueberkategorie__isnull=True
-        ).values(
-            'produkt__produktgruppe__name'
-        ).annotate(
-            ausgaben=Sum('gesamtpreis'),
-            anzahl_kaeufe=Count('id')
-        ).order_by('-ausgaben')
+        artikel = artikel.filter(ueberkategorie__isnull=True)
     else:
-        produktgruppen = artikel.filter(
-            produkt__ueberkategorie__name=ueberkategorie
-        ).values(
-            'produkt__produktgruppe__name'
-        ).annotate(
-            ausgaben=Sum('gesamtpreis'),
-            anzahl_kaeufe=Count('id')
-        ).order_by('-ausgaben')
+        artikel = artikel.filter(ueberkategorie__name=ueberkategorie)
+
+    produktgruppen = artikel.values(
+        'produktgruppe__name'
+    ).annotate(
+        ausgaben=Sum('ausgaben'),
+        anzahl_kaeufe=Sum('anzahl_artikel')
+    ).order_by('-ausgaben')
 
     # Konvertiere zu JSON
     data = [
         {
-            'name': pg['produkt__produktgruppe__name'] or 'Ohne Gruppe',
+            'name': pg['produktgruppe__name'] or 'Ohne Gruppe',
             'ausgaben': float(pg['ausgaben']) if pg['ausgaben'] else 0,
             'anzahl_kaeufe': pg['anzahl_kaeufe']
         }
@@ -375,6 +282,7 @@ def billa_dashboard_produktgruppen_ajax(request):
 
 
 @login_required
+@conditional_json(BILLA)
 def billa_dashboard_produkte_ajax(request):
     """API Endpoint für Produkte einer Produktgruppe"""
     produktgruppe = request.GET.get('produktgruppe')
@@ -388,43 +296,21 @@ def billa_dashboard_produkte_ajax(request):
     end_date = request.GET.get('end_date')
     filiale_id = request.GET.get('filiale')
 
-    # Basis-Queryset
-    artikel = BillaArtikel.objects.select_related(
-        'produkt__ueberkategorie',
-        'produkt__produktgruppe'
-    )
-
-    # Datum-Filter
-    if start_date:
-        artikel = artikel.filter(einkauf__datum__gte=start_date)
-    if end_date:
-        artikel = artikel.filter(einkauf__datum__lte=end_date)
-
-    # Filialen-Filter
-    if filiale_id and filiale_id != 'alle':
-        artikel = artikel.filter(einkauf__filiale__filial_nr=filiale_id)
+    artikel = filter_mart(BillaMartArtikelTag.objects.all(), start_date, end_date, filiale_id)
 
     # Aggregiere Produkte für diese Produktgruppe
     if produktgruppe == 'Ohne Gruppe':
-        produkte = artikel.filter(
-            produkt__produktgruppe__isnull=True
-        ).values(
-            'produkt__name_korrigiert',
-            'produkt__id'
-        ).annotate(
-            ausgaben=Sum('gesamtpreis'),
-            anzahl_kaeufe=Count('id')
-        ).order_by('-ausgaben')[:20]  # Limit auf Top 20
+        artikel = artikel.filter(produktgruppe__isnull=True)
     else:
-        produkte = artikel.filter(
-            produkt__produktgruppe__name=produktgruppe
-        ).values(
-            'produkt__name_korrigiert',
-            'produkt__id'
-        ).annotate(
-            ausgaben=Sum('gesamtpreis'),
-            anzahl_kaeufe=Count('id')
-        ).order_by('-ausgaben')[:20]  # Limit auf Top 20
+        artikel = artikel.filter(produktgruppe__name=produktgruppe)
+
+    produkte = artikel.values(
+        'produkt__name_korrigiert',
+        'produkt_id'
+    ).annotate(
+        ausgaben=Sum('ausgaben'),
+        anzahl_kaeufe=Sum('anzahl_artikel')
+    ).order_by('-ausgaben')[:20]  # Limit auf Top 20
 
     # Konvertiere zu JSON
     data = [
@@ -432,7 +318,7 @@ def billa_dashboard_produkte_ajax(request):
             'name': p['produkt__name_korrigiert'] or 'Unbekannt',
             'ausgaben': float(p['ausgaben']) if p['ausgaben'] else 0,
             'anzahl_kaeufe': p['anzahl_kaeufe'],
-            'produkt_id': p['produkt__id']
+            'produkt_id': p['produkt_id']
         }
         for p in produkte if p['ausgaben'] and p['ausgaben'] > 0
     ]
@@ -1,49 +1,32 @@
 from django.shortcuts import render, get_object_or_404
-from django.db.models import Count, Sum, Avg
 from django.contrib.auth.decorators import login_required
+from billa.api.einkauefe import filter_einkaeufe, paginate_einkaeufe
 from billa.models import (
     BillaEinkauf, BillaFiliale
 )
+from billa.services.mart import einkauf_summary
 
 
 @login_required
 def billa_einkauefe_liste(request):
-    """Übersicht aller Einkäufe"""
+    """Übersicht aller Einkäufe (erste Seite, weitere per billa_api_einkauefe)"""
 
     # Filter aus GET-Parametern
     start_date = request.GET.get('start_date')
     end_date = request.GET.get('end_date')
     filiale_id = request.GET.get('filiale')
 
-    # Basis-Queryset
-    einkaufe = BillaEinkauf.objects.select_related('filiale')
+    page = paginate_einkaeufe(filter_einkaeufe(request.GET))
 
-    # Datum-Filter
-    if start_date:
-        einkaufe = einkaufe.filter(datum__gte=start_date)
-    if end_date:
-        einkaufe = einkaufe.filter(datum__lte=end_date)
-
-    # Filialen-Filter
-    if filiale_id and filiale_id != 'alle':
-        einkaufe = einkaufe.filter(filiale__filial_nr=filiale_id)
-
-    # Sortierung
-    einkaufe = einkaufe.order_by('-datum', '-zeit')
-
-    # Statistiken
-    stats = einkaufe.aggregate(
-        anzahl=Count('id'),
-        gesamt_ausgaben=Sum('gesamt_preis'),
-        gesamt_ersparnis=Sum('gesamt_ersparnis'),
-        avg_warenkorb=Avg('gesamt_preis')
-    )
+    # Statistiken aus dem Analytics-Mart statt über alle Einkäufe
+    stats = einkauf_summary(start_date, end_date, filiale_id)
 
     # Filialen für Filter
     filialen = BillaFiliale.objects.filter(aktiv=True).order_by('filial_nr')
 
     context = {
-        'einkaufe': einkaufe,
+        'einkaufe': page.items,
+        'next_cursor': page.next_cursor,
         'stats': stats,
         'filialen': filialen,
         'selected_filiale': filiale_id or 'alle',
@@ -53,6 +36,7 @@ def billa_einkauefe_liste(request):
 
     return render(request, 'billa/billa_einkauefe_liste.html', context)
 
+
 @login_required
 def billa_einkauf_detail(request, einkauf_id):
     """Detail-Ansicht eines Einkaufs"""
@@ -6,11 +6,17 @@ from billa.services.brand_mapper import BrandMapper
 from django.db import transaction
 from django.shortcuts import render
 from django.contrib.auth.decorators import login_required
+from django.http import JsonResponse
+from django.utils import timezone
+from django.views.decorators.http import require_POST
 from billa.models import (
     BillaEinkauf, BillaArtikel, BillaProdukt,
     BillaPreisHistorie, BillaFiliale
 )
+from billa.services import mart, preise
 from billa.services.parser import BillaReceiptParser
+from finance.storages.presigned import UploadTokenError, confirm_upload, issue_upload, supports_presigned
+from finance.storages import LazyR2Storage, r2_configured
 
 
 @login_required
@@ -43,49 +49,7 @@ def billa_import_upload(request):
                     for chunk in pdf_file.chunks():
                         destination.write(chunk)
 
-                # Parse PDF (verwendet jetzt die konsolidierte Logik)
-                data = parser.parse_pdf(temp_path)
-
-                # Prüfe ob bereits importiert (VOR der Transaktion!)
-                if not force and data.get('re_nr'):
-                    if BillaEinkauf.objects.filter(re_nr=data['re_nr']).exists():
-                        stats['skipped'] += 1
-                        stats['error_details'].append({
-                            'file': pdf_file.name,
-                            'error': f'Rechnung bereits vorhanden (Re-Nr: {data["re_nr"]}). Aktiviere "Erneut importieren" um zu überschreiben.'
-                        })
-                        continue
-
-                # Jedes PDF in eigener Transaktion!
-                with transaction.atomic():
-                    # Bei force: Alte Rechnung löschen
-                    if force and data.get('re_nr'):
-                        BillaEinkauf.objects.filter(re_nr=data['re_nr']).delete()
-
-                    # Erstelle Einkauf und Artikel
-                    _create_einkauf_with_artikel(data)
-
-                stats['imported'] += 1
-
-            except Exception as e:
-                stats['errors'] += 1
-                error_msg = str(e)
-
-                # Debug-Info bei Parsing-Fehlern
-                if "konnte nicht" in error_msg or "NULL" in error_msg:
-                    try:
-                        import pdfplumber
-                        with pdfplumber.open(temp_path) as pdf:
-                            first_page_text = pdf.pages[0].extract_text()
-                            preview = first_page_text[:500] if first_page_text else "Kein Text extrahierbar"
-                            error_msg += f"\n\nPDF-Vorschau (erste 500 Zeichen):\n{preview}"
-                    except:
-                        pass
-
-                stats['error_details'].append({
-                    'file': pdf_file.name,
-                    'error': error_msg
-                })
+                _import_pdf(parser, temp_path, pdf_file.name, force, stats)
 
             finally:
                 # Lösche temporäre Datei
@@ -95,21 +59,7 @@ def billa_import_upload(request):
                 except:
                     pass
 
-        # Feedback-Nachrichten
-        if stats['imported'] > 0:
-            messages.success(request, f"✓ {stats['imported']} Rechnung(en) erfolgreich importiert")
-
-        if stats['skipped'] > 0:
-            messages.warning(request, f"⊘ {stats['skipped']} Rechnung(en) übersprungen (bereits vorhanden)")
-            # Zeige Details für übersprungene Rechnungen
-            for error in [e for e in stats['error_details'] if 'bereits vorhanden' in e.get('error', '')]:
-                messages.info(request, f"  • {error['file']}")
-
-        if stats['errors'] > 0:
-            messages.error(request, f"✗ {stats['errors']} Fehler beim Import")
-            # Zeige nur echte Fehler (nicht die Duplikate)
-            for error in [e for e in stats['error_details'] if 'bereits vorhanden' not in e.get('error', '')]:
-                messages.error(request, f"  • {error['file']}: {error['error']}")
+        _add_import_messages(request, stats)
 
         return redirect('billa:billa_dashboard')
 
@@ -117,6 +67,137 @@ def billa_import_upload(request):
     return render(request, 'billa/billa_import.html', context)
 
 
+_r2_pdf_storage = LazyR2Storage()
+
+
+def _pdf_storage():
+    """R2-Storage für Billa-PDFs, None ohne Credentials"""
+    return _r2_pdf_storage if r2_configured() else None
+
+
+@login_required
+@require_POST
+def billa_import_upload_url(request):
+    """
+    Direkt-Upload, Schritt 1: presigned PUT-URL für ein PDF nach R2.
+    Ohne R2 409 -> das Formular wird klassisch abgeschickt.
+    """
+    storage = _pdf_storage()
+    if storage is None or not supports_presigned(storage):
+        return JsonResponse({'direct': False}, status=409)
+
+    filename = os.path.basename(request.POST.get('filename', '')) or 'rechnung.pdf'
+    if not filename.lower().endswith('.pdf'):
+        return JsonResponse({'error': 'Nur PDF-Dateien erlaubt.'}, status=400)
+
+    upload = issue_upload(
+        storage, f'uploads/{timezone.now():%Y/%m}/{filename}', 'application/pdf',
+        purpose='billa_pdf', user_id=request.user.id, extra={'filename': filename},
+    )
+    return JsonResponse({'direct': True, **upload})
+
+
+@login_required
+@require_POST
+def billa_import_confirm(request):
+    """
+    Direkt-Upload, Schritt 2: PDF aus R2 laden und importieren.
+    Die Meldungen landen wie beim Formular-Upload im Dashboard.
+    """
+    storage = _pdf_storage()
+    if storage is None:
+        return JsonResponse({'error': 'R2 nicht konfiguriert.'}, status=409)
+    try:
+        payload = confirm_upload(storage, request.POST.get('token', ''), 'billa_pdf', request.user.id)
+    except UploadTokenError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+
+    stats = {'total': 1, 'imported': 0, 'skipped': 0, 'errors': 0, 'error_details': []}
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_path = os.path.join(temp_dir, payload['filename'])
+        with storage.open(payload['name'], 'rb') as source, open(temp_path, 'wb') as destination:
+            for chunk in iter(lambda: source.read(1024 * 1024), b''):
+                destination.write(chunk)
+        _import_pdf(BillaReceiptParser(), temp_path, payload['filename'], bool(request.POST.get('force')), stats)
+
+    _add_import_messages(request, stats)
+    return JsonResponse({key: stats[key] for key in ('imported', 'skipped', 'errors')})
+
+
+def _import_pdf(parser, temp_path, filename, force, stats):
+    """Ein PDF parsen und importieren; Ergebnis landet in stats"""
+    try:
+        # Parse PDF (verwendet jetzt die konsolidierte Logik)
+        data = parser.parse_pdf(temp_path)
+
+        # Prüfe ob bereits importiert (VOR der Transaktion!)
+        if not force and data.get('re_nr'):
+            if BillaEinkauf.objects.filter(re_nr=data['re_nr']).exists():
+                stats['skipped'] += 1
+                stats['error_details'].append({
+                    'file': filename,
+                    'error': f'Rechnung bereits vorhanden (Re-Nr: {data["re_nr"]}). Aktiviere "Erneut importieren" um zu überschreiben.'
+                })
+                return
+
+        # Jedes PDF in eigener Transaktion!
+        with transaction.atomic():
+            # Bei force: Alte Rechnung löschen
+            if force and data.get('re_nr'):
+                _delete_existing(data['re_nr'])
+
+            # Erstelle Einkauf und Artikel
+            _create_einkauf_with_artikel(data)
+
+        stats['imported'] += 1
+
+    except Exception as e:
+        stats['errors'] += 1
+        error_msg = str(e)
+
+        # Debug-Info bei Parsing-Fehlern
+        if "konnte nicht" in error_msg or "NULL" in error_msg:
+            try:
+                import pdfplumber
+                with pdfplumber.open(temp_path) as pdf:
+                    first_page_text = pdf.pages[0].extract_text()
+                    preview = first_page_text[:500] if first_page_text else "Kein Text extrahierbar"
+                    error_msg += f"\n\nPDF-Vorschau (erste 500 Zeichen):\n{preview}"
+            except:
+                pass
+
+        stats['error_details'].append({
+            'file': filename,
+            'error': error_msg
+        })
+
+
+def _add_import_messages(request, stats):
+    """Feedback-Nachrichten für Formular- und Direkt-Upload"""
+    if stats['imported'] > 0:
+        messages.success(request, f"✓ {stats['imported']} Rechnung(en) erfolgreich importiert")
+
+    if stats['skipped'] > 0:
+        messages.warning(request, f"⊘ {stats['skipped']} Rechnung(en) übersprungen (bereits vorhanden)")
+        # Zeige Details für übersprungene Rechnungen
+        for error in [e for e in stats['error_details'] if 'bereits vorhanden' in e.get('error', '')]:
+            messages.info(request, f"  • {error['file']}")
+
+    if stats['errors'] > 0:
+        messages.error(request, f"✗ {stats['errors']} Fehler beim Import")
+        # Zeige nur echte Fehler (nicht die Duplikate)
+        for error in [e for e in stats['error_details'] if 'bereits vorhanden' not in e.get('error', '')]:
+            messages.error(request, f"  • {error['file']}: {error['error']}")
+
+
+def _delete_existing(re_nr):
+    """Bestehende Rechnung(en) löschen (Re-Import), Mart-Tage und Preisstände nachziehen"""
+    einkaufe = BillaEinkauf.objects.filter(re_nr=re_nr)
+    tage = set(einkaufe.values_list('datum', flat=True))
+    paare = preise.paare(BillaPreisHistorie.objects.filter(artikel__einkauf__in=einkaufe))
+    einkaufe.delete()
+    mart.refresh_days(tage)
+    preise.refresh(paare)
 
 
 def _create_einkauf_with_artikel(data):
@@ -204,4 +285,8 @@ def _create_einkauf_with_artikel(data):
         # Aktualisiere Produkt-Statistiken
         produkt.update_statistiken()
 
+    # Analytics-Mart für diesen Tag neu berechnen, danach Preisstände und Index
+    mart.refresh_days({einkauf.datum})
+    preise.refresh(preise.paare(BillaPreisHistorie.objects.filter(artikel__einkauf=einkauf)))
+
     return einkauf
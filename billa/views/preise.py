@@ -0,0 +1,38 @@
+from django.contrib.auth.decorators import login_required
+from django.db.models import Count, Q
+from django.shortcuts import render
+
+from billa.api.preise import filter_aenderungen, paginate_aenderungen, preisindex_data
+from billa.models import BillaFiliale, BillaPreisStand
+
+
+@login_required
+def billa_preise(request):
+    """Preis-Tracker: Warenkorb-Preisindex und letzte Preisänderungen"""
+    richtung = request.GET.get('richtung', 'alle')
+    filiale_id = request.GET.get('filiale')
+
+    page = paginate_aenderungen(filter_aenderungen(request.GET))
+
+    stats = BillaPreisStand.objects.aggregate(
+        produkte=Count('id'),
+        teurer=Count('id', filter=Q(aenderung_prozent__gt=0)),
+        billiger=Count('id', filter=Q(aenderung_prozent__lt=0)),
+    )
+
+    index = preisindex_data()
+    if index['index']:
+        stats['index_aktuell'] = index['index'][-1]
+        stats['monat_aktuell'] = index['monate'][-1]
+
+    context = {
+        'staende': page.items,
+        'next_cursor': page.next_cursor,
+        'stats': stats,
+        'index': index,
+        'filialen': BillaFiliale.objects.filter(aktiv=True).order_by('filial_nr'),
+        'selected_filiale': filiale_id or 'alle',
+        'richtung': richtung,
+    }
+
+    return render(request, 'billa/billa_preise.html', context)
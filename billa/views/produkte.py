@@ -11,6 +11,7 @@ from django.utils.dateparse import parse_date
 from billa.models import (
     BillaArtikel, BillaProdukt, BillaPreisHistorie, BillaUeberkategorie, BillaProduktgruppe
 )
+from billa.services import mart
 
 logger = logging.getLogger(__name__)
 
@@ -213,9 +214,11 @@ def bulk_update_by_name(request):
             'produktgruppe': produktgruppe if produktgruppe else None
         }
 
-        updated_count = BillaProdukt.objects.filter(
-            name_korrigiert=name_korrigiert
-        ).update(**update_dict)
+        produkte = BillaProdukt.objects.filter(name_korrigiert=name_korrigiert)
+        updated_count = produkte.update(**update_dict)
+
+        # .update() löst keine Signals aus → Analytics-Mart direkt nachziehen
+        mart.sync_produkte(produkte.values('pk'))
 
         logger.info(f"Bulk update: {updated_count} Produkte mit name_korrigiert='{name_korrigiert}' aktualisiert")
 
@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class BitpandaConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'bitpanda'
+
+    def ready(self):
+        """
+        Signals für die Daten-Generation registrieren
+        """
+        import bitpanda.signals  # noqa
@@ -1,11 +1,14 @@
 # bitpanda/bitpanda_service.py
 import requests
 from decimal import Decimal
-from typing import Dict, List, Optional
+from typing import Dict, Iterator, List, Optional
 import logging
 import os
 from datetime import datetime, timedelta
 from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 # Fix für Windows SSL Certificate Problem
 try:
@@ -17,6 +20,31 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+# Max. Seitengröße der Bitpanda API
+TRADES_PAGE_SIZE = 100
+
+_session = None
+
+
+def get_session() -> requests.Session:
+    """
+    Geteilte HTTP-Session (Connection-Pool + Retry bei 429/5xx) für
+    Bitpanda und CoinGecko - bei paginierten Abrufen wird die
+    TLS-Verbindung wiederverwendet statt pro Seite neu aufgebaut.
+    """
+    global _session
+    if _session is None:
+        retry = Retry(
+            total=3,
+            backoff_factor=0.5,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=('GET',),
+        )
+        adapter = HTTPAdapter(pool_connections=2, pool_maxsize=4, max_retries=retry)
+        _session = requests.Session()
+        _session.mount('https://', adapter)
+    return _session
+
 
 class BitpandaService:
     """
@@ -40,7 +68,8 @@ class BitpandaService:
         'WLD': 'worldcoin-wld',
     }
 
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(self, api_key: Optional[str] = None, session=None):
+        self.session = session or get_session()
         self.api_key = api_key or os.environ.get('BITPANDA_API_KEY')
 
         if not self.api_key:
@@ -59,7 +88,7 @@ class BitpandaService:
         url = f"{self.BASE_URL}{endpoint}"
 
         try:
-            response = requests.request(
+            response = self.session.request(
                 method=method,
                 url=url,
                 headers=self.headers,
@@ -114,7 +143,7 @@ class BitpandaService:
                 'vs_currencies': 'eur'
             }
 
-            response = requests.get(url, params=params, timeout=10, verify=SSL_VERIFY)
+            response = self.session.get(url, params=params, timeout=10, verify=SSL_VERIFY)
             response.raise_for_status()
             data = response.json()
 
@@ -232,6 +261,44 @@ class BitpandaService:
             'total_value': float(total_value),
         }
 
+    def iter_trades(self, stop_at_id: Optional[str] = None, since=None) -> Iterator[Dict]:
+        """
+        Alle Trades (neueste zuerst) über die Cursor-Pagination von /trades.
+
+        Args:
+            stop_at_id: Abbrechen, sobald dieser (bereits bekannte) Trade erscheint
+            since: Abbrechen, sobald ein Trade älter als dieser Zeitpunkt ist
+
+        Yields:
+            Rohe Trade-Objekte der API ({'id', 'attributes', ...})
+        """
+        params = {'page_size': TRADES_PAGE_SIZE}
+
+        while True:
+            response = self._make_request('/trades', params=params)
+
+            for trade in response.get('data', []):
+                if stop_at_id and trade['id'] == stop_at_id:
+                    return
+                if since and self.parse_trade_time(trade) < since:
+                    return
+                yield trade
+
+            cursor = response.get('meta', {}).get('next_cursor')
+            if not cursor:
+                return
+            params = {'page_size': TRADES_PAGE_SIZE, 'cursor': cursor}
+
+    @staticmethod
+    def parse_trade_time(trade: Dict) -> datetime:
+        """Zeitpunkt eines Trades (timezone-aware)"""
+        trade_date = parse_datetime(trade['attributes']['time']['date_iso8601'])
+        if trade_date is None:
+            raise ValueError(f"Ungültiges Trade-Datum: {trade['attributes']['time']['date_iso8601']}")
+        if timezone.is_naive(trade_date):
+            trade_date = timezone.make_aware(trade_date)
+        return trade_date
+
     def get_trades_history(self, days: int = 365) -> List[Dict]:
         """
         Holt Trading-Historie für Performance-Berechnung
@@ -242,53 +309,40 @@ class BitpandaService:
         Returns:
             Liste von Trades sortiert nach Datum
         """
+        cutoff_date = timezone.now() - timedelta(days=days)
+
         try:
-            response = self._make_request('/trades', params={'page_size': 100})
-            trades = response.get('data', [])
-
-            # Filtere nach Zeitraum (timezone-aware)
-            cutoff_date = timezone.now() - timedelta(days=days)
-
-            filtered_trades = []
-            for trade in trades:
-                attrs = trade['attributes']
-                # Parse ISO datetime string und mache es timezone-aware
-                trade_date_str = attrs['time']['date_iso8601']
-
-                # Versuche datetime zu parsen
-                try:
-                    # Entferne Zeitzone-String falls vorhanden und parse neu
-                    if '+' in trade_date_str:
-                        trade_date_str = trade_date_str.split('+')[0]
-                    elif 'Z' in trade_date_str:
-                        trade_date_str = trade_date_str.replace('Z', '')
-
-                    trade_date = datetime.fromisoformat(trade_date_str)
-
-                    # Mache timezone-aware falls es naive ist
-                    if trade_date.tzinfo is None:
-                        trade_date = timezone.make_aware(trade_date)
-
-                except (ValueError, AttributeError) as e:
-                    logger.warning(f"Konnte Trade-Datum nicht parsen: {trade_date_str}, Error: {e}")
-                    continue
-
-                if trade_date >= cutoff_date:
-                    filtered_trades.append({
-                        'date': trade_date,
-                        'type': attrs['type'],  # buy/sell
-                        'amount_eur': Decimal(attrs['amount_fiat']),
-                        'crypto_symbol': attrs.get('cryptocoin_id'),
-                        'crypto_amount': Decimal(attrs['amount_cryptocoin']),
-                        'price': Decimal(attrs['price']),
-                    })
-
-            return sorted(filtered_trades, key=lambda x: x['date'])
+            trades = [
+                {
+                    'date': self.parse_trade_time(trade),
+                    'type': trade['attributes']['type'],  # buy/sell
+                    'amount_eur': Decimal(trade['attributes']['amount_fiat']),
+                    'crypto_symbol': trade['attributes'].get('cryptocoin_symbol') or trade['attributes'].get('cryptocoin_id'),
+                    'crypto_amount': Decimal(trade['attributes']['amount_cryptocoin']),
+                    'price': Decimal(trade['attributes']['price']),
+                }
+                for trade in self.iter_trades(since=cutoff_date)
+            ]
+            return sorted(trades, key=lambda x: x['date'])
 
         except Exception as e:
             logger.error(f"Fehler beim Abrufen der Trading-Historie: {e}")
             return []
 
+    def get_cryptocoin_symbols(self) -> Dict[str, str]:
+        """cryptocoin_id → Symbol aus den Wallets (Trades liefern teils nur die ID)"""
+        response = self._make_request('/asset-wallets')
+        data = response.get('data', {}).get('attributes', {})
+
+        wallets = list(data.get('cryptocoin', {}).get('attributes', {}).get('wallets', []))
+        wallets += data.get('commodity', {}).get('metal', {}).get('attributes', {}).get('wallets', [])
+
+        return {
+            str(w['attributes']['cryptocoin_id']): w['attributes']['cryptocoin_symbol']
+            for w in wallets
+            if w['attributes'].get('cryptocoin_id') and w['attributes'].get('cryptocoin_symbol')
+        }
+
     def calculate_portfolio_performance(self) -> Dict:
         """
         Berechnet Portfolio-Performance über Zeit
@@ -0,0 +1,311 @@
+# bitpanda/csv_import.py
+"""
+Streaming-CSV-Importe für Bitpanda (import_bitpanda_csv, import_asset_values).
+
+Ablauf je Import:
+1. Encoding aus den ersten SNIFF_BYTES bestimmen (BOM / UTF-8 / chardet)
+2. Datei zeilenweise lesen und in Blöcken zu CHUNK_SIZE Zeilen verarbeiten
+3. Pro Block eine Abfrage für bereits vorhandene Einträge, dann bulk_create
+4. Holdings einmal als Dict laden, fehlende gesammelt anlegen
+5. Bestände danach mit einer GROUP BY-Abfrage berechnen
+
+Alles läuft in einer Transaktion. Mit dry_run=True wird nur gezählt, was
+neu wäre bzw. schon vorhanden ist - geschrieben wird nichts.
+"""
+import codecs
+import csv
+from dataclasses import dataclass, field
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+from itertools import islice
+
+from django.db import transaction
+from django.db.models import Max, Q, Sum
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from finance.data_generation import BITPANDA, bump_generation
+
+from .models import BitpandaAssetValue, BitpandaHolding, BitpandaTrade
+from .trade_sync import rebuild_holdings
+
+SNIFF_BYTES = 64 * 1024
+CHUNK_SIZE = 1000
+DATE_FORMATS = ('%d.%m.%Y', '%Y-%m-%d', '%d/%m/%Y')
+
+_CENT = Decimal('0.01')
+_UNIT = Decimal('0.00000001')
+
+
+@dataclass
+class ImportReport:
+    encoding: str = ''
+    confidence: float = 1.0
+    dry_run: bool = False
+    inserted: int = 0
+    duplicates: int = 0
+    skipped: int = 0
+    errors: list = field(default_factory=list)
+    new_assets: set = field(default_factory=set)
+
+
+def sniff_encoding(path, sample_size=SNIFF_BYTES):
+    """Encoding aus dem Dateianfang bestimmen. Rückgabe: (encoding, confidence)"""
+    with open(path, 'rb') as f:
+        sample = f.read(sample_size)
+
+    # utf-8-sig liest auch BOM-lose UTF-8-Dateien und entfernt ein BOM
+    if sample.startswith(codecs.BOM_UTF8):
+        return 'utf-8-sig', 1.0
+    try:
+        codecs.getincrementaldecoder('utf-8')().decode(sample, final=len(sample) < sample_size)
+        return 'utf-8-sig', 1.0
+    except UnicodeDecodeError:
+        pass
+
+    import chardet
+    result = chardet.detect(sample)
+    return result['encoding'] or 'windows-1252', result['confidence'] or 0.0
+
+
+def read_rows(path, encoding, delimiter):
+    """(Zeilennummer, Zeile) - liest die Datei zeilenweise"""
+    with open(path, 'r', encoding=encoding, newline='') as f:
+        reader = csv.DictReader(f, delimiter=delimiter)
+        if reader.fieldnames:
+            reader.fieldnames = [name.strip().lstrip('\ufeff') for name in reader.fieldnames]
+        yield from enumerate(reader, start=2)
+
+
+def chunks(iterable, size=CHUNK_SIZE):
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def parse_decimal(value, places=None):
+    """'1.234,56' / '1234.56' → Decimal (None bei leerem Wert)"""
+    value = (value or '').strip()
+    if not value:
+        return None
+    if ',' in value:
+        value = value.replace('.', '').replace(',', '.')
+    try:
+        number = Decimal(value)
+    except InvalidOperation:
+        raise ValueError(f'Ungültige Zahl: {value}')
+    return number.quantize(places) if places is not None else number
+
+
+def parse_date(value):
+    value = (value or '').strip()
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(value, fmt).date()
+        except ValueError:
+            continue
+    raise ValueError(f'Ungültiges Datumsformat: {value}')
+
+
+def _open(path, encoding, report):
+    if encoding == 'auto':
+        report.encoding, report.confidence = sniff_encoding(path)
+    else:
+        report.encoding = encoding
+    return report.encoding
+
+
+# ---------------------------------------------------------------------------
+# Trades (Bitpanda CSV-Export)
+# ---------------------------------------------------------------------------
+
+def _parse_trade_row(row, user):
+    """CSV-Zeile → (BitpandaTrade, asset_class); None für Nicht-Trades (Ein-/Auszahlung, Transfer)"""
+    trade_type = (row.get('Transaction Type') or '').strip().lower()
+    if trade_type not in ('buy', 'sell'):
+        return None
+
+    trade_id = (row.get('Transaction ID') or '').strip()
+    asset = (row.get('Asset') or '').strip()
+    if not trade_id or not asset:
+        raise ValueError('Transaction ID oder Asset fehlt')
+
+    timestamp_str = (row.get('Timestamp') or '').strip()
+    timestamp = parse_datetime(timestamp_str)
+    if timestamp is None:
+        timestamp = datetime.combine(parse_date(timestamp_str), datetime.min.time())
+    if timezone.is_naive(timestamp):
+        timestamp = timezone.make_aware(timestamp)
+
+    amount_fiat = parse_decimal(row.get('Amount Fiat'), _CENT) or Decimal('0')
+    trade = BitpandaTrade(
+        user=user,
+        trade_id=trade_id,
+        trade_type=trade_type,
+        asset=asset,
+        timestamp=timestamp,
+        amount_fiat=amount_fiat,
+        # Der Export enthält keinen Wechselkurs - Beträge sind in der Konto-Währung (EUR)
+        amount_eur=amount_fiat,
+        amount_asset=parse_decimal(row.get('Amount Asset')) or Decimal('0'),
+        price=parse_decimal(row.get('Asset market price'), _UNIT) or Decimal('0'),
+    )
+    return trade, (row.get('Asset class') or '').strip() or None
+
+
+def import_trades_csv(path, user, encoding='auto', delimiter=';', dry_run=False, chunk_size=CHUNK_SIZE):
+    """Kauf-/Verkaufszeilen eines Bitpanda-Exports als BitpandaTrade importieren"""
+    report = ImportReport(dry_run=dry_run)
+    encoding = _open(path, encoding, report)
+    seen = set()
+    asset_classes = {}
+
+    with transaction.atomic():
+        for chunk in chunks(read_rows(path, encoding, delimiter), chunk_size):
+            trades = []
+            for row_num, row in chunk:
+                try:
+                    parsed = _parse_trade_row(row, user)
+                except (ValueError, KeyError) as e:
+                    report.errors.append(f'Zeile {row_num}: {e}')
+                    continue
+                if parsed is None:
+                    report.skipped += 1
+                    continue
+
+                trade, asset_class = parsed
+                if trade.trade_id in seen:
+                    report.duplicates += 1
+                    continue
+                seen.add(trade.trade_id)
+                trades.append(trade)
+                if asset_classes.get(trade.asset) is None:
+                    asset_classes[trade.asset] = asset_class
+
+            existing = set(
+                BitpandaTrade.objects.filter(trade_id__in=[t.trade_id for t in trades])
+                .values_list('trade_id', flat=True)
+            )
+            new = [t for t in trades if t.trade_id not in existing]
+            report.duplicates += len(trades) - len(new)
+            report.inserted += len(new)
+            if not dry_run:
+                BitpandaTrade.objects.bulk_create(new)
+
+        known = set(BitpandaHolding.objects.filter(user=user).values_list('asset', flat=True))
+        report.new_assets = set(asset_classes) - known
+        if not dry_run:
+            rebuild_holdings(user, {asset: cls for asset, cls in asset_classes.items() if cls})
+            bump_generation(BITPANDA)
+
+    return report
+
+
+# ---------------------------------------------------------------------------
+# Asset-Werte (asset;date;price_per_unit[;payed;units])
+# ---------------------------------------------------------------------------
+
+class HoldingResolver:
+    """Asset → BitpandaHolding; einmal geladen, fehlende werden blockweise angelegt"""
+
+    def __init__(self, user, dry_run=False):
+        self.user = user
+        self.dry_run = dry_run
+        self.holdings = {h.asset: h for h in BitpandaHolding.objects.filter(user=user)}
+        self.new_assets = set()
+
+    def ensure(self, assets):
+        missing = set(assets) - self.holdings.keys()
+        if not missing:
+            return
+        self.new_assets |= missing
+        if self.dry_run:
+            return
+        BitpandaHolding.objects.bulk_create(
+            [BitpandaHolding(user=self.user, asset=asset, asset_class='Unknown') for asset in missing],
+            ignore_conflicts=True,
+        )
+        self.holdings.update(
+            (h.asset, h) for h in BitpandaHolding.objects.filter(user=self.user, asset__in=missing)
+        )
+
+
+def _parse_asset_value_row(row):
+    """CSV-Zeile → (asset, date, payed, units, price_per_unit)"""
+    asset = (row.get('asset') or '').strip()
+    if not asset or not (row.get('date') or '').strip() or not (row.get('price_per_unit') or '').strip():
+        raise ValueError('Fehlende Pflichtfelder (asset, date, price_per_unit)')
+    return (
+        asset,
+        parse_date(row['date']),
+        parse_decimal(row.get('payed'), _CENT),
+        parse_decimal(row.get('units'), _UNIT),
+        parse_decimal(row['price_per_unit'], _UNIT),
+    )
+
+
+def import_asset_values_csv(path, user, encoding='auto', delimiter=',', dry_run=False, chunk_size=CHUNK_SIZE):
+    """
+    Historische Transaktionen/Preise als BitpandaAssetValue importieren.
+    Duplikat = gleiche Kombination aus Asset, Datum, Betrag, Einheiten und Preis.
+    """
+    report = ImportReport(dry_run=dry_run)
+    encoding = _open(path, encoding, report)
+    resolver = HoldingResolver(user, dry_run=dry_run)
+    seen = set()
+
+    with transaction.atomic():
+        for chunk in chunks(read_rows(path, encoding, delimiter), chunk_size):
+            rows = []
+            for row_num, row in chunk:
+                try:
+                    rows.append(_parse_asset_value_row(row))
+                except (ValueError, KeyError) as e:
+                    report.errors.append(f'Zeile {row_num}: {e}')
+
+            resolver.ensure(key[0] for key in rows)
+            existing = set(
+                BitpandaAssetValue.objects.filter(
+                    holding__user=user,
+                    holding__asset__in={key[0] for key in rows},
+                    date__in={key[1] for key in rows},
+                ).values_list('holding__asset', 'date', 'payed', 'units', 'price_per_unit')
+            )
+
+            new = []
+            for key in rows:
+                if key in seen or key in existing:
+                    report.duplicates += 1
+                    continue
+                seen.add(key)
+                new.append(key)
+
+            report.inserted += len(new)
+            if not dry_run:
+                BitpandaAssetValue.objects.bulk_create([
+                    BitpandaAssetValue(
+                        holding=resolver.holdings[asset], date=date, payed=payed, units=units, price_per_unit=price,
+                    )
+                    for asset, date, payed, units, price in new
+                ])
+
+        if not dry_run:
+            bump_generation(BITPANDA)
+
+    report.new_assets = resolver.new_assets
+    return report
+
+
+def asset_value_positions(user):
+    """Bestand pro Asset aus BitpandaAssetValue - eine GROUP BY-Abfrage"""
+    rows = (
+        BitpandaAssetValue.objects.filter(holding__user=user)
+        .values('holding__asset')
+        .annotate(
+            balance=Sum('units'),
+            invested=Sum('payed', filter=Q(units__gt=0)),
+            last_date=Max('date'),
+        )
+        .order_by('holding__asset')
+    )
+    return {row.pop('holding__asset'): row for row in rows}
@@ -1,11 +1,18 @@
 # bitpanda/management/commands/import_asset_values.py
-from django.core.management.base import BaseCommand
+"""
+Importiert historische Asset-Transaktionen/Preise als BitpandaAssetValue
+(streamend, blockweise bulk_create) - siehe bitpanda/csv_import.py.
+
+Spalten: asset, date, price_per_unit (Pflicht), payed, units (optional)
+
+Beispiele:
+    python manage.py import_asset_values werte.csv --user sigi --dry-run
+    python manage.py import_asset_values werte.csv --user sigi --delimiter ';'
+"""
 from django.contrib.auth.models import User
-from bitpanda.models import BitpandaHolding, BitpandaAssetValue
-from decimal import Decimal
-from datetime import datetime
-import csv
-import chardet  # Für automatische Encoding-Erkennung
+from django.core.management.base import BaseCommand
+
+from bitpanda.csv_import import asset_value_positions, import_asset_values_csv
 
 
 class Command(BaseCommand):
@@ -17,12 +24,13 @@ class Command(BaseCommand):
         parser.add_argument('--delimiter', type=str, default=',', help='CSV Delimiter (Standard: ,)')
         parser.add_argument('--encoding', type=str, default='auto',
                             help='Encoding (auto, utf-8, windows-1252, iso-8859-1)')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Nur anzeigen, was neu bzw. schon vorhanden wäre')
 
     def handle(self, *args, **options):
         csv_file = options['csv_file']
         username = options['user']
-        delimiter = options['delimiter']
-        encoding = options['encoding']
+        dry_run = options['dry_run']
 
         try:
             user = User.objects.get(username=username)
@@ -30,126 +38,14 @@ class Command(BaseCommand):
             self.stdout.write(self.style.ERROR(f'User {username} nicht gefunden!'))
             return
 
-        # Auto-detect encoding
-        if encoding == 'auto':
-            with open(csv_file, 'rb') as f:
-                raw_data = f.read()
-                result = chardet.detect(raw_data)
-                encoding = result['encoding']
-                self.stdout.write(f'Erkanntes Encoding: {encoding} (Confidence: {result["confidence"]:.0%})')
-
-        self.stdout.write(f'Importiere Asset-Transaktionen für User: {username}')
+        self.stdout.write(f'Importiere Asset-Transaktionen für User: {username}' + (' (Dry-Run)' if dry_run else ''))
         self.stdout.write(f'CSV-Datei: {csv_file}')
-        self.stdout.write(f'Encoding: {encoding}')
-
-        imported = 0
-        errors = 0
 
         try:
-            with open(csv_file, 'r', encoding=encoding) as file:
-                # Entferne BOM falls vorhanden
-                content = file.read()
-                if content.startswith('\ufeff'):
-                    content = content[1:]
-
-                reader = csv.DictReader(content.splitlines(), delimiter=delimiter)
-
-                # Zeige erkannte Spalten
-                self.stdout.write(f'Erkannte Spalten: {reader.fieldnames}')
-
-
-                for row_num, row in enumerate(reader, start=2):
-                    try:
-                        # Erwartete Spalten: asset, date, price_per_unit (Pflicht)
-                        # Optional: payed, units
-                        asset_symbol = row.get('asset', '').strip()
-                        date_str = row.get('date', '').strip()
-                        price_str = row.get('price_per_unit', '').strip()
-                        payed_str = row.get('payed', '').strip()
-                        units_str = row.get('units', '').strip()
-
-                        # Nur asset, date und price_per_unit sind Pflicht
-                        if not all([asset_symbol, date_str, price_str]):
-                            self.stdout.write(
-                                self.style.WARNING(
-                                    f'Zeile {row_num}: Fehlende Pflichtfelder (asset, date, price_per_unit) - übersprungen')
-                            )
-                            errors += 1
-                            continue
-
-                        # Hole oder erstelle Holding
-                        holding, created = BitpandaHolding.objects.get_or_create(
-                            user=user,
-                            asset=asset_symbol,
-                            defaults={
-                                'asset_class': 'Unknown',
-                                'balance': Decimal('0'),
-                            }
-                        )
-
-                        if created:
-                            self.stdout.write(
-                                self.style.WARNING(f'Holding für {asset_symbol} wurde neu erstellt')
-                            )
-
-                        # Parse Datum
-                        try:
-                            date_obj = datetime.strptime(date_str, '%d.%m.%Y').date()
-                        except ValueError:
-                            try:
-                                date_obj = datetime.strptime(date_str, '%Y-%m-%d').date()
-                            except ValueError:
-                                try:
-                                    date_obj = datetime.strptime(date_str, '%d/%m/%Y').date()
-                                except ValueError:
-                                    self.stdout.write(
-                                        self.style.WARNING(f'Zeile {row_num}: Ungültiges Datumsformat {date_str}')
-                                    )
-                                    errors += 1
-                                    continue
-
-                        # Parse Werte (Komma → Punkt)
-                        price_per_unit = Decimal(price_str.replace(',', '.'))
-
-                        # Optional: payed und units
-                        payed = Decimal(payed_str.replace(',', '.')) if payed_str else None
-                        units = Decimal(units_str.replace(',', '.')) if units_str else None
-
-                        # Erstelle Transaktion
-                        asset_value = BitpandaAssetValue.objects.create(
-                            holding=holding,
-                            date=date_obj,
-                            payed=payed,
-                            units=units,
-                            price_per_unit=price_per_unit,
-                        )
-
-                        # Ausgabe
-                        if units is not None:
-                            action = 'Kauf' if units > 0 else 'Verkauf'
-                            imported += 1
-                            self.stdout.write(
-                                self.style.SUCCESS(
-                                    f'✓ {asset_symbol} - {date_obj} - {action}: '
-                                    f'{abs(units)} Einheiten à €{price_per_unit}'
-                                    f'{f" = €{abs(payed)}" if payed else ""}'
-                                )
-                            )
-                        else:
-                            imported += 1
-                            self.stdout.write(
-                                self.style.SUCCESS(
-                                    f'✓ {asset_symbol} - {date_obj} - Preis: €{price_per_unit}'
-                                )
-                            )
-
-                    except Exception as e:
-                        self.stdout.write(
-                            self.style.ERROR(f'✗ Zeile {row_num}: Fehler - {str(e)}')
-                        )
-                        errors += 1
-
-
+            report = import_asset_values_csv(
+                csv_file, user,
+                encoding=options['encoding'], delimiter=options['delimiter'], dry_run=dry_run,
+            )
         except UnicodeDecodeError as e:
             self.stdout.write(
                 self.style.ERROR(
@@ -162,6 +58,23 @@ class Command(BaseCommand):
             )
             return
 
-        self.stdout.write(self.style.SUCCESS(f'\n=== Import abgeschlossen ==='))
-        self.stdout.write(f'Importiert: {imported}')
-        self.stdout.write(f'Fehler: {errors}')
\ No newline at end of file
+        self.stdout.write(f'Encoding: {report.encoding} (Confidence: {report.confidence:.0%})')
+        for error in report.errors:
+            self.stdout.write(self.style.ERROR(f'✗ {error}'))
+        for asset in sorted(report.new_assets):
+            self.stdout.write(self.style.WARNING(
+                f'Holding für {asset} würde neu erstellt' if dry_run else f'Holding für {asset} wurde neu erstellt'
+            ))
+
+        self.stdout.write(self.style.SUCCESS(
+            '\n=== Dry-Run: nichts geschrieben ===' if dry_run else '\n=== Import abgeschlossen ==='
+        ))
+        self.stdout.write(f'{"Neu" if dry_run else "Importiert"}: {report.inserted}')
+        self.stdout.write(f'Duplikate: {report.duplicates}')
+        self.stdout.write(f'Fehler: {len(report.errors)}')
+
+        if not dry_run:
+            self.stdout.write('\nBestände:')
+            for asset, position in asset_value_positions(user).items():
+                balance = position['balance'].normalize() if position['balance'] is not None else 0
+                self.stdout.write(f'  {asset}: {balance} (investiert € {position["invested"] or 0})')
@@ -0,0 +1,46 @@
+# bitpanda/management/commands/sync_bitpanda_trades.py
+"""
+Synchronisiert die Bitpanda-Trades eines Users in die lokale Datenbank,
+siehe bitpanda/trade_sync.py.
+
+Beispiele:
+    python manage.py sync_bitpanda_trades --user sigi
+    python manage.py sync_bitpanda_trades --user sigi --full
+"""
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from bitpanda.bitpanda_service import BitpandaService
+from bitpanda.trade_sync import sync_trades
+
+
+class Command(BaseCommand):
+    help = 'Lädt neue Bitpanda-Trades (Cursor-Pagination) und aktualisiert die Holdings'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', type=str, required=True, help='Username')
+        parser.add_argument('--full', action='store_true', help='Alle Trades neu laden statt nur neue')
+        parser.add_argument('--api-key', type=str, help='Optionaler API Key (überschreibt ENV Variable)')
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(username=options['user'])
+        except User.DoesNotExist:
+            raise CommandError(f'User "{options["user"]}" nicht gefunden!')
+
+        try:
+            service = BitpandaService(api_key=options.get('api_key'))
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        start = time.perf_counter()
+        result = sync_trades(user, service=service, full=options['full'])
+
+        modus = 'vollständig' if result.full else 'inkrementell'
+        self.stdout.write(self.style.SUCCESS(f'✅ Bitpanda-Trades synchronisiert ({modus})'))
+        self.stdout.write(f'   📥 Neu geladen: {result.fetched:,}')
+        self.stdout.write(f'   📊 Trades gesamt: {result.total:,}')
+        self.stdout.write(f'   💼 Assets: {result.holdings:,}')
+        self.stdout.write(f'⏱️  Dauer: {time.perf_counter() - start:.1f}s')
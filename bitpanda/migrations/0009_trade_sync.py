@@ -0,0 +1,57 @@
+# Generated by Django 5.2.18 on 2026-10-19 10:07
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bitpanda', '0008_alter_bitpandaassetvalue_options_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BitpandaSyncState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('last_trade_id', models.CharField(blank=True, max_length=64)),
+                ('last_trade_time', models.DateTimeField(blank=True, null=True)),
+                ('last_synced_at', models.DateTimeField(blank=True, null=True)),
+                ('trades_total', models.IntegerField(default=0)),
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='bitpanda_sync_state', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Bitpanda Sync-Status',
+                'verbose_name_plural': 'Bitpanda Sync-Status',
+            },
+        ),
+        migrations.CreateModel(
+            name='BitpandaTrade',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('trade_id', models.CharField(help_text='Bitpanda Trade-ID', max_length=64, unique=True)),
+                ('trade_type', models.CharField(choices=[('buy', 'Kauf'), ('sell', 'Verkauf')], max_length=10)),
+                ('status', models.CharField(default='finished', max_length=20)),
+                ('asset', models.CharField(help_text='Asset Symbol (z.B. BTC)', max_length=50)),
+                ('cryptocoin_id', models.CharField(blank=True, max_length=20)),
+                ('timestamp', models.DateTimeField()),
+                ('amount_fiat', models.DecimalField(decimal_places=2, max_digits=20)),
+                ('amount_eur', models.DecimalField(decimal_places=2, help_text='amount_fiat × fiat_to_eur_rate', max_digits=20)),
+                ('amount_asset', models.DecimalField(decimal_places=12, max_digits=28)),
+                ('price', models.DecimalField(decimal_places=8, max_digits=20)),
+                ('is_swap', models.BooleanField(default=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='bitpanda_trades', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Bitpanda Trade',
+                'verbose_name_plural': 'Bitpanda Trades',
+                'ordering': ['-timestamp'],
+                'indexes': [models.Index(fields=['user', 'asset'], name='bitpanda_bi_user_id_48f9eb_idx'), models.Index(fields=['user', 'timestamp'], name='bitpanda_bi_user_id_7539f2_idx')],
+            },
+        ),
+    ]
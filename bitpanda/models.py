@@ -129,4 +129,78 @@ class BitpandaAssetValue(models.Model):
         """Berechnet den Gesamtwert: units × price_per_unit"""
         if self.units is None:
             return None
-        return abs(self.units * self.price_per_unit)
\ No newline at end of file
+        return abs(self.units * self.price_per_unit)
+
+class BitpandaTrade(models.Model):
+    """
+    Lokale Kopie der Bitpanda-Trades (/v1/trades), gepflegt von
+    bitpanda/trade_sync.py - nicht manuell bearbeiten.
+    """
+    TYPE_CHOICES = [
+        ('buy', 'Kauf'),
+        ('sell', 'Verkauf'),
+    ]
+
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='bitpanda_trades'
+    )
+    trade_id = models.CharField(max_length=64, unique=True, help_text="Bitpanda Trade-ID")
+
+    trade_type = models.CharField(max_length=10, choices=TYPE_CHOICES)
+    status = models.CharField(max_length=20, default='finished')
+    asset = models.CharField(max_length=50, help_text="Asset Symbol (z.B. BTC)")
+    cryptocoin_id = models.CharField(max_length=20, blank=True)
+    timestamp = models.DateTimeField()
+
+    amount_fiat = models.DecimalField(max_digits=20, decimal_places=2)
+    amount_eur = models.DecimalField(
+        max_digits=20,
+        decimal_places=2,
+        help_text="amount_fiat × fiat_to_eur_rate"
+    )
+    amount_asset = models.DecimalField(max_digits=28, decimal_places=12)
+    price = models.DecimalField(max_digits=20, decimal_places=8)
+    is_swap = models.BooleanField(default=False)
+
+    # Metadaten
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Bitpanda Trade"
+        verbose_name_plural = "Bitpanda Trades"
+        ordering = ['-timestamp']
+        indexes = [
+            models.Index(fields=['user', 'asset']),
+            models.Index(fields=['user', 'timestamp']),
+        ]
+
+    def __str__(self):
+        return f"{self.asset} - {self.timestamp:%Y-%m-%d} - {self.get_trade_type_display()}: {self.amount_asset}"
+
+    @property
+    def signed_units(self):
+        """Einheiten mit Vorzeichen (positiv bei Kauf, negativ bei Verkauf)"""
+        return self.amount_asset if self.trade_type == 'buy' else -self.amount_asset
+
+
+class BitpandaSyncState(models.Model):
+    """Stand der Trade-Synchronisation pro User (neuester bekannter Trade)"""
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        related_name='bitpanda_sync_state'
+    )
+    last_trade_id = models.CharField(max_length=64, blank=True)
+    last_trade_time = models.DateTimeField(null=True, blank=True)
+    last_synced_at = models.DateTimeField(null=True, blank=True)
+    trades_total = models.IntegerField(default=0)
+
+    class Meta:
+        verbose_name = "Bitpanda Sync-Status"
+        verbose_name_plural = "Bitpanda Sync-Status"
+
+    def __str__(self):
+        return f"{self.user.username} - {self.last_synced_at or 'nie'}"
@@ -0,0 +1,78 @@
+# bitpanda/prices.py
+"""
+Preisaktualisierung in Batches - für das Formular update_prices und die
+JSON-API api/prices/.
+
+- latest_values(): letzter Eintrag je Holding in einer Window-Abfrage
+- save_prices(): alle Preise eines Tages mit einem bulk_update (bestehende
+  Tageseinträge) und einem bulk_create (neue Preis-Einträge) in einer
+  Transaktion
+"""
+from decimal import Decimal, InvalidOperation
+
+from django.db import transaction
+from django.db.models import F, Window
+from django.db.models.functions import RowNumber
+from django.utils import timezone
+
+from finance.data_generation import BITPANDA, bump_generation
+
+from .models import BitpandaAssetValue
+
+
+def parse_price(value):
+    """Eingabe → Decimal > 0 (ValueError mit Meldung sonst)"""
+    try:
+        price = Decimal(str(value).strip().replace(',', '.'))
+    except (InvalidOperation, ValueError):
+        raise ValueError('Ungültiger Preis')
+    if not price.is_finite() or price <= 0:
+        raise ValueError('Preis muss größer als 0 sein')
+    return price
+
+
+def latest_values(user, day):
+    """{holding_id: letzter BitpandaAssetValue bis einschließlich day}"""
+    values = BitpandaAssetValue.objects.filter(holding__user=user, date__lte=day).annotate(
+        rang=Window(
+            RowNumber(),
+            partition_by=F('holding_id'),
+            order_by=[F('date').desc(), F('id').desc()],
+        )
+    ).filter(rang=1)
+    return {value.holding_id: value for value in values}
+
+
+def save_prices(prices, day):
+    """
+    Preise {holding: Decimal} für day speichern.
+
+    Gibt es am Tag schon einen Eintrag, wird dessen Preis überschrieben -
+    bevorzugt ein reines Preis-Update statt einer Transaktion.
+    Rückgabe: (angelegt, aktualisiert)
+    """
+    if not prices:
+        return 0, 0
+    by_id = {holding.pk: price for holding, price in prices.items()}
+
+    with transaction.atomic():
+        existing = {}
+        for value in BitpandaAssetValue.objects.filter(holding_id__in=by_id, date=day).order_by('id'):
+            current = existing.get(value.holding_id)
+            if current is None or (current.units is not None and value.units is None):
+                existing[value.holding_id] = value
+
+        now = timezone.now()
+        for holding_id, value in existing.items():
+            value.price_per_unit = by_id[holding_id]
+            value.updated_at = now
+        BitpandaAssetValue.objects.bulk_update(existing.values(), ['price_per_unit', 'updated_at'])
+
+        BitpandaAssetValue.objects.bulk_create([
+            BitpandaAssetValue(holding=holding, date=day, price_per_unit=price, payed=None, units=None)
+            for holding, price in prices.items()
+            if holding.pk not in existing
+        ])
+        bump_generation(BITPANDA)
+
+    return len(prices) - len(existing), len(existing)
@@ -0,0 +1,20 @@
+# bitpanda/signals.py
+"""
+Erhöht die Daten-Generation BITPANDA (ETags der Chart-APIs) bei Änderungen
+an Holdings, Werten und Trades. Bulk-Schreibpfade (Sync, CSV-Import,
+Preis-Batch) rufen bump_generation() selbst auf.
+"""
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from finance.data_generation import BITPANDA, bump_generation
+
+from .models import BitpandaAssetValue, BitpandaHolding, BitpandaTrade
+
+
+@receiver([post_save, post_delete], sender=BitpandaHolding)
+@receiver([post_save, post_delete], sender=BitpandaAssetValue)
+@receiver([post_save, post_delete], sender=BitpandaTrade)
+def bump_bitpanda_generation(sender, raw=False, **kwargs):
+    if not raw:
+        bump_generation(BITPANDA)
@@ -1,3 +1,174 @@
-from django.test import TestCase
+import json
+import tempfile
+from datetime import date
+from decimal import Decimal
+from pathlib import Path
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.test import RequestFactory, TestCase, override_settings
+
+from bitpanda.bitpanda_service import BitpandaService
+from bitpanda.csv_import import asset_value_positions, import_asset_values_csv, import_trades_csv
+from bitpanda.models import BitpandaAssetValue, BitpandaHolding, BitpandaSyncState, BitpandaTrade
+from bitpanda.prices import latest_values
+from bitpanda.trade_sync import sync_trades, trade_positions
+from bitpanda.views import api_update_prices, update_prices
+
+RESPONSES = Path(__file__).parent / 'test_responses'
+
+
+class RecordedResponse:
+    def __init__(self, name):
+        self.status_code = 200
+        self._data = json.loads((RESPONSES / name).read_text())
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self._data
+
+
+class RecordedSession:
+    """Liefert aufgezeichnete API-Antworten je (Endpoint, Cursor)"""
+
+    def __init__(self, routes):
+        self.routes = routes
+        self.calls = []
+
+    def request(self, method, url, params=None, **kwargs):
+        key = (url.rsplit('/v1', 1)[-1], (params or {}).get('cursor'))
+        self.calls.append(key)
+        return RecordedResponse(self.routes[key])
+
+
+class TradeSyncTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('sigi', password='x')
+
+    def _service(self, routes):
+        return BitpandaService(api_key='test', session=RecordedSession(routes))
+
+    def test_sync_laedt_alle_seiten_und_danach_nur_neue(self):
+        service = self._service({
+            ('/trades', None): 'trades_page_1.json',
+            ('/trades', 'cursor-2'): 'trades_page_2.json',
+            ('/asset-wallets', None): 'asset_wallets.json',
+        })
+        result = sync_trades(self.user, service=service)
+
+        self.assertEqual((result.fetched, result.total, result.full), (3, 3, True))
+        # Trade ohne Symbol wird über die Wallets aufgelöst
+        self.assertEqual(BitpandaTrade.objects.get(trade_id='7b0c1a6e-0001').asset, 'BTC')
+        self.assertEqual(BitpandaSyncState.objects.get(user=self.user).last_trade_id, '7b0c1a6e-0003')
+        self.assertEqual(
+            sorted(BitpandaHolding.objects.filter(user=self.user).values_list('asset', 'asset_class')),
+            [('BTC', 'Cryptocurrency'), ('ETH', 'Cryptocurrency')],
+        )
+
+        btc = trade_positions(self.user)['BTC']
+        self.assertEqual(btc['units'], Decimal('0.0015'))
+        self.assertEqual((btc['invested'], btc['proceeds']), (Decimal('100.00'), Decimal('55.00')))
+
+        # Zweiter Lauf: bricht beim bekannten Trade ab, Seite 2 wird nicht mehr geladen
+        service = self._service({('/trades', None): 'trades_new_page_1.json'})
+        result = sync_trades(self.user, service=service)
+
+        self.assertEqual((result.fetched, result.total, result.full), (1, 4, False))
+        self.assertEqual(service.session.calls, [('/trades', None)])
+        self.assertEqual(trade_positions(self.user)['BTC']['units'], Decimal('0.0025'))
+        self.assertEqual(BitpandaSyncState.objects.get(user=self.user).last_trade_id, '7b0c1a6e-0005')
+
+
+class CsvImportTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('sigi', password='x')
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+
+    def _csv(self, name, text, encoding='utf-8'):
+        path = Path(self.tmpdir.name) / name
+        path.write_bytes(text.encode(encoding))
+        return path
+
+    def test_asset_values_dry_run_und_duplikate(self):
+        path = self._csv('werte.csv', (
+            'asset;date;price_per_unit;payed;units\n'
+            'BTC;15.01.2024;40000;100,00;0,0025\n'
+            'BTC;01.02.2024;42000;;\n'
+            'Gold €;01.02.2024;60,5;;\n'
+            'BTC;01.02.2024;42000;;\n'
+            'ETH;kein-datum;2500;;\n'
+        ), encoding='windows-1252')
+
+        report = import_asset_values_csv(path, self.user, delimiter=';', dry_run=True)
+        self.assertEqual((report.inserted, report.duplicates, len(report.errors)), (3, 1, 1))
+        self.assertEqual(report.new_assets, {'BTC', 'Gold €'})
+        self.assertFalse(BitpandaHolding.objects.exists())
+
+        report = import_asset_values_csv(path, self.user, delimiter=';', chunk_size=2)
+        self.assertEqual(report.inserted, 3)
+        self.assertEqual(BitpandaAssetValue.objects.count(), 3)
+        self.assertEqual(asset_value_positions(self.user)['BTC']['balance'], Decimal('0.0025'))
+
+        # Erneuter Import: alles Duplikate
+        report = import_asset_values_csv(path, self.user, delimiter=';')
+        self.assertEqual((report.inserted, report.duplicates), (0, 4))
+
+    def test_trades_csv_legt_trades_und_holdings_an(self):
+        path = self._csv('export.csv', (
+            'Transaction ID;Timestamp;Transaction Type;In/Out;Amount Fiat;Fiat;Amount Asset;Asset;'
+            'Asset market price;Asset market price currency;Asset class;Product ID;Fee;Fee asset;Spread;Spread Currency\n'
+            'T1;15.01.2024;buy;outgoing;100,00;EUR;0,0025;BTC;40000;EUR;Cryptocurrency;1;0;;;\n'
+            'T2;20.01.2024;deposit;incoming;500,00;EUR;;;;EUR;;;0;;;\n'
+            'T3;01.02.2024;buy;outgoing;50,00;EUR;0,5;AAPL;100;EUR;Stock (derivative);2;0;;;\n'
+        ))
+
+        report = import_trades_csv(path, self.user)
+        self.assertEqual((report.inserted, report.skipped), (2, 1))
+        self.assertEqual(
+            dict(BitpandaHolding.objects.filter(user=self.user).values_list('asset', 'asset_class')),
+            {'BTC': 'Cryptocurrency', 'AAPL': 'Stock (derivative)'},
+        )
+        self.assertEqual(import_trades_csv(path, self.user, dry_run=True).duplicates, 2)
+        self.assertEqual(BitpandaTrade.objects.count(), 2)
+
+
+@override_settings(CRON_SECRET_TOKEN='geheim')
+class PriceUpdateTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('sigi', password='x')
+        self.btc = BitpandaHolding.objects.create(user=self.user, asset='BTC', asset_class='Cryptocurrency')
+        self.eth = BitpandaHolding.objects.create(user=self.user, asset='ETH', asset_class='Cryptocurrency')
+        BitpandaAssetValue.objects.create(holding=self.btc, date=date(2025, 1, 1), price_per_unit=Decimal('40000'))
+        BitpandaAssetValue.objects.create(
+            holding=self.btc, date=date(2025, 1, 15), price_per_unit=Decimal('41000'),
+            payed=Decimal('41.00'), units=Decimal('0.001'),
+        )
+
+    def _api(self, payload, token='geheim'):
+        request = RequestFactory().post(
+            '/bitpanda/api/prices/', json.dumps(payload), content_type='application/json',
+            HTTP_X_CRON_TOKEN=token,
+        )
+        return api_update_prices(request)
+
+    def test_batch_api_legt_an_und_aktualisiert(self):
+        self.assertEqual(self._api({'user': 'sigi', 'prices': {}}, token='falsch').status_code, 403)
+
+        payload = {'user': 'sigi', 'date': '2025-01-31', 'prices': {'BTC': '42000,5', 'ETH': '2500', 'DOGE': '1'}}
+        data = json.loads(self._api(payload).content)
+        self.assertEqual((data['created'], data['updated']), (2, 0))
+        self.assertEqual(data['errors'], ['DOGE: Unbekanntes Asset'])
+
+        payload['prices'] = {'BTC': '43000', 'ETH': '-1'}
+        data = json.loads(self._api(payload).content)
+        self.assertEqual((data['created'], data['updated'], len(data['errors'])), (0, 1, 1))
+
+        with self.assertNumQueries(1):
+            latest = latest_values(self.user, date(2025, 1, 31))
+        self.assertEqual(latest[self.btc.pk].price_per_unit, Decimal('43000'))
+
+        request = RequestFactory().get('/bitpanda/update-prices/')
+        request.user = self.user
+        self.assertContains(update_prices(request), 'price_%d' % self.eth.pk)
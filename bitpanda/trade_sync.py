@@ -0,0 +1,165 @@
+# bitpanda/trade_sync.py
+"""
+Synchronisation der Bitpanda-Trades in die lokale Tabelle BitpandaTrade.
+
+- Lädt alle Seiten von /trades über die Cursor-Pagination
+  (BitpandaService.iter_trades, geteilte HTTP-Session).
+- Inkrementell: BitpandaSyncState merkt sich den neuesten Trade; der
+  nächste Lauf lädt nur Seiten bis zu diesem Trade.
+- Schreibt per bulk_create(update_conflicts=True) - erneut gelieferte
+  Trades werden aktualisiert statt dupliziert.
+- Zieht danach die BitpandaHoldings aus einer einzigen Aggregat-Abfrage
+  über die Trades nach (trade_positions).
+
+Für Tests: BitpandaService(session=...) mit aufgezeichneten API-Antworten.
+"""
+from dataclasses import dataclass
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Case, DecimalField, F, Max, Q, Sum, When
+from django.utils import timezone
+
+from finance.data_generation import BITPANDA, bump_generation
+
+from .bitpanda_service import BitpandaService
+from .models import BitpandaHolding, BitpandaSyncState, BitpandaTrade
+
+BATCH_SIZE = 500
+COMMODITY_SYMBOLS = {'XAU', 'XAG', 'XPT', 'XPD'}
+
+_UPDATE_FIELDS = [
+    'trade_type', 'status', 'asset', 'cryptocoin_id', 'timestamp',
+    'amount_fiat', 'amount_eur', 'amount_asset', 'price', 'is_swap', 'updated_at',
+]
+
+
+@dataclass
+class SyncResult:
+    fetched: int
+    total: int
+    holdings: int
+    full: bool
+
+
+class _SymbolLookup:
+    """cryptocoin_id → Symbol, erst bei Bedarf über /asset-wallets geladen"""
+
+    def __init__(self, service):
+        self.service = service
+        self._symbols = None
+
+    def get(self, cryptocoin_id):
+        if self._symbols is None:
+            self._symbols = self.service.get_cryptocoin_symbols()
+        return self._symbols.get(cryptocoin_id)
+
+
+def build_trade(user, trade, symbols):
+    """API-Trade → (ungespeichertes) BitpandaTrade-Objekt"""
+    attrs = trade['attributes']
+    cryptocoin_id = str(attrs.get('cryptocoin_id') or '')
+    amount_fiat = Decimal(attrs['amount_fiat'])
+    rate = Decimal(attrs.get('fiat_to_eur_rate') or '1')
+
+    return BitpandaTrade(
+        user=user,
+        trade_id=trade['id'],
+        trade_type=attrs['type'],
+        status=attrs.get('status') or 'finished',
+        asset=attrs.get('cryptocoin_symbol') or symbols.get(cryptocoin_id) or cryptocoin_id,
+        cryptocoin_id=cryptocoin_id,
+        timestamp=BitpandaService.parse_trade_time(trade),
+        amount_fiat=amount_fiat,
+        amount_eur=(amount_fiat * rate).quantize(Decimal('0.01')),
+        amount_asset=Decimal(attrs['amount_cryptocoin']),
+        price=Decimal(attrs['price']),
+        is_swap=bool(attrs.get('is_swap', False)),
+    )
+
+
+def asset_class_for(asset):
+    return 'Commodity' if asset in COMMODITY_SYMBOLS else 'Cryptocurrency'
+
+
+def trade_positions(user):
+    """
+    Bestand pro Asset aus den Trades - eine GROUP BY-Abfrage.
+    Rückgabe: {asset: {'units', 'invested', 'proceeds', 'last_trade'}}
+    """
+    signed_units = Case(
+        When(trade_type='buy', then=F('amount_asset')),
+        default=-F('amount_asset'),
+        output_field=DecimalField(max_digits=28, decimal_places=12),
+    )
+    rows = (
+        BitpandaTrade.objects.filter(user=user, status='finished')
+        .values('asset')
+        .annotate(
+            units=Sum(signed_units),
+            invested=Sum('amount_eur', filter=Q(trade_type='buy')),
+            proceeds=Sum('amount_eur', filter=Q(trade_type='sell')),
+            last_trade=Max('timestamp'),
+        )
+        .order_by('asset')
+    )
+    return {row.pop('asset'): row for row in rows}
+
+
+def rebuild_holdings(user, asset_classes=None):
+    """
+    Fehlende BitpandaHoldings für alle gehandelten Assets anlegen.
+    asset_classes: optionale Asset-Klasse je Asset (z.B. aus dem CSV-Export)
+    """
+    asset_classes = asset_classes or {}
+    positions = trade_positions(user)
+    BitpandaHolding.objects.bulk_create(
+        [
+            BitpandaHolding(user=user, asset=asset, asset_class=asset_classes.get(asset) or asset_class_for(asset))
+            for asset in positions
+        ],
+        ignore_conflicts=True,
+    )
+    return positions
+
+
+def sync_trades(user, service=None, full=False):
+    """
+    Neue Trades von Bitpanda holen und speichern.
+
+    Args:
+        service: BitpandaService (Standard: API-Key aus der Umgebung)
+        full: Alle Seiten laden statt nur bis zum zuletzt bekannten Trade
+    """
+    service = service or BitpandaService()
+    state, _ = BitpandaSyncState.objects.get_or_create(user=user)
+    full = full or not state.last_trade_id
+
+    # Erst alle Seiten laden, dann in einer Transaktion schreiben
+    trades = list(service.iter_trades(
+        stop_at_id=None if full else state.last_trade_id,
+        since=None if full else state.last_trade_time,
+    ))
+    symbols = _SymbolLookup(service)
+
+    with transaction.atomic():
+        for start in range(0, len(trades), BATCH_SIZE):
+            BitpandaTrade.objects.bulk_create(
+                [build_trade(user, trade, symbols) for trade in trades[start:start + BATCH_SIZE]],
+                update_conflicts=True,
+                unique_fields=['trade_id'],
+                update_fields=_UPDATE_FIELDS,
+            )
+
+        if trades:
+            # Die API liefert die neuesten Trades zuerst
+            state.last_trade_id = trades[0]['id']
+            state.last_trade_time = BitpandaService.parse_trade_time(trades[0])
+        state.last_synced_at = timezone.now()
+        state.trades_total = BitpandaTrade.objects.filter(user=user).count()
+        state.save()
+
+        positions = rebuild_holdings(user)
+        bump_generation(BITPANDA)
+
+    return SyncResult(fetched=len(trades), total=state.trades_total, holdings=len(positions), full=full)
@@ -10,4 +10,5 @@ urlpatterns = [
     path('update-prices/', views.update_prices, name='update_prices'),
     path('api/portfolio-chart/', views.api_bitpanda_portfolio_chart, name='api_bitpanda_portfolio_chart'),
     path('api/asset-allocation/', views.api_bitpanda_asset_allocation, name='api_bitpanda_asset_allocation'),
+    path('api/prices/', views.api_update_prices, name='api_update_prices'),
 ]
\ No newline at end of file
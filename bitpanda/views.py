@@ -1,14 +1,22 @@
 # bitpanda/views.py
 from django.shortcuts import render
+from django.conf import settings
 from django.contrib.auth.decorators import login_required
+from django.contrib.auth.models import User
 from django.contrib import messages
-from django.http import JsonResponse
+from django.http import HttpResponseForbidden, JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
 from decimal import Decimal
 from collections import defaultdict
 from datetime import date
+import json
 import logging
 from django.shortcuts import redirect
 from .models import BitpandaHolding, BitpandaAssetValue
+from .prices import latest_values, parse_price, save_prices
+from config.conditional import conditional_json
+from finance.data_generation import BITPANDA
 
 logger = logging.getLogger(__name__)
 
@@ -215,6 +223,7 @@ def calculate_performance(user, portfolio):
 
 
 @login_required
+@conditional_json(BITPANDA)
 def api_bitpanda_portfolio_chart(request):
     """API Endpoint für Portfolio Performance Chart - Entwicklung über Zeit"""
     try:
@@ -299,6 +308,7 @@ def api_bitpanda_portfolio_chart(request):
 
 
 @login_required
+@conditional_json(BITPANDA)
 def api_bitpanda_asset_allocation(request):
     """API Endpoint für Asset Allocation Pie Chart"""
     try:
@@ -384,50 +394,25 @@ def api_bitpanda_asset_allocation(request):
 @login_required
 def update_prices(request):
     """Manuelle Preisaktualisierung - erstellt neue Einträge in BitpandaAssetValue"""
-    from datetime import date
-
-    holdings = BitpandaHolding.objects.filter(user=request.user).order_by('asset')
+    holdings = list(BitpandaHolding.objects.filter(user=request.user).order_by('asset'))
     today = date.today()
 
     if request.method == 'POST':
-        updated_count = 0
+        prices = {}
         errors = []
 
         for holding in holdings:
-            price_key = f'price_{holding.id}'
-            price_value = request.POST.get(price_key, '').strip()
-
-            if price_value:
-                try:
-                    new_price = Decimal(price_value)
-
-                    if new_price > 0:
-                        # Prüfe ob heute schon ein Eintrag existiert
-                        existing = BitpandaAssetValue.objects.filter(
-                            holding=holding,
-                            date=today
-                        ).first()
-
-                        if existing:
-                            # Update existierenden Eintrag
-                            existing.price_per_unit = new_price
-                            existing.save()
-                            updated_count += 1
-                        else:
-                            # Erstelle neuen Eintrag (nur Preis, keine Transaktion)
-                            BitpandaAssetValue.objects.create(
-                                holding=holding,
-                                date=today,
-                                price_per_unit=new_price,
-                                payed=None,
-                                units=None
-                            )
-                            updated_count += 1
-                    else:
-                        errors.append(f'{holding.asset}: Preis muss größer als 0 sein')
-
-                except (ValueError, Decimal.InvalidOperation) as e:
-                    errors.append(f'{holding.asset}: Ungültiger Preis')
+            price_value = request.POST.get(f'price_{holding.id}', '').strip()
+            if not price_value:
+                continue
+            try:
+                prices[holding] = parse_price(price_value)
+            except ValueError as e:
+                errors.append(f'{holding.asset}: {e}')
+
+        # Alle Preise in einer Transaktion (bulk_update + bulk_create)
+        created, updated = save_prices(prices, today)
+        updated_count = created + updated
 
         if updated_count > 0:
             messages.success(request, f'✓ {updated_count} Preise erfolgreich aktualisiert in BitpandaAssetValue!')
@@ -441,26 +426,19 @@ def update_prices(request):
 
         return redirect('bitpanda:bitpanda_dashboard')
 
-    # GET Request - Zeige Formular
+    # GET Request - Zeige Formular (letzter Preis aller Holdings in einer Abfrage)
+    latest = latest_values(request.user, today)
     holdings_with_prices = []
     for holding in holdings:
-        # Hole letzten Preis
-        last_tx = BitpandaAssetValue.objects.filter(
-            holding=holding
-        ).order_by('-date').first()
-
-        # Prüfe ob heute schon ein Eintrag existiert
-        today_entry = BitpandaAssetValue.objects.filter(
-            holding=holding,
-            date=today
-        ).first()
+        last_tx = latest.get(holding.id)
+        has_today_entry = last_tx is not None and last_tx.date == today
 
         holdings_with_prices.append({
             'holding': holding,
             'last_price': last_tx.price_per_unit if last_tx else None,
             'last_date': last_tx.date if last_tx else None,
-            'today_price': today_entry.price_per_unit if today_entry else None,
-            'has_today_entry': bool(today_entry),
+            'today_price': last_tx.price_per_unit if has_today_entry else None,
+            'has_today_entry': has_today_entry,
         })
 
     context = {
@@ -468,4 +446,48 @@ def update_prices(request):
         'today': today,
     }
 
-    return render(request, 'bitpanda/update_prices.html', context)
\ No newline at end of file
+    return render(request, 'bitpanda/update_prices.html', context)
+
+
+@csrf_exempt
+@require_POST
+def api_update_prices(request):
+    """
+    JSON-API für Preis-Batches (lokale Skripte, Preis-Job).
+
+    Header: X-Cron-Token
+    Body:   {"user": "sigi", "date": "2025-01-31" (optional), "prices": {"BTC": "42000.5", ...}}
+    """
+    provided_token = request.headers.get('X-Cron-Token')
+    if not provided_token or provided_token != settings.CRON_SECRET_TOKEN:
+        logger.warning('Unauthorized price update attempt')
+        return HttpResponseForbidden('Invalid token')
+
+    try:
+        payload = json.loads(request.body)
+        user = User.objects.get(username=payload['user'])
+        day = date.fromisoformat(payload['date']) if payload.get('date') else date.today()
+        quotes = payload['prices']
+        if not isinstance(quotes, dict):
+            raise ValueError('prices muss ein Objekt {Asset: Preis} sein')
+    except User.DoesNotExist:
+        return JsonResponse({'error': 'User nicht gefunden'}, status=404)
+    except (ValueError, KeyError, TypeError) as e:
+        return JsonResponse({'error': f'Ungültige Anfrage: {e}'}, status=400)
+
+    holdings = {h.asset: h for h in BitpandaHolding.objects.filter(user=user, asset__in=list(quotes))}
+    prices = {}
+    errors = []
+    for asset, value in quotes.items():
+        if asset not in holdings:
+            errors.append(f'{asset}: Unbekanntes Asset')
+            continue
+        try:
+            prices[holdings[asset]] = parse_price(value)
+        except ValueError as e:
+            errors.append(f'{asset}: {e}')
+
+    created, updated = save_prices(prices, day)
+    logger.info(f'Price batch for {user.username} ({day}): {created} created, {updated} updated, {len(errors)} errors')
+
+    return JsonResponse({'date': day.isoformat(), 'created': created, 'updated': updated, 'errors': errors})
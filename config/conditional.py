@@ -0,0 +1,76 @@
+# config/conditional.py
+"""
+Bedingte GETs für die JSON-Chart-APIs.
+
+Das ETag wird aus den Daten-Generationen der Bereiche, von denen eine
+Antwort abhängt, plus User, Tag, Pfad und Query-Parametern gebildet - ohne
+die Antwort selbst zu berechnen. Passt If-None-Match, gibt es sofort 304,
+die View (und ihre Aggregation) läuft gar nicht.
+
+    @login_required
+    @conditional_json(TRANSACTIONS)
+    def api_...(request): ...
+
+Der Tag ist Teil des ETags, weil viele Charts relativ zu "heute" rechnen.
+"""
+import hashlib
+from datetime import date
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import urlencode
+
+from finance.data_generation import get_generations
+
+
+def compute_etag(request, user, scopes):
+    """Starkes ETag (ohne Anführungszeichen) - eine Abfrage für die Generationen"""
+    generations = get_generations(scopes)
+    parts = [
+        str(user.pk),
+        date.today().isoformat(),
+        request.path,
+        urlencode(sorted(request.GET.lists()), doseq=True),
+        *(f'{scope}:{generations[scope]}' for scope in scopes),
+    ]
+    return hashlib.sha1('|'.join(parts).encode()).hexdigest()
+
+
+def _not_modified(request, etag):
+    """304-Antwort wenn If-None-Match passt, sonst None"""
+    if request.method not in ('GET', 'HEAD'):
+        return None
+    return get_conditional_response(request, etag=etag)
+
+
+def _with_etag(request, response, etag):
+    # Nur erfolgreiche GETs - Fehler (403/400) sollen nicht revalidiert werden
+    if request.method in ('GET', 'HEAD') and response.status_code in (200, 304):
+        response.headers.setdefault('ETag', etag)
+        patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+def conditional_json(*scopes):
+    """Decorator: ETag/304 für sync- und async-Views; scopes = Daten-Generationen"""
+    def decorator(view):
+        if iscoroutinefunction(view):
+            @wraps(view)
+            async def inner(request, *args, **kwargs):
+                user = await request.auser()
+                etag = f'"{await sync_to_async(compute_etag)(request, user, scopes)}"'
+                response = _not_modified(request, etag)
+                if response is None:
+                    response = await view(request, *args, **kwargs)
+                return _with_etag(request, response, etag)
+        else:
+            @wraps(view)
+            def inner(request, *args, **kwargs):
+                etag = f'"{compute_etag(request, request.user, scopes)}"'
+                response = _not_modified(request, etag)
+                if response is None:
+                    response = view(request, *args, **kwargs)
+                return _with_etag(request, response, etag)
+        return inner
+    return decorator
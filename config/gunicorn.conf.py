@@ -0,0 +1,25 @@
+# config/gunicorn.conf.py
+"""
+Gunicorn-Konfiguration für Render.
+
+    gunicorn -c config/gunicorn.conf.py
+
+SERVER_MODE=asgi: Uvicorn-Worker mit config.asgi - die async Chart-APIs
+und die Rechnungsanalyse laufen nebenläufig in einem Event-Loop, ein
+einzelner Worker bedient den parallelen Dashboard-Load.
+SERVER_MODE=wsgi (Standard): klassische sync Worker mit config.wsgi.
+"""
+import os
+
+server_mode = os.environ.get('SERVER_MODE', 'wsgi')
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '10000')}"
+workers = int(os.environ.get('WEB_CONCURRENCY', 2))
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 120))
+
+if server_mode == 'asgi':
+    wsgi_app = 'config.asgi:application'
+    worker_class = 'uvicorn_worker.UvicornWorker'
+else:
+    wsgi_app = 'config.wsgi:application'
+    worker_class = 'sync'
@@ -0,0 +1,53 @@
+# config/lazy.py
+"""
+Lazy-Imports für schwere Abhängigkeiten.
+
+    np = lazy_module('numpy')
+    Image = lazy_module('PIL.Image')
+
+liefert einen Platzhalter; das Modul wird erst beim ersten Attributzugriff
+importiert (danach aus sys.modules). Damit lädt der Worker-Start (Settings,
+URLconf, Views) nur, was jeder Request braucht - NumPy, Pillow, pdfplumber
+usw. erst in den Views/Services, die sie tatsächlich verwenden.
+
+HEAVY_MODULES wird von `manage.py importtime` und dem Regressionstest in
+finance/tests.py geprüft: keines davon darf beim Import der URLconf geladen
+werden.
+"""
+import importlib
+
+HEAVY_MODULES = (
+    'numpy',
+    'PIL',
+    'pdfplumber',
+    'pdfminer',
+    'openai',
+    'chardet',
+    'boto3',
+    'botocore',
+    'requests',
+    'plotly',
+    'yfinance',
+)
+
+
+class LazyModule:
+    """Modul-Platzhalter: importiert beim ersten Attributzugriff"""
+
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def __getattr__(self, attr):
+        # Nur für Attribute, die der Platzhalter selbst nicht hat
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return getattr(self._module, attr)
+
+    def __repr__(self):
+        state = 'geladen' if self._module is not None else 'nicht geladen'
+        return f'<LazyModule {self._name} ({state})>'
+
+
+def lazy_module(name):
+    return LazyModule(name)
@@ -0,0 +1,254 @@
+# config/metrics.py
+"""
+Request-Instrumentierung: Laufzeit, Query-Anzahl, SQL-Zeit und
+N+1-Erkennung (wiederholte Query-Fingerprints) pro View.
+
+Die Messwerte landen in einem rollierenden In-Memory-Speicher pro
+Prozess und sind unter /ops/metrics (nur Staff) einsehbar.
+
+Settings:
+    METRICS_ENABLED          - Instrumentierung an/aus (Standard: True)
+    METRICS_SAMPLE_RATE      - Anteil gemessener Requests 0.0-1.0 (Standard: 1.0)
+    METRICS_SLOW_REQUEST_MS  - Schwelle für langsame Requests (Standard: 500)
+    METRICS_N_PLUS_ONE_MIN   - Ab so vielen gleichen Queries gilt es als N+1 (Standard: 5)
+    METRICS_BUFFER_SIZE      - Anzahl gespeicherter Requests (Standard: 500)
+"""
+import logging
+import random
+import re
+import threading
+import time
+from collections import Counter, defaultdict, deque
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connection
+from django.db.backends.signals import connection_created
+
+logger = logging.getLogger(__name__)
+
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r'\b\d+(?:\.\d+)?\b')
+_IN_LIST_RE = re.compile(r'\bIN\s*\((?:\s*(?:\?|%s)\s*,?)+\)', re.IGNORECASE)
+_WHITESPACE_RE = re.compile(r'\s+')
+
+
+def fingerprint_sql(sql):
+    """Normalisiert SQL (Literale → ?) damit gleiche Queries gleich aussehen"""
+    sql = _STRING_RE.sub('?', sql)
+    sql = _NUMBER_RE.sub('?', sql)
+    sql = _IN_LIST_RE.sub('IN (...)', sql)
+    return _WHITESPACE_RE.sub(' ', sql).strip()
+
+
+def get_setting(name, default):
+    return getattr(settings, name, default)
+
+
+class QueryRecorder:
+    """DB execute_wrapper: misst jede Query eines Requests"""
+
+    def __init__(self):
+        self.count = 0
+        self.sql_time = 0.0
+        self.fingerprints = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.sql_time += time.perf_counter() - start
+            self.count += 1
+            self.fingerprints[fingerprint_sql(sql)] += 1
+
+    def repeated(self, threshold):
+        """Fingerprints die mindestens threshold-mal ausgeführt wurden"""
+        return [
+            {'sql': sql, 'count': count}
+            for sql, count in self.fingerprints.most_common()
+            if count >= threshold
+        ]
+
+
+class MetricsStore:
+    """Thread-sicherer, rollierender Speicher für Request-Messwerte"""
+
+    def __init__(self, maxlen=500):
+        self._lock = threading.Lock()
+        self._requests = deque(maxlen=maxlen)
+
+    def record(self, entry):
+        with self._lock:
+            self._requests.append(entry)
+
+    def clear(self):
+        with self._lock:
+            self._requests.clear()
+
+    def recent(self, limit=50):
+        with self._lock:
+            return list(self._requests)[-limit:][::-1]
+
+    def summary(self):
+        """Aggregiert pro View: Aufrufe, Ø/Max-Zeit, Ø Queries, N+1-Signaturen"""
+        with self._lock:
+            entries = list(self._requests)
+
+        views = defaultdict(lambda: {
+            'calls': 0,
+            'total_ms': 0.0,
+            'max_ms': 0.0,
+            'total_queries': 0,
+            'total_sql_ms': 0.0,
+            'slow_calls': 0,
+            'n_plus_one': Counter(),
+        })
+
+        for entry in entries:
+            view = views[entry['view']]
+            view['calls'] += 1
+            view['total_ms'] += entry['duration_ms']
+            view['max_ms'] = max(view['max_ms'], entry['duration_ms'])
+            view['total_queries'] += entry['queries']
+            view['total_sql_ms'] += entry['sql_ms']
+            view['slow_calls'] += int(entry['slow'])
+            for repeated in entry['n_plus_one']:
+                view['n_plus_one'][repeated['sql']] = max(
+                    view['n_plus_one'][repeated['sql']], repeated['count']
+                )
+
+        result = []
+        for name, view in views.items():
+            calls = view['calls']
+            result.append({
+                'view': name,
+                'calls': calls,
+                'avg_ms': round(view['total_ms'] / calls, 1),
+                'max_ms': round(view['max_ms'], 1),
+                'avg_queries': round(view['total_queries'] / calls, 1),
+                'avg_sql_ms': round(view['total_sql_ms'] / calls, 1),
+                'slow_calls': view['slow_calls'],
+                'n_plus_one': [
+                    {'sql': sql, 'count': count}
+                    for sql, count in view['n_plus_one'].most_common(5)
+                ],
+            })
+
+        result.sort(key=lambda v: v['avg_ms'] * v['calls'], reverse=True)
+        return result
+
+
+metrics_store = MetricsStore(maxlen=get_setting('METRICS_BUFFER_SIZE', 500))
+
+
+# Recorder des aktuellen Requests. Als ContextVar, weil async Views ihre
+# Queries per sync_to_async in einem anderen Thread (mit eigener Verbindung)
+# ausführen - der Kontext wird dorthin mitkopiert.
+_current_recorder = ContextVar('metrics_recorder', default=None)
+
+
+def _dispatch_to_recorder(execute, sql, params, many, context):
+    """Dauerhafter execute_wrapper pro Verbindung, leitet an den Request-Recorder weiter"""
+    recorder = _current_recorder.get()
+    if recorder is None:
+        return execute(sql, params, many, context)
+    return recorder(execute, sql, params, many, context)
+
+
+def _install_dispatcher(connection, **kwargs):
+    if _dispatch_to_recorder not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_dispatch_to_recorder)
+
+
+connection_created.connect(_install_dispatcher)
+
+
+class RequestMetricsMiddleware:
+    """
+    Misst Wall-Time, Query-Anzahl und SQL-Zeit pro Request (gesampelt)
+    und loggt langsame Requests inkl. N+1-Kandidaten. Sync und async.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def _sampled(self):
+        return (
+            get_setting('METRICS_ENABLED', True)
+            and random.random() < get_setting('METRICS_SAMPLE_RATE', 1.0)
+        )
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        if not self._sampled():
+            return self.get_response(request)
+
+        # Bereits offene Verbindung (vor connection_created) nachrüsten
+        _install_dispatcher(connection)
+        recorder = QueryRecorder()
+        token = _current_recorder.set(recorder)
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _current_recorder.reset(token)
+
+        duration_ms = (time.perf_counter() - start) * 1000
+        self._record(request, response, recorder, duration_ms)
+
+        return response
+
+    async def __acall__(self, request):
+        if not self._sampled():
+            return await self.get_response(request)
+
+        recorder = QueryRecorder()
+        token = _current_recorder.set(recorder)
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current_recorder.reset(token)
+
+        duration_ms = (time.perf_counter() - start) * 1000
+        self._record(request, response, recorder, duration_ms)
+
+        return response
+
+    def _record(self, request, response, recorder, duration_ms):
+        match = getattr(request, 'resolver_match', None)
+        view_name = (match.view_name or match._func_path) if match else request.path
+
+        slow_threshold = get_setting('METRICS_SLOW_REQUEST_MS', 500)
+        n_plus_one = recorder.repeated(get_setting('METRICS_N_PLUS_ONE_MIN', 5))
+
+        entry = {
+            'timestamp': time.time(),
+            'view': view_name,
+            'path': request.path,
+            'method': request.method,
+            'status': response.status_code,
+            'duration_ms': round(duration_ms, 1),
+            'queries': recorder.count,
+            'sql_ms': round(recorder.sql_time * 1000, 1),
+            'slow': duration_ms >= slow_threshold,
+            'n_plus_one': n_plus_one[:5],
+        }
+        metrics_store.record(entry)
+
+        if entry['slow']:
+            logger.warning(
+                f"Langsamer Request: {request.method} {request.path} ({view_name}) "
+                f"{entry['duration_ms']}ms, {recorder.count} Queries, {entry['sql_ms']}ms SQL"
+            )
+            for repeated in entry['n_plus_one']:
+                logger.warning(f"  N+1 Verdacht ({repeated['count']}x): {repeated['sql'][:200]}")
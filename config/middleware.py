@@ -0,0 +1,41 @@
+# config/middleware.py
+"""
+Async-fähige Varianten von Middleware aus Fremdpaketen.
+
+Unter ASGI muss jede Middleware async-fähig sein, sonst läuft der ganze
+Request (inkl. async Views) über einen sync-Thread und Requests werden
+wieder nacheinander abgearbeitet.
+"""
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings as django_settings
+from whitenoise.middleware import WhiteNoiseMiddleware as BaseWhiteNoiseMiddleware
+
+
+class WhiteNoiseMiddleware(BaseWhiteNoiseMiddleware):
+    """
+    WhiteNoise mit async-Pfad. Das Nachschlagen der Datei ist ein
+    Dict-Zugriff (bzw. Dateisystem-Lookup bei autorefresh) und blockiert
+    den Event-Loop nicht nennenswert.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response=None, settings=django_settings):
+        super().__init__(get_response, settings)
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return super().__call__(request)
+
+    async def __acall__(self, request):
+        if self.autorefresh:
+            static_file = self.find_file(request.path_info)
+        else:
+            static_file = self.files.get(request.path_info)
+        if static_file is not None:
+            return self.serve(static_file, request)
+        return await self.get_response(request)
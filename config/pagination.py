@@ -0,0 +1,126 @@
+# config/pagination.py
+"""
+Cursor-Pagination (Keyset) für große Listen.
+
+Statt OFFSET merkt sich der Cursor die Sortierwerte des letzten Elements;
+die nächste Seite filtert "hinter" diese Werte. Jede Seite kostet damit
+gleich viel, egal wie weit geblättert wird, und neue Einträge verschieben
+die Seiten nicht.
+
+    page = keyset_paginate(qs, ['-captured_at', '-id'], cursor, limit=24,
+                           nullable={'captured_at'})
+    page.items, page.next_cursor
+
+Die letzte Sortierspalte muss eindeutig sein (i.d.R. id). NULL-Werte
+nullable-Spalten sortieren immer zuletzt.
+"""
+import base64
+import json
+from dataclasses import dataclass
+from datetime import date, time
+from decimal import Decimal
+
+from django.db.models import F, Q
+
+DEFAULT_LIMIT = 24
+MAX_LIMIT = 100
+
+
+class InvalidCursor(ValueError):
+    """Cursor lässt sich nicht dekodieren oder passt nicht zur Sortierung"""
+
+
+@dataclass
+class KeysetPage:
+    items: list
+    next_cursor: str | None
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+
+def _json_default(value):
+    # Volle Präzision (DjangoJSONEncoder kürzt Mikrosekunden -> Keyset-Vergleich falsch)
+    if isinstance(value, (date, time)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    raise TypeError(f'{type(value).__name__} nicht serialisierbar')
+
+
+def encode_cursor(values):
+    raw = json.dumps(values, default=_json_default, separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor, fields):
+    """Cursor → Python-Werte (über to_python der Modellfelder)"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        values = json.loads(raw)
+    except (ValueError, TypeError) as e:
+        raise InvalidCursor('Ungültiger Cursor') from e
+    if not isinstance(values, list) or len(values) != len(fields):
+        raise InvalidCursor('Cursor passt nicht zur Sortierung')
+    try:
+        return [None if value is None else field.to_python(value) for field, value in zip(fields, values)]
+    except Exception as e:
+        raise InvalidCursor('Ungültiger Cursor') from e
+
+
+def parse_limit(value, default=DEFAULT_LIMIT, maximum=MAX_LIMIT):
+    try:
+        return max(1, min(int(value), maximum))
+    except (TypeError, ValueError):
+        return default
+
+
+def _after(names, descending, nullable, values):
+    """WHERE-Bedingung "lexikografisch hinter values" """
+    condition = Q(pk__in=[])
+    equal = Q()
+    for name, desc, value in zip(names, descending, values):
+        if value is None:
+            # Hinter NULL kommt nichts mehr (NULLs zuletzt)
+            beyond = Q(pk__in=[])
+            same = Q(**{f'{name}__isnull': True})
+        else:
+            beyond = Q(**{f'{name}__lt' if desc else f'{name}__gt': value})
+            if name in nullable:
+                beyond |= Q(**{f'{name}__isnull': True})
+            same = Q(**{name: value})
+        condition |= equal & beyond
+        equal &= same
+    return condition
+
+
+def keyset_paginate(queryset, ordering, cursor=None, limit=DEFAULT_LIMIT, nullable=()):
+    """
+    Eine Seite von queryset, sortiert nach ordering (z.B. ['-datum', '-id']).
+    Liefert KeysetPage(items, next_cursor); next_cursor ist None auf der letzten Seite.
+    """
+    names = [spec.lstrip('-') for spec in ordering]
+    descending = [spec.startswith('-') for spec in ordering]
+    nullable = set(nullable)
+    opts = queryset.model._meta
+    fields = [opts.pk if name in ('pk', 'id') else opts.get_field(name) for name in names]
+
+    order_by = [
+        (F(name).desc(nulls_last=True) if desc else F(name).asc(nulls_last=True)) if name in nullable
+        else (f'-{name}' if desc else name)
+        for name, desc in zip(names, descending)
+    ]
+    queryset = queryset.order_by(*order_by)
+
+    if cursor:
+        queryset = queryset.filter(_after(names, descending, nullable, decode_cursor(cursor, fields)))
+
+    # Eine Zeile mehr holen, um zu wissen, ob es weitergeht
+    items = list(queryset[:limit + 1])
+    next_cursor = None
+    if len(items) > limit:
+        items = items[:limit]
+        last = items[-1]
+        next_cursor = encode_cursor([getattr(last, field.attname) for field in fields])
+    return KeysetPage(items, next_cursor)
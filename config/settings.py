@@ -62,7 +62,8 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
-    'whitenoise.middleware.WhiteNoiseMiddleware',  # ← Für Static Files auf Render
+    'config.middleware.WhiteNoiseMiddleware',  # ← Für Static Files auf Render (WhiteNoise, async-fähig)
+    'config.metrics.RequestMetricsMiddleware',  # ← Query-/Latenz-Messung pro View
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -96,12 +97,18 @@ WSGI_APPLICATION = 'config.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
+# Server-Modus (siehe config/gunicorn.conf.py): 'wsgi' (sync Worker) oder
+# 'asgi' (Uvicorn-Worker, async Views laufen nebenläufig)
+SERVER_MODE = os.environ.get('SERVER_MODE', 'wsgi')
+
 # Unterscheidet zwischen lokalem Development und Production (Render)
 if 'DATABASE_URL' in os.environ:
     # PRODUCTION (Render.com) - nutzt DATABASE_URL
     DATABASES = {
         'default': dj_database_url.config(
-            conn_max_age=600,
+            # Unter ASGI läuft sync-Code in wechselnden Threads - persistente
+            # Verbindungen würden sich pro Thread ansammeln
+            conn_max_age=0 if SERVER_MODE == 'asgi' else 600,
             conn_health_checks=True,
             ssl_require=True
         )
@@ -251,6 +258,18 @@ LOGGING = {
     },
 }
 
+# Request-Metriken (siehe config/metrics.py, Übersicht unter /ops/metrics)
+METRICS_ENABLED = os.environ.get('METRICS_ENABLED', 'True') == 'True'
+METRICS_SAMPLE_RATE = float(os.environ.get('METRICS_SAMPLE_RATE', '1.0'))
+METRICS_SLOW_REQUEST_MS = int(os.environ.get('METRICS_SLOW_REQUEST_MS', '500'))
+METRICS_N_PLUS_ONE_MIN = int(os.environ.get('METRICS_N_PLUS_ONE_MIN', '5'))
+METRICS_BUFFER_SIZE = int(os.environ.get('METRICS_BUFFER_SIZE', '500'))
+
+# Rechnungsanalyse (siehe finance/receipt_jobs.py)
+RECEIPT_OPENAI_CLIENT = os.environ.get('RECEIPT_OPENAI_CLIENT')  # Dotted Path einer Client-Factory
+RECEIPT_JOB_WORKERS = int(os.environ.get('RECEIPT_JOB_WORKERS', '2'))
+RECEIPT_JOBS_EAGER = False
+
 
 CRON_SECRET_TOKEN = os.environ.get('CRON_SECRET_TOKEN')
 if not CRON_SECRET_TOKEN and not DEBUG:
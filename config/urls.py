@@ -15,6 +15,10 @@ urlpatterns = [
     path('service-worker.js', views.service_worker, name='service-worker'),
     path('manifest.json', views.manifest, name='manifest'),
 
+    # Request-Metriken (nur Staff)
+    path('ops/metrics', views.ops_metrics, name='ops-metrics'),
+    path('ops/metrics.json', views.ops_metrics_json, name='ops-metrics-json'),
+
     path('', include('finance.urls')),
     path('billa/', include('billa.urls')),
     path('energiedaten/', include('energiedaten.urls')),
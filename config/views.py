@@ -3,12 +3,17 @@ from django.shortcuts import render, redirect
 from django.contrib.auth import login as auth_login
 from django.db import IntegrityError
 from finance.models import RegisteredDevice
-from django.http import HttpResponse
+from django.http import HttpResponse, JsonResponse
+from django.conf import settings
+from django.contrib.admin.views.decorators import staff_member_required
 from django.views.decorators.http import require_http_methods
 import hashlib
 import logging
 import uuid
 
+from .metrics import metrics_store
+from .pagination import parse_limit
+
 logger = logging.getLogger(__name__)
 
 
@@ -220,4 +225,25 @@ def manifest(request):
             content = f.read()
         return HttpResponse(content, content_type='application/json')
     except FileNotFoundError:
-        return HttpResponse('{}', content_type='application/json')
\ No newline at end of file
+        return HttpResponse('{}', content_type='application/json')
+
+@staff_member_required
+def ops_metrics(request):
+    """Übersicht der Request-Metriken (nur Staff)"""
+    context = {
+        'views': metrics_store.summary(),
+        'recent': metrics_store.recent(limit=50),
+        'sample_rate': getattr(settings, 'METRICS_SAMPLE_RATE', 1.0),
+        'slow_threshold': getattr(settings, 'METRICS_SLOW_REQUEST_MS', 500),
+    }
+    return render(request, 'ops/metrics.html', context)
+
+
+@staff_member_required
+def ops_metrics_json(request):
+    """Request-Metriken als JSON (nur Staff)"""
+    limit = parse_limit(request.GET.get('limit'), default=50, maximum=500)
+    return JsonResponse({
+        'views': metrics_store.summary(),
+        'recent': metrics_store.recent(limit=limit),
+    })
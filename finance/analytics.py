@@ -0,0 +1,299 @@
+# finance/analytics.py
+"""
+Zeitreihen-Auswertungen für die Chart-APIs.
+
+Nimmt eine dünn besetzte Monatsreihe [(monat, wert), ...] und liefert
+dichte, ausgerichtete Arrays inkl. Trend, gleitendem Durchschnitt,
+Vorjahresvergleich, Saisonindex und einfacher Prognose - alles mit NumPy
+in einem Durchgang.
+
+Ergebnisse werden pro (Serien-Schlüssel, Daten-Generation) im Django-Cache
+gehalten, d.h. sie bleiben gültig bis sich die Transaktionen ändern.
+"""
+from datetime import date
+
+from django.core.cache import cache
+
+from config.lazy import lazy_module
+
+from .data_generation import TRANSACTIONS, get_generation
+
+np = lazy_module('numpy')
+
+MONTH_NAMES = ['Jan', 'Feb', 'Mär', 'Apr', 'Mai', 'Jun', 'Jul', 'Aug', 'Sep', 'Okt', 'Nov', 'Dez']
+
+CACHE_TIMEOUT = 60 * 60
+
+
+def month_number(d):
+    """Fortlaufende Monatsnummer (Jahr * 12 + Monat - 1)"""
+    return d.year * 12 + d.month - 1
+
+
+def month_from_number(n):
+    return date(n // 12, n % 12 + 1, 1)
+
+
+def month_label(d):
+    """Label im Format 'Jan 2025'"""
+    return f"{MONTH_NAMES[d.month - 1]} {d.year}"
+
+
+def parse_month(value, default):
+    """Parst 'YYYY-MM' aus Query-Parametern, sonst default"""
+    if not value:
+        return default
+    try:
+        year, month = value.split('-')[:2]
+        return date(int(year), int(month), 1)
+    except (ValueError, TypeError):
+        return default
+
+
+def default_window(today=None):
+    """Standard-Zeitraum: 1. Jänner des Vorjahres bis aktueller Monat"""
+    today = today or date.today()
+    return date(today.year - 1, 1, 1), today.replace(day=1)
+
+
+def _to_list(values, decimals=2):
+    """NumPy-Array → JSON-Liste (NaN → None)"""
+    return [None if np.isnan(v) else round(float(v), decimals) for v in values]
+
+
+class MonthlySeries:
+    """Dichte Monatsreihe von start bis end (jeweils inklusive)"""
+
+    def __init__(self, points, start, end):
+        self.start = month_number(start)
+        self.end = month_number(end)
+        size = max(self.end - self.start + 1, 0)
+
+        self.numbers = np.arange(self.start, self.start + size)
+        self.values = np.zeros(size, dtype=float)
+
+        if points and size:
+            index = np.fromiter((month_number(m) for m, _ in points), dtype=np.int64, count=len(points))
+            weights = np.fromiter((float(v or 0) for _, v in points), dtype=float, count=len(points))
+            mask = (index >= self.start) & (index <= self.end)
+            np.add.at(self.values, index[mask] - self.start, weights[mask])
+
+    @property
+    def months(self):
+        return [month_from_number(int(n)) for n in self.numbers]
+
+    @property
+    def labels(self):
+        return [month_label(m) for m in self.months]
+
+    def complete_mask(self, today=None):
+        """Nur abgeschlossene Monate (aktueller Monat ausgenommen)"""
+        return self.numbers < month_number(today or date.today())
+
+    def trend(self, mask=None):
+        """Lineare Regression über die maskierten Monate (Standard: alle); NaN außerhalb"""
+        if mask is None:
+            mask = np.ones(self.values.shape, dtype=bool)
+        result = np.full(self.values.shape, np.nan)
+        if mask.sum() < 2:
+            return result, 0.0, 0.0
+
+        x = np.arange(len(self.values))
+        slope, intercept = np.polyfit(x[mask], self.values[mask], 1)
+        result[mask] = slope * x[mask] + intercept
+        return result, float(slope), float(intercept)
+
+    def rolling_mean(self, window=3):
+        """Gleitender Durchschnitt; die ersten window-1 Monate sind NaN"""
+        result = np.full(self.values.shape, np.nan)
+        if window < 1 or len(self.values) < window:
+            return result
+        kernel = np.ones(window) / window
+        result[window - 1:] = np.convolve(self.values, kernel, mode='valid')
+        return result
+
+    def yoy(self):
+        """Differenz und Prozent zum Vorjahresmonat (NaN wenn nicht vorhanden)"""
+        delta = np.full(self.values.shape, np.nan)
+        pct = np.full(self.values.shape, np.nan)
+        if len(self.values) > 12:
+            previous = self.values[:-12]
+            delta[12:] = self.values[12:] - previous
+            with np.errstate(divide='ignore', invalid='ignore'):
+                pct[12:] = np.where(previous != 0, delta[12:] / np.abs(previous) * 100, np.nan)
+        return delta, pct
+
+    def seasonal_index(self, mask):
+        """Saisonindex pro Kalendermonat (1.0 = Durchschnitt)"""
+        calendar = self.numbers[mask] % 12
+        values = self.values[mask]
+        if not len(values) or values.mean() == 0:
+            return np.ones(12)
+
+        sums = np.bincount(calendar, weights=values, minlength=12)
+        counts = np.bincount(calendar, minlength=12)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            index = np.where(counts > 0, sums / counts / values.mean(), 1.0)
+        return index
+
+    def analyze(self, window=3, forecast_months=0, today=None):
+        """Alle Kennzahlen in einem Durchgang"""
+        mask = self.complete_mask(today)
+        trend, slope, intercept = self.trend(mask)
+        delta, pct = self.yoy()
+        seasonal = self.seasonal_index(mask)
+
+        forecast_labels = []
+        forecast = []
+        if forecast_months and mask.sum() >= 2:
+            last_complete = int(np.flatnonzero(mask)[-1])
+            steps = np.arange(last_complete + 1, last_complete + 1 + forecast_months)
+            numbers = self.start + steps
+            forecast = _to_list((slope * steps + intercept) * seasonal[numbers % 12])
+            forecast_labels = [month_label(month_from_number(int(n))) for n in numbers]
+
+        complete = self.values[mask]
+        return {
+            'labels': self.labels,
+            'months': [m.strftime('%Y-%m') for m in self.months],
+            'data': _to_list(self.values),
+            'trend_data': _to_list(trend),
+            'rolling_mean': _to_list(self.rolling_mean(window)),
+            'yoy_delta': _to_list(delta),
+            'yoy_pct': _to_list(pct, 1),
+            'seasonal_index': _to_list(seasonal, 3),
+            'forecast_labels': forecast_labels,
+            'forecast': forecast,
+            'slope': round(slope, 2),
+            'monthly_average': round(float(complete.mean()), 2) if len(complete) else 0,
+            'total': round(float(complete.sum()), 2),
+            'num_months': int(len(complete)),
+        }
+
+    def by_year(self, year):
+        """12 Monatswerte eines Kalenderjahres (0 außerhalb der Reihe)"""
+        result = np.zeros(12)
+        first = year * 12
+        lo = max(first, self.start)
+        hi = min(first + 11, self.end)
+        if lo <= hi:
+            result[lo - first:hi - first + 1] = self.values[lo - self.start:hi - self.start + 1]
+        return [round(float(v), 2) for v in result]
+
+    def by_quarter(self, mask=None):
+        """Summen pro Quartal; nur vollständig abgedeckte Quartale (bzw. maskierte Monate)"""
+        if mask is None:
+            mask = np.ones(self.values.shape, dtype=bool)
+        quarters = self.numbers // 3
+        labels = []
+        totals = []
+        for q in np.unique(quarters):
+            members = quarters == q
+            if members.sum() == 3 and mask[members].all():
+                labels.append(f"Q{int(q % 4) + 1} {int(q // 4)}")
+                totals.append(round(float(self.values[members].sum()), 2))
+        return labels, totals
+
+
+def cached_series(key, loader, start, end, scope=TRANSACTIONS):
+    """
+    Memoisierte MonthlySeries: loader() liefert die Punkte nur bei einem
+    Cache-Miss. Schlüssel = (key, Zeitraum, Daten-Generation).
+    """
+    generation = get_generation(scope)
+    cache_key = f"analytics:{key}:{start:%Y%m}-{end:%Y%m}:g{generation}"
+
+    series = cache.get(cache_key)
+    if series is None:
+        series = MonthlySeries(loader(), start, end)
+        cache.set(cache_key, series, CACHE_TIMEOUT)
+    return series
+
+
+RESOLUTIONS = ('monthly', 'quarterly', 'yearly')
+
+
+def period_label(n, resolution='monthly'):
+    """Label für Monatsnummer n: 'Jan 2025', 'Q1 2025' bzw. '2025'"""
+    if resolution == 'quarterly':
+        return f"Q{n % 12 // 3 + 1} {n // 12}"
+    if resolution == 'yearly':
+        return str(n // 12)
+    return month_label(month_from_number(n))
+
+
+class AccountBalances:
+    """
+    Monatsend-Kontostände aller Accounts als Matrix (Accounts × Monate).
+
+    rows = [(account_id, monat, netto), ...] aus einer GROUP BY-Abfrage;
+    die Salden entstehen per kumulierter Summe über die Monate. Bewegungen
+    vor start zählen zum Anfangsbestand, Bewegungen nach end gar nicht.
+    """
+
+    def __init__(self, rows, start, end):
+        self.start = month_number(start)
+        self.end = month_number(end)
+        size = max(self.end - self.start + 1, 0)
+
+        self.numbers = np.arange(self.start, self.start + size)
+        self.account_ids = sorted({account_id for account_id, _, _ in rows})
+        self.index = {account_id: i for i, account_id in enumerate(self.account_ids)}
+        self.values = np.zeros((len(self.account_ids), size), dtype=float)
+
+        if rows and size:
+            accounts = np.fromiter((self.index[a] for a, _, _ in rows), dtype=np.int64, count=len(rows))
+            months = np.fromiter((month_number(m) for _, m, _ in rows), dtype=np.int64, count=len(rows))
+            amounts = np.fromiter((float(v or 0) for _, _, v in rows), dtype=float, count=len(rows))
+            mask = months <= self.end
+            columns = np.clip(months[mask] - self.start, 0, None)
+            np.add.at(self.values, (accounts[mask], columns), amounts[mask])
+            np.cumsum(self.values, axis=1, out=self.values)
+
+    def columns(self, start=None, end=None, resolution='monthly'):
+        """
+        Spalten-Indizes für den Zeitraum [start, end]. Bei quarterly/yearly
+        nur das jeweilige Periodenende (bzw. der letzte Monat im Zeitraum).
+        """
+        lo = max(month_number(start), self.start) if start else self.start
+        hi = min(month_number(end), self.end) if end else self.end
+        numbers = np.arange(lo, hi + 1)
+        if resolution == 'quarterly':
+            keep = numbers % 3 == 2
+        elif resolution == 'yearly':
+            keep = numbers % 12 == 11
+        else:
+            keep = np.ones(numbers.shape, dtype=bool)
+        if len(numbers):
+            keep[-1] = True
+        return numbers[keep] - self.start
+
+    def labels(self, columns, resolution='monthly'):
+        return [period_label(int(n), resolution) for n in self.numbers[columns]]
+
+    def months(self, columns):
+        return [month_from_number(int(n)).strftime('%Y-%m') for n in self.numbers[columns]]
+
+    def rows(self, account_ids, columns):
+        """Teilmatrix (len(account_ids) × len(columns)); unbekannte Accounts = 0"""
+        result = np.zeros((len(account_ids), len(columns)), dtype=float)
+        for i, account_id in enumerate(account_ids):
+            if account_id in self.index:
+                result[i] = self.values[self.index[account_id], columns]
+        return result
+
+
+def cached_balances(loader, end, scope=TRANSACTIONS):
+    """
+    Memoisierte AccountBalances: loader() liefert (rows, start) nur bei
+    einem Cache-Miss. Schlüssel = (Endmonat, Daten-Generation).
+    """
+    generation = get_generation(scope)
+    cache_key = f"analytics:balances:{end:%Y%m}:g{generation}"
+
+    balances = cache.get(cache_key)
+    if balances is None:
+        rows, start = loader()
+        balances = AccountBalances(rows, start, end)
+        cache.set(cache_key, balances, CACHE_TIMEOUT)
+    return balances
@@ -0,0 +1,43 @@
+# finance/data_generation.py
+"""
+Daten-Generationen: ein Zähler pro Datenbereich, der bei jeder Änderung
+erhöht wird. Caches verwenden (Schlüssel, Generation) und sind damit
+automatisch ungültig, sobald sich die zugrunde liegenden Daten ändern -
+auch über mehrere Worker-Prozesse hinweg.
+
+Erhöht wird über Signale und bump_generation() in den Bulk-Pfaden; auf
+PostgreSQL zusätzlich per Statement-Trigger auf den extern befüllten
+Fakten-/Dimensionstabellen (Migration finance 0014), damit auch Ladevorgänge
+außerhalb der App die Caches ungültig machen.
+"""
+from django.db.models import F
+from django.utils import timezone
+
+from .models import DataGeneration
+
+TRANSACTIONS = 'transactions'
+BILLA = 'billa'
+BITPANDA = 'bitpanda'
+
+
+def get_generation(scope=TRANSACTIONS):
+    """Aktuelle Generation eines Bereichs (0 wenn noch nie geändert)"""
+    value = DataGeneration.objects.filter(scope=scope).values_list('generation', flat=True).first()
+    return value or 0
+
+
+def get_generations(scopes):
+    """{scope: generation} für mehrere Bereiche in einer Abfrage"""
+    generations = dict.fromkeys(scopes, 0)
+    generations.update(DataGeneration.objects.filter(scope__in=scopes).values_list('scope', 'generation'))
+    return generations
+
+
+def bump_generation(scope=TRANSACTIONS):
+    """Erhöht die Generation eines Bereichs (nach Schreiboperationen aufrufen)"""
+    updated = DataGeneration.objects.filter(scope=scope).update(
+        generation=F('generation') + 1,
+        updated_at=timezone.now(),
+    )
+    if not updated:
+        DataGeneration.objects.get_or_create(scope=scope, defaults={'generation': 1})
@@ -0,0 +1,253 @@
+# finance/exporters.py
+"""
+Streaming-Export der Transaktionen als CSV, JSON Lines oder Parquet.
+
+Die Zeilen werden per iterator(chunk_size) über einen serverseitigen Cursor
+gelesen; Dimensionsnamen (Account, Payee, Kategorie, Flag) werden einmal
+pro Export in Lookup-Dicts geladen statt pro Zeile gejoint. Der
+Speicherbedarf bleibt damit auch für die komplette Historie konstant.
+
+Unter ASGI puffert Django synchrone Iteratoren komplett (sync_to_async(list));
+dort wird der Stream mit astream() blockweise im Sync-Thread weitergeschaltet.
+"""
+import csv
+import json
+from decimal import Decimal
+from itertools import islice
+
+from asgiref.sync import sync_to_async
+
+from .models import (
+    DimAccount,
+    DimCategory,
+    DimFlag,
+    DimPayee,
+    FactTransactionsRobert,
+    FactTransactionsSigi,
+)
+from .search import search_transactions
+from .utils import period_filter
+
+EXPORT_FORMATS = {
+    'csv': ('text/csv; charset=utf-8', 'csv'),
+    'jsonl': ('application/x-ndjson', 'jsonl'),
+    'parquet': ('application/vnd.apache.parquet', 'parquet'),
+}
+
+EXPORT_COLUMNS = [
+    'id', 'person', 'date', 'account', 'flag', 'payee', 'payee_type',
+    'category', 'category_group', 'memo', 'outflow', 'inflow',
+]
+
+CHUNK_SIZE = 2000
+# Ausgabe-Blöcke pro Thread-Wechsel beim ASGI-Streaming
+ASYNC_BATCH_SIZE = 200
+
+
+def apply_transaction_filters(queryset, params):
+    """Filter wie in transactions_list / household_transactions (year, month, account, category, search)"""
+    year = params.get('year', '')
+    month = params.get('month', '')
+    account_id = params.get('account', '')
+    category_id = params.get('category', '')
+    search = params.get('search', '')
+
+    if year or month:
+        queryset = queryset.filter(**period_filter(year, month))
+    if account_id:
+        queryset = queryset.filter(account_id=int(account_id))
+    if category_id:
+        queryset = queryset.filter(category_id=int(category_id))
+    if search:
+        queryset = search_transactions(queryset, search)
+    return queryset
+
+
+def export_querysets(params, scope='all'):
+    """
+    Gefilterte Querysets pro Person.
+    scope='all': alle Sigi-Transaktionen (wie transactions_list)
+    scope='household': Sigi mit Flag 5 + Robert (wie household_transactions)
+    """
+    if scope == 'household':
+        person = params.get('person', '')
+        querysets = []
+        if person in ('', 'sigi'):
+            querysets.append(('Sigi', FactTransactionsSigi.objects.filter(flag_id=5)))
+        if person in ('', 'robert'):
+            querysets.append(('Robert', FactTransactionsRobert.objects.all()))
+    else:
+        querysets = [('Sigi', FactTransactionsSigi.objects.all())]
+
+    return [(person, apply_transaction_filters(qs, params)) for person, qs in querysets]
+
+
+class DimensionLookup:
+    """Einmal geladene Dimensionsnamen (ersetzt den Join pro Zeile)"""
+
+    def __init__(self):
+        self.accounts = dict(DimAccount.objects.values_list('id', 'account'))
+        self.flags = dict(DimFlag.objects.values_list('id', 'flag'))
+        self.payees = {
+            pk: (name, payee_type)
+            for pk, name, payee_type in DimPayee.objects.values_list('id', 'payee', 'payee_type')
+        }
+        self.categories = {
+            pk: (name, group)
+            for pk, name, group in DimCategory.objects.values_list('id', 'category', 'categorygroup__category_group')
+        }
+
+
+def iter_export_rows(params, scope='all', chunk_size=CHUNK_SIZE):
+    """Generator über Export-Zeilen als Dicts (Reihenfolge: Person, Datum absteigend)"""
+    lookup = DimensionLookup()
+
+    for person, queryset in export_querysets(params, scope):
+        rows = queryset.order_by('-date', '-id').values_list(
+            'id', 'date', 'account_id', 'flag_id', 'payee_id',
+            'category_id', 'memo', 'outflow', 'inflow',
+        ).iterator(chunk_size=chunk_size)
+
+        for pk, tx_date, account_id, flag_id, payee_id, category_id, memo, outflow, inflow in rows:
+            payee, payee_type = lookup.payees.get(payee_id, (None, None))
+            category, category_group = lookup.categories.get(category_id, (None, None))
+            yield {
+                'id': pk,
+                'person': person,
+                'date': tx_date,
+                'account': lookup.accounts.get(account_id),
+                'flag': lookup.flags.get(flag_id),
+                'payee': payee,
+                'payee_type': payee_type,
+                'category': category,
+                'category_group': category_group,
+                'memo': memo,
+                'outflow': outflow,
+                'inflow': inflow,
+            }
+
+
+class _Echo:
+    """Pseudo-Datei für csv.writer: gibt die geschriebene Zeile zurück"""
+
+    def write(self, value):
+        return value
+
+
+def stream_csv(rows):
+    writer = csv.writer(_Echo(), delimiter=';')
+    yield '\ufeff' + writer.writerow(EXPORT_COLUMNS)
+    for row in rows:
+        yield writer.writerow([
+            '' if row[col] is None else row[col] for col in EXPORT_COLUMNS
+        ])
+
+
+def _json_default(value):
+    if isinstance(value, Decimal):
+        return str(value)
+    return value.isoformat()
+
+
+def stream_jsonl(rows):
+    for row in rows:
+        yield json.dumps(row, default=_json_default, ensure_ascii=False) + '\n'
+
+
+class _ChunkSink:
+    """Schreibziel für den Parquet-Writer; gibt geschriebene Bytes blockweise ab"""
+
+    def __init__(self):
+        self.buffer = []
+        self.closed = False
+
+    def write(self, data):
+        self.buffer.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self):
+        data = b''.join(self.buffer)
+        self.buffer = []
+        return data
+
+
+def parquet_available():
+    """pyarrow ist optional"""
+    try:
+        import pyarrow.parquet  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def stream_parquet(rows, row_group_size=50000):
+    """Parquet in Row-Groups streamen (benötigt pyarrow)"""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise RuntimeError('Parquet-Export benötigt das Paket "pyarrow".')
+
+    schema = pa.schema([
+        ('id', pa.int64()),
+        ('person', pa.string()),
+        ('date', pa.date32()),
+        ('account', pa.string()),
+        ('flag', pa.string()),
+        ('payee', pa.string()),
+        ('payee_type', pa.string()),
+        ('category', pa.string()),
+        ('category_group', pa.string()),
+        ('memo', pa.string()),
+        ('outflow', pa.decimal128(18, 2)),
+        ('inflow', pa.decimal128(18, 2)),
+    ])
+
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(pa.PythonFile(sink, mode='w'), schema)
+    batch = []
+
+    def flush_batch():
+        writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+        batch.clear()
+        return sink.drain()
+
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= row_group_size:
+            yield flush_batch()
+
+    if batch:
+        yield flush_batch()
+    writer.close()
+    yield sink.drain()
+
+
+async def astream(chunks, batch_size=ASYNC_BATCH_SIZE):
+    """
+    Synchronen Stream als async Iterator ausgeben. Jeder Block läuft im
+    Thread mit der DB-Verbindung (thread_sensitive), der serverseitige Cursor
+    bleibt damit offen; nie mehr als batch_size Blöcke im Speicher.
+    """
+    next_batch = sync_to_async(lambda: list(islice(chunks, batch_size)), thread_sensitive=True)
+    try:
+        while batch := await next_batch():
+            for chunk in batch:
+                yield chunk
+    finally:
+        # Abbruch durch den Client: Generator (und Cursor) im selben Thread schließen
+        if hasattr(chunks, 'close'):
+            await sync_to_async(chunks.close, thread_sensitive=True)()
+
+
+STREAMERS = {
+    'csv': stream_csv,
+    'jsonl': stream_jsonl,
+    'parquet': stream_parquet,
+}
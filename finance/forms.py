@@ -235,4 +235,48 @@ class TransactionForm(forms.Form):
                     inflow=inflow,
                 )
 
-        return transaction
\ No newline at end of file
+        return transaction
+
+
+class TransactionImportForm(forms.Form):
+    """Upload einer Bank- oder YNAB-CSV für den Bulk-Import"""
+
+    file = forms.FileField(
+        label="CSV-Datei",
+        widget=forms.FileInput(attrs={'accept': '.csv,text/csv', 'class': 'form-control'}),
+    )
+    format = forms.ChoiceField(
+        choices=[('ynab', 'YNAB-Export'), ('bank', 'Bank-Export (Betrag mit Vorzeichen)')],
+        initial='ynab',
+        label="Format",
+        widget=forms.Select(attrs={'class': 'form-select'}),
+    )
+    target = forms.ChoiceField(
+        choices=[('sigi', 'Sigi'), ('robert', 'Robert')],
+        initial='sigi',
+        label="Zieltabelle",
+        widget=forms.Select(attrs={'class': 'form-select'}),
+    )
+    account = forms.ModelChoiceField(
+        queryset=DimAccount.objects.all(),
+        required=False,
+        label="Konto (falls die CSV keine Konto-Spalte hat)",
+        widget=forms.Select(attrs={'class': 'form-select'}),
+    )
+    counterparts = forms.BooleanField(
+        required=False,
+        initial=True,
+        label="Transfer-Gegenbuchungen erzeugen",
+        widget=forms.CheckboxInput(attrs={'class': 'form-check-input'}),
+    )
+    dry_run = forms.BooleanField(
+        required=False,
+        label="Nur prüfen (nichts speichern)",
+        widget=forms.CheckboxInput(attrs={'class': 'form-check-input'}),
+    )
+
+    def clean_file(self):
+        uploaded_file = self.cleaned_data['file']
+        if not uploaded_file.name.lower().endswith('.csv'):
+            raise forms.ValidationError("Nur CSV-Dateien werden unterstützt.")
+        return uploaded_file
@@ -0,0 +1,411 @@
+# finance/importers.py
+"""
+Bulk-Import von Bank- und YNAB-CSV-Exporten in die Fakten-Tabellen.
+
+Ablauf pro Batch:
+    1. CSV streamend lesen und normalisieren (Datum, Beträge, Namen)
+    2. Account/Kategorie/Flag über einmal geladene Lookup-Dicts auflösen,
+       fehlende Payees gesammelt per bulk_create anlegen
+    3. Duplikate über einen Inhalts-Hash gegen bestehende Zeilen aussortieren
+    4. Transfer-Gegenbuchungen im selben Batch erzeugen
+    5. Schreiben per PostgreSQL COPY (Fallback: bulk_create)
+
+Signale werden dabei nicht ausgelöst - Gegenbuchungen und die
+Daten-Generation werden explizit behandelt.
+"""
+import codecs
+import csv
+import hashlib
+import io
+import logging
+from collections import Counter
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+
+from django.db import connection, transaction
+
+from config.lazy import lazy_module
+
+from .data_generation import bump_generation
+from .models import (
+    DimAccount,
+    DimCategory,
+    DimFlag,
+    DimPayee,
+    FactTransactionsRobert,
+    FactTransactionsSigi,
+)
+from .signals import build_transfer_counterpart
+
+chardet = lazy_module('chardet')
+logger = logging.getLogger(__name__)
+
+TARGET_MODELS = {
+    'sigi': FactTransactionsSigi,
+    'robert': FactTransactionsRobert,
+}
+
+# Spaltennamen pro Format (erste vorhandene Spalte gewinnt)
+IMPORT_FORMATS = {
+    'ynab': {
+        'account': ['Account'],
+        'flag': ['Flag'],
+        'date': ['Date'],
+        'payee': ['Payee'],
+        'category_group': ['Category Group'],
+        'category': ['Category'],
+        'memo': ['Memo'],
+        'outflow': ['Outflow'],
+        'inflow': ['Inflow'],
+    },
+    'bank': {
+        'account': ['Konto', 'Account'],
+        'date': ['Buchungsdatum', 'Datum', 'Valutadatum', 'Date'],
+        'payee': ['Partnername', 'Empfänger', 'Auftraggeber/Empfänger', 'Payee'],
+        'category': ['Kategorie', 'Category'],
+        'memo': ['Verwendungszweck', 'Buchungstext', 'Zahlungsreferenz', 'Memo'],
+        'amount': ['Betrag', 'Amount'],
+    },
+}
+
+DATE_FORMATS = ['%d.%m.%Y', '%Y-%m-%d', '%d/%m/%Y', '%m/%d/%Y', '%d.%m.%y']
+
+COPY_COLUMNS = ['account_id', 'flag_id', 'date', 'payee_id', 'category_id', 'memo', 'outflow', 'inflow']
+
+BATCH_SIZE = 5000
+
+
+class ImportRowError(ValueError):
+    """Zeile kann nicht importiert werden"""
+
+
+def parse_amount(value):
+    """'€1.234,56', '-12,50', '1,234.56' → Decimal (leer → 0)"""
+    value = (value or '').strip().replace('€', '').replace('EUR', '').replace(' ', '').replace('\xa0', '')
+    if not value:
+        return Decimal('0')
+
+    if ',' in value and '.' in value:
+        # Das zuletzt vorkommende Zeichen ist der Dezimaltrenner
+        if value.rfind(',') > value.rfind('.'):
+            value = value.replace('.', '').replace(',', '.')
+        else:
+            value = value.replace(',', '')
+    elif ',' in value:
+        value = value.replace(',', '.')
+
+    try:
+        return Decimal(value).quantize(Decimal('0.01'))
+    except InvalidOperation:
+        raise ImportRowError(f'Ungültiger Betrag: {value!r}')
+
+
+def parse_date(value):
+    value = (value or '').strip()
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(value, fmt).date()
+        except ValueError:
+            continue
+    raise ImportRowError(f'Ungültiges Datum: {value!r}')
+
+
+def content_hash(account_id, tx_date, payee_id, category_id, memo, outflow, inflow):
+    """Inhalts-Hash einer Buchung (Basis der Duplikaterkennung)"""
+    key = '|'.join([
+        str(account_id or ''),
+        tx_date.isoformat(),
+        str(payee_id or ''),
+        str(category_id or ''),
+        (memo or '').strip(),
+        str(Decimal(outflow or 0).quantize(Decimal('0.01'))),
+        str(Decimal(inflow or 0).quantize(Decimal('0.01'))),
+    ])
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+
+def open_csv(fileobj, sample_size=64 * 1024):
+    """
+    Binären Datei-Stream als Text öffnen: Encoding (BOM/chardet) und
+    Trennzeichen werden aus den ersten Bytes erkannt, der Rest wird
+    streamend gelesen.
+    """
+    stream = io.BufferedReader(fileobj, buffer_size=sample_size)
+    sample = stream.peek(sample_size)[:sample_size]
+
+    if sample.startswith(codecs.BOM_UTF8):
+        encoding = 'utf-8-sig'
+    else:
+        try:
+            sample.decode('utf-8')
+            encoding = 'utf-8'
+        except UnicodeDecodeError as e:
+            # Abgeschnittenes Multibyte-Zeichen am Ende des Samples ist kein Fehler
+            encoding = 'utf-8' if e.start > len(sample) - 4 else (chardet.detect(sample)['encoding'] or 'cp1252')
+
+    text = io.TextIOWrapper(stream, encoding=encoding, errors='replace', newline='')
+    head = sample.decode(encoding, errors='ignore').splitlines()[0] if sample else ''
+    delimiter = max([';', ',', '\t'], key=head.count)
+    return csv.DictReader(text, delimiter=delimiter)
+
+
+def iter_csv_rows(fileobj, fmt='ynab'):
+    """Normalisierte Zeilen (Dict mit Namen statt IDs) aus einer CSV-Datei"""
+    reader = open_csv(fileobj)
+    columns = {}
+    for field, aliases in IMPORT_FORMATS[fmt].items():
+        columns[field] = next((a for a in aliases if a in (reader.fieldnames or [])), None)
+
+    missing = [f for f in ('date', 'payee') if not columns.get(f)]
+    if fmt == 'ynab':
+        missing += [f for f in ('outflow', 'inflow') if not columns.get(f)]
+    elif not columns.get('amount'):
+        missing.append('amount')
+    if missing:
+        raise ImportRowError(f'Pflichtspalten fehlen: {", ".join(missing)}')
+
+    def get(row, field):
+        column = columns.get(field)
+        return (row.get(column) or '').strip() if column else ''
+
+    for line, row in enumerate(reader, start=2):
+        try:
+            if fmt == 'ynab':
+                outflow = parse_amount(get(row, 'outflow'))
+                inflow = parse_amount(get(row, 'inflow'))
+            else:
+                amount = parse_amount(get(row, 'amount'))
+                outflow = -amount if amount < 0 else Decimal('0')
+                inflow = amount if amount > 0 else Decimal('0')
+
+            yield {
+                'line': line,
+                'account': get(row, 'account'),
+                'flag': get(row, 'flag'),
+                'date': parse_date(get(row, 'date')),
+                'payee': get(row, 'payee'),
+                'category_group': get(row, 'category_group'),
+                'category': get(row, 'category'),
+                'memo': get(row, 'memo') or None,
+                'outflow': outflow,
+                'inflow': inflow,
+            }
+        except ImportRowError as e:
+            yield {'line': line, 'error': str(e)}
+
+
+class TransactionBulkLoader:
+    """
+    Lädt normalisierte Zeilen batchweise in eine Fakten-Tabelle.
+
+    target: 'sigi' oder 'robert'
+    default_account / default_flag: Namen, falls die CSV keine Spalte hat
+    """
+
+    def __init__(self, target='sigi', default_account=None, default_flag=None,
+                 counterparts=True, batch_size=BATCH_SIZE):
+        self.model = TARGET_MODELS[target]
+        self.default_account = default_account
+        self.default_flag = default_flag
+        self.counterparts = counterparts
+        self.batch_size = batch_size
+
+        self.accounts = {a.account: a for a in DimAccount.objects.all()}
+        self.flags = dict(DimFlag.objects.values_list('flag', 'id'))
+        self.payees = {p.payee: p for p in DimPayee.objects.all()}
+        self.categories = {}
+        self.categories_by_group = {}
+        for pk, name, group in DimCategory.objects.values_list('id', 'category', 'categorygroup__category_group'):
+            self.categories.setdefault(name, pk)
+            self.categories_by_group[(group, name)] = pk
+
+        self.stats = {
+            'read': 0,
+            'imported': 0,
+            'duplicates': 0,
+            'counterparts': 0,
+            'new_payees': 0,
+            'errors': [],
+        }
+        # Hashes der in diesem Lauf bereits geschriebenen Zeilen
+        self.written = Counter()
+
+    def load(self, rows, dry_run=False):
+        """Importiert alle Zeilen; gibt die Statistik zurück"""
+        self.dry_run = dry_run
+        batch = []
+        with transaction.atomic():
+            for row in rows:
+                self.stats['read'] += 1
+                if 'error' in row:
+                    self.stats['errors'].append((row['line'], row['error']))
+                    continue
+                batch.append(row)
+                if len(batch) >= self.batch_size:
+                    self._load_batch(batch, dry_run)
+                    batch = []
+            if batch:
+                self._load_batch(batch, dry_run)
+
+            if dry_run:
+                transaction.set_rollback(True)
+            elif self.stats['imported']:
+                bump_generation()
+
+        logger.info(
+            f"Bulk-Import {self.model._meta.db_table}: {self.stats['imported']} importiert, "
+            f"{self.stats['duplicates']} Duplikate, {self.stats['counterparts']} Gegenbuchungen"
+        )
+        return self.stats
+
+    def _load_batch(self, batch, dry_run):
+        self._create_missing_payees(batch)
+
+        instances = []
+        for row in batch:
+            try:
+                instances.append(self._build_instance(row))
+            except ImportRowError as e:
+                self.stats['errors'].append((row['line'], str(e)))
+
+        instances = self._drop_duplicates(instances)
+        counterparts = self._build_counterparts(instances) if self.counterparts else []
+
+        self.stats['imported'] += len(instances)
+        self.stats['counterparts'] += len(counterparts)
+
+        if not dry_run:
+            write_rows(self.model, instances + counterparts)
+            self.written.update(self._hash(tx) for tx in instances)
+
+    def _create_missing_payees(self, batch):
+        """Alle unbekannten Payees des Batches mit einem bulk_create anlegen"""
+        names = {row['payee'] for row in batch if row['payee'] and row['payee'] not in self.payees}
+        if not names:
+            return
+
+        new_payees = [
+            DimPayee(payee=name, payee_type='transfer' if name.startswith('Transfer : ') else None)
+            for name in sorted(names)
+        ]
+        created = DimPayee.objects.bulk_create(new_payees)
+        if any(p.pk is None for p in created):
+            # Backends ohne RETURNING: IDs nachladen
+            created = DimPayee.objects.filter(payee__in=names)
+        self.payees.update({p.payee: p for p in created})
+        self.stats['new_payees'] += len(names)
+
+    def _build_instance(self, row):
+        account_name = row['account'] or self.default_account
+        account = self.accounts.get(account_name)
+        if account is None:
+            raise ImportRowError(f'Unbekanntes Konto: {account_name!r}')
+
+        category_id = None
+        if row['category']:
+            category_id = (
+                self.categories_by_group.get((row['category_group'], row['category']))
+                or self.categories.get(row['category'])
+            )
+
+        flag_name = row['flag'] or self.default_flag
+        return self.model(
+            account=account,
+            flag_id=self.flags.get(flag_name) if flag_name else None,
+            date=row['date'],
+            payee=self.payees.get(row['payee']),
+            category_id=category_id,
+            memo=row['memo'],
+            outflow=row['outflow'],
+            inflow=row['inflow'],
+        )
+
+    def _drop_duplicates(self, instances):
+        """
+        Zeilen verwerfen, deren Inhalts-Hash bereits in der Tabelle existiert.
+        Gezählt wird pro Hash: zwei identische Buchungen am selben Tag bleiben
+        erhalten, ein erneuter Import derselben Datei bucht aber nichts doppelt.
+        """
+        if not instances:
+            return instances
+
+        dates = [tx.date for tx in instances]
+        existing = Counter(
+            content_hash(*values)
+            for values in self.model.objects.filter(
+                date__gte=min(dates), date__lte=max(dates),
+            ).values_list('account_id', 'date', 'payee_id', 'category_id', 'memo', 'outflow', 'inflow')
+            .iterator(chunk_size=self.batch_size)
+        )
+        # Identische Zeilen aus früheren Batches dieses Laufs sind keine Duplikate
+        existing -= self.written
+
+        fresh = []
+        for tx in instances:
+            key = self._hash(tx)
+            if existing[key] > 0:
+                existing[key] -= 1
+                self.stats['duplicates'] += 1
+            else:
+                fresh.append(tx)
+        return fresh
+
+    @staticmethod
+    def _hash(tx):
+        return content_hash(tx.account_id, tx.date, tx.payee_id, tx.category_id, tx.memo, tx.outflow, tx.inflow)
+
+    @staticmethod
+    def _leg_key(tx):
+        return (tx.account_id, tx.date, tx.payee_id, tx.outflow or 0, tx.inflow or 0)
+
+    def _build_counterparts(self, instances):
+        """
+        Gegenbuchungen für Transfers. Enthält die Datei beide Seiten eines
+        Transfers (z.B. YNAB-Export), wird keine Gegenbuchung erzeugt.
+        """
+        account_ids = {name: a.id for name, a in self.accounts.items()}
+        payee_ids = {name: p.id for name, p in self.payees.items()}
+        legs = Counter(self._leg_key(tx) for tx in instances)
+
+        counterparts = []
+        for tx in instances:
+            counterpart = build_transfer_counterpart(tx, account_ids, payee_ids)
+            if counterpart is None:
+                continue
+            key = self._leg_key(counterpart)
+            if legs[key] > 0:
+                legs[key] -= 1
+                continue
+            counterparts.append(counterpart)
+        return counterparts
+
+
+def write_rows(model, instances):
+    """Ungespeicherte Instanzen schreiben: COPY auf PostgreSQL, sonst bulk_create"""
+    if not instances:
+        return
+    if connection.vendor != 'postgresql':
+        model.objects.bulk_create(instances, batch_size=BATCH_SIZE)
+        return
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for tx in instances:
+        writer.writerow([
+            '' if value is None else value
+            for value in (tx.account_id, tx.flag_id, tx.date, tx.payee_id,
+                          tx.category_id, tx.memo, tx.outflow, tx.inflow)
+        ])
+    buffer.seek(0)
+
+    sql = (
+        f'COPY {connection.ops.quote_name(model._meta.db_table)} ({", ".join(COPY_COLUMNS)}) '
+        f"FROM STDIN WITH (FORMAT csv, NULL '')"
+    )
+    with connection.cursor() as cursor:
+        if hasattr(cursor.cursor, 'copy_expert'):
+            cursor.cursor.copy_expert(sql, buffer)
+        else:
+            # psycopg 3
+            with cursor.cursor.copy(sql) as copy:
+                copy.write(buffer.getvalue())
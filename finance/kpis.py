@@ -0,0 +1,120 @@
+# finance/kpis.py
+"""
+Kennzahlen für das Haupt-Dashboard (Seite und api/dashboard-kpis/).
+
+- Summen, Anzahl und Ausgaben der letzten 30 Tage: eine Abfrage mit
+  bedingter Aggregation über einen Datumsbereich
+- Top-Payees und letzte Transaktionen: je eine weitere Abfrage
+
+Ergebnisse werden pro (User, Jahr, Tag, Daten-Generation) im Django-Cache
+gehalten, d.h. bis zur nächsten Änderung an den Transaktionen.
+"""
+from dataclasses import asdict, dataclass, field
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.db.models import Count, F, Q, Sum
+
+from .data_generation import TRANSACTIONS, get_generation
+from .models import FactTransactionsSigi
+from .utils import year_range
+
+CACHE_TIMEOUT = 60 * 60
+TOP_PAYEES = 10
+RECENT_TRANSACTIONS = 10
+
+
+@dataclass
+class DashboardKpis:
+    year: int
+    total_inflow: Decimal = Decimal('0')
+    total_outflow: Decimal = Decimal('0')
+    transaction_count: int = 0
+    last_month_outflow: Decimal = Decimal('0')
+    top_payees: list = field(default_factory=list)
+    recent_transactions: list = field(default_factory=list)
+
+    @property
+    def netto(self):
+        return self.total_inflow - self.total_outflow
+
+    def as_context(self):
+        context = asdict(self)
+        context['netto'] = self.netto
+        return context
+
+    def as_json(self):
+        """Beträge als float, Datum als ISO-String"""
+        def number(value):
+            return round(float(value or 0), 2)
+
+        return {
+            'year': self.year,
+            'total_inflow': number(self.total_inflow),
+            'total_outflow': number(self.total_outflow),
+            'netto': number(self.netto),
+            'transaction_count': self.transaction_count,
+            'last_month_outflow': number(self.last_month_outflow),
+            'top_payees': [
+                {'payee': row['payee__payee'], 'total': number(row['total']), 'count': row['count']}
+                for row in self.top_payees
+            ],
+            'recent_transactions': [
+                dict(row, date=row['date'].isoformat(), inflow=number(row['inflow']), outflow=number(row['outflow']))
+                for row in self.recent_transactions
+            ],
+        }
+
+
+def compute_kpis(year, today=None):
+    """Alle Kennzahlen eines Jahres - drei Abfragen"""
+    today = today or date.today()
+    transactions = FactTransactionsSigi.objects.filter(date__range=year_range(year))
+
+    totals = transactions.aggregate(
+        total_inflow=Sum('inflow'),
+        total_outflow=Sum('outflow'),
+        transaction_count=Count('id'),
+        last_month_outflow=Sum('outflow', filter=Q(date__gte=today - timedelta(days=30))),
+    )
+
+    top_payees = transactions.filter(
+        outflow__gt=0
+    ).exclude(
+        category__categorygroup__category_group__iexact='NoCategory'
+    ).exclude(
+        payee__payee_type__in=['transfer', 'kursschwankung']
+    ).values(
+        'payee__payee'
+    ).annotate(
+        total=Sum('outflow'),
+        count=Count('id')
+    ).order_by('-total')[:TOP_PAYEES]
+
+    recent = transactions.order_by('-date', '-id').values(
+        'id', 'date', 'inflow', 'outflow', payee_name=F('payee__payee'),
+    )[:RECENT_TRANSACTIONS]
+
+    return DashboardKpis(
+        year=int(year),
+        total_inflow=totals['total_inflow'] or Decimal('0'),
+        total_outflow=totals['total_outflow'] or Decimal('0'),
+        transaction_count=totals['transaction_count'],
+        last_month_outflow=totals['last_month_outflow'] or Decimal('0'),
+        top_payees=list(top_payees),
+        recent_transactions=list(recent),
+    )
+
+
+def dashboard_kpis(user, year, today=None):
+    """Gecachte Kennzahlen pro (User, Jahr) bis zur nächsten Transaktions-Änderung"""
+    today = today or date.today()
+    generation = get_generation(TRANSACTIONS)
+    cache_key = f"kpis:dashboard:{user.pk}:{int(year)}:{today:%Y%m%d}:g{generation}"
+
+    kpis = cache.get(cache_key)
+    if kpis is None:
+        kpis = compute_kpis(year, today)
+        cache.set(cache_key, kpis, CACHE_TIMEOUT)
+    return kpis
@@ -0,0 +1,168 @@
+# finance/management/commands/benchmark_views.py
+"""
+Wiederholbarer Benchmark der schweren Finance-Views über den Test-Client.
+Misst pro Endpoint p50/p95-Latenz und Query-Anzahl und gibt JSON aus.
+Nur PostgreSQL - die finance-Migrationen legen Tabellen im Schema
+"finance" an.
+
+Beispiel:
+    python manage.py generate_synthetic_data --clear
+    python manage.py benchmark_views --iterations 20 --output bench.json
+"""
+import json
+import statistics
+import time
+import uuid
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from finance.models import DimCategoryGroup, RegisteredDevice
+
+BENCHMARK_USERNAME = 'benchmark'
+
+# (URL-Name, Query-Parameter)
+ENDPOINTS = [
+    ('finance:dashboard', {}),
+    ('finance:transactions', {}),
+    ('finance:household_transactions', {}),
+    ('finance:asset_overview', {}),
+    ('finance:api_asset_history', {}),
+    ('finance:api_asset_category_details', {}),
+    ('finance:api_monthly_spending', {}),
+    ('finance:api_category_breakdown', {}),
+    ('finance:api_top_payees', {}),
+    ('finance:api_spending_trend', {}),
+    ('finance:api_income_payees', {}),
+    ('finance:api_household_monthly_spending', {}),
+    ('finance:api_household_category_breakdown', {}),
+    ('finance:api_categorygroup_monthly_trend', {'group_id': '{group_id}'}),
+    ('finance:api_categorygroup_year_comparison', {'group_id': '{group_id}'}),
+    ('finance:api_categorygroup_quarterly_breakdown', {'group_id': '{group_id}'}),
+    ('finance:api_categorygroup_stats', {'group_id': '{group_id}'}),
+    ('finance:api_supermarket_monthly_trend', {}),
+    ('finance:api_supermarket_year_comparison', {}),
+    ('finance:api_supermarket_stats', {}),
+]
+
+
+def percentile(values, pct):
+    """Perzentil mit linearer Interpolation"""
+    ordered = sorted(values)
+    if not ordered:
+        return None
+    k = (len(ordered) - 1) * pct / 100
+    lower = int(k)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (k - lower)
+
+
+def benchmark_client():
+    """Client mit eingeloggtem Benchmark-User und registriertem Gerät"""
+    user, created = User.objects.get_or_create(
+        username=BENCHMARK_USERNAME,
+        defaults={'is_superuser': True, 'is_staff': True},
+    )
+    if created:
+        user.set_unusable_password()
+        user.save()
+
+    device, _ = RegisteredDevice.objects.get_or_create(
+        user=user,
+        device_fingerprint='benchmark',
+        defaults={'device_name': 'Benchmark', 'device_token': uuid.uuid4()},
+    )
+
+    host = next((h.lstrip('.') for h in settings.ALLOWED_HOSTS if h != '*'), 'localhost')
+    client = Client(HTTP_HOST=host)
+    client.force_login(user)
+    client.cookies['device_id'] = str(device.device_token)
+    return client
+
+
+def endpoint_requests(only=None):
+    """(URL-Name, URL, Query-Parameter) für alle bzw. die gewählten Endpoints"""
+    group = DimCategoryGroup.objects.order_by('id').first()
+    placeholders = {'group_id': group.id if group else ''}
+
+    endpoints = ENDPOINTS
+    if only:
+        endpoints = [e for e in ENDPOINTS if e[0] in only]
+        if not endpoints:
+            raise CommandError('Keiner der angegebenen Endpoints ist bekannt.')
+
+    return [
+        (url_name, reverse(url_name), {key: value.format(**placeholders) for key, value in params.items()})
+        for url_name, params in endpoints
+    ]
+
+
+class Command(BaseCommand):
+    help = 'Benchmark der Finance-Views (p50/p95 Latenz, Queries) als JSON'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=10, help='Messungen pro Endpoint (Standard: 10)')
+        parser.add_argument('--warmup', type=int, default=1, help='Aufwärm-Requests pro Endpoint (Standard: 1)')
+        parser.add_argument('--only', nargs='*', help='Nur diese URL-Namen (z.B. finance:dashboard)')
+        parser.add_argument('--output', type=str, help='JSON zusätzlich in Datei schreiben')
+
+    def handle(self, *args, **options):
+        client = benchmark_client()
+
+        results = []
+        for url_name, url, query in endpoint_requests(options['only']):
+            results.append(self._measure(client, url_name, url, query, options))
+
+        report = {
+            'database': connection.vendor,
+            'iterations': options['iterations'],
+            'endpoints': results,
+        }
+        output = json.dumps(report, indent=2)
+
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                f.write(output)
+            self.stderr.write(self.style.SUCCESS(f'✓ Ergebnis gespeichert: {options["output"]}'))
+
+        self.stdout.write(output)
+
+    def _measure(self, client, url_name, url, query, options):
+        # Über HTTPS - mit SECURE_SSL_REDIRECT würden sonst nur 301-Redirects gemessen
+        for _ in range(options['warmup']):
+            client.get(url, query, secure=True)
+
+        timings = []
+        query_counts = []
+        status = None
+
+        for _ in range(options['iterations']):
+            with CaptureQueriesContext(connection) as captured:
+                start = time.perf_counter()
+                response = client.get(url, query, secure=True)
+                timings.append((time.perf_counter() - start) * 1000)
+            query_counts.append(len(captured.captured_queries))
+            status = response.status_code
+
+        self.stderr.write(
+            f'  {url_name:50s} p50={percentile(timings, 50):8.1f}ms  '
+            f'queries={int(statistics.median(query_counts))}  status={status}'
+        )
+
+        return {
+            'name': url_name,
+            'url': url,
+            'params': query,
+            'status': status,
+            'p50_ms': round(percentile(timings, 50), 2),
+            'p95_ms': round(percentile(timings, 95), 2),
+            'mean_ms': round(statistics.mean(timings), 2),
+            'max_ms': round(max(timings), 2),
+            'queries': int(statistics.median(query_counts)),
+            'queries_max': max(query_counts),
+        }
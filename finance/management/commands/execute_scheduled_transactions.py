@@ -1,12 +1,12 @@
 # Speichere unter: finance/management/commands/execute_scheduled_transactions.py
 
 from django.core.management.base import BaseCommand
-from finance.models import ScheduledTransaction
+from finance.scheduler import ScheduledTransactionEngine
 from datetime import date
 
 
 class Command(BaseCommand):
-    help = 'Führt fällige Scheduled Transactions aus'
+    help = 'Führt fällige Scheduled Transactions aus (inkl. verpasster Termine)'
 
     def add_arguments(self, parser):
         parser.add_argument(
@@ -20,58 +20,55 @@ class Command(BaseCommand):
 
         today = date.today()
 
-        # Hole alle aktiven Scheduled Transactions die fällig sind
-        scheduled = ScheduledTransaction.objects.filter(
-            is_active=True,
-            next_execution_date__lte=today
-        )
+        try:
+            results = ScheduledTransactionEngine(today).run(dry_run=dry_run)
+        except Exception as e:
+            self.stdout.write(self.style.ERROR(f'✗ Fehler beim Ausführen: {str(e)}'))
+            return
 
-        if not scheduled.exists():
+        if not results:
             self.stdout.write(
                 self.style.SUCCESS('✓ Keine fälligen Scheduled Transactions gefunden.')
             )
             return
 
         self.stdout.write(
-            self.style.WARNING(f'📅 Gefunden: {scheduled.count()} fällige Scheduled Transaction(s)')
+            self.style.WARNING(f'📅 Gefunden: {len(results)} fällige Scheduled Transaction(s)')
         )
 
         executed_count = 0
-        failed_count = 0
 
-        for scheduled_transaction in scheduled:
-            try:
-                if dry_run:
-                    self.stdout.write(
-                        f'  [DRY-RUN] Würde erstellen: {scheduled_transaction}'
-                    )
-                else:
-                    transaction = scheduled_transaction.execute()
+        for result in results:
+            scheduled_transaction = result['scheduled']
+            dates = ', '.join(d.strftime('%d.%m.%Y') for d in result['dates'])
 
-                    if transaction:
-                        executed_count += 1
-                        self.stdout.write(
-                            self.style.SUCCESS(
-                                f'  ✓ Erstellt: {scheduled_transaction.payee} - '
-                                f'€{scheduled_transaction.outflow or scheduled_transaction.inflow} '
-                                f'(Nächste: {scheduled_transaction.next_execution_date})'
-                            )
-                        )
-                    else:
-                        self.stdout.write(
-                            self.style.WARNING(
-                                f'  ⊘ Übersprungen: {scheduled_transaction} '
-                                f'(Enddatum erreicht oder bereits ausgeführt)'
-                            )
-                        )
+            if dry_run:
+                self.stdout.write(
+                    f'  [DRY-RUN] Würde erstellen: {scheduled_transaction} '
+                    f'({len(result["dates"])}x: {dates or "-"})'
+                )
+            elif result['dates']:
+                executed_count += len(result['dates'])
+                self.stdout.write(
+                    self.style.SUCCESS(
+                        f'  ✓ Erstellt: {scheduled_transaction.payee} - '
+                        f'€{scheduled_transaction.outflow or scheduled_transaction.inflow} '
+                        f'x{len(result["dates"])} ({dates}) '
+                        f'(Nächste: {scheduled_transaction.next_execution_date})'
+                    )
+                )
 
-            except Exception as e:
-                failed_count += 1
+            if result['skipped']:
                 self.stdout.write(
-                    self.style.ERROR(
-                        f'  ✗ Fehler bei {scheduled_transaction}: {str(e)}'
+                    self.style.WARNING(
+                        f'  ⊘ Übersprungen: {scheduled_transaction} '
+                        f'({result["skipped"]} Termin(e) bereits gebucht)'
                     )
                 )
+            if result['deactivated']:
+                self.stdout.write(
+                    self.style.WARNING(f'  ⊘ Deaktiviert: {scheduled_transaction} (Enddatum erreicht)')
+                )
 
         # Zusammenfassung
         if not dry_run:
@@ -80,8 +77,4 @@ class Command(BaseCommand):
             self.stdout.write(
                 self.style.SUCCESS(f'✓ Erfolgreich erstellt: {executed_count}')
             )
-            if failed_count > 0:
-                self.stdout.write(
-                    self.style.ERROR(f'✗ Fehler: {failed_count}')
-                )
-            self.stdout.write(self.style.SUCCESS('=' * 50))
\ No newline at end of file
+            self.stdout.write(self.style.SUCCESS('=' * 50))
@@ -0,0 +1,58 @@
+# finance/management/commands/export_transactions.py
+"""
+Export der Transaktionen (komplette Historie) ohne HTTP-Timeout.
+
+Beispiel:
+    python manage.py export_transactions --format parquet --output tx.parquet
+    python manage.py export_transactions --scope household --year 2025 > haushalt.csv
+"""
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from finance.exporters import EXPORT_FORMATS, STREAMERS, iter_export_rows, parquet_available
+
+
+class Command(BaseCommand):
+    help = 'Exportiert Transaktionen als CSV, JSON Lines oder Parquet (streamend)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', choices=list(EXPORT_FORMATS), default='csv', help='Ausgabeformat (Standard: csv)')
+        parser.add_argument('--scope', choices=['all', 'household'], default='all', help='all = Sigi, household = Flag 5 + Robert')
+        parser.add_argument('--year', type=str, default='')
+        parser.add_argument('--month', type=str, default='')
+        parser.add_argument('--account', type=str, default='', help='Account-ID')
+        parser.add_argument('--category', type=str, default='', help='Kategorie-ID')
+        parser.add_argument('--search', type=str, default='', help='Suche in Payee und Memo')
+        parser.add_argument('--person', choices=['', 'sigi', 'robert'], default='', help='Nur bei --scope household')
+        parser.add_argument('--output', type=str, help='Zieldatei (Standard: stdout)')
+
+    def handle(self, *args, **options):
+        export_format = options['format']
+        if export_format == 'parquet':
+            if not parquet_available():
+                raise CommandError('Parquet-Export benötigt das Paket "pyarrow".')
+            if not options['output']:
+                raise CommandError('Parquet-Export benötigt --output.')
+
+        params = {
+            key: options[key]
+            for key in ('year', 'month', 'account', 'category', 'search', 'person')
+        }
+        chunks = STREAMERS[export_format](iter_export_rows(params, scope=options['scope']))
+
+        if not options['output']:
+            for chunk in chunks:
+                sys.stdout.write(chunk)
+            return
+
+        if export_format == 'parquet':
+            f = open(options['output'], 'wb')
+        else:
+            f = open(options['output'], 'w', encoding='utf-8', newline='')
+
+        with f:
+            for chunk in chunks:
+                f.write(chunk)
+
+        self.stderr.write(self.style.SUCCESS(f'✓ Export gespeichert: {options["output"]}'))
@@ -0,0 +1,294 @@
+# finance/management/commands/generate_synthetic_data.py
+"""
+Erzeugt realistische Testdaten in den dim_*/fact_* Tabellen - für
+Benchmarks (siehe benchmark_views) und lokale Entwicklung. Nur PostgreSQL
+(wie das übrige finance-Schema).
+
+Beispiel:
+    python manage.py generate_synthetic_data --years 3 --per-month 150 --clear
+"""
+import random
+from datetime import date
+from decimal import Decimal
+
+from dateutil.relativedelta import relativedelta
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connection, transaction
+
+from finance.data_generation import bump_generation
+from finance.models import (
+    DimAccount,
+    DimAccountTypes,
+    DimCategory,
+    DimCategoryGroup,
+    DimFlag,
+    DimPayee,
+    FactTransactionsRobert,
+    FactTransactionsSigi,
+    ScheduledTransaction,
+    ScheduledTransactionOccurrence,
+)
+from finance.signals import TRANSFER_MAPPING, build_transfer_counterpart
+
+# IDs die im Code fest verdrahtet sind
+READY_TO_ASSIGN_CATEGORY_ID = 1
+SUPERMARKT_CATEGORY_ID = 5
+HAUSHALT_FLAG_ID = 5
+ROBERT_ACCOUNT_ID = 18
+
+ACCOUNT_TYPES = {1: 'Cash', 2: 'Credit', 3: 'MidtermInvest', 4: 'LongtermInvest'}
+
+ACCOUNTS = {
+    1: ('Girokonto', 1),
+    2: ('MasterCard', 2),
+    3: ('Bargeld', 1),
+    4: ('Gutscheine', 1),
+    5: ('OnlineSparen', 3),
+    6: ('Bausparer', 3),
+    7: ('ETF', 4),
+    8: ('Krypto & Aktien', 4),
+    9: ('Goldanlage', 4),
+    10: ('Pensionsvorsorge Uniqa', 4),
+    11: ('Top4 Fonds & Green Invest', 4),
+    ROBERT_ACCOUNT_ID: ('Robert', 1),
+}
+
+FLAGS = {1: 'Rot', 2: 'Orange', 3: 'Gelb', 4: 'Grün', HAUSHALT_FLAG_ID: 'Haushalt'}
+
+CATEGORY_GROUPS = {
+    1: ('Einkommen', [(READY_TO_ASSIGN_CATEGORY_ID, 'Ready to Assign')]),
+    2: ('Lebenshaltung', [(SUPERMARKT_CATEGORY_ID, 'Supermarkt'), (6, 'Drogerie'), (7, 'Restaurant')]),
+    3: ('Wohnen', [(8, 'Miete'), (9, 'Strom'), (10, 'Internet')]),
+    4: ('Mobilität', [(11, 'Tanken'), (12, 'Öffis')]),
+    5: ('Freizeit', [(13, 'Urlaub'), (14, 'Hobbys'), (15, 'Geschenke')]),
+    6: ('Sonstiges', [(2, 'Versicherung'), (3, 'Gesundheit'), (4, 'Kleidung')]),
+}
+
+SPENDING_CATEGORY_IDS = [
+    category_id
+    for group_id, (_, categories) in CATEGORY_GROUPS.items() if group_id != 1
+    for category_id, _ in categories
+]
+
+SYNTHETIC_MEMO = '[Synthetisch]'
+
+
+class Command(BaseCommand):
+    help = 'Erzeugt synthetische Finanzdaten für Benchmarks und Entwicklung'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--years', type=int, default=3, help='Anzahl Jahre bis heute (Standard: 3)')
+        parser.add_argument('--per-month', type=int, default=120,
+                            help='Ausgaben-Transaktionen pro Monat (Standard: 120)')
+        parser.add_argument('--payees', type=int, default=80, help='Anzahl normaler Payees (Standard: 80)')
+        parser.add_argument('--extra-accounts', type=int, default=0,
+                            help='Zusätzliche generische Konten (Standard: 0)')
+        parser.add_argument('--household-share', type=float, default=0.3,
+                            help='Anteil Haushalts-Buchungen (Flag 5) bei Sigi (Standard: 0.3)')
+        parser.add_argument('--robert-share', type=float, default=0.2,
+                            help='Anteil Buchungen in Roberts Tabelle (Standard: 0.2)')
+        parser.add_argument('--scheduled', type=int, default=10,
+                            help='Anzahl Scheduled Transactions (Standard: 10)')
+        parser.add_argument('--seed', type=int, default=42, help='Random Seed (Standard: 42)')
+        parser.add_argument('--clear', action='store_true',
+                            help='Löscht vorher ALLE Fakten, Schedules und Dimensionen')
+        parser.add_argument('--force', action='store_true', help='Auch mit DEBUG=False ausführen')
+
+    def handle(self, *args, **options):
+        if not settings.DEBUG and not options['force']:
+            raise CommandError('Nur mit DEBUG=True erlaubt (oder --force verwenden).')
+
+        self.rng = random.Random(options['seed'])
+
+        if not options['clear'] and (FactTransactionsSigi.objects.exists() or DimAccount.objects.exists()):
+            raise CommandError('Tabellen enthalten bereits Daten - mit --clear neu erzeugen.')
+
+        self.stdout.write('=' * 70)
+        self.stdout.write(self.style.SUCCESS('🧪 Synthetische Daten erzeugen'))
+        self.stdout.write('=' * 70)
+
+        with transaction.atomic():
+            if options['clear']:
+                self._clear()
+
+            self._create_dimensions(options)
+            sigi_rows, robert_rows = self._build_transactions(options)
+
+            FactTransactionsSigi.objects.bulk_create(sigi_rows, batch_size=5000)
+            FactTransactionsRobert.objects.bulk_create(robert_rows, batch_size=5000)
+            scheduled_count = self._create_scheduled(options)
+            bump_generation()
+
+        self.stdout.write(self.style.SUCCESS('\n✅ Fertig!'))
+        self.stdout.write(f'   • Sigi-Transaktionen: {len(sigi_rows)}')
+        self.stdout.write(f'   • Robert-Transaktionen: {len(robert_rows)}')
+        self.stdout.write(f'   • Scheduled Transactions: {scheduled_count}')
+
+    def _clear(self):
+        """Leert Fakten, Schedules und Dimensionen (Reihenfolge wegen FKs)"""
+        self.stdout.write(self.style.WARNING('\n🗑️  Lösche bestehende Daten...'))
+        ScheduledTransactionOccurrence.objects.all().delete()
+        ScheduledTransaction.objects.all().delete()
+        FactTransactionsSigi.objects.all().delete()
+        FactTransactionsRobert.objects.all().delete()
+        for model in (DimPayee, DimCategory, DimCategoryGroup, DimFlag, DimAccount, DimAccountTypes):
+            model.objects.all().delete()
+
+    def _create_dimensions(self, options):
+        self.stdout.write('\n📐 Erzeuge Dimensionen...')
+
+        DimAccountTypes.objects.bulk_create([
+            DimAccountTypes(id=type_id, accounttypes=name) for type_id, name in ACCOUNT_TYPES.items()
+        ])
+
+        accounts = [
+            DimAccount(id=account_id, account=name, accounttype_id=type_id)
+            for account_id, (name, type_id) in ACCOUNTS.items()
+        ]
+        first_extra = max(ACCOUNTS) + 1
+        accounts += [
+            DimAccount(id=first_extra + i, account=f'Konto {i + 1:02d}', accounttype_id=1)
+            for i in range(options['extra_accounts'])
+        ]
+        DimAccount.objects.bulk_create(accounts)
+
+        DimFlag.objects.bulk_create([DimFlag(id=flag_id, flag=name) for flag_id, name in FLAGS.items()])
+
+        DimCategoryGroup.objects.bulk_create([
+            DimCategoryGroup(id=group_id, category_group=name)
+            for group_id, (name, _) in CATEGORY_GROUPS.items()
+        ])
+        DimCategory.objects.bulk_create([
+            DimCategory(id=category_id, category=name, categorygroup_id=group_id)
+            for group_id, (_, categories) in CATEGORY_GROUPS.items()
+            for category_id, name in categories
+        ])
+
+        payees = [DimPayee(payee=name, payee_type='transfer') for name in TRANSFER_MAPPING]
+        payees.append(DimPayee(payee='Kursschwankung', payee_type='kursschwankung'))
+        payees.append(DimPayee(payee='Gehalt'))
+        payees += [DimPayee(payee=f'Händler {i + 1:03d}') for i in range(options['payees'])]
+        DimPayee.objects.bulk_create(payees)
+
+        # Sequenzen nach expliziten IDs nachziehen (Postgres)
+        sequence_sql = connection.ops.sequence_reset_sql(
+            no_style(), [DimAccountTypes, DimAccount, DimFlag, DimCategoryGroup, DimCategory, DimPayee]
+        )
+        with connection.cursor() as cursor:
+            for sql in sequence_sql:
+                cursor.execute(sql)
+
+        self.accounts = {a.account: a for a in DimAccount.objects.all()}
+        self.payees = {p.payee: p for p in DimPayee.objects.all()}
+        self.merchants = [p for p in self.payees.values() if p.payee.startswith('Händler')]
+        self.spending_accounts = [
+            self.accounts['Girokonto'], self.accounts['MasterCard'], self.accounts['Bargeld']
+        ] + [a for name, a in self.accounts.items() if name.startswith('Konto ')]
+
+        self.stdout.write(self.style.SUCCESS(
+            f'   ✓ {len(accounts)} Konten, {len(payees)} Payees, {len(SPENDING_CATEGORY_IDS) + 1} Kategorien'
+        ))
+
+    def _build_transactions(self, options):
+        self.stdout.write('\n💸 Erzeuge Transaktionen...')
+
+        today = date.today()
+        start = (today - relativedelta(years=options['years'])).replace(day=1)
+        account_ids = {name: a.id for name, a in self.accounts.items()}
+        payee_ids = {name: p.id for name, p in self.payees.items()}
+
+        sigi_rows = []
+        robert_rows = []
+        month = start
+
+        while month <= today:
+            days_in_month = ((month + relativedelta(months=1)) - month).days
+            last_day = min(days_in_month, today.day) if month.year == today.year and month.month == today.month \
+                else days_in_month
+
+            def random_date():
+                return month.replace(day=self.rng.randint(1, last_day))
+
+            # Gehalt
+            sigi_rows.append(FactTransactionsSigi(
+                account=self.accounts['Girokonto'], date=month, payee=self.payees['Gehalt'],
+                category_id=READY_TO_ASSIGN_CATEGORY_ID, memo=SYNTHETIC_MEMO,
+                outflow=Decimal('0'), inflow=self._amount(2800, 3400),
+            ))
+            robert_rows.append(FactTransactionsRobert(
+                account=self.accounts['Robert'], date=month, payee=self.payees['Gehalt'],
+                category_id=READY_TO_ASSIGN_CATEGORY_ID, memo=SYNTHETIC_MEMO,
+                outflow=Decimal('0'), inflow=self._amount(2200, 2800),
+            ))
+
+            # Transfers (inkl. Gegenbuchung) und Kursschwankungen
+            for target in ('MasterCard', 'OnlineSparen', 'ETF', 'Krypto & Aktien'):
+                transfer = FactTransactionsSigi(
+                    account=self.accounts['Girokonto'], date=random_date(),
+                    payee=self.payees[f'Transfer : {target}'], memo=SYNTHETIC_MEMO,
+                    outflow=self._amount(100, 600), inflow=Decimal('0'),
+                )
+                sigi_rows.append(transfer)
+                counterpart = build_transfer_counterpart(transfer, account_ids, payee_ids)
+                if counterpart:
+                    sigi_rows.append(counterpart)
+
+            for target in ('ETF', 'Krypto & Aktien', 'Goldanlage'):
+                change = self._amount(-300, 400)
+                sigi_rows.append(FactTransactionsSigi(
+                    account=self.accounts[target], date=random_date(), payee=self.payees['Kursschwankung'],
+                    memo=SYNTHETIC_MEMO,
+                    outflow=-change if change < 0 else Decimal('0'),
+                    inflow=change if change > 0 else Decimal('0'),
+                ))
+
+            # Ausgaben
+            for _ in range(options['per_month']):
+                data = {
+                    'date': random_date(),
+                    'payee': self.rng.choice(self.merchants),
+                    'category_id': self.rng.choice(SPENDING_CATEGORY_IDS),
+                    'memo': SYNTHETIC_MEMO,
+                    'outflow': self._amount(3, 180),
+                    'inflow': Decimal('0'),
+                }
+                if self.rng.random() < options['robert_share']:
+                    robert_rows.append(FactTransactionsRobert(account=self.accounts['Robert'], **data))
+                else:
+                    flag_id = HAUSHALT_FLAG_ID if self.rng.random() < options['household_share'] else None
+                    sigi_rows.append(FactTransactionsSigi(
+                        account=self.rng.choice(self.spending_accounts), flag_id=flag_id, **data
+                    ))
+
+            month += relativedelta(months=1)
+
+        return sigi_rows, robert_rows
+
+    def _create_scheduled(self, options):
+        today = date.today()
+        schedules = []
+
+        for i in range(options['scheduled']):
+            frequency = self.rng.choice(['monthly', 'monthly', 'quarterly', 'yearly'])
+            start_date = today.replace(day=min(28, self.rng.randint(1, 28)))
+            schedules.append(ScheduledTransaction(
+                target_table='robert' if i % 4 == 3 else 'sigi',
+                account=self.accounts['Robert'] if i % 4 == 3 else self.accounts['Girokonto'],
+                payee=self.rng.choice(self.merchants),
+                category_id=self.rng.choice(SPENDING_CATEGORY_IDS),
+                memo=SYNTHETIC_MEMO,
+                outflow=self._amount(10, 900),
+                inflow=Decimal('0'),
+                frequency=frequency,
+                start_date=start_date,
+                next_execution_date=start_date,
+                created_by='generate_synthetic_data',
+            ))
+
+        ScheduledTransaction.objects.bulk_create(schedules)
+        return len(schedules)
+
+    def _amount(self, low, high):
+        return Decimal(str(round(self.rng.uniform(low, high), 2)))
@@ -0,0 +1,69 @@
+# finance/management/commands/import_transactions.py
+"""
+Bulk-Import von Bank- oder YNAB-CSV-Exporten.
+
+Beispiel:
+    python manage.py import_transactions ynab_register.csv
+    python manage.py import_transactions george.csv --format bank --account Girokonto --dry-run
+"""
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from finance.importers import (
+    BATCH_SIZE,
+    IMPORT_FORMATS,
+    TARGET_MODELS,
+    ImportRowError,
+    TransactionBulkLoader,
+    iter_csv_rows,
+)
+
+
+class Command(BaseCommand):
+    help = 'Importiert Transaktionen aus einer Bank- oder YNAB-CSV (COPY auf PostgreSQL)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('csv_file', type=str, help='Pfad zur CSV-Datei')
+        parser.add_argument('--format', choices=list(IMPORT_FORMATS), default='ynab', help='CSV-Format (Standard: ynab)')
+        parser.add_argument('--target', choices=list(TARGET_MODELS), default='sigi', help='Zieltabelle (Standard: sigi)')
+        parser.add_argument('--account', type=str, help='Konto für Zeilen ohne Konto-Spalte (z.B. Girokonto)')
+        parser.add_argument('--flag', type=str, help='Flag für Zeilen ohne Flag')
+        parser.add_argument('--no-counterparts', action='store_true', help='Keine Transfer-Gegenbuchungen erzeugen')
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+        parser.add_argument('--dry-run', action='store_true', help='Nur prüfen, nichts schreiben')
+
+    def handle(self, *args, **options):
+        loader = TransactionBulkLoader(
+            target=options['target'],
+            default_account=options['account'],
+            default_flag=options['flag'],
+            counterparts=not options['no_counterparts'],
+            batch_size=options['batch_size'],
+        )
+
+        start = time.perf_counter()
+        try:
+            with open(options['csv_file'], 'rb') as f:
+                stats = loader.load(iter_csv_rows(f, options['format']), dry_run=options['dry_run'])
+        except FileNotFoundError:
+            raise CommandError(f'Datei nicht gefunden: {options["csv_file"]}')
+        except ImportRowError as e:
+            raise CommandError(str(e))
+        duration = time.perf_counter() - start
+
+        if options['dry_run']:
+            self.stdout.write(self.style.WARNING('🔍 DRY RUN - nichts geschrieben'))
+
+        self.stdout.write(f'📄 Gelesen:         {stats["read"]}')
+        self.stdout.write(self.style.SUCCESS(f'✓ Importiert:      {stats["imported"]}'))
+        self.stdout.write(f'🔁 Gegenbuchungen:  {stats["counterparts"]}')
+        self.stdout.write(f'⏭️  Duplikate:       {stats["duplicates"]}')
+        self.stdout.write(f'👤 Neue Payees:     {stats["new_payees"]}')
+
+        if stats['errors']:
+            self.stdout.write(self.style.WARNING(f'⚠️  Fehlerhafte Zeilen: {len(stats["errors"])}'))
+            for line, error in stats['errors'][:20]:
+                self.stdout.write(f'   Zeile {line}: {error}')
+
+        self.stdout.write(f'⏱️  Dauer: {duration:.2f}s')
@@ -0,0 +1,149 @@
+# finance/management/commands/importtime.py
+"""
+Import-Zeit beim Worker-Start messen (python -X importtime in einem
+frischen Prozess: django.setup() + Import der URLconf).
+
+Die Zeit jedes Moduls wird der nächsten Projekt-App in seiner Import-Kette
+zugeschlagen - Third-Party-Imports zählen also zu der App, die sie auslöst.
+Zusätzlich wird gemeldet, ob Module aus config.lazy.HEAVY_MODULES geladen
+wurden (die sollen erst im Request kommen).
+
+Beispiel:
+    python manage.py importtime
+    python manage.py importtime --top 25 --json
+    python manage.py importtime --strict   # Fehler bei schweren Modulen
+"""
+import json
+import os
+import subprocess
+import sys
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+from django.apps import apps
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from config.lazy import HEAVY_MODULES
+
+
+@dataclass
+class ImportProfile:
+    target: str
+    total_us: int = 0
+    # Owner (Projekt-App bzw. Top-Level-Paket) → Mikrosekunden
+    per_owner: dict = field(default_factory=dict)
+    # Schweres Paket → {'owner', 'cumulative_us'}
+    heavy: dict = field(default_factory=dict)
+
+
+def project_apps():
+    """Top-Level-Pakete der Apps im Projektverzeichnis (plus config)"""
+    base = Path(settings.BASE_DIR).resolve()
+    names = {'config'}
+    for app_config in apps.get_app_configs():
+        if base in Path(app_config.path).resolve().parents:
+            names.add(app_config.name.split('.')[0])
+    return names
+
+
+def parse_importtime(output, own_packages, target=''):
+    """
+    Ausgabe von -X importtime auswerten. Die Zeilen kommen in Post-Order
+    (Kinder vor dem Eltern-Modul), daher rückwärts mit einem Stack der
+    Vorfahren durchlaufen.
+    """
+    rows = []
+    for line in output.splitlines():
+        if not line.startswith('import time:') or 'imported package' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|', 2)
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        rows.append((depth, int(self_us), int(cumulative_us), name.strip()))
+
+    profile = ImportProfile(target=target)
+    stack = []
+    for depth, self_us, cumulative_us, name in reversed(rows):
+        while stack and stack[-1][0] >= depth:
+            stack.pop()
+        top = name.split('.')[0]
+        parent_top, parent = stack[-1][1:] if stack else (None, None)
+
+        if top in own_packages:
+            owner = top
+        else:
+            owner = parent or top
+            # Äußerster Import eines schweren Pakets (z.B. PIL.Image ohne PIL davor)
+            if top in HEAVY_MODULES and parent_top != top:
+                heavy = profile.heavy.setdefault(top, {'owner': parent or '(direkt)', 'cumulative_us': 0})
+                heavy['cumulative_us'] += cumulative_us
+
+        stack.append((depth, top, owner))
+        profile.per_owner[owner] = profile.per_owner.get(owner, 0) + self_us
+        profile.total_us += self_us
+
+    return profile
+
+
+def profile_imports(target=None, env=None):
+    """
+    Import-Profil von django.setup() + target in einem neuen Interpreter.
+    env: zusätzliche Umgebungsvariablen (z.B. USE_R2_STORAGE wie in Produktion)
+    """
+    target = target or settings.ROOT_URLCONF
+    if not all(part.isidentifier() for part in target.split('.')):
+        raise CommandError(f'Ungültiger Modulname: {target}')
+    # import-Statement statt importlib.import_module - nur so erscheint das
+    # Zielmodul selbst (mit seinen Imports darunter) in der importtime-Ausgabe
+    code = f'import django; django.setup(); import {target}'
+    env = {
+        **os.environ,
+        'DJANGO_SETTINGS_MODULE': os.environ.get('DJANGO_SETTINGS_MODULE', 'config.settings'),
+        **(env or {}),
+    }
+
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', code],
+        capture_output=True, text=True, env=env, cwd=settings.BASE_DIR,
+    )
+    if result.returncode:
+        raise CommandError(f'Import von {target} fehlgeschlagen:\n{result.stderr[-2000:]}')
+    return parse_importtime(result.stderr, project_apps(), target)
+
+
+class Command(BaseCommand):
+    help = 'Misst die Import-Zeit beim Worker-Start pro App und prüft auf schwere Module'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--target', help='Zu importierendes Modul (Standard: ROOT_URLCONF)')
+        parser.add_argument('--top', type=int, default=15, help='Anzahl angezeigter Einträge')
+        parser.add_argument('--json', action='store_true', help='Ergebnis als JSON ausgeben')
+        parser.add_argument('--strict', action='store_true', help='Fehler, wenn schwere Module geladen werden')
+
+    def handle(self, *args, **options):
+        profile = profile_imports(options['target'])
+
+        if options['json']:
+            self.stdout.write(json.dumps(asdict(profile), indent=2))
+        else:
+            self._report(profile, options['top'])
+
+        if options['strict'] and profile.heavy:
+            raise CommandError(f"Schwere Module beim Start geladen: {', '.join(sorted(profile.heavy))}")
+
+    def _report(self, profile, top):
+        own = project_apps()
+        self.stdout.write(f'⏱️  Import-Zeit bis {profile.target}: {profile.total_us / 1000:.1f} ms')
+        self.stdout.write('📦 Pro App bzw. Paket (inkl. ausgelöster Third-Party-Imports):')
+
+        ranking = sorted(profile.per_owner.items(), key=lambda item: item[1], reverse=True)
+        for owner, us in ranking[:top]:
+            marker = '🏠' if owner in own else '  '
+            self.stdout.write(f'   {marker} {owner:<24} {us / 1000:8.1f} ms')
+
+        if not profile.heavy:
+            self.stdout.write(self.style.SUCCESS('✅ Keine schweren Module beim Start geladen'))
+            return
+        self.stdout.write(self.style.WARNING('⚠️  Schwere Module beim Start geladen:'))
+        for name, info in sorted(profile.heavy.items()):
+            self.stdout.write(f"   {name:<14} {info['cumulative_us'] / 1000:8.1f} ms  (via {info['owner']})")
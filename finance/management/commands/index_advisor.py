@@ -0,0 +1,160 @@
+# finance/management/commands/index_advisor.py
+"""
+Index-Berater: ruft die schweren Views (siehe benchmark_views) auf, lässt
+alle dabei ausgeführten SELECTs per EXPLAIN planen und meldet
+Sequential Scans auf großen Tabellen, nicht-sargable Filter
+(EXTRACT/date_part) sowie ungenutzte Indizes der Fakten-Tabellen.
+
+Beispiel:
+    python manage.py index_advisor
+    python manage.py index_advisor --only finance:household_transactions --analyze --json
+"""
+import json
+import re
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from config.metrics import fingerprint_sql
+from finance.management.commands.benchmark_views import benchmark_client, endpoint_requests
+
+# Spaltenname vor einem Vergleichsoperator im Filter-Text des Plans
+_FILTER_COLUMN = re.compile(r'\(?\b([a-z_][a-z0-9_]*)\)?(?:::\w+)?\s*(?:=|>=|<=|>|<|~~\*?|@@|= ANY)')
+_NOT_SARGABLE = re.compile(r'EXTRACT|date_part|upper\(|lower\(', re.IGNORECASE)
+_KEYWORDS = {'and', 'or', 'not', 'null', 'true', 'false', 'text', 'numeric', 'date'}
+
+
+def walk_plan(node):
+    yield node
+    for child in node.get('Plans', []):
+        yield from walk_plan(child)
+
+
+class Command(BaseCommand):
+    help = 'EXPLAIN der Hot-Queries: Seq Scans, Index-Kandidaten und ungenutzte Indizes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--only', nargs='*', help='Nur diese URL-Namen (z.B. finance:dashboard)')
+        parser.add_argument('--min-rows', type=int, default=1000, help='Seq Scans auf kleineren Tabellen ignorieren (Standard: 1000)')
+        parser.add_argument('--analyze', action='store_true', help='EXPLAIN ANALYZE (führt die SELECTs tatsächlich aus)')
+        parser.add_argument('--json', action='store_true', help='Bericht als JSON ausgeben')
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError('Der Index-Berater benötigt PostgreSQL.')
+
+        client = benchmark_client()
+        table_rows = self._table_rows()
+
+        queries = {}
+        for url_name, url, query in endpoint_requests(options['only']):
+            with CaptureQueriesContext(connection) as captured:
+                client.get(url, query)
+            for item in captured.captured_queries:
+                sql = item['sql']
+                if sql.lstrip().upper().startswith('SELECT'):
+                    queries.setdefault(fingerprint_sql(sql), (url_name, sql))
+
+        findings = defaultdict(lambda: {'seq_scans': 0, 'columns': defaultdict(int), 'endpoints': set(), 'not_sargable': 0})
+        for url_name, sql in queries.values():
+            for node in self._explain(sql, options['analyze']):
+                if node.get('Node Type') != 'Seq Scan':
+                    continue
+                table = node.get('Relation Name')
+                if table_rows.get(table, 0) < options['min_rows']:
+                    continue
+
+                finding = findings[table]
+                finding['seq_scans'] += 1
+                finding['endpoints'].add(url_name)
+                condition = node.get('Filter', '')
+                if _NOT_SARGABLE.search(condition):
+                    finding['not_sargable'] += 1
+                for column in _FILTER_COLUMN.findall(condition):
+                    if column not in _KEYWORDS:
+                        finding['columns'][column] += 1
+
+        report = {
+            'queries': len(queries),
+            'seq_scans': [
+                {
+                    'table': table,
+                    'rows': table_rows.get(table, 0),
+                    'seq_scans': data['seq_scans'],
+                    'not_sargable': data['not_sargable'],
+                    'filter_columns': dict(sorted(data['columns'].items(), key=lambda c: -c[1])),
+                    'endpoints': sorted(data['endpoints']),
+                }
+                for table, data in sorted(findings.items(), key=lambda f: -f[1]['seq_scans'])
+            ],
+            'unused_indexes': self._unused_indexes(),
+        }
+
+        if options['json']:
+            self.stdout.write(json.dumps(report, indent=2))
+        else:
+            self._print_report(report)
+
+    def _table_rows(self):
+        """Geschätzte Zeilenzahl pro Tabelle (pg_class.reltuples)"""
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT c.relname, c.reltuples::bigint FROM pg_class c "
+                "JOIN pg_namespace n ON n.oid = c.relnamespace "
+                "WHERE c.relkind = 'r' AND n.nspname = ANY(current_schemas(false))"
+            )
+            return dict(cursor.fetchall())
+
+    def _explain(self, sql, analyze):
+        prefix = 'EXPLAIN (ANALYZE, FORMAT JSON) ' if analyze else 'EXPLAIN (FORMAT JSON) '
+        with connection.cursor() as cursor:
+            try:
+                cursor.execute(prefix + sql)
+            except Exception as e:
+                self.stderr.write(self.style.WARNING(f'⚠️  EXPLAIN fehlgeschlagen: {e}'))
+                return []
+            plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return list(walk_plan(plan[0]['Plan']))
+
+    def _unused_indexes(self):
+        """Nicht-eindeutige Indizes der Fakten-Tabellen ohne Index-Scan seit dem letzten Stats-Reset"""
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT s.relname, s.indexrelname, s.idx_scan, pg_relation_size(s.indexrelid) "
+                "FROM pg_stat_user_indexes s JOIN pg_index i ON i.indexrelid = s.indexrelid "
+                "WHERE s.relname LIKE 'fact\\_%%' AND s.idx_scan = 0 AND NOT i.indisunique "
+                "ORDER BY pg_relation_size(s.indexrelid) DESC"
+            )
+            return [
+                {'table': table, 'index': index, 'scans': scans, 'size_bytes': size}
+                for table, index, scans, size in cursor.fetchall()
+            ]
+
+    def _print_report(self, report):
+        self.stdout.write('=' * 70)
+        self.stdout.write(self.style.SUCCESS(f'🔍 Index-Berater: {report["queries"]} unterschiedliche SELECTs geprüft'))
+        self.stdout.write('=' * 70)
+
+        if not report['seq_scans']:
+            self.stdout.write(self.style.SUCCESS('✓ Keine Sequential Scans auf großen Tabellen.'))
+
+        for item in report['seq_scans']:
+            self.stdout.write(self.style.WARNING(
+                f'\n⚠️  {item["table"]} (~{item["rows"]} Zeilen): {item["seq_scans"]} Seq Scan(s)'
+            ))
+            self.stdout.write(f'   Endpoints: {", ".join(item["endpoints"])}')
+            if item['not_sargable']:
+                self.stdout.write(f'   ⛔ {item["not_sargable"]}x Filter auf Ausdruck (EXTRACT/UPPER) - Bereichsfilter verwenden')
+            if item['filter_columns']:
+                columns = list(item['filter_columns'])[:3]
+                self.stdout.write(f'   Filter-Spalten: {", ".join(f"{c} ({n}x)" for c, n in item["filter_columns"].items())}')
+                self.stdout.write(f'   💡 Kandidat: CREATE INDEX ON {item["table"]} ({", ".join(columns)});')
+
+        if report['unused_indexes']:
+            self.stdout.write(self.style.WARNING('\n🗑️  Ungenutzte Indizes:'))
+            for index in report['unused_indexes']:
+                self.stdout.write(f'   {index["table"]}.{index["index"]} ({index["size_bytes"] // 1024} KB)')
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-19 09:22
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finance', '0007_populate_fact_urlaube'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ScheduledTransactionOccurrence',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('occurrence_date', models.DateField()),
+                ('target_table', models.CharField(choices=[('sigi', 'Sigi'), ('robert', 'Robert')], max_length=10)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('schedule', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='occurrences', to='finance.scheduledtransaction')),
+            ],
+            options={
+                'db_table': 'scheduled_transaction_occurrences',
+                'ordering': ['-occurrence_date'],
+                'constraints': [models.UniqueConstraint(fields=('schedule', 'occurrence_date'), name='unique_schedule_occurrence')],
+            },
+        ),
+    ]
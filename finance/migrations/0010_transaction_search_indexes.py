@@ -0,0 +1,63 @@
+# Suchindizes für finance.search auf den (unmanaged) Fakten-Tabellen.
+#
+# Die Ausdrücke entsprechen exakt dem SQL, das Django für die Suche erzeugt
+# (UPPER(...) LIKE UPPER(...) für icontains, to_tsvector('german', COALESCE(memo, ''))
+# für SearchVector), sonst verwendet der Planner die Indizes nicht.
+# pg_trgm ist optional: fehlt die Extension, werden nur die tsvector-Indizes angelegt.
+
+from django.db import migrations
+
+FACT_TABLES = ['fact_transactions_sigi', 'fact_transactions_robert']
+
+TSVECTOR_INDEXES = [
+    (f'{table}_memo_tsv', table, "to_tsvector('german'::regconfig, COALESCE(memo, ''))")
+    for table in FACT_TABLES
+]
+
+TRIGRAM_INDEXES = [
+    (f'{table}_memo_trgm', table, 'UPPER(memo) gin_trgm_ops')
+    for table in FACT_TABLES
+] + [
+    ('dim_payee_payee_trgm', 'dim_payee', 'UPPER(payee) gin_trgm_ops'),
+]
+
+
+def _table_exists(cursor, table):
+    cursor.execute('SELECT to_regclass(%s) IS NOT NULL', [table])
+    return cursor.fetchone()[0]
+
+
+def create_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+        trigram = cursor.fetchone() is not None
+        if trigram:
+            cursor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+
+        indexes = TSVECTOR_INDEXES + (TRIGRAM_INDEXES if trigram else [])
+        for name, table, expression in indexes:
+            if _table_exists(cursor, table):
+                cursor.execute(f'CREATE INDEX IF NOT EXISTS {name} ON {table} USING gin ({expression})')
+
+
+def drop_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+
+    with schema_editor.connection.cursor() as cursor:
+        for name, _, _ in TSVECTOR_INDEXES + TRIGRAM_INDEXES:
+            cursor.execute(f'DROP INDEX IF EXISTS {name}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finance', '0009_datageneration'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+    ]
@@ -0,0 +1,72 @@
+# Index-Schicht für die unmanaged Fakten-Tabellen.
+#
+# Die Tabellen werden extern befüllt (managed=False), deshalb gibt es keine
+# Meta.indexes - die Indizes werden hier per SQL angelegt. CONCURRENTLY
+# sperrt die Tabellen nicht, läuft aber nicht in einer Transaktion
+# (atomic = False). Nur PostgreSQL; fehlende Tabellen werden übersprungen.
+#
+# Abgedeckte Zugriffsmuster (siehe index_advisor):
+#   - Datumsbereiche (date__range statt date__year)
+#   - account_id + Datum (Kontostände bis Stichtag)
+#   - category_id / payee_id + Datum (Chart-APIs, Supermarkt, Top-Payees)
+#   - Haushalt: flag_id = 5 als partieller Index
+#   - Monat über alle Jahre: Expression-Index auf EXTRACT(MONTH ...)
+
+from django.db import migrations
+
+TRANSACTION_TABLES = ['fact_transactions_sigi', 'fact_transactions_robert']
+
+FACT_INDEXES = [
+    (name.format(t=table), table, definition)
+    for table in TRANSACTION_TABLES
+    for name, definition in [
+        ('{t}_date_idx', '(date)'),
+        ('{t}_account_date_idx', '(account_id, date)'),
+        ('{t}_category_date_idx', '(category_id, date)'),
+        ('{t}_payee_date_idx', '(payee_id, date)'),
+        ('{t}_month_idx', '((EXTRACT(MONTH FROM date)))'),
+    ]
+] + [
+    ('fact_transactions_sigi_household_date_idx', 'fact_transactions_sigi', '(date) WHERE flag_id = 5'),
+    ('fact_transactions_sigi_household_category_idx', 'fact_transactions_sigi', '(category_id, date) WHERE flag_id = 5'),
+    ('fact_assets_liabilities_overview_asset_date_idx', 'fact_assets_liabilities_overview', '(asset_name, date_zone)'),
+    ('fact_assets_liabilities_overview_category_date_idx', 'fact_assets_liabilities_overview', '(category, date_zone)'),
+    ('fact_betriebskosten_period_idx', 'fact_betriebskosten', '(jahr, monat, vs_posten)'),
+    # fact_urlaube (datum) existiert bereits seit 0005 (idx_fact_urlaube_datum)
+]
+
+
+def create_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+
+    with schema_editor.connection.cursor() as cursor:
+        for name, table, definition in FACT_INDEXES:
+            cursor.execute('SELECT to_regclass(%s) IS NOT NULL', [table])
+            if cursor.fetchone()[0]:
+                cursor.execute(f'CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {table} {definition}')
+        for table in {table for _, table, _ in FACT_INDEXES}:
+            cursor.execute('SELECT to_regclass(%s) IS NOT NULL', [table])
+            if cursor.fetchone()[0]:
+                cursor.execute(f'ANALYZE {table}')
+
+
+def drop_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+
+    with schema_editor.connection.cursor() as cursor:
+        for name, _, _ in FACT_INDEXES:
+            cursor.execute(f'DROP INDEX CONCURRENTLY IF EXISTS {name}')
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('finance', '0010_transaction_search_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_indexes, drop_indexes),
+    ]
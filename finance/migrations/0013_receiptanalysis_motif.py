@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-19 10:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finance', '0012_receiptanalysis'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='receiptanalysis',
+            name='aspect_ratio',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='receiptanalysis',
+            name='perceptual_hash',
+            field=models.CharField(blank=True, max_length=128),
+        ),
+    ]
@@ -0,0 +1,98 @@
+# Daten-Generationen auch bei Ladevorgängen außerhalb der App erhöhen.
+#
+# Die Fakten- und Dimensionstabellen werden extern befüllt (managed=False);
+# Django-Signale und die expliziten bump_generation()-Aufrufe sehen diese
+# Schreibzugriffe nicht. Ein Statement-Trigger (INSERT/UPDATE/DELETE/
+# TRUNCATE) erhöht deshalb direkt in der Datenbank die Generation des
+# Bereichs - einmal pro Statement, nicht pro Zeile.
+#
+# Nur PostgreSQL; fehlende Tabellen werden übersprungen. Wird eine Tabelle
+# extern neu angelegt (DROP/CREATE), die Migration erneut ausführen
+# (migrate finance 0013 && migrate finance).
+
+from django.db import migrations
+
+SCOPE_TABLES = {
+    'transactions': [
+        'fact_transactions_sigi',
+        'fact_transactions_robert',
+        'dim_account',
+        'dim_accounttypes',
+        'dim_payee',
+        'dim_category',
+        'dim_categorygroup',
+        'dim_flag',
+    ],
+}
+
+FUNCTION = 'bump_data_generation'
+
+
+def _generations_schema(cursor):
+    """Schema von data_generations (Trigger laufen mit dem search_path des Laders)"""
+    cursor.execute(
+        'SELECT n.nspname FROM pg_class c JOIN pg_namespace n ON n.oid = c.relnamespace '
+        "WHERE c.oid = to_regclass('data_generations')"
+    )
+    return cursor.fetchone()[0]
+
+
+def create_triggers(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor != 'postgresql':
+        return
+
+    quote = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        schema = quote(_generations_schema(cursor))
+        cursor.execute(f'''
+            CREATE OR REPLACE FUNCTION {schema}.{FUNCTION}() RETURNS trigger
+            LANGUAGE plpgsql AS $$
+            BEGIN
+                INSERT INTO {schema}.data_generations (scope, generation, updated_at)
+                VALUES (TG_ARGV[0], 1, now())
+                ON CONFLICT (scope) DO UPDATE
+                SET generation = {schema}.data_generations.generation + 1, updated_at = now();
+                RETURN NULL;
+            END
+            $$
+        ''')
+        for scope, tables in SCOPE_TABLES.items():
+            for table in tables:
+                cursor.execute('SELECT to_regclass(%s) IS NOT NULL', [table])
+                if not cursor.fetchone()[0]:
+                    continue
+                trigger = quote(f'{table}_bump_generation')
+                cursor.execute(f'DROP TRIGGER IF EXISTS {trigger} ON {quote(table)}')
+                cursor.execute(
+                    f'CREATE TRIGGER {trigger} '
+                    f'AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON {quote(table)} '
+                    f"FOR EACH STATEMENT EXECUTE FUNCTION {schema}.{FUNCTION}('{scope}')"
+                )
+
+
+def drop_triggers(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor != 'postgresql':
+        return
+
+    quote = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        for tables in SCOPE_TABLES.values():
+            for table in tables:
+                cursor.execute('SELECT to_regclass(%s) IS NOT NULL', [table])
+                if cursor.fetchone()[0]:
+                    cursor.execute(f"DROP TRIGGER IF EXISTS {quote(f'{table}_bump_generation')} ON {quote(table)}")
+        schema = quote(_generations_schema(cursor))
+        cursor.execute(f'DROP FUNCTION IF EXISTS {schema}.{FUNCTION}()')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finance', '0013_receiptanalysis_motif'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_triggers, drop_triggers),
+    ]
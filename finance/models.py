@@ -498,8 +498,15 @@ class ScheduledTransaction(models.Model):
             self.save()
             return None
 
-        # Erstelle Transaktion
-        transaction = self.create_transaction()
+        # Idempotenz-Schlüssel: pro Schedule und Datum genau eine Buchung
+        _, created = ScheduledTransactionOccurrence.objects.get_or_create(
+            schedule=self,
+            occurrence_date=self.next_execution_date,
+            defaults={'target_table': self.target_table},
+        )
+
+        # Erstelle Transaktion (nur wenn dieses Datum noch nicht gebucht wurde)
+        transaction = self.create_transaction() if created else None
 
         # Update next_execution_date
         self.next_execution_date = self.calculate_next_execution_date()
@@ -521,6 +528,91 @@ class ScheduledTransaction(models.Model):
         return self.is_active and self.next_execution_date < date.today()
 
 
+class ScheduledTransactionOccurrence(models.Model):
+    """
+    Idempotenz-Schlüssel für ausgeführte Scheduled Transactions
+    (Schedule + Ausführungsdatum) - verhindert Doppelbuchungen bei
+    überlappenden Cron-Läufen
+    """
+    schedule = models.ForeignKey(
+        ScheduledTransaction,
+        on_delete=models.CASCADE,
+        related_name='occurrences'
+    )
+    occurrence_date = models.DateField()
+    target_table = models.CharField(
+        max_length=10,
+        choices=ScheduledTransaction.TABLE_CHOICES
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'scheduled_transaction_occurrences'
+        ordering = ['-occurrence_date']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['schedule', 'occurrence_date'],
+                name='unique_schedule_occurrence'
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.schedule_id} @ {self.occurrence_date}"
+
+
+class DataGeneration(models.Model):
+    """
+    Versionszähler pro Datenbereich - wird bei jeder Schreiboperation
+    erhöht und dient als Cache-Schlüssel für abgeleitete Auswertungen
+    """
+    scope = models.CharField(max_length=50, unique=True)
+    generation = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'data_generations'
+
+    def __str__(self):
+        return f"{self.scope}: {self.generation}"
+
+
+class ReceiptAnalysis(models.Model):
+    """
+    Hintergrund-Job der KI-Rechnungsanalyse (siehe finance/receipt_jobs.py).
+    Abgeschlossene Jobs dienen zugleich als Ergebnis-Cache: gleiche Datei
+    (content_hash) oder gleiches Motiv (perceptual_hash + aspect_ratio) wird
+    nicht erneut analysiert.
+    """
+    STATUS_PENDING = 'pending'
+    STATUS_RUNNING = 'running'
+    STATUS_DONE = 'done'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Wartend'),
+        (STATUS_RUNNING, 'Läuft'),
+        (STATUS_DONE, 'Fertig'),
+        (STATUS_FAILED, 'Fehlgeschlagen'),
+    ]
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='receipt_analyses')
+    content_hash = models.CharField(max_length=64, db_index=True)
+    perceptual_hash = models.CharField(max_length=128, blank=True)
+    aspect_ratio = models.FloatField(null=True, blank=True)  # Breite/Höhe nach EXIF-Drehung
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    result = models.JSONField(null=True, blank=True)
+    error = models.TextField(blank=True)
+    cached = models.BooleanField(default=False)  # Ergebnis aus früherer Analyse übernommen
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'receipt_analyses'
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"{self.user_id} {self.content_hash[:12]} ({self.status})"
+
+
 class RegisteredDevice(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='devices')
     device_name = models.CharField(max_length=100, default='Neues Gerät')
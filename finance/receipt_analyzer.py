@@ -1,40 +1,209 @@
 # finance/receipt_analyzer.py
 """
 KI-basierte Rechnungsanalyse mit OpenAI Vision API
+
+Pipeline (Ablauf als Hintergrund-Job siehe finance/receipt_jobs.py):
+1. prepare_image(): EXIF-Drehung anwenden, auf die Auflösung verkleinern,
+   die das Modell ohnehin verwendet (max. 2048px, kurze Kante 768px), und
+   als JPEG neu komprimieren - statt bis zu 10MB Original.
+2. perceptual_hash(): dHash des Motivs in beiden Richtungen; zusammen mit
+   dem Seitenverhältnis (is_same_motif) wird dieselbe Rechnung (auch neu
+   komprimiert) nicht erneut analysiert.
+3. ReceiptAnalyzer.analyze_receipt(): Modellaufruf + JSON-Auswertung.
+4. CategoryIndex: vorberechneter Index für den Kategorie-Abgleich.
+
+Der OpenAI-Client ist austauschbar (settings.RECEIPT_OPENAI_CLIENT =
+Dotted Path einer Factory), z.B. für Tests ohne Netzwerk.
 """
 import base64
+import hashlib
+import io
 import json
+import os
 from datetime import datetime
 from decimal import Decimal
-import os
-from openai import OpenAI
 
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.module_loading import import_string
 
-class ReceiptAnalyzer:
-    """Analysiert Rechnungsbilder und extrahiert Transaktionsdaten"""
+from config.lazy import lazy_module
 
-    def __init__(self):
-        self.client = OpenAI(api_key=os.environ.get('OPENAI_API_KEY'))
+# Pillow erst bei der ersten Analyse laden
+Image = lazy_module('PIL.Image')
+ImageOps = lazy_module('PIL.ImageOps')
 
-    def analyze_receipt(self, image_path_or_bytes):
-        """
-        Analysiert ein Rechnungsbild und gibt strukturierte Daten zurück
+# Vision-Modell skaliert auf 2048x2048 und dann die kurze Kante auf 768px -
+# mehr Auflösung kostet nur Upload und Tokens
+MAX_LONG_EDGE = 2048
+MAX_SHORT_EDGE = 768
+JPEG_QUALITY = 85
 
-        Args:
-            image_path_or_bytes: Dateipfad oder Bytes des Bildes
+# Motiv-Vergleich: 16x16-dHash je Richtung, max. abweichende Bits (von 256)
+# pro Richtung und relative Abweichung des Seitenverhältnisses
+HASH_SIZE = 16
+HASH_MAX_DISTANCE = 6
+ASPECT_TOLERANCE = 0.02
+
+CATEGORY_INDEX_CACHE_KEY = 'receipts:category_index'
+CATEGORY_INDEX_TIMEOUT = 10 * 60
+
+# Keyword-Gruppen für den Kategorie-Abgleich
+CATEGORY_KEYWORDS = {
+    'lebensmittel': ['lebensmittel', 'groceries', 'supermarkt', 'food'],
+    'restaurant': ['restaurant', 'essen', 'dining', 'café', 'bar'],
+    'transport': ['transport', 'taxi', 'uber', 'öffi', 'öffentlich'],
+    'kleidung': ['kleidung', 'fashion', 'clothing', 'mode'],
+    'gesundheit': ['gesundheit', 'apotheke', 'arzt', 'health', 'medical'],
+    'elektronik': ['elektronik', 'tech', 'computer', 'handy'],
+    'haushalt': ['haushalt', 'möbel', 'einrichtung', 'household'],
+}
+
+
+def content_hash(data):
+    """SHA-256 der hochgeladenen Bytes (exakt gleiche Datei)"""
+    return hashlib.sha256(data).hexdigest()
+
+
+def perceptual_hash(image):
+    """
+    Doppelter dHash (2x256 Bit, hex): Helligkeitsverlauf eines
+    16x16-Graustufenbilds horizontal (Spalten) und vertikal (Zeilen)
+    """
+    gray = image.convert('L')
+    size = HASH_SIZE
+    wide = list(gray.resize((size + 1, size), Image.LANCZOS).getdata())
+    tall = list(gray.resize((size, size + 1), Image.LANCZOS).getdata())
+    horizontal = vertical = 0
+    for row in range(size):
+        for col in range(size):
+            horizontal = (horizontal << 1) | (wide[row * (size + 1) + col] > wide[row * (size + 1) + col + 1])
+            vertical = (vertical << 1) | (tall[row * size + col] > tall[(row + 1) * size + col])
+    digits = size * size // 4
+    return f'{horizontal:0{digits}x}{vertical:0{digits}x}'
+
+
+def hash_distances(first, second):
+    """Hamming-Distanz (horizontal, vertikal) zweier perceptual_hash-Werte"""
+    half = len(first) // 2
+    return tuple(
+        bin(int(first[part], 16) ^ int(second[part], 16)).count('1')
+        for part in (slice(None, half), slice(half, None))
+    )
+
+
+def is_same_motif(first_hash, first_aspect, second_hash, second_aspect):
+    """
+    Gleiches Motiv nur, wenn beide Hashes fast identisch sind und das
+    Seitenverhältnis übereinstimmt - ähnliche Rechnungen desselben Händlers
+    unterscheiden sich sonst oft nur in wenigen Bits.
+    """
+    if not first_hash or len(first_hash) != len(second_hash or ''):
+        return False
+    if not first_aspect or not second_aspect:
+        return False
+    if abs(first_aspect - second_aspect) > ASPECT_TOLERANCE * first_aspect:
+        return False
+    return max(hash_distances(first_hash, second_hash)) <= HASH_MAX_DISTANCE
+
+
+def _to_rgb(image):
+    """Transparenz auf weißem Hintergrund, damit JPEG möglich ist"""
+    if image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info):
+        rgba = image.convert('RGBA')
+        background = Image.new('RGB', rgba.size, (255, 255, 255))
+        background.paste(rgba, mask=rgba.getchannel('A'))
+        return background
+    return image.convert('RGB')
+
+
+def prepare_image(data):
+    """
+    Bild für das Modell aufbereiten.
+    Rückgabe: (jpeg_bytes, perceptual_hash, Seitenverhältnis Breite/Höhe)
+    """
+    with Image.open(io.BytesIO(data)) as original:
+        image = _to_rgb(ImageOps.exif_transpose(original))
+
+    width, height = image.size
+    scale = min(1.0, MAX_LONG_EDGE / max(width, height), MAX_SHORT_EDGE / min(width, height))
+    if scale < 1.0:
+        image = image.resize((max(1, round(width * scale)), max(1, round(height * scale))), Image.LANCZOS)
+
+    buffer = io.BytesIO()
+    image.save(buffer, 'JPEG', quality=JPEG_QUALITY, optimize=True)
+    return buffer.getvalue(), perceptual_hash(image), width / height
+
+
+def get_client():
+    """OpenAI-Client (oder Ersatz laut settings.RECEIPT_OPENAI_CLIENT)"""
+    factory = getattr(settings, 'RECEIPT_OPENAI_CLIENT', None)
+    if factory:
+        return import_string(factory)()
+
+    from openai import OpenAI
+    return OpenAI(api_key=os.environ.get('OPENAI_API_KEY'))
+
+
+class CategoryIndex:
+    """
+    Vorberechneter Index für den Abgleich KI-Vorschlag → DimCategory.
+    Hält nur einfache Dicts (picklebar für den Cache).
+    """
+
+    def __init__(self, categories):
+        self.entries = []
+        for category in categories:
+            name = category.category or ''
+            lower = name.lower()
+            group = category.categorygroup
+            self.entries.append({
+                'id': category.id,
+                'name': name,
+                'lower': lower,
+                'groups': frozenset(
+                    key for key, keywords in CATEGORY_KEYWORDS.items()
+                    if any(keyword in lower for keyword in keywords)
+                ),
+                'categorygroup_id': group.id if group else None,
+                'categorygroup_name': group.category_group if group else None,
+            })
+
+    def match(self, suggestion):
+        """Erste Kategorie mit direkter Übereinstimmung oder gemeinsamer Keyword-Gruppe"""
+        if not suggestion:
+            return None
+
+        suggestion = suggestion.lower()
+        groups = {
+            key for key, keywords in CATEGORY_KEYWORDS.items()
+            if any(keyword in suggestion for keyword in keywords)
+        }
+        for entry in self.entries:
+            if suggestion in entry['lower'] or entry['lower'] in suggestion:
+                return entry
+            if groups & entry['groups']:
+                return entry
+        return None
+
+
+def category_index():
+    """CategoryIndex aus dem Cache (baut ihn bei Bedarf aus DimCategory)"""
+    index = cache.get(CATEGORY_INDEX_CACHE_KEY)
+    if index is None:
+        from .models import DimCategory
+        index = CategoryIndex(DimCategory.objects.select_related('categorygroup').order_by('id'))
+        cache.set(CATEGORY_INDEX_CACHE_KEY, index, CATEGORY_INDEX_TIMEOUT)
+    return index
 
-        Returns:
-            dict mit: date, payee, amount, category_suggestion, memo
-        """
-        # Bild zu Base64 konvertieren
-        if isinstance(image_path_or_bytes, bytes):
-            base64_image = base64.b64encode(image_path_or_bytes).decode('utf-8')
-        else:
-            with open(image_path_or_bytes, 'rb') as f:
-                base64_image = base64.b64encode(f.read()).decode('utf-8')
 
-        # Prompt für GPT-4 Vision
-        prompt = """
+class ReceiptAnalyzer:
+    """Analysiert Rechnungsbilder und extrahiert Transaktionsdaten"""
+
+    MODEL = "gpt-4o"  # oder "gpt-4-vision-preview"
+
+    # Prompt für GPT-4 Vision
+    PROMPT = """
         Analysiere diese Rechnung und extrahiere folgende Informationen im JSON-Format:
 
         {
@@ -53,60 +222,92 @@ class ReceiptAnalyzer:
         - Sei präzise und zuverlässig
         """
 
+    def __init__(self, client=None):
+        self._client = client
+
+    @property
+    def client(self):
+        if self._client is None:
+            self._client = get_client()
+        return self._client
+
+    def analyze_receipt(self, image_path_or_bytes):
+        """
+        Analysiert ein Rechnungsbild und gibt strukturierte Daten zurück
+
+        Args:
+            image_path_or_bytes: Dateipfad oder Bytes des (aufbereiteten) Bildes
+
+        Returns:
+            dict mit: date, payee, amount, category_suggestion, memo
+        """
         try:
-            response = self.client.chat.completions.create(
-                model="gpt-4o",  # oder "gpt-4-vision-preview"
-                messages=[
-                    {
-                        "role": "user",
-                        "content": [
-                            {"type": "text", "text": prompt},
-                            {
-                                "type": "image_url",
-                                "image_url": {
-                                    "url": f"data:image/jpeg;base64,{base64_image}"
-                                }
+            response = self.client.chat.completions.create(**self._request(image_path_or_bytes))
+            return self._parse_response(response)
+        except Exception as e:
+            return self._error(e)
+
+    def _request(self, image_path_or_bytes):
+        """Parameter für chat.completions.create"""
+        # Bild zu Base64 konvertieren
+        if isinstance(image_path_or_bytes, bytes):
+            base64_image = base64.b64encode(image_path_or_bytes).decode('utf-8')
+        else:
+            with open(image_path_or_bytes, 'rb') as f:
+                base64_image = base64.b64encode(f.read()).decode('utf-8')
+
+        return {
+            'model': self.MODEL,
+            'messages': [
+                {
+                    "role": "user",
+                    "content": [
+                        {"type": "text", "text": self.PROMPT},
+                        {
+                            "type": "image_url",
+                            "image_url": {
+                                "url": f"data:image/jpeg;base64,{base64_image}"
                             }
-                        ]
-                    }
-                ],
-                max_tokens=500,
-                temperature=0.1  # Niedrig für konsistente Ergebnisse
-            )
-
-            # Extrahiere JSON aus Response
-            content = response.choices[0].message.content
-
-            # Parse JSON (manchmal ist es in Markdown-Code-Block)
-            if "```json" in content:
-                json_str = content.split("```json")[1].split("```")[0].strip()
-            elif "```" in content:
-                json_str = content.split("```")[1].split("```")[0].strip()
-            else:
-                json_str = content.strip()
-
-            data = json.loads(json_str)
-
-            # Validierung und Aufbereitung
-            result = {
-                'success': True,
-                'date': self._parse_date(data.get('date')),
-                'payee': data.get('payee', '').strip(),
-                'amount': self._parse_amount(data.get('amount')),
-                'category_suggestion': data.get('category', ''),
-                'memo': data.get('memo', '').strip(),
-                'currency': data.get('currency', 'EUR'),
-                'raw_response': data  # Für Debugging
-            }
-
-            return result
+                        }
+                    ]
+                }
+            ],
+            'max_tokens': 500,
+            'temperature': 0.1,  # Niedrig für konsistente Ergebnisse
+        }
 
-        except Exception as e:
-            return {
-                'success': False,
-                'error': str(e),
-                'message': 'Fehler bei der Analyse des Bildes'
-            }
+    def _parse_response(self, response):
+        """Extrahiert und validiert das JSON aus der Modellantwort"""
+        content = response.choices[0].message.content
+
+        # Parse JSON (manchmal ist es in Markdown-Code-Block)
+        if "```json" in content:
+            json_str = content.split("```json")[1].split("```")[0].strip()
+        elif "```" in content:
+            json_str = content.split("```")[1].split("```")[0].strip()
+        else:
+            json_str = content.strip()
+
+        data = json.loads(json_str)
+
+        # Validierung und Aufbereitung
+        return {
+            'success': True,
+            'date': self._parse_date(data.get('date')),
+            'payee': (data.get('payee') or '').strip(),
+            'amount': self._parse_amount(data.get('amount')),
+            'category_suggestion': data.get('category', ''),
+            'memo': (data.get('memo') or '').strip(),
+            'currency': data.get('currency', 'EUR'),
+            'raw_response': data  # Für Debugging
+        }
+
+    def _error(self, e):
+        return {
+            'success': False,
+            'error': str(e),
+            'message': 'Fehler bei der Analyse des Bildes'
+        }
 
     def _parse_date(self, date_str):
         """Parst und validiert Datum"""
@@ -127,45 +328,3 @@ class ReceiptAnalyzer:
             return Decimal(str(amount)).quantize(Decimal('0.01'))
         except:
             return Decimal('0.00')
-
-    def suggest_category(self, category_name, all_categories):
-        """
-        Matched den KI-Vorschlag mit vorhandenen Kategorien
-
-        Args:
-            category_name: KI-Vorschlag
-            all_categories: Liste aller verfügbaren Kategorien
-
-        Returns:
-            DimCategory-Objekt oder None
-        """
-        if not category_name:
-            return None
-
-        category_lower = category_name.lower()
-
-        # Einfaches Keyword-Matching
-        category_keywords = {
-            'lebensmittel': ['lebensmittel', 'groceries', 'supermarkt', 'food'],
-            'restaurant': ['restaurant', 'essen', 'dining', 'café', 'bar'],
-            'transport': ['transport', 'taxi', 'uber', 'öffi', 'öffentlich'],
-            'kleidung': ['kleidung', 'fashion', 'clothing', 'mode'],
-            'gesundheit': ['gesundheit', 'apotheke', 'arzt', 'health', 'medical'],
-            'elektronik': ['elektronik', 'tech', 'computer', 'handy'],
-            'haushalt': ['haushalt', 'möbel', 'einrichtung', 'household'],
-        }
-
-        for category in all_categories:
-            cat_name_lower = category.category.lower()
-
-            # Direkte Übereinstimmung
-            if category_lower in cat_name_lower or cat_name_lower in category_lower:
-                return category
-
-            # Keyword-Matching
-            for keywords in category_keywords.values():
-                if any(keyword in category_lower for keyword in keywords):
-                    if any(keyword in cat_name_lower for keyword in keywords):
-                        return category
-
-        return None
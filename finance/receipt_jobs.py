@@ -0,0 +1,177 @@
+# finance/receipt_jobs.py
+"""
+Rechnungsanalyse als Hintergrund-Job.
+
+Der Upload-Request legt nur einen ReceiptAnalysis-Eintrag an und gibt
+dessen ID zurück; aufbereitet und analysiert wird in einem Thread-Pool
+des Worker-Prozesses. Die Seite fragt den Status per
+api/analyze-receipt/<id>/ ab.
+
+Abgeschlossene Jobs sind zugleich der Ergebnis-Cache:
+- gleiche Datei (SHA-256) → Ergebnis sofort, ohne Job
+- gleiches Motiv (beide dHashes fast gleich und gleiches Seitenverhältnis,
+  siehe is_same_motif) → Ergebnis ohne Modellaufruf
+
+Mit settings.RECEIPT_JOBS_EAGER = True laufen Jobs direkt im Request (Tests).
+"""
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.utils import timezone
+
+from .models import ReceiptAnalysis
+from .receipt_analyzer import ReceiptAnalyzer, category_index, content_hash, is_same_motif, prepare_image
+
+logger = logging.getLogger(__name__)
+
+# Anzahl letzter Analysen, die auf gleiches Motiv verglichen werden
+MOTIF_CANDIDATES = 200
+
+# Jobs, die länger hängen (z.B. Worker-Neustart), gelten als fehlgeschlagen
+JOB_TIMEOUT = timedelta(minutes=5)
+
+_executor = None
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=getattr(settings, 'RECEIPT_JOB_WORKERS', 2),
+            thread_name_prefix='receipt-analysis',
+        )
+    return _executor
+
+
+def find_cached(user_id, content_hash):
+    """Letzte erfolgreiche Analyse derselben Datei"""
+    return ReceiptAnalysis.objects.filter(
+        user_id=user_id, status=ReceiptAnalysis.STATUS_DONE, content_hash=content_hash,
+    ).order_by('-finished_at').first()
+
+
+def find_same_motif(user_id, perceptual_hash, aspect_ratio):
+    """Letzte erfolgreiche Analyse desselben Motivs (Hamming-Distanz in Python)"""
+    candidates = ReceiptAnalysis.objects.filter(
+        user_id=user_id,
+        status=ReceiptAnalysis.STATUS_DONE,
+        aspect_ratio__isnull=False,
+    ).exclude(perceptual_hash='').order_by('-finished_at').only(
+        'perceptual_hash', 'aspect_ratio', 'result',
+    )[:MOTIF_CANDIDATES]
+    for candidate in candidates:
+        if is_same_motif(perceptual_hash, aspect_ratio, candidate.perceptual_hash, candidate.aspect_ratio):
+            return candidate
+    return None
+
+
+def start_analysis(user, image_bytes):
+    """
+    Job anlegen und einreihen. Bekannte Dateien werden sofort als
+    abgeschlossener (cached) Job zurückgegeben.
+    """
+    digest = content_hash(image_bytes)
+    previous = find_cached(user.pk, digest)
+    if previous is not None:
+        return ReceiptAnalysis.objects.create(
+            user=user,
+            content_hash=digest,
+            perceptual_hash=previous.perceptual_hash,
+            aspect_ratio=previous.aspect_ratio,
+            status=ReceiptAnalysis.STATUS_DONE,
+            result=previous.result,
+            cached=True,
+            finished_at=timezone.now(),
+        )
+
+    job = ReceiptAnalysis.objects.create(user=user, content_hash=digest)
+    if getattr(settings, 'RECEIPT_JOBS_EAGER', False):
+        run_job(job.pk, image_bytes)
+        job.refresh_from_db()
+    else:
+        _get_executor().submit(_run_in_thread, job.pk, image_bytes)
+    return job
+
+
+def _run_in_thread(job_id, image_bytes):
+    close_old_connections()
+    try:
+        run_job(job_id, image_bytes)
+    except Exception:
+        logger.exception(f'Rechnungsanalyse {job_id} abgebrochen')
+    finally:
+        close_old_connections()
+
+
+def run_job(job_id, image_bytes, analyzer=None):
+    """Bild aufbereiten, Cache prüfen, analysieren, Kategorie zuordnen"""
+    job = ReceiptAnalysis.objects.get(pk=job_id)
+    job.status = ReceiptAnalysis.STATUS_RUNNING
+    job.save(update_fields=['status'])
+
+    try:
+        prepared, job.perceptual_hash, job.aspect_ratio = prepare_image(image_bytes)
+
+        previous = find_same_motif(job.user_id, job.perceptual_hash, job.aspect_ratio)
+        if previous is not None:
+            job.result = previous.result
+            job.cached = True
+        else:
+            analysis = (analyzer or ReceiptAnalyzer()).analyze_receipt(prepared)
+            if not analysis['success']:
+                raise ValueError(analysis['error'])
+            job.result = serialize_result(analysis)
+        job.status = ReceiptAnalysis.STATUS_DONE
+    except Exception as e:
+        logger.warning(f'Rechnungsanalyse {job_id} fehlgeschlagen: {e}')
+        job.status = ReceiptAnalysis.STATUS_FAILED
+        job.error = str(e)
+
+    job.finished_at = timezone.now()
+    job.save(update_fields=['perceptual_hash', 'aspect_ratio', 'result', 'cached', 'status', 'error', 'finished_at'])
+    return job
+
+
+def serialize_result(analysis):
+    """Analyse-Ergebnis + Kategorie-Vorschlag als JSON-fähiges Dict"""
+    category = category_index().match(analysis['category_suggestion'])
+    return {
+        'date': analysis['date'].strftime('%Y-%m-%d'),
+        'payee': analysis['payee'],
+        'amount': str(analysis['amount']),
+        'memo': analysis['memo'],
+        'category_id': category['id'] if category else None,
+        'category_name': category['name'] if category else None,
+        'categorygroup_id': category['categorygroup_id'] if category else None,
+        'categorygroup_name': category['categorygroup_name'] if category else None,
+        'category_suggestion_text': analysis['category_suggestion'],
+        'currency': analysis.get('currency', 'EUR'),
+    }
+
+
+def job_status(job_id, user_id):
+    """Antwort für die Status-Abfrage (None = unbekannter Job)"""
+    job = ReceiptAnalysis.objects.filter(pk=job_id, user_id=user_id).first()
+    if job is None:
+        return None
+
+    if job.status in (ReceiptAnalysis.STATUS_PENDING, ReceiptAnalysis.STATUS_RUNNING) \
+            and timezone.now() - job.created_at > JOB_TIMEOUT:
+        job.status = ReceiptAnalysis.STATUS_FAILED
+        job.error = 'Zeitüberschreitung bei der Analyse'
+        job.finished_at = timezone.now()
+        job.save(update_fields=['status', 'error', 'finished_at'])
+
+    return job_payload(job)
+
+
+def job_payload(job):
+    payload = {'job_id': job.pk, 'status': job.status}
+    if job.status == ReceiptAnalysis.STATUS_DONE:
+        payload.update({'success': True, 'cached': job.cached, 'data': job.result})
+    elif job.status == ReceiptAnalysis.STATUS_FAILED:
+        payload.update({'success': False, 'error': job.error or 'Fehler bei der Analyse des Bildes'})
+    return payload
@@ -0,0 +1,183 @@
+# finance/scheduler.py
+"""
+Batch-Ausführung für Scheduled Transactions.
+
+Holt alle fälligen Schedules mit Zeilensperre (SKIP LOCKED), erzeugt alle
+verpassten Termine bis heute im Speicher und schreibt sie mit einem
+bulk_create pro Zieltabelle. Der Idempotenz-Schlüssel (Schedule + Datum)
+macht wiederholte oder parallele Läufe zu No-Ops.
+"""
+import logging
+from datetime import date
+
+from django.db import transaction
+from django.utils import timezone
+
+from .data_generation import bump_generation
+from .models import (
+    DimAccount,
+    DimPayee,
+    FactTransactionsRobert,
+    FactTransactionsSigi,
+    ScheduledTransaction,
+    ScheduledTransactionOccurrence,
+)
+from .signals import (
+    COUNTERPART_PAYEE_MAPPING,
+    REVERSE_TRANSFER_MAPPING,
+    TRANSFER_MAPPING,
+    build_transfer_counterpart,
+)
+
+logger = logging.getLogger(__name__)
+
+TARGET_MODELS = {
+    'sigi': FactTransactionsSigi,
+    'robert': FactTransactionsRobert,
+}
+
+
+class ScheduledTransactionEngine:
+    """Führt alle fälligen Scheduled Transactions inkl. Nachholterminen aus"""
+
+    def __init__(self, today=None):
+        self.today = today or date.today()
+
+    def pending_dates(self, scheduled):
+        """
+        Alle Termine ab next_execution_date bis heute (bzw. Enddatum).
+        Gibt (termine, nächstes_datum) zurück.
+        """
+        dates = []
+        current = scheduled.next_execution_date
+
+        while current <= self.today:
+            if scheduled.end_date and current > scheduled.end_date:
+                break
+            dates.append(current)
+            current = scheduled.calculate_next_execution_date(current)
+
+        return dates, current
+
+    def run(self, dry_run=False):
+        """
+        Verarbeitet alle fälligen Schedules in einer Transaktion.
+
+        Rückgabe: Liste von Dicts pro Schedule mit
+        'scheduled', 'dates' (neu gebucht), 'skipped' (bereits gebucht)
+        und 'deactivated'.
+        """
+        with transaction.atomic():
+            due = list(
+                ScheduledTransaction.objects
+                .select_for_update(skip_locked=True, of=('self',))
+                .select_related('payee', 'account')
+                .filter(is_active=True, next_execution_date__lte=self.today)
+            )
+
+            if not due:
+                return []
+
+            # Bereits gebuchte Termine in einer Query laden
+            booked = set(
+                ScheduledTransactionOccurrence.objects.filter(
+                    schedule__in=due,
+                    occurrence_date__lte=self.today,
+                ).values_list('schedule_id', 'occurrence_date')
+            )
+
+            results = []
+            rows = {table: [] for table in TARGET_MODELS}
+            occurrences = []
+            now = timezone.now()
+
+            for scheduled in due:
+                dates, next_date = self.pending_dates(scheduled)
+                new_dates = [d for d in dates if (scheduled.id, d) not in booked]
+
+                for occurrence_date in new_dates:
+                    rows[scheduled.target_table].append(
+                        self._build_transaction(scheduled, occurrence_date)
+                    )
+                    occurrences.append(ScheduledTransactionOccurrence(
+                        schedule=scheduled,
+                        occurrence_date=occurrence_date,
+                        target_table=scheduled.target_table,
+                    ))
+
+                deactivated = bool(scheduled.end_date and next_date > scheduled.end_date)
+                scheduled.next_execution_date = next_date
+                scheduled.is_active = not deactivated
+                scheduled.updated_at = now
+
+                results.append({
+                    'scheduled': scheduled,
+                    'dates': new_dates,
+                    'skipped': len(dates) - len(new_dates),
+                    'deactivated': deactivated,
+                })
+
+            if dry_run:
+                return results
+
+            counterparts = self._build_counterparts(rows)
+
+            for table, model in TARGET_MODELS.items():
+                batch = rows[table] + counterparts[table]
+                if batch:
+                    model.objects.bulk_create(batch)
+
+            # Unique-Constraint als letzte Absicherung gegen Doppelbuchung
+            ScheduledTransactionOccurrence.objects.bulk_create(occurrences)
+            ScheduledTransaction.objects.bulk_update(
+                due, ['next_execution_date', 'is_active', 'updated_at']
+            )
+
+            # bulk_create löst keine Signale aus
+            if occurrences:
+                bump_generation()
+
+        logger.info(
+            f'Scheduler: {len(occurrences)} Buchungen für {len(due)} Schedules erstellt'
+        )
+        return results
+
+    @staticmethod
+    def _build_transaction(scheduled, occurrence_date):
+        """Ungespeicherte Fact-Zeile für einen Termin"""
+        model = TARGET_MODELS[scheduled.target_table]
+        return model(
+            account=scheduled.account,
+            flag_id=scheduled.flag_id,
+            date=occurrence_date,
+            payee=scheduled.payee,
+            category_id=scheduled.category_id,
+            memo=scheduled.memo,
+            outflow=scheduled.outflow,
+            inflow=scheduled.inflow,
+        )
+
+    @staticmethod
+    def _build_counterparts(rows):
+        """Transfer-Gegenbuchungen für den Batch (ersetzt das post_save Signal)"""
+        counterparts = {table: [] for table in TARGET_MODELS}
+
+        if not any(tx.payee.is_transfer for batch in rows.values() for tx in batch):
+            return counterparts
+
+        account_ids = dict(
+            DimAccount.objects.filter(account__in=TRANSFER_MAPPING.values())
+            .values_list('account', 'id')
+        )
+        payee_names = set(COUNTERPART_PAYEE_MAPPING.values()) | set(REVERSE_TRANSFER_MAPPING.values())
+        payee_ids = dict(
+            DimPayee.objects.filter(payee__in=payee_names).values_list('payee', 'id')
+        )
+
+        for table, batch in rows.items():
+            for tx in batch:
+                counterpart = build_transfer_counterpart(tx, account_ids, payee_ids)
+                if counterpart:
+                    counterparts[table].append(counterpart)
+
+        return counterparts
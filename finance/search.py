@@ -0,0 +1,247 @@
+# finance/search.py
+"""
+Suche über Payee und Memo der Transaktionslisten.
+
+Query-Syntax:
+    billa spar          alle Begriffe müssen vorkommen (Payee oder Memo)
+    "bio milch"         Phrase
+    urlaub*             Präfix
+    betrag:12.50        Betrag (Outflow oder Inflow), auch >100, <20, 10..20
+    datum:2024-03       Datum (Jahr, Monat oder Tag), auch >2024-01-01, 2024-01..2024-03
+
+PostgreSQL: Memo über tsvector (deutsche Stemming-Konfiguration) und
+Trigramm-Indizes auf UPPER(memo)/UPPER(payee) für Teilstring-Treffer,
+Ranking über ts_rank. Andere Backends: LIKE-Fallback ohne Ranking.
+Die Indizes legt Migration 0010 an.
+"""
+import calendar
+import re
+import shlex
+from dataclasses import dataclass, field
+from datetime import date
+from decimal import Decimal, InvalidOperation
+
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+from django.db import connection
+from django.db.models import Case, FloatField, Q, Value, When
+
+from .models import DimPayee
+
+SEARCH_CONFIG = 'german'
+
+AMOUNT_KEYS = ('betrag', 'amount')
+DATE_KEYS = ('datum', 'date')
+
+_COMPARISON = re.compile(r'^(>=|<=|>|<)?(.+)$')
+
+
+@dataclass
+class ParsedQuery:
+    terms: list = field(default_factory=list)
+    prefixes: list = field(default_factory=list)
+    phrases: list = field(default_factory=list)
+    amount: Q = None
+    dates: Q = None
+
+    @property
+    def has_text(self):
+        return bool(self.terms or self.prefixes or self.phrases)
+
+
+def _parse_amount(value):
+    try:
+        return Decimal(value.replace(',', '.'))
+    except InvalidOperation:
+        return None
+
+
+def _parse_date_bounds(value):
+    """'2024' / '2024-03' / '2024-03-15' → (erster Tag, letzter Tag)"""
+    parts = value.split('-')
+    try:
+        year = int(parts[0])
+        if len(parts) == 1:
+            return date(year, 1, 1), date(year, 12, 31)
+        month = int(parts[1])
+        if len(parts) == 2:
+            return date(year, month, 1), date(year, month, calendar.monthrange(year, month)[1])
+        day = date(year, month, int(parts[2]))
+        return day, day
+    except (ValueError, IndexError):
+        return None
+
+
+def _amount_filter(value):
+    if '..' in value:
+        low, high = (_parse_amount(v) for v in value.split('..', 1))
+        if low is None or high is None:
+            return None
+        return Q(outflow__range=(low, high)) | Q(inflow__range=(low, high))
+
+    op, raw = _COMPARISON.match(value).groups()
+    amount = _parse_amount(raw)
+    if amount is None:
+        return None
+    lookup = {'>': 'gt', '>=': 'gte', '<': 'lt', '<=': 'lte', None: 'exact'}[op]
+    return Q(**{f'outflow__{lookup}': amount}) | Q(**{f'inflow__{lookup}': amount})
+
+
+def _date_filter(value):
+    if '..' in value:
+        low, high = (_parse_date_bounds(v) for v in value.split('..', 1))
+        if low is None or high is None:
+            return None
+        return Q(date__gte=low[0], date__lte=high[1])
+
+    op, raw = _COMPARISON.match(value).groups()
+    bounds = _parse_date_bounds(raw)
+    if bounds is None:
+        return None
+    first, last = bounds
+    if op == '>':
+        return Q(date__gt=last)
+    if op == '>=':
+        return Q(date__gte=first)
+    if op == '<':
+        return Q(date__lt=first)
+    if op == '<=':
+        return Q(date__lte=last)
+    return Q(date__gte=first, date__lte=last)
+
+
+def parse_query(text):
+    """Zerlegt die Sucheingabe in Begriffe, Präfixe, Phrasen und Filter"""
+    parsed = ParsedQuery()
+    try:
+        tokens = shlex.split(text)
+    except ValueError:
+        # Unbalancierte Anführungszeichen: als normale Wörter behandeln
+        tokens = text.replace('"', ' ').split()
+
+    for token in tokens:
+        key, sep, value = token.partition(':')
+        key = key.lower()
+        if sep and value and key in AMOUNT_KEYS:
+            condition = _amount_filter(value)
+            if condition is not None:
+                parsed.amount = condition if parsed.amount is None else parsed.amount & condition
+                continue
+        if sep and value and key in DATE_KEYS:
+            condition = _date_filter(value)
+            if condition is not None:
+                parsed.dates = condition if parsed.dates is None else parsed.dates & condition
+                continue
+
+        if ' ' in token:
+            parsed.phrases.append(token)
+        elif token.endswith('*') and len(token) > 1:
+            parsed.prefixes.append(token.rstrip('*'))
+        elif token:
+            parsed.terms.append(token)
+
+    return parsed
+
+
+def _prefix_tsquery(prefix):
+    """Präfix → to_tsquery-Syntax ('urlaub:*'), Sonderzeichen entfernt"""
+    cleaned = re.sub(r'[^\w]', '', prefix)
+    return f'{cleaned}:*' if cleaned else None
+
+
+class TransactionSearch:
+    """Filter und Ranking für einen Suchtext auf Fact-Querysets"""
+
+    def __init__(self, text):
+        self.text = (text or '').strip()
+        self.query = parse_query(self.text)
+        self.postgres = connection.vendor == 'postgresql'
+
+    def __bool__(self):
+        return bool(self.text)
+
+    def _payee_ids(self, condition):
+        """
+        Payee-IDs vorab auflösen (dim_payee ist klein): payee_id = ANY(...)
+        lässt sich im Gegensatz zur Subquery per BitmapOr mit den
+        Memo-Indizes kombinieren.
+        """
+        return list(DimPayee.objects.filter(condition).values_list('id', flat=True))
+
+    def _term_condition(self, term):
+        memo = Q(memo__icontains=term)
+        if self.postgres:
+            memo |= Q(memo_vector=SearchQuery(term, config=SEARCH_CONFIG))
+        return Q(payee_id__in=self._payee_ids(Q(payee__icontains=term))) | memo
+
+    def _prefix_condition(self, prefix):
+        payees = Q(payee_id__in=self._payee_ids(Q(payee__istartswith=prefix) | Q(payee__icontains=f' {prefix}')))
+        tsquery = _prefix_tsquery(prefix) if self.postgres else None
+        if tsquery:
+            return payees | Q(memo_vector=SearchQuery(tsquery, config=SEARCH_CONFIG, search_type='raw'))
+        return payees | Q(memo__icontains=prefix)
+
+    def _phrase_condition(self, phrase):
+        memo = Q(memo__icontains=phrase)
+        if self.postgres:
+            memo |= Q(memo_vector=SearchQuery(phrase, config=SEARCH_CONFIG, search_type='phrase'))
+        return Q(payee_id__in=self._payee_ids(Q(payee__icontains=phrase))) | memo
+
+    def filter(self, queryset):
+        """Eingeschränktes Queryset (alle Bedingungen UND-verknüpft)"""
+        if not self:
+            return queryset
+
+        query = self.query
+        if self.postgres and query.has_text:
+            queryset = queryset.alias(memo_vector=SearchVector('memo', config=SEARCH_CONFIG))
+
+        for term in query.terms:
+            queryset = queryset.filter(self._term_condition(term))
+        for prefix in query.prefixes:
+            queryset = queryset.filter(self._prefix_condition(prefix))
+        for phrase in query.phrases:
+            queryset = queryset.filter(self._phrase_condition(phrase))
+        if query.amount is not None:
+            queryset = queryset.filter(query.amount)
+        if query.dates is not None:
+            queryset = queryset.filter(query.dates)
+        return queryset
+
+    def rank(self, queryset):
+        """
+        Nach Relevanz sortieren (Payee-Treffer vor Memo-Treffern, dann
+        ts_rank, dann Datum). Ohne Suchbegriffe bleibt die Sortierung.
+        """
+        query = self.query
+        if not query.has_text:
+            return queryset
+
+        words = query.terms + query.prefixes + query.phrases
+        payee_match = Q()
+        for word in words:
+            payee_match |= Q(payee__payee__icontains=word)
+
+        score = Case(When(payee_match, then=Value(1.0)), default=Value(0.0), output_field=FloatField())
+        if self.postgres:
+            # Vereinigung aller Begriffe; der Filter hat die UND-Verknüpfung bereits erledigt
+            tsquery = None
+            for term in query.terms:
+                part = SearchQuery(term, config=SEARCH_CONFIG)
+                tsquery = part if tsquery is None else tsquery | part
+            for phrase in query.phrases:
+                part = SearchQuery(phrase, config=SEARCH_CONFIG, search_type='phrase')
+                tsquery = part if tsquery is None else tsquery | part
+            for prefix in query.prefixes:
+                raw = _prefix_tsquery(prefix)
+                if raw:
+                    part = SearchQuery(raw, config=SEARCH_CONFIG, search_type='raw')
+                    tsquery = part if tsquery is None else tsquery | part
+            if tsquery is not None:
+                score = score + SearchRank(SearchVector('memo', config=SEARCH_CONFIG), tsquery)
+
+        return queryset.annotate(search_rank=score).order_by('-search_rank', '-date', '-id')
+
+
+def search_transactions(queryset, text):
+    """Kurzform: Queryset nach Suchtext filtern"""
+    return TransactionSearch(text).filter(queryset)
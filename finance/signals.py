@@ -1,6 +1,6 @@
 # finance/signals.py - DEBUG VERSION
 
-from django.db.models.signals import post_save
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
 from django.db import transaction
 from decimal import Decimal
@@ -12,6 +12,7 @@ from .models import (
     DimPayee,
     DimAccount
 )
+from .data_generation import TRANSACTIONS, bump_generation
 
 logger = logging.getLogger(__name__)
 
@@ -44,6 +45,69 @@ COUNTERPART_PAYEE_MAPPING = {
     'Transfer : Girokonto': None,
 }
 
+# Spezialfall 'Transfer : Girokonto': Quell-Account → Gegenbuchungs-Payee
+REVERSE_TRANSFER_MAPPING = {
+    'MasterCard': 'Transfer : MasterCard',
+    'Pensionsvorsorge Uniqa': 'Transfer : Pensionsvorsorge Uniqa',
+    'OnlineSparen': 'Transfer : OnlineSparen',
+    'ETF': 'Transfer : ETF',
+    'Krypto & Aktien': 'Transfer : Krypto & Aktien',
+    'Top4 Fonds & Green Invest': 'Transfer : Top4 Fonds & Green Invest',
+    'Bausparer': 'Transfer : Bausparer',
+    'Goldanlage': 'Transfer : Goldanlage',
+    'Bargeld': 'Transfer : Bargeld',
+    'Gutscheine': 'Transfer : Gutscheine',
+}
+
+
+def build_transfer_counterpart(instance, account_ids, payee_ids):
+    """
+    Baut die Gegenbuchung zu einer (noch ungespeicherten) Transaktion für
+    Bulk-Inserts - bulk_create löst kein post_save aus.
+
+    account_ids / payee_ids: Lookup-Dicts Name → ID (einmal pro Batch laden).
+    Gibt eine ungespeicherte Instanz derselben Tabelle zurück oder None.
+    """
+    if instance.memo and '[Auto-Gegenbuchung]' in instance.memo:
+        return None
+    if not instance.payee or not instance.payee.is_transfer:
+        return None
+
+    payee_name = instance.payee.payee
+    target_account_id = account_ids.get(TRANSFER_MAPPING.get(payee_name))
+
+    counterpart_payee_name = COUNTERPART_PAYEE_MAPPING.get(payee_name)
+    if counterpart_payee_name is None and payee_name == 'Transfer : Girokonto':
+        counterpart_payee_name = REVERSE_TRANSFER_MAPPING.get(instance.account.account)
+    counterpart_payee_id = payee_ids.get(counterpart_payee_name)
+
+    if not target_account_id or not counterpart_payee_id:
+        logger.warning(f"Keine Gegenbuchung möglich für Transfer-Payee '{payee_name}'")
+        return None
+
+    counterpart_outflow = Decimal('0')
+    counterpart_inflow = Decimal('0')
+    if instance.outflow and instance.outflow > 0:
+        counterpart_inflow = instance.outflow
+    elif instance.inflow and instance.inflow > 0:
+        counterpart_outflow = instance.inflow
+
+    if instance.memo:
+        counterpart_memo = f'{instance.memo} [Auto-Gegenbuchung]'
+    else:
+        counterpart_memo = f'Gegenbuchung zu Transfer von {instance.account.account} [Auto-Gegenbuchung]'
+
+    return type(instance)(
+        account_id=target_account_id,
+        flag_id=instance.flag_id,
+        date=instance.date,
+        payee_id=counterpart_payee_id,
+        category_id=None,
+        memo=counterpart_memo,
+        outflow=counterpart_outflow,
+        inflow=counterpart_inflow,
+    )
+
 
 def should_create_counterpart(instance):
     """Prüft ob Gegenbuchung erstellt werden soll"""
@@ -140,20 +204,7 @@ def get_counterpart_payee_id(source_payee_name, source_account):
     if counterpart_payee_name is None and source_payee_name == "Transfer : Girokonto":
         print("⚠️  Spezialfall: 'Transfer : Girokonto' → Reverse Lookup")
 
-        reverse_mapping = {
-            'MasterCard': 'Transfer : MasterCard',
-            'Pensionsvorsorge Uniqa': 'Transfer : Pensionsvorsorge Uniqa',
-            'OnlineSparen': 'Transfer : OnlineSparen',
-            'ETF': 'Transfer : ETF',
-            'Krypto & Aktien': 'Transfer : Krypto & Aktien',
-            'Top4 Fonds & Green Invest': 'Transfer : Top4 Fonds & Green Invest',
-            'Bausparer': 'Transfer : Bausparer',
-            'Goldanlage': 'Transfer : Goldanlage',
-            'Bargeld': 'Transfer : Bargeld',
-            'Gutscheine': 'Transfer : Gutscheine',
-        }
-
-        counterpart_payee_name = reverse_mapping.get(source_account.account)
+        counterpart_payee_name = REVERSE_TRANSFER_MAPPING.get(source_account.account)
         print(f"🔄 Reverse Mapping: '{source_account.account}' → '{counterpart_payee_name}'")
 
         if not counterpart_payee_name:
@@ -350,4 +401,10 @@ def handle_robert_transfer(sender, instance, created, **kwargs):
         print(f"\n❌❌❌ FEHLER: {str(e)}")
         logger.error(f"✗ Fehler beim Erstellen der Gegenbuchung: {str(e)}")
         import traceback
-        traceback.print_exc()
\ No newline at end of file
+        traceback.print_exc()
+
+@receiver([post_save, post_delete], sender=FactTransactionsSigi)
+@receiver([post_save, post_delete], sender=FactTransactionsRobert)
+def bump_transactions_generation(sender, **kwargs):
+    """Invalidiert abgeleitete Auswertungen (Charts, KPIs) nach Änderungen"""
+    bump_generation(TRANSACTIONS)
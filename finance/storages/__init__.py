@@ -0,0 +1,35 @@
+# finance/storages/__init__.py
+"""
+Storage-Backends (R2) und Hilfen dafür.
+
+Die S3-Backends importieren boto3/botocore (~200ms) - beim Worker-Start
+werden sie deshalb nur als LazyStorage referenziert und erst beim ersten
+Zugriff instanziiert.
+"""
+import os
+
+from django.utils.functional import LazyObject
+from django.utils.module_loading import import_string
+
+R2_CREDENTIAL_VARS = ('R2_ACCESS_KEY_ID', 'R2_SECRET_ACCESS_KEY', 'R2_ENDPOINT_URL')
+
+
+def r2_configured():
+    """Sind die R2-Credentials gesetzt? (ohne boto3 zu laden)"""
+    return all(os.environ.get(name) for name in R2_CREDENTIAL_VARS)
+
+
+class LazyStorage(LazyObject):
+    """Storage erst beim ersten Attributzugriff instanziieren"""
+    storage_class = None  # Dotted Path
+
+    def _setup(self):
+        self._wrapped = import_string(self.storage_class)()
+
+    def __bool__(self):
+        # FileField prüft "storage or default_storage" - ohne Instanziierung
+        return True
+
+
+class LazyR2Storage(LazyStorage):
+    storage_class = 'finance.storages.r2_storage.CloudflareR2Storage'
@@ -0,0 +1,94 @@
+# finance/storages/presigned.py
+"""
+Direkte Browser-Uploads nach R2 per presigned PUT-URL.
+
+Ablauf:
+1. issue_upload(): Server reserviert einen Key, signiert eine PUT-URL und
+   ein Token (Key + Zweck + User, django.core.signing).
+2. Browser lädt die Datei direkt nach R2 hoch (fetch PUT mit den
+   zurückgegebenen Headern) - der App-Worker ist dabei nicht beteiligt.
+3. confirm_upload(): Token prüfen, Objekt muss existieren und darf nicht
+   größer als MAX_UPLOAD_SIZE sein (die PUT-URL selbst begrenzt die Größe
+   nicht - zu große Objekte werden gelöscht); danach registriert die
+   aufrufende View das Objekt und verarbeitet es. Die View muss dabei einen
+   zweiten Confirm mit demselben Token abweisen.
+
+Nur für S3-kompatible Storages (PlantPhotoStorage, CloudflareR2Storage).
+Ohne R2 (lokale Entwicklung) liefert supports_presigned() False und die
+Templates verwenden den klassischen Formular-Upload.
+"""
+from django.core import signing
+
+UPLOAD_URL_EXPIRES = 10 * 60     # Gültigkeit der PUT-URL in Sekunden
+CONFIRM_MAX_AGE = 60 * 60        # Token nach spätestens 1h bestätigen
+MAX_UPLOAD_SIZE = 10 * 1024 * 1024  # wie FILE_UPLOAD_MAX_MEMORY_SIZE
+
+_SALT = 'finance.storages.presigned'
+# PUT-Parameter, die der Browser als Header mitsenden muss (Teil der Signatur)
+_HEADER_PARAMS = {'ContentType': 'Content-Type', 'CacheControl': 'Cache-Control'}
+
+
+class UploadTokenError(ValueError):
+    """Ungültiges, abgelaufenes oder fremdes Upload-Token"""
+
+
+def supports_presigned(storage):
+    try:
+        from storages.backends.s3 import S3Storage
+    except ImportError:
+        return False
+    return isinstance(storage, S3Storage)
+
+
+def issue_upload(storage, name, content_type, purpose, user_id, extra=None):
+    """
+    Freien Key reservieren und presigned PUT-URL + Bestätigungs-Token liefern.
+
+    Rückgabe: {'url', 'name', 'headers', 'token'}
+    """
+    from storages.utils import clean_name
+
+    name = storage.get_available_name(name)
+    params = {
+        'Bucket': storage.bucket_name,
+        'Key': storage._normalize_name(clean_name(name)),
+        'ContentType': content_type,
+    }
+    object_params = storage.get_object_parameters(name)
+    if object_params.get('CacheControl'):
+        params['CacheControl'] = object_params['CacheControl']
+
+    url = storage.bucket.meta.client.generate_presigned_url(
+        'put_object', Params=params, ExpiresIn=UPLOAD_URL_EXPIRES, HttpMethod='PUT',
+    )
+    token = signing.dumps(
+        {'name': name, 'purpose': purpose, 'user': user_id, **(extra or {})},
+        salt=_SALT,
+    )
+    return {
+        'url': url,
+        'name': name,
+        'headers': {header: params[param] for param, header in _HEADER_PARAMS.items() if param in params},
+        'token': token,
+    }
+
+
+def confirm_upload(storage, token, purpose, user_id, max_size=MAX_UPLOAD_SIZE):
+    """
+    Token prüfen und sicherstellen, dass das Objekt hochgeladen wurde und
+    höchstens max_size Bytes groß ist (sonst wird es gelöscht).
+    Rückgabe: Token-Inhalt (name + extra)
+    """
+    try:
+        payload = signing.loads(token, salt=_SALT, max_age=CONFIRM_MAX_AGE)
+    except signing.BadSignature as e:
+        raise UploadTokenError('Upload-Token ungültig oder abgelaufen') from e
+
+    if payload.get('purpose') != purpose or payload.get('user') != user_id:
+        raise UploadTokenError('Upload-Token gehört nicht zu diesem Upload')
+    if not storage.exists(payload['name']):
+        raise UploadTokenError('Datei wurde nicht hochgeladen')
+    if storage.size(payload['name']) > max_size:
+        storage.delete(payload['name'])
+        raise UploadTokenError(f'Datei ist zu groß (max. {max_size // (1024 * 1024)} MB)')
+    return payload
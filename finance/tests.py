@@ -1 +1,633 @@
-# Placeholder for future finance app tests.
+import asyncio
+import json
+import tempfile
+import warnings
+from datetime import date
+from types import SimpleNamespace
+from decimal import Decimal
+from io import BytesIO, StringIO
+
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+from django.core.handlers.asgi import ASGIHandler
+from django.core.signals import request_finished, request_started
+from django.db import close_old_connections, connection
+from django.core.management import call_command
+from django.http import HttpResponse
+from django.test import AsyncRequestFactory, RequestFactory, TestCase, override_settings
+from PIL import Image, ImageDraw
+
+from config.metrics import RequestMetricsMiddleware, fingerprint_sql, metrics_store
+from config.views import ops_metrics_json
+from finance.analytics import MonthlySeries, cached_series
+from finance.data_generation import bump_generation
+from finance.exporters import iter_export_rows, stream_csv
+from finance.importers import TransactionBulkLoader, iter_csv_rows
+from finance.kpis import compute_kpis
+from finance.management.commands.importtime import profile_imports
+from finance.models import (
+    DimAccount,
+    DimAccountTypes,
+    DimCategory,
+    DimCategoryGroup,
+    DimPayee,
+    FactTransactionsRobert,
+    FactTransactionsSigi,
+    RegisteredDevice,
+    ScheduledTransaction,
+    ScheduledTransactionOccurrence,
+)
+from finance.receipt_analyzer import CATEGORY_INDEX_CACHE_KEY, prepare_image
+from finance.receipt_jobs import job_status, start_analysis
+from finance.scheduler import ScheduledTransactionEngine
+from finance.search import TransactionSearch, parse_query
+from finance.storages.presigned import UploadTokenError, confirm_upload, issue_upload
+from finance.utils import calculate_account_balance, period_filter
+from finance.views import api_asset_category_details, api_dashboard_kpis, api_spending_trend, api_top_payees
+
+
+class ScheduledTransactionEngineTests(TestCase):
+    def setUp(self):
+        self.account = DimAccount.objects.create(account='Girokonto')
+        self.payee = DimPayee.objects.create(payee='Miete')
+        self.category = DimCategory.objects.create(category='Wohnen')
+
+    def _schedule(self, **kwargs):
+        data = {
+            'target_table': 'sigi',
+            'account': self.account,
+            'payee': self.payee,
+            'category': self.category,
+            'outflow': Decimal('800.00'),
+            'frequency': 'monthly',
+            'start_date': date(2025, 1, 1),
+            'next_execution_date': date(2025, 1, 1),
+        }
+        data.update(kwargs)
+        return ScheduledTransaction.objects.create(**data)
+
+    def test_holt_alle_verpassten_termine_nach(self):
+        scheduled = self._schedule()
+
+        results = ScheduledTransactionEngine(today=date(2025, 3, 15)).run()
+
+        self.assertEqual(results[0]['dates'], [date(2025, 1, 1), date(2025, 2, 1), date(2025, 3, 1)])
+        self.assertEqual(FactTransactionsSigi.objects.filter(payee=self.payee).count(), 3)
+        scheduled.refresh_from_db()
+        self.assertEqual(scheduled.next_execution_date, date(2025, 4, 1))
+
+    def test_erneuter_lauf_bucht_nicht_doppelt(self):
+        scheduled = self._schedule()
+        engine = ScheduledTransactionEngine(today=date(2025, 2, 10))
+        engine.run()
+
+        # Zurücksetzen simuliert einen überlappenden Cron-Lauf
+        ScheduledTransaction.objects.filter(pk=scheduled.pk).update(next_execution_date=date(2025, 1, 1))
+        results = engine.run()
+
+        self.assertEqual(results[0]['dates'], [])
+        self.assertEqual(results[0]['skipped'], 2)
+        self.assertEqual(FactTransactionsSigi.objects.filter(payee=self.payee).count(), 2)
+        self.assertEqual(ScheduledTransactionOccurrence.objects.filter(schedule=scheduled).count(), 2)
+
+    def test_enddatum_deaktiviert_schedule(self):
+        scheduled = self._schedule(end_date=date(2025, 2, 15))
+
+        results = ScheduledTransactionEngine(today=date(2025, 6, 1)).run()
+
+        self.assertEqual(len(results[0]['dates']), 2)
+        self.assertTrue(results[0]['deactivated'])
+        scheduled.refresh_from_db()
+        self.assertFalse(scheduled.is_active)
+
+    def test_dry_run_schreibt_nichts(self):
+        self._schedule()
+
+        results = ScheduledTransactionEngine(today=date(2025, 3, 15)).run(dry_run=True)
+
+        self.assertEqual(len(results[0]['dates']), 3)
+        self.assertFalse(FactTransactionsSigi.objects.filter(payee=self.payee).exists())
+        self.assertFalse(ScheduledTransactionOccurrence.objects.exists())
+
+
+class RequestMetricsTests(TestCase):
+    def setUp(self):
+        metrics_store.clear()
+
+    def test_fingerprint_normalisiert_literale(self):
+        self.assertEqual(
+            fingerprint_sql("SELECT * FROM dim_payee WHERE id = 12 AND payee = 'Billa'"),
+            fingerprint_sql("SELECT * FROM dim_payee WHERE id = 7 AND payee = 'Spar'"),
+        )
+
+    @override_settings(METRICS_SAMPLE_RATE=1.0)
+    def test_middleware_erfasst_view_und_queries(self):
+        self.client.get('/manifest.json', secure=True)
+
+        entry = metrics_store.recent(limit=1)[0]
+        self.assertEqual(entry['view'], 'manifest')
+        self.assertEqual(entry['status'], 200)
+        self.assertIn('queries', entry)
+
+    @override_settings(METRICS_SAMPLE_RATE=1.0)
+    async def test_async_middleware_erfasst_queries(self):
+        async def view(request):
+            await DimPayee.objects.acount()
+            return HttpResponse('ok')
+
+        middleware = RequestMetricsMiddleware(view)
+        response = await middleware(AsyncRequestFactory().get('/async/'))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(metrics_store.recent(limit=1)[0]['queries'], 1)
+
+    def test_json_endpoint_ignoriert_ungueltiges_limit(self):
+        request = RequestFactory().get('/ops/metrics.json', {'limit': 'abc'})
+        request.user = User.objects.create_user('admin', password='x', is_staff=True)
+
+        response = ops_metrics_json(request)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('recent', json.loads(response.content))
+
+
+class AsyncChartApiTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.sigi = User.objects.create_user('sigi', password='x')
+        cls.robert = User.objects.create_user('robert', password='x')
+
+    def _request(self, user):
+        request = AsyncRequestFactory().get('/api/spending-trend/')
+
+        async def auser():
+            return user
+
+        request.auser = auser
+        return request
+
+    async def test_spending_trend_async(self):
+        response = await api_spending_trend(self._request(self.sigi))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.content)['labels'], [])
+
+    async def test_robert_gesperrt(self):
+        response = await api_top_payees(self._request(self.robert))
+
+        self.assertEqual(response.status_code, 403)
+
+
+class SyntheticDataBenchmarkTests(TestCase):
+    def test_generator_und_benchmark_laufen(self):
+        call_command(
+            'generate_synthetic_data', years=1, per_month=10, payees=5, scheduled=2,
+            force=True, stdout=StringIO(),
+        )
+        self.assertTrue(FactTransactionsSigi.objects.filter(flag_id=5).exists())
+        self.assertTrue(FactTransactionsRobert.objects.exists())
+
+        out = StringIO()
+        call_command(
+            'benchmark_views', iterations=1, warmup=0,
+            only=['finance:dashboard', 'finance:api_asset_history'],
+            stdout=out, stderr=StringIO(),
+        )
+        report = json.loads(out.getvalue())
+        self.assertEqual([e['status'] for e in report['endpoints']], [200, 200])
+        self.assertGreater(report['endpoints'][0]['queries'], 0)
+
+
+class MonthlySeriesTests(TestCase):
+    def test_dichte_ausrichtung_und_trend(self):
+        points = [(date(2024, 1, 1), 100), (date(2024, 3, 1), 300), (date(2024, 3, 1), 50)]
+        series = MonthlySeries(points, date(2024, 1, 1), date(2024, 4, 1))
+
+        result = series.analyze(today=date(2024, 4, 15))
+
+        self.assertEqual(result['data'], [100.0, 0.0, 350.0, 0.0])
+        self.assertEqual(result['labels'][0], 'Jan 2024')
+        # Aktueller Monat fließt nicht in den Trend ein
+        self.assertIsNone(result['trend_data'][-1])
+        self.assertEqual(result['num_months'], 3)
+
+    def test_vorjahresvergleich_und_jahreswerte(self):
+        points = [(date(2023, 5, 1), 200), (date(2024, 5, 1), 300)]
+        series = MonthlySeries(points, date(2023, 1, 1), date(2024, 12, 1))
+
+        delta, pct = series.yoy()
+
+        self.assertEqual(delta[16], 100)
+        self.assertEqual(pct[16], 50)
+        self.assertEqual(series.by_year(2024)[4], 300)
+        self.assertEqual(series.by_year(2022), [0.0] * 12)
+
+    def test_cache_wird_bei_neuer_generation_verworfen(self):
+        calls = []
+
+        def loader():
+            calls.append(1)
+            return [(date(2024, 1, 1), 10)]
+
+        cached_series('test', loader, date(2024, 1, 1), date(2024, 2, 1))
+        cached_series('test', loader, date(2024, 1, 1), date(2024, 2, 1))
+        self.assertEqual(len(calls), 1)
+
+        bump_generation()
+        cached_series('test', loader, date(2024, 1, 1), date(2024, 2, 1))
+        self.assertEqual(len(calls), 2)
+
+
+class AssetBalanceSeriesTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('sigi', password='x')
+        cash = DimAccountTypes.objects.create(accounttypes='Cash')
+        self.giro = DimAccount.objects.create(account='Girokonto', accounttype=cash)
+        DimAccount.objects.create(account='Leer', accounttype=cash)
+        for day, inflow, outflow in [
+            (date(2023, 12, 20), '50.00', None),
+            (date(2024, 2, 3), '100.00', None),
+            (date(2024, 5, 10), None, '30.25'),
+            (date(2024, 8, 1), '10.00', None),
+        ]:
+            FactTransactionsSigi.objects.create(
+                account=self.giro, date=day,
+                inflow=Decimal(inflow) if inflow else None,
+                outflow=Decimal(outflow) if outflow else None,
+            )
+
+    def _get(self, **params):
+        request = RequestFactory().get('/api/asset-category-details/', params)
+        request.user = self.user
+        return json.loads(api_asset_category_details(request).content)
+
+    def test_fenster_und_quartale_aus_kumulierter_reihe(self):
+        data = self._get(**{'from': '2024-01', 'to': '2024-07', 'resolution': 'quarterly'})
+
+        cash = data['Cash']
+        self.assertEqual(cash['labels'], ['Q1 2024', 'Q2 2024', 'Q3 2024'])
+        self.assertEqual(cash['months'], ['2024-03', '2024-06', '2024-07'])
+        # Konto ohne Bewegungen wird ausgelassen
+        self.assertEqual([d['label'] for d in cash['datasets']], ['Girokonto'])
+        self.assertEqual(cash['datasets'][0]['data'], [150.0, 119.75, 119.75])
+        self.assertEqual(
+            float(calculate_account_balance(self.giro.id, date(2024, 6, 30))),
+            cash['datasets'][0]['data'][1],
+        )
+
+        # Zweiter Aufruf aus dem Cache: ETag-Generationen, Generation, Accounts
+        with self.assertNumQueries(3):
+            data = self._get(category='Cash', resolution='yearly')
+        self.assertEqual(list(data), ['Cash'])
+        self.assertEqual(data['Cash']['labels'][:2], ['2023', '2024'])
+        self.assertEqual(data['Cash']['datasets'][0]['data'][:2], [50.0, 129.75])
+
+
+class DashboardKpiTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('sigi', password='x')
+        account = DimAccount.objects.create(account='Girokonto')
+        billa = DimPayee.objects.create(payee='Billa')
+        arbeit = DimPayee.objects.create(payee='Arbeitgeber')
+        FactTransactionsSigi.objects.create(account=account, payee=arbeit, date=date(2025, 1, 31), inflow=Decimal('2000.00'))
+        FactTransactionsSigi.objects.create(account=account, payee=billa, date=date(2025, 3, 1), outflow=Decimal('40.00'))
+        FactTransactionsSigi.objects.create(account=account, payee=billa, date=date(2025, 3, 20), outflow=Decimal('10.50'))
+        FactTransactionsSigi.objects.create(account=account, payee=billa, date=date(2024, 12, 31), outflow=Decimal('99.00'))
+
+    def test_kennzahlen_in_drei_abfragen_und_gecacht(self):
+        with self.assertNumQueries(3):
+            kpis = compute_kpis(2025, today=date(2025, 3, 25))
+        self.assertEqual((kpis.total_inflow, kpis.total_outflow, kpis.transaction_count), (Decimal('2000.00'), Decimal('50.50'), 3))
+        self.assertEqual(kpis.last_month_outflow, Decimal('50.50'))
+        self.assertEqual(kpis.netto, Decimal('1949.50'))
+        self.assertEqual(kpis.recent_transactions[0]['payee_name'], 'Billa')
+
+        request = RequestFactory().get('/api/dashboard-kpis/', {'year': '2025'})
+        request.user = self.user
+        data = json.loads(api_dashboard_kpis(request).content)
+        self.assertEqual(data['top_payees'], [{'payee': 'Billa', 'total': 50.5, 'count': 2}])
+        self.assertEqual(data['recent_transactions'][0]['date'], '2025-03-20')
+
+        # Zweiter Aufruf: nur ETag-Generationen und Cache-Generation
+        with self.assertNumQueries(2):
+            api_dashboard_kpis(request)
+
+
+class ConditionalGetTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('sigi', password='x')
+
+    def _get(self, etag=None, **params):
+        headers = {'HTTP_IF_NONE_MATCH': etag} if etag else {}
+        request = RequestFactory().get('/api/dashboard-kpis/', params, **headers)
+        request.user = self.user
+        return api_dashboard_kpis(request)
+
+    def test_304_vor_der_aggregation_und_neues_etag_nach_schreiben(self):
+        response = self._get(year='2025')
+        etag = response['ETag']
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('no-cache', response['Cache-Control'])
+
+        # Nur die Generationen werden abgefragt
+        with self.assertNumQueries(1):
+            response = self._get(etag, year='2025')
+        self.assertEqual(response.status_code, 304)
+
+        self.assertNotEqual(self._get(year='2024')['ETag'], etag)
+        bump_generation()
+        self.assertEqual(self._get(etag, year='2025').status_code, 200)
+
+    def test_externer_ladevorgang_erhoeht_generation(self):
+        etag = self._get(year='2025')['ETag']
+
+        # Schreibzugriff ohne ORM (wie ein externer Loader) - Statement-Trigger
+        with connection.cursor() as cursor:
+            cursor.execute("DELETE FROM fact_transactions_sigi WHERE date < '1900-01-01'")
+
+        self.assertEqual(self._get(etag, year='2025').status_code, 200)
+
+    async def test_async_view_liefert_etag(self):
+        request = AsyncRequestFactory().get('/api/spending-trend/')
+
+        async def auser():
+            return self.user
+
+        request.auser = auser
+        response = await api_spending_trend(request)
+        self.assertTrue(response['ETag'].startswith('"'))
+
+
+class ImportBudgetTests(TestCase):
+    def test_urlconf_laedt_keine_schweren_module(self):
+        # Frischer Interpreter: django.setup() + config.urls
+        profile = profile_imports('config.urls')
+
+        self.assertIn('finance', profile.per_owner)
+        self.assertEqual(profile.heavy, {})
+
+    def test_urlconf_mit_r2_laedt_kein_boto3(self):
+        # Wie in Produktion: R2-Storages dürfen erst beim ersten Zugriff boto3 laden
+        profile = profile_imports('config.urls', env={
+            'USE_R2_STORAGE': 'True',
+            'R2_ACCESS_KEY_ID': 'key',
+            'R2_SECRET_ACCESS_KEY': 'secret',
+            'R2_ENDPOINT_URL': 'https://account.r2.cloudflarestorage.com',
+        })
+
+        self.assertEqual(profile.heavy, {})
+
+
+class TransactionExportTests(TestCase):
+    def test_csv_export_filtert_und_streamt(self):
+        account = DimAccount.objects.create(account='Girokonto')
+        billa = DimPayee.objects.create(payee='Billa')
+        spar = DimPayee.objects.create(payee='Spar')
+        FactTransactionsSigi.objects.create(account=account, payee=billa, date=date(2025, 1, 5), outflow=Decimal('12.50'))
+        FactTransactionsSigi.objects.create(account=account, payee=spar, date=date(2025, 1, 6), outflow=Decimal('8.00'))
+        FactTransactionsSigi.objects.create(account=account, payee=billa, date=date(2024, 12, 1), outflow=Decimal('3.00'))
+
+        chunks = list(stream_csv(iter_export_rows({'year': '2025', 'search': 'billa'}, chunk_size=1)))
+
+        self.assertEqual(len(chunks), 2)
+        self.assertTrue(chunks[0].startswith('\ufeffid;person;date'))
+        self.assertIn(';Sigi;2025-01-05;Girokonto;;Billa;', chunks[1])
+
+    def _asgi_get(self, path, query_string, cookies):
+        """Request direkt durch den ASGI-Handler (wie unter SERVER_MODE=asgi)"""
+        messages = []
+        scope = {
+            'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1',
+            'method': 'GET', 'scheme': 'https', 'path': path, 'query_string': query_string,
+            'headers': [(b'host', b'testserver'), (b'cookie', cookies.encode())],
+            'server': ('testserver', 443), 'client': ('127.0.0.1', 50000),
+        }
+        requests = [{'type': 'http.request', 'body': b'', 'more_body': False}]
+
+        async def receive():
+            if requests:
+                return requests.pop()
+            await asyncio.Event().wait()  # kein Disconnect
+
+        async def send(message):
+            messages.append(message)
+
+        # Wie der Test-Client: Verbindung der Test-Transaktion nicht schließen
+        request_started.disconnect(close_old_connections)
+        request_finished.disconnect(close_old_connections)
+        try:
+            async_to_sync(ASGIHandler())(scope, receive, send)
+        finally:
+            request_started.connect(close_old_connections)
+            request_finished.connect(close_old_connections)
+        return messages
+
+    def test_export_streamt_unter_asgi_ohne_puffern(self):
+        user = User.objects.create_user('sigi', password='x')
+        device = RegisteredDevice.objects.create(user=user, device_fingerprint='test')
+        account = DimAccount.objects.create(account='Girokonto')
+        billa = DimPayee.objects.create(payee='Billa')
+        FactTransactionsSigi.objects.create(account=account, payee=billa, date=date(2025, 1, 5), outflow=Decimal('12.50'))
+        self.client.force_login(user)
+        cookies = f"{settings.SESSION_COOKIE_NAME}={self.client.cookies[settings.SESSION_COOKIE_NAME].value}; device_id={device.device_token}"
+
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter('always')
+            messages = self._asgi_get('/transactions/export/', b'format=csv&year=2025', cookies)
+
+        self.assertEqual(messages[0]['status'], 200)
+        body = b''.join(message.get('body', b'') for message in messages[1:]).decode('utf-8')
+        self.assertIn(';Sigi;2025-01-05;Girokonto;;Billa;', body)
+        self.assertFalse([w for w in caught if 'synchronous iterators' in str(w.message)])
+
+
+class TransactionBulkImportTests(TestCase):
+    CSV = (
+        'Account;Flag;Date;Payee;Category Group;Category;Memo;Outflow;Inflow\n'
+        'Girokonto;;05.01.2025;Billa;;Lebensmittel;Einkauf;€12,50;€0,00\n'
+        'Girokonto;;05.01.2025;Billa;;Lebensmittel;Einkauf;€12,50;€0,00\n'
+        'Girokonto;;06.01.2025;Transfer : MasterCard;;;;€100,00;€0,00\n'
+        'Girokonto;;kein Datum;Spar;;;;€1,00;€0,00\n'
+    )
+
+    def setUp(self):
+        self.giro = DimAccount.objects.create(account='Girokonto')
+        self.mastercard = DimAccount.objects.create(account='MasterCard')
+        DimPayee.objects.create(payee='Transfer : Girokonto', payee_type='transfer')
+        DimCategory.objects.create(category='Lebensmittel')
+
+    def _load(self):
+        return TransactionBulkLoader().load(iter_csv_rows(BytesIO(self.CSV.encode('utf-8')), 'ynab'))
+
+    def test_import_mit_gegenbuchung_und_duplikaterkennung(self):
+        stats = self._load()
+
+        self.assertEqual(stats['imported'], 3)
+        self.assertEqual(stats['counterparts'], 1)
+        self.assertEqual(stats['new_payees'], 2)
+        self.assertEqual([line for line, _ in stats['errors']], [5])
+        self.assertEqual(FactTransactionsSigi.objects.filter(payee__payee='Billa').count(), 2)
+        self.assertTrue(FactTransactionsSigi.objects.filter(account=self.mastercard, inflow=Decimal('100.00')).exists())
+
+        # Erneuter Import derselben Datei bucht nichts doppelt
+        stats = self._load()
+        self.assertEqual(stats['imported'], 0)
+        self.assertEqual(stats['duplicates'], 3)
+        self.assertEqual(FactTransactionsSigi.objects.count(), 4)
+
+
+class TransactionSearchTests(TestCase):
+    def setUp(self):
+        account = DimAccount.objects.create(account='Girokonto')
+        billa = DimPayee.objects.create(payee='Billa')
+        hotel = DimPayee.objects.create(payee='Hotel Seeblick')
+        FactTransactionsSigi.objects.create(account=account, payee=billa, date=date(2024, 3, 2), memo='Bio Milch und Brot', outflow=Decimal('12.50'))
+        FactTransactionsSigi.objects.create(account=account, payee=hotel, date=date(2024, 7, 20), memo='Urlaubsreise Kärnten', outflow=Decimal('480.00'))
+        FactTransactionsSigi.objects.create(account=account, payee=hotel, date=date(2025, 7, 20), memo='Anzahlung', outflow=Decimal('100.00'))
+
+    def _search(self, text):
+        return list(TransactionSearch(text).filter(FactTransactionsSigi.objects.all()).values_list('memo', flat=True))
+
+    def test_syntax_wird_zerlegt(self):
+        parsed = parse_query('billa urlaub* "bio milch" betrag:>10 datum:2024-03')
+        self.assertEqual(parsed.terms, ['billa'])
+        self.assertEqual(parsed.prefixes, ['urlaub'])
+        self.assertEqual(parsed.phrases, ['bio milch'])
+        self.assertIsNotNone(parsed.amount)
+        self.assertIsNotNone(parsed.dates)
+
+    def test_payee_memo_praefix_phrase_betrag_datum(self):
+        self.assertEqual(self._search('billa'), ['Bio Milch und Brot'])
+        self.assertEqual(self._search('urlaub*'), ['Urlaubsreise Kärnten'])
+        self.assertEqual(self._search('"bio milch"'), ['Bio Milch und Brot'])
+        self.assertEqual(self._search('seeblick betrag:>200'), ['Urlaubsreise Kärnten'])
+        self.assertEqual(self._search('seeblick datum:2025'), ['Anzahlung'])
+
+
+class PeriodFilterTests(TestCase):
+    def test_jahr_und_monat_werden_zu_datumsbereichen(self):
+        self.assertEqual(period_filter('2024'), {'date__range': (date(2024, 1, 1), date(2024, 12, 31))})
+        self.assertEqual(period_filter(2024, 2), {'date__range': (date(2024, 2, 1), date(2024, 2, 29))})
+        self.assertEqual(period_filter('', '3'), {'date__month': 3})
+        self.assertEqual(period_filter(), {})
+
+
+class PresignedUploadTests(TestCase):
+    def setUp(self):
+        from storages.backends.s3 import S3Storage
+        # file_overwrite: kein HEAD-Request für get_available_name
+        self.storage = S3Storage(
+            access_key='key', secret_key='secret', bucket_name='plant-photos',
+            endpoint_url='https://account.r2.cloudflarestorage.com', region_name='auto',
+            signature_version='s3v4', location='plant_photos', file_overwrite=True,
+        )
+
+    def test_issue_upload_signs_put_for_normalized_key(self):
+        upload = issue_upload(self.storage, 'plants/2025/10/Basilikum_20251001.jpg', 'image/jpeg', 'plant_image', 7)
+
+        self.assertIn('/plant_photos/plants/2025/10/Basilikum_20251001.jpg?', upload['url'])
+        self.assertIn('X-Amz-Signature=', upload['url'])
+        self.assertEqual(upload['headers'], {'Content-Type': 'image/jpeg'})
+        self.assertEqual(upload['name'], 'plants/2025/10/Basilikum_20251001.jpg')
+
+    def test_confirm_rejects_foreign_or_tampered_tokens(self):
+        token = issue_upload(self.storage, 'uploads/a.pdf', 'application/pdf', 'billa_pdf', 7)['token']
+
+        with self.assertRaises(UploadTokenError):
+            confirm_upload(self.storage, token, 'billa_pdf', 8)
+        with self.assertRaises(UploadTokenError):
+            confirm_upload(self.storage, token, 'plant_image', 7)
+        with self.assertRaises(UploadTokenError):
+            confirm_upload(self.storage, token + 'x', 'billa_pdf', 7)
+
+    def test_confirm_deletes_oversized_upload(self):
+        token = issue_upload(self.storage, 'uploads/a.pdf', 'application/pdf', 'billa_pdf', 7)['token']
+        with tempfile.TemporaryDirectory() as root:
+            uploaded = FileSystemStorage(location=root)
+            uploaded.save('uploads/a.pdf', ContentFile(b'x' * 2048))
+
+            self.assertEqual(confirm_upload(uploaded, token, 'billa_pdf', 7, max_size=2048)['name'], 'uploads/a.pdf')
+            with self.assertRaisesMessage(UploadTokenError, 'zu groß'):
+                confirm_upload(uploaded, token, 'billa_pdf', 7, max_size=1024)
+            self.assertFalse(uploaded.exists('uploads/a.pdf'))
+
+
+class StubReceiptClient:
+    """Offline-Ersatz für den OpenAI-Client (settings.RECEIPT_OPENAI_CLIENT)"""
+    calls = []
+
+    def __init__(self):
+        self.chat = SimpleNamespace(completions=self)
+
+    def create(self, **kwargs):
+        StubReceiptClient.calls.append(kwargs)
+        content = '```json\n{"date": "2025-03-14", "payee": " Billa ", "amount": 23.5, ' \
+                  '"category": "Supermarkt", "memo": "Milch", "currency": "EUR"}\n```'
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+
+@override_settings(RECEIPT_JOBS_EAGER=True, RECEIPT_OPENAI_CLIENT='finance.tests.StubReceiptClient')
+class ReceiptPipelineTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('sigi', password='x')
+        group = DimCategoryGroup.objects.create(category_group='Alltag')
+        cls.category = DimCategory.objects.create(category='Lebensmittel', categorygroup=group)
+
+    def setUp(self):
+        StubReceiptClient.calls = []
+        cache.delete(CATEGORY_INDEX_CACHE_KEY)
+
+    def _receipt(self, size=(1200, 4000), fmt='PNG', box=(100, 200, 900, 1400)):
+        image = Image.new('RGB', size, 'white')
+        ImageDraw.Draw(image).rectangle(box, fill='black')
+        buffer = BytesIO()
+        image.save(buffer, fmt)
+        return buffer.getvalue()
+
+    def test_bild_wird_auf_modellaufloesung_verkleinert(self):
+        prepared, phash, aspect = prepare_image(self._receipt())
+
+        with Image.open(BytesIO(prepared)) as image:
+            self.assertEqual(image.format, 'JPEG')
+            self.assertEqual(image.size, (614, 2048))
+        self.assertEqual(len(phash), 128)
+        self.assertAlmostEqual(aspect, 0.3, places=2)
+
+    def test_analyse_mit_stub_und_kategorie_index(self):
+        job = start_analysis(self.user, self._receipt())
+
+        payload = job_status(job.pk, self.user.pk)
+        self.assertEqual(payload['status'], 'done')
+        self.assertEqual(payload['data']['payee'], 'Billa')
+        self.assertEqual(payload['data']['amount'], '23.50')
+        self.assertEqual(payload['data']['category_id'], self.category.id)
+        self.assertEqual(payload['data']['categorygroup_name'], 'Alltag')
+        self.assertIsNone(job_status(job.pk, self.user.pk + 1))
+
+    def test_gleiche_rechnung_wird_nicht_erneut_analysiert(self):
+        start_analysis(self.user, self._receipt())
+        same_file = start_analysis(self.user, self._receipt())
+        reencoded = start_analysis(self.user, self._receipt(fmt='JPEG'))
+
+        self.assertEqual(len(StubReceiptClient.calls), 1)
+        self.assertTrue(same_file.cached)
+        self.assertTrue(reencoded.cached)
+        self.assertEqual(reencoded.result['payee'], 'Billa')
+
+    def test_aehnliche_rechnung_wird_neu_analysiert(self):
+        start_analysis(self.user, self._receipt())
+        other_content = start_analysis(self.user, self._receipt(box=(100, 200, 900, 1600)))
+        other_format = start_analysis(self.user, self._receipt(size=(1200, 3600)))
+
+        self.assertEqual(len(StubReceiptClient.calls), 3)
+        self.assertFalse(other_content.cached)
+        self.assertFalse(other_format.cached)
+
@@ -15,6 +15,8 @@ urlpatterns = [
 
     path('transactions/', views.transactions_list, name='transactions'),
     path('transactions/household/', views.household_transactions, name='household_transactions'),
+    path('transactions/export/', views.export_transactions, name='export_transactions'),
+    path('transactions/import/', views.import_transactions, name='import_transactions'),
     path('transactions/add/', views.add_transaction, name='add_transaction'),
     path('transactions/edit/<int:pk>/', views.edit_transaction, name='edit_transaction'),
     path('transactions/delete/<int:pk>/', views.delete_transaction, name='delete_transaction'),
@@ -35,6 +37,7 @@ urlpatterns = [
     path('api/monthly-spending-drilldown/', views.api_monthly_spending_drilldown, name='api_monthly_spending_drilldown'),
     path('api/category-breakdown/', views.api_category_breakdown, name='api_category_breakdown'),
     path('api/top-payees/', views.api_top_payees, name='api_top_payees'),
+    path('api/dashboard-kpis/', views.api_dashboard_kpis, name='api_dashboard_kpis'),
     path('api/spending-trend/', views.api_spending_trend, name='api_spending_trend'),
 
     # API Endpoints für Formular
@@ -46,6 +49,7 @@ urlpatterns = [
     # Receipt Scanner
     path('receipt-upload/', views.analyze_receipt_page, name='receipt_upload'),
     path('api/analyze-receipt/', views.analyze_receipt_image, name='api_analyze_receipt'),
+    path('api/analyze-receipt/<int:job_id>/', views.analyze_receipt_status, name='api_analyze_receipt_status'),
 
     # Inline Transaction Creation
     path('api/transactions/create/', views.create_transaction_inline, name='create_transaction_inline'),
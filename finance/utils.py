@@ -2,6 +2,8 @@
 """
 Utility-Funktionen für das Finance-Modul
 """
+import calendar
+from datetime import date
 from decimal import Decimal
 
 # Icon-Mapping für verschiedene Account-Typen
@@ -168,4 +170,35 @@ def calculate_percentage_change(current, previous):
     if not previous or previous == 0:
         return None
 
-    return ((current - previous) / abs(previous)) * 100
\ No newline at end of file
+    return ((current - previous) / abs(previous)) * 100
+
+
+def year_range(year):
+    """
+    (1. Jänner, 31. Dezember) eines Jahres für date__range-Filter.
+
+    Bereichsfilter auf der nackten Spalte können die Datums-Indizes nutzen,
+    EXTRACT(...)-Ausdrücke nur die Expression-Indizes.
+    """
+    year = int(year)
+    return date(year, 1, 1), date(year, 12, 31)
+
+
+def month_range(year, month):
+    """(erster, letzter Tag) eines Monats für date__range-Filter"""
+    year, month = int(year), int(month)
+    return date(year, month, 1), date(year, month, calendar.monthrange(year, month)[1])
+
+
+def period_filter(year=None, month=None, field='date'):
+    """
+    Lookup-Dict für einen Jahr/Monat-Filter als Datumsbereich.
+    Nur Monat ohne Jahr (über alle Jahre) bleibt ein __month-Lookup.
+    """
+    if year and month:
+        return {f'{field}__range': month_range(year, month)}
+    if year:
+        return {f'{field}__range': year_range(year)}
+    if month:
+        return {f'{field}__month': int(month)}
+    return {}
@@ -2,7 +2,6 @@ from django.shortcuts import render, redirect
 from django.http import JsonResponse
 import json
 from django.contrib.auth import logout
-import numpy as np
 from django.db.models import Sum, Count, Q, Value, CharField, Min
 from django.db.models.functions import TruncMonth
 from datetime import datetime, timedelta, date
@@ -13,17 +12,39 @@ from .models import (
     DimAccount, DimCategory, DimPayee, DimCategoryGroup, DimFlag,
     ScheduledTransaction, RegisteredDevice, FactUrlaube, FactBetriebskosten
 )
-from .forms import TransactionForm
+from .forms import TransactionForm, TransactionImportForm
 from collections import defaultdict
 from decimal import Decimal
-from .utils import get_account_icon, calculate_account_balance, CATEGORY_CONFIG
+from .utils import get_account_icon, calculate_account_balance, CATEGORY_CONFIG, month_range, period_filter, year_range
 
-from django.http import HttpResponse, HttpResponseForbidden
+from django.http import HttpResponse, HttpResponseForbidden, StreamingHttpResponse
+from django.core.handlers.asgi import ASGIRequest
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_POST
 from django.conf import settings
 import logging
-from .receipt_analyzer import ReceiptAnalyzer
+from asgiref.sync import sync_to_async
+from .receipt_jobs import job_payload, job_status, start_analysis
+from .scheduler import ScheduledTransactionEngine
+from .exporters import (
+    EXPORT_FORMATS, STREAMERS, apply_transaction_filters, astream, iter_export_rows, parquet_available
+)
+from .importers import ImportRowError, TransactionBulkLoader, iter_csv_rows
+from .search import TransactionSearch
+from .kpis import dashboard_kpis
+from .data_generation import TRANSACTIONS
+from .analytics import (
+    MONTH_NAMES,
+    RESOLUTIONS,
+    MonthlySeries,
+    cached_balances,
+    cached_series,
+    default_window,
+    month_from_number,
+    month_number,
+    parse_month,
+)
+from config.conditional import conditional_json
 from django.urls import reverse
 from django.utils.http import url_has_allowed_host_and_scheme
 
@@ -73,6 +94,144 @@ def _parse_person_filter(request):
     return person, include_robert, include_sigi
 
 
+async def _deny_robert(request):
+    """
+    Async-Variante der robert-Sperre für die Chart-APIs.
+    request.user ist in async Views nicht nutzbar (Lazy-Load wäre sync DB-Zugriff).
+    """
+    user = await request.auser()
+    if user.username == 'robert':
+        return JsonResponse({'error': 'Keine Berechtigung'}, status=403)
+    return None
+
+
+def _analytics_window(request):
+    """Zeitraum aus ?start=YYYY-MM&end=YYYY-MM (Standard: Vorjahr bis aktueller Monat)"""
+    default_start, default_end = default_window()
+    start = parse_month(request.GET.get('start'), default_start)
+    end = parse_month(request.GET.get('end'), default_end)
+    return (start, end) if start <= end else (end, start)
+
+
+def _forecast_months(request):
+    """Anzahl Prognose-Monate aus ?forecast= (max. 24)"""
+    try:
+        return max(0, min(int(request.GET.get('forecast', 0)), 24))
+    except ValueError:
+        return 0
+
+
+def _comparison_year(request):
+    """Jahr für Jahresvergleiche aus ?year= (Standard: aktuelles Jahr)"""
+    try:
+        return int(request.GET.get('year', date.today().year))
+    except ValueError:
+        return date.today().year
+
+
+def _household_monthly_points(include_sigi, include_robert, start, end,
+                              outflow_only=False, group_by=None, **filters):
+    """
+    Netto-Ausgaben pro Monat für den Haushalt (Sigi mit Flag 5 + Robert).
+    Rückgabe: [(monat, netto), ...] bzw. {group_by-Wert: [...]} mit group_by.
+    """
+    from dateutil.relativedelta import relativedelta
+
+    querysets = []
+    if include_sigi:
+        querysets.append(FactTransactionsSigi.objects.filter(flag_id=5))
+    if include_robert:
+        querysets.append(FactTransactionsRobert.objects.all())
+
+    group_fields = ['month'] + ([group_by] if group_by else [])
+    points = defaultdict(list) if group_by else []
+
+    for queryset in querysets:
+        queryset = queryset.filter(
+            date__gte=start,
+            date__lt=end + relativedelta(months=1),
+            **filters
+        ).exclude(
+            payee__payee_type__in=['transfer', 'kursschwankung']
+        ).exclude(
+            category_id=1
+        )
+        if outflow_only:
+            queryset = queryset.filter(outflow__gt=0)
+
+        rows = queryset.annotate(
+            month=TruncMonth('date')
+        ).values(*group_fields).annotate(
+            inflow=Sum('inflow'),
+            outflow=Sum('outflow')
+        ).order_by()
+
+        for row in rows:
+            netto = float((row['outflow'] or 0) - (row['inflow'] or 0))
+            if group_by:
+                points[row[group_by]].append((row['month'], netto))
+            else:
+                points.append((row['month'], netto))
+
+    return points
+
+
+def _account_balance_rows():
+    """
+    Netto-Bewegungen pro (Account, Monat) aus einer GROUP BY-Abfrage plus
+    Startmonat (früheste Transaktion Sigi/Robert) - Loader für cached_balances.
+    """
+    rows = FactTransactionsSigi.objects.filter(
+        account__isnull=False
+    ).annotate(
+        month=TruncMonth('date')
+    ).values_list('account_id', 'month').annotate(
+        inflow=Sum('inflow'),
+        outflow=Sum('outflow')
+    ).order_by()
+
+    earliest = [
+        first for first in (
+            FactTransactionsSigi.objects.aggregate(first=Min('date'))['first'],
+            FactTransactionsRobert.objects.aggregate(first=Min('date'))['first'],
+        ) if first
+    ]
+    if earliest:
+        start = min(earliest).replace(day=1)
+    else:
+        # Keine Transaktionen: letztes Jahr
+        start = month_from_number(month_number(date.today()) - 12)
+
+    return [(account_id, month, (inflow or 0) - (outflow or 0)) for account_id, month, inflow, outflow in rows], start
+
+
+def _asset_balances(request):
+    """
+    Gecachte Monatsend-Salden aller Accounts (bis zum aktuellen Monat) und
+    die Spalten für ?from=YYYY-MM&to=YYYY-MM&resolution=monthly|quarterly|yearly.
+    """
+    balances = cached_balances(_account_balance_rows, date.today().replace(day=1))
+
+    resolution = request.GET.get('resolution', 'monthly')
+    if resolution not in RESOLUTIONS:
+        resolution = 'monthly'
+    columns = balances.columns(
+        parse_month(request.GET.get('from'), None),
+        parse_month(request.GET.get('to'), None),
+        resolution,
+    )
+    return balances, columns, resolution
+
+
+def _accounts_by_category(categories):
+    """{kategorie: [DimAccount, ...]} für die angegebenen Kontotypen"""
+    result = {category: [] for category in categories}
+    for account in DimAccount.objects.select_related('accounttype'):
+        if account.accounttype and account.accounttype.accounttypes in result:
+            result[account.accounttype.accounttypes].append(account)
+    return result
+
+
 @login_required
 def manage_devices(request):
     """Zeigt registrierte Geräte und erlaubt (optional) Administration"""
@@ -230,51 +389,25 @@ def dashboard(request):
     current_year_now = datetime.now().year
     available_years = range(current_year_now, 2019, -1)
 
-    transactions = FactTransactionsSigi.objects.filter(date__year=selected_year)
-
-    total_inflow = transactions.aggregate(Sum('inflow'))['inflow__sum'] or 0
-    total_outflow = transactions.aggregate(Sum('outflow'))['outflow__sum'] or 0
-    netto = total_inflow - total_outflow
-    transaction_count = transactions.count()
-
-    last_month = datetime.now() - timedelta(days=30)
-    last_month_outflow = transactions.filter(
-        date__gte=last_month
-    ).aggregate(Sum('outflow'))['outflow__sum'] or 0
-
-    # Top Payees statt Top Kategorien
-    top_payees = transactions.filter(
-        outflow__gt=0
-    ).values(
-        'payee__payee'
-    ).exclude(
-        category__categorygroup__category_group__iexact='NoCategory'
-    ).exclude(
-        payee__payee_type__in=['transfer', 'kursschwankung']
-    ).annotate(
-        total=Sum('outflow'),
-        count=Count('id')
-    ).order_by('-total')[:10]
-
-    recent_transactions = transactions.select_related(
-        'account', 'payee', 'category', 'flag'
-    )[:10]
-
-    context = {
+    context = dashboard_kpis(request.user, selected_year).as_context()
+    context.update({
         'current_year': selected_year,  # Das ausgewählte Jahr
         'available_years': available_years,  # Für Dropdown
-        'total_inflow': total_inflow,
-        'total_outflow': total_outflow,
-        'netto': netto,
-        'transaction_count': transaction_count,
-        'last_month_outflow': last_month_outflow,
-        'top_payees': top_payees,
-        'recent_transactions': recent_transactions
-    }
+    })
 
     return render(request, 'finance/dashboard.html', context)
 
 
+@login_required
+@conditional_json(TRANSACTIONS)
+def api_dashboard_kpis(request):
+    """API: Dashboard-Kennzahlen eines Jahres (?year=) als JSON"""
+    if request.user.username == 'robert':
+        return JsonResponse({'error': 'Keine Berechtigung'}, status=403)
+
+    return JsonResponse(dashboard_kpis(request.user, _comparison_year(request)).as_json())
+
+
 @login_required
 def transactions_list(request):
     """Liste aller Transaktionen mit Filter"""
@@ -293,19 +426,7 @@ def transactions_list(request):
     category_id = request.GET.get('category', '')
     search = request.GET.get('search', '')
 
-    if year:
-        transactions = transactions.filter(date__year=int(year))
-    if month:
-        transactions = transactions.filter(date__month=int(month))
-    if account_id:
-        transactions = transactions.filter(account_id=int(account_id))
-    if category_id:
-        transactions = transactions.filter(category_id=int(category_id))
-    if search:
-        transactions = transactions.filter(
-            Q(payee__payee__icontains=search) |
-            Q(memo__icontains=search)
-        )
+    transactions = apply_transaction_filters(transactions, request.GET)
 
     # Statistiken berechnen mit allen Ausschlüssen
     transactions_for_stats = transactions.exclude(
@@ -339,7 +460,8 @@ def transactions_list(request):
     categories = DimCategory.objects.select_related('categorygroup').all()
     years = range(datetime.now().year, 2019, -1)
 
-    transactions = transactions[:100]
+    # Bei Suche nach Relevanz sortieren
+    transactions = TransactionSearch(search).rank(transactions)[:100]
 
     context = {
         'transactions': transactions,
@@ -368,6 +490,74 @@ def transactions_list(request):
     return render(request, 'finance/transactions.html', context)
 
 
+@login_required
+def export_transactions(request):
+    """Streaming-Export der gefilterten Transaktionen (CSV, JSON Lines, Parquet)"""
+    export_format = request.GET.get('format', 'csv')
+    scope = request.GET.get('scope', 'all')
+
+    if export_format not in EXPORT_FORMATS:
+        return JsonResponse({'error': f'Unbekanntes Format: {export_format}'}, status=400)
+    if export_format == 'parquet' and not parquet_available():
+        return JsonResponse({'error': 'Parquet-Export ist nicht verfügbar (pyarrow fehlt)'}, status=400)
+
+    # Robert darf nur Haushalts-Transaktionen exportieren
+    if request.user.username == 'robert':
+        scope = 'household'
+
+    content_type, extension = EXPORT_FORMATS[export_format]
+    rows = iter_export_rows(request.GET, scope=scope)
+    stream = STREAMERS[export_format](rows)
+    if isinstance(request, ASGIRequest):
+        # Unter ASGI würde ein sync Iterator vor dem Senden komplett gepuffert
+        stream = astream(stream)
+
+    response = StreamingHttpResponse(stream, content_type=content_type)
+    filename = f"transaktionen_{scope}_{date.today():%Y%m%d}.{extension}"
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+
+@login_required
+def import_transactions(request):
+    """Bulk-Import einer Bank- oder YNAB-CSV"""
+    if not user_has_full_access(request.user):
+        messages.warning(request, 'Du hast keine Berechtigung für diese Seite.')
+        return redirect('finance:household_transactions')
+
+    if request.method == 'POST':
+        form = TransactionImportForm(request.POST, request.FILES)
+        if form.is_valid():
+            data = form.cleaned_data
+            loader = TransactionBulkLoader(
+                target=data['target'],
+                default_account=data['account'].account if data['account'] else None,
+                counterparts=data['counterparts'],
+            )
+            try:
+                stats = loader.load(iter_csv_rows(data['file'], data['format']), dry_run=data['dry_run'])
+            except ImportRowError as e:
+                messages.error(request, f'Import fehlgeschlagen: {e}')
+                return redirect('finance:import_transactions')
+
+            prefix = 'Prüflauf: ' if data['dry_run'] else ''
+            messages.success(
+                request,
+                f"{prefix}{stats['imported']} Transaktionen importiert, "
+                f"{stats['counterparts']} Gegenbuchungen, {stats['duplicates']} Duplikate übersprungen, "
+                f"{stats['new_payees']} neue Payees."
+            )
+            if stats['errors']:
+                details = '; '.join(f'Zeile {line}: {error}' for line, error in stats['errors'][:5])
+                messages.warning(request, f"{len(stats['errors'])} Zeilen übersprungen ({details})")
+            return redirect('finance:import_transactions')
+        messages.error(request, 'Bitte überprüfe deine Eingaben.')
+    else:
+        form = TransactionImportForm()
+
+    return render(request, 'finance/transaction_import.html', {'form': form})
+
+
 @login_required
 def household_transactions(request):
     """Haushalt-Transaktionen"""
@@ -395,27 +585,8 @@ def household_transactions(request):
     person_filter = request.GET.get('person', '')
     search = request.GET.get('search', '')
 
-    if year:
-        sigi_transactions = sigi_transactions.filter(date__year=int(year))
-        robert_transactions = robert_transactions.filter(date__year=int(year))
-    if month:
-        sigi_transactions = sigi_transactions.filter(date__month=int(month))
-        robert_transactions = robert_transactions.filter(date__month=int(month))
-    if account_id:
-        sigi_transactions = sigi_transactions.filter(account_id=int(account_id))
-        robert_transactions = robert_transactions.filter(account_id=int(account_id))
-    if category_id:
-        sigi_transactions = sigi_transactions.filter(category_id=int(category_id))
-        robert_transactions = robert_transactions.filter(category_id=int(category_id))
-    if search:
-        sigi_transactions = sigi_transactions.filter(
-            Q(payee__payee__icontains=search) |
-            Q(memo__icontains=search)
-        )
-        robert_transactions = robert_transactions.filter(
-            Q(payee__payee__icontains=search) |
-            Q(memo__icontains=search)
-        )
+    sigi_transactions = apply_transaction_filters(sigi_transactions, request.GET)
+    robert_transactions = apply_transaction_filters(robert_transactions, request.GET)
 
     sigi_for_stats = sigi_transactions.exclude(
         payee__payee_type__in=['transfer', 'kursschwankung']
@@ -446,8 +617,9 @@ def household_transactions(request):
 
     total_outflow = sigi_outflow + robert_outflow
 
-    sigi_list_full = list(sigi_transactions)
-    robert_list_full = list(robert_transactions)
+    searcher = TransactionSearch(search)
+    sigi_list_full = list(searcher.rank(sigi_transactions))
+    robert_list_full = list(searcher.rank(robert_transactions))
 
     if person_filter == 'sigi':
         transactions_full = sigi_list_full
@@ -456,7 +628,8 @@ def household_transactions(request):
     else:
         transactions_full = sigi_list_full + robert_list_full
 
-    transactions_full.sort(key=lambda x: x.date, reverse=True)
+    # Bei Suche nach Relevanz, sonst nach Datum
+    transactions_full.sort(key=lambda x: (getattr(x, 'search_rank', 0), x.date), reverse=True)
 
     robert_percentage = (robert_outflow / total_outflow * 100) if total_outflow > 0 else 0
     sigi_percentage = (sigi_outflow / total_outflow * 100) if total_outflow > 0 else 0
@@ -517,16 +690,17 @@ def household_transactions(request):
 # finance/views.py - Ergänzungen für Drilldown
 
 @login_required
-def api_monthly_spending(request):
+@conditional_json(TRANSACTIONS)
+async def api_monthly_spending(request):
     """API: Monatliche Ausgaben für Chart mit CategoryGroup-Level"""
-    if request.user.username == 'robert':
-        return JsonResponse({'error': 'Keine Berechtigung'}, status=403)
+    if denied := await _deny_robert(request):
+        return denied
 
     year = request.GET.get('year', datetime.now().year)
 
     # Aggregiere nach Monat und CategoryGroup
     monthly_data = FactTransactionsSigi.objects.filter(
-        date__year=year
+        date__range=year_range(year)
     ).exclude(
         payee__payee_type__in=['transfer', 'kursschwankung']
     ).exclude(
@@ -552,7 +726,7 @@ def api_monthly_spending(request):
     months_data = defaultdict(lambda: defaultdict(float))
     category_groups = set()
 
-    for item in monthly_data:
+    async for item in monthly_data:
         month_str = item['month'].strftime('%B')  # Englischer Monatsname
         group_id = item['category__categorygroup_id']
         group_name = item['category__categorygroup__category_group'] or 'Sonstige'
@@ -610,10 +784,11 @@ def api_monthly_spending(request):
 
 
 @login_required
-def api_monthly_spending_drilldown(request):
+@conditional_json(TRANSACTIONS)
+async def api_monthly_spending_drilldown(request):
     """API: Drilldown zu einzelnen Categories einer CategoryGroup"""
-    if request.user.username == 'robert':
-        return JsonResponse({'error': 'Keine Berechtigung'}, status=403)
+    if denied := await _deny_robert(request):
+        return denied
 
     year = request.GET.get('year', datetime.now().year)
     categorygroup_id = request.GET.get('categorygroup_id')
@@ -634,7 +809,7 @@ def api_monthly_spending_drilldown(request):
 
     # Basis-Query
     query = FactTransactionsSigi.objects.filter(
-        date__year=year,
+        date__range=year_range(year),
         category__categorygroup_id=categorygroup_id
     ).exclude(
         payee__payee_type__in=['transfer', 'kursschwankung']
@@ -650,7 +825,7 @@ def api_monthly_spending_drilldown(request):
 
         try:
             month_num = month_names_en.index(month) + 1
-            query = query.filter(date__month=month_num)
+            query = query.filter(date__range=month_range(year, month_num))
         except (ValueError, AttributeError):
             # Falls Monat ungültig, ignorieren wir den Filter
             pass
@@ -667,7 +842,7 @@ def api_monthly_spending_drilldown(request):
     labels = []
     data = []
 
-    for item in category_data:
+    async for item in category_data:
         category_name = item['category__category'] or 'Unbekannt'
         netto = float((item['total_outflow'] or 0) - (item['total_inflow'] or 0))
 
@@ -701,10 +876,11 @@ def api_monthly_spending_drilldown(request):
 
 
 @login_required
-def api_category_breakdown(request):
+@conditional_json(TRANSACTIONS)
+async def api_category_breakdown(request):
     """API: Ausgaben nach Kategorie für Pie Chart mit Drilldown-Support"""
-    if request.user.username == 'robert':
-        return JsonResponse({'error': 'Keine Berechtigung'}, status=403)
+    if denied := await _deny_robert(request):
+        return denied
 
     year = request.GET.get('year', datetime.now().year)
     categorygroup = request.GET.get('categorygroup')  # NEU: Optional für Drilldown
@@ -712,7 +888,7 @@ def api_category_breakdown(request):
     if categorygroup:
         # DRILLDOWN: Zeige Categories dieser CategoryGroup
         category_data = FactTransactionsSigi.objects.filter(
-            date__year=year,
+            date__range=year_range(year),
             outflow__gt=0,
             category__categorygroup__category_group=categorygroup
         ).exclude(
@@ -726,7 +902,7 @@ def api_category_breakdown(request):
         labels = []
         data = []
 
-        for item in category_data:
+        async for item in category_data:
             category_name = item['category__category'] or 'Unbekannt'
             labels.append(category_name)
             data.append(float(item['total'] or 0))
@@ -756,7 +932,7 @@ def api_category_breakdown(request):
     else:
         # OVERVIEW: Zeige CategoryGroups (wie bisher)
         category_data = FactTransactionsSigi.objects.filter(
-            date__year=year,
+            date__range=year_range(year),
             outflow__gt=0
         ).values(
             'category__categorygroup__category_group'
@@ -771,7 +947,7 @@ def api_category_breakdown(request):
         labels = []
         data = []
 
-        for item in category_data:
+        async for item in category_data:
             category_name = item['category__categorygroup__category_group'] or 'Unbekannt'
             labels.append(category_name)
             data.append(float(item['total'] or 0))
@@ -800,15 +976,16 @@ def api_category_breakdown(request):
 
 
 @login_required
-def api_top_payees(request):
+@conditional_json(TRANSACTIONS)
+async def api_top_payees(request):
     """API: Top Zahlungsempfänger"""
-    if request.user.username == 'robert':
-        return JsonResponse({'error': 'Keine Berechtigung'}, status=403)
+    if denied := await _deny_robert(request):
+        return denied
 
     year = request.GET.get('year', datetime.now().year)
 
     payee_data = FactTransactionsSigi.objects.filter(
-        date__year=year,
+        date__range=year_range(year),
         outflow__gt=0
     ).values(
         'payee__payee'
@@ -820,7 +997,7 @@ def api_top_payees(request):
     labels = []
     data = []
 
-    for item in payee_data:
+    async for item in payee_data:
         payee_name = item['payee__payee'] or 'Unbekannt'
         labels.append(payee_name)
         data.append(float(item['total'] or 0))
@@ -1586,38 +1763,37 @@ def process_scheduled_transactions(request):
 
     today = date.today()
 
-    # Hole alle aktiven scheduled transactions, die heute oder früher fällig sind
-    due_transactions = ScheduledTransaction.objects.filter(
-        is_active=True,
-        next_execution_date__lte=today
-    )
-
     executed_count = 0
     failed_count = 0
     results = []
 
-    for scheduled_tx in due_transactions:
-        try:
-            transaction = scheduled_tx.execute()
-            if transaction:
-                executed_count += 1
-                results.append(f"✓ {scheduled_tx.payee} - €{scheduled_tx.outflow or scheduled_tx.inflow}")
-                logger.info(f'Executed scheduled transaction: {scheduled_tx}')
-            else:
-                # Transaction war nicht fällig oder deaktiviert
-                if not scheduled_tx.is_active:
-                    results.append(f"○ {scheduled_tx.payee} (deactivated/expired)")
-        except Exception as e:
-            failed_count += 1
-            results.append(f"✗ {scheduled_tx.payee}: {str(e)}")
-            logger.error(f'Failed to execute scheduled transaction {scheduled_tx}: {str(e)}')
+    # Alle fälligen Schedules inkl. verpasster Termine in einem Batch
+    try:
+        run_results = ScheduledTransactionEngine(today).run()
+    except Exception as e:
+        failed_count += 1
+        run_results = []
+        results.append(f"✗ Batch fehlgeschlagen: {str(e)}")
+        logger.error(f'Failed to process scheduled transactions: {str(e)}')
+
+    for result in run_results:
+        scheduled_tx = result['scheduled']
+        if result['dates']:
+            executed_count += len(result['dates'])
+            dates = ', '.join(d.isoformat() for d in result['dates'])
+            results.append(f"✓ {scheduled_tx.payee} - €{scheduled_tx.outflow or scheduled_tx.inflow} ({dates})")
+            logger.info(f'Executed scheduled transaction: {scheduled_tx} x{len(result["dates"])}')
+        if result['skipped']:
+            results.append(f"○ {scheduled_tx.payee} ({result['skipped']} already booked)")
+        if result['deactivated']:
+            results.append(f"○ {scheduled_tx.payee} (deactivated/expired)")
 
     response_text = f"""Scheduled Transactions Processing Complete
 
 Date: {today}
 Executed: {executed_count}
 Failed: {failed_count}
-Total processed: {len(due_transactions)}
+Total processed: {len(run_results)}
 
 Details:
 {chr(10).join(results) if results else 'No transactions due'}
@@ -1630,9 +1806,11 @@ Details:
 
 @login_required
 @require_POST
-def analyze_receipt_image(request):
+async def analyze_receipt_image(request):
     """
-    API Endpoint: Analysiert hochgeladenes Rechnungsbild
+    API Endpoint: Startet die Analyse eines hochgeladenen Rechnungsbilds.
+    Antwortet sofort - bei bekannter Datei mit dem Ergebnis (200), sonst
+    mit der Job-ID (202) für api_analyze_receipt_status.
     """
     if 'receipt_image' not in request.FILES:
         return JsonResponse({
@@ -1640,56 +1818,38 @@ def analyze_receipt_image(request):
             'error': 'Kein Bild hochgeladen'
         })
 
-    try:
-        image_file = request.FILES['receipt_image']
-        image_bytes = image_file.read()
-
-        # Größenlimit prüfen (z.B. 10MB)
-        if len(image_bytes) > 10 * 1024 * 1024:
-            return JsonResponse({
-                'success': False,
-                'error': 'Bild zu groß (max. 10MB)'
-            })
+    image_bytes = request.FILES['receipt_image'].read()
 
-        # Analysiere mit KI
-        analyzer = ReceiptAnalyzer()
-        result = analyzer.analyze_receipt(image_bytes)
-
-        if not result['success']:
-            return JsonResponse(result)
-
-        # Finde passende Kategorie
-        all_categories = DimCategory.objects.select_related('categorygroup').all()
-        suggested_category = analyzer.suggest_category(
-            result['category_suggestion'],
-            all_categories
-        )
-
-        # Formatiere Antwort
-        response = {
-            'success': True,
-            'data': {
-                'date': result['date'].strftime('%Y-%m-%d'),
-                'payee': result['payee'],
-                'amount': str(result['amount']),
-                'memo': result['memo'],
-                'category_id': suggested_category.id if suggested_category else None,
-                'category_name': suggested_category.category if suggested_category else None,
-                'categorygroup_id': suggested_category.categorygroup.id if suggested_category else None,
-                'categorygroup_name': suggested_category.categorygroup.category_group if suggested_category else None,
-                'category_suggestion_text': result['category_suggestion'],
-                'currency': result.get('currency', 'EUR')
-            }
-        }
-
-        return JsonResponse(response)
+    # Größenlimit prüfen (z.B. 10MB)
+    if len(image_bytes) > 10 * 1024 * 1024:
+        return JsonResponse({
+            'success': False,
+            'error': 'Bild zu groß (max. 10MB)'
+        })
 
+    try:
+        user = await request.auser()
+        job = await sync_to_async(start_analysis)(user, image_bytes)
     except Exception as e:
         return JsonResponse({
             'success': False,
             'error': f'Fehler bei der Verarbeitung: {str(e)}'
         })
 
+    payload = job_payload(job)
+    payload['status_url'] = reverse('finance:api_analyze_receipt_status', args=[job.pk])
+    return JsonResponse(payload, status=202 if 'success' not in payload else 200)
+
+
+@login_required
+async def analyze_receipt_status(request, job_id):
+    """API Endpoint: Status/Ergebnis eines Analyse-Jobs (Polling)"""
+    user = await request.auser()
+    payload = await sync_to_async(job_status)(job_id, user.pk)
+    if payload is None:
+        return JsonResponse({'success': False, 'error': 'Analyse nicht gefunden'}, status=404)
+    return JsonResponse(payload)
+
 
 @login_required
 def analyze_receipt_page(request):
@@ -2104,10 +2264,11 @@ def adjust_investments(request):
 
 
 @login_required
-def api_spending_trend(request):
+@conditional_json(TRANSACTIONS)
+async def api_spending_trend(request):
     """API: Historische Ausgaben und Einnahmen über alle Monate für Trendlinie"""
-    if request.user.username == 'robert':
-        return JsonResponse({'error': 'Keine Berechtigung'}, status=403)
+    if denied := await _deny_robert(request):
+        return denied
 
     # Ausgaben: Alle Transaktionen außer Ready to Assign, Transfers, etc.
     monthly_spending = FactTransactionsSigi.objects.exclude(
@@ -2138,38 +2299,28 @@ def api_spending_trend(request):
         total_inflow=Sum('inflow')
     ).order_by('month')
 
-    # Erstelle Dictionaries für einfacheren Zugriff
-    income_by_month = {item['month']: float(item['total_inflow'] or 0) for item in monthly_income}
-
-    labels = []
-    spending_data = []
-    income_data = []
-
-    for item in monthly_spending:
-        month = item['month']
+    # Dichte Monatsreihen vom ersten Monat bis heute
+    spending_points = [
+        (item['month'], float(item['outflow'] or 0) - float(item['inflow'] or 0))
+        async for item in monthly_spending
+    ]
+    income_points = [(item['month'], item['total_inflow']) async for item in monthly_income]
 
-        # Formatiere Label als "Jan 2023"
-        labels.append(month.strftime('%b %Y'))
+    if not spending_points:
+        return JsonResponse({'labels': [], 'spending': [], 'income': [], 'trend': []})
 
-        # Netto-Ausgaben (Outflow - Inflow)
-        outflow = float(item['outflow'] or 0)
-        inflow = float(item['inflow'] or 0)
-        net_spending = outflow - inflow
-        spending_data.append(net_spending)
+    start = min(month for month, _ in spending_points)
+    end = max(max(month for month, _ in spending_points), date.today().replace(day=1))
+    spending = MonthlySeries(spending_points, start, end)
+    income = MonthlySeries(income_points, start, end)
 
-        # Einnahmen für diesen Monat
-        income_data.append(income_by_month.get(month, 0))
+    labels = spending.labels
+    spending_data = [round(float(v), 2) for v in spending.values]
+    income_data = [round(float(v), 2) for v in income.values]
 
-    # Berechne Trendlinie nur für Ausgaben (lineare Regression)
-    if len(spending_data) >= 2:
-        x = np.arange(len(spending_data))
-        y = np.array(spending_data)
-
-        # Lineare Regression: y = mx + b
-        m, b = np.polyfit(x, y, 1)
-        trend_data = [m * i + b for i in x]
-    else:
-        trend_data = spending_data
+    # Trendlinie nur für Ausgaben (lineare Regression über alle Monate)
+    trend, _, _ = spending.trend()
+    trend_data = [round(float(v), 2) for v in trend] if len(spending_data) >= 2 else spending_data
 
     return JsonResponse({
         'labels': labels,
@@ -2180,93 +2331,26 @@ def api_spending_trend(request):
 
 
 @login_required
+@conditional_json(TRANSACTIONS)
 def api_asset_history(request):
     """API: Historische Vermögensentwicklung über alle Kategorien"""
     if request.user.username == 'robert':
         return JsonResponse({'error': 'Keine Berechtigung'}, status=403)
 
-    from dateutil.relativedelta import relativedelta
-
-    # Zeitraum: Vom ersten Datensatz bis heute
-    end_date = datetime.now().date()
-    if end_date.month == 12:
-        end_date = end_date.replace(day=31)
-    else:
-        next_month = end_date.replace(month=end_date.month + 1, day=1)
-        end_date = next_month - timedelta(days=1)
-
-    # Finde früheste Transaktion
-    earliest_sigi = FactTransactionsSigi.objects.order_by('date').first()
-    earliest_robert = FactTransactionsRobert.objects.order_by('date').first()
-
-    earliest_dates = []
-    if earliest_sigi:
-        earliest_dates.append(earliest_sigi.date)
-    if earliest_robert:
-        earliest_dates.append(earliest_robert.date)
-
-    if not earliest_dates:
-        # Keine Transaktionen, Fallback auf letztes Jahr
-        start_date = end_date - relativedelta(months=12)
-    else:
-        start_date = min(earliest_dates)
-        # Setze auf ersten Tag des Monats
-        start_date = start_date.replace(day=1)
-
-    # Generiere Liste aller Monate
-    months = []
-    current = start_date
-    while current <= end_date:
-        # Letzter Tag des Monats
-        if current.month == 12:
-            month_end = current.replace(day=31)
-        else:
-            next_month = current.replace(month=current.month + 1, day=1)
-            month_end = next_month - timedelta(days=1)
-
-        months.append(month_end)
-        current = current + relativedelta(months=1)
-
-    # Hole alle Accounts
-    accounts = DimAccount.objects.select_related('accounttype').all()
+    balances, columns, resolution = _asset_balances(request)
+    labels = balances.labels(columns, resolution)
 
-    # Datenstruktur für Kategorien (in fester Reihenfolge für Stacking)
+    # Kategorien in fester Reihenfolge für Stacking
     category_order = ['Cash', 'Credit', 'MidtermInvest', 'LongtermInvest']
-    category_data = {cat: [] for cat in category_order}
-
-    labels = []
-
-    # Für jeden Monat: Berechne Kontostände pro Kategorie
-    for month_end in months:
-        labels.append(month_end.strftime('%b %Y'))
-
-        # Reset für diesen Monat
-        monthly_totals = {cat: Decimal('0') for cat in category_order}
+    category_accounts = _accounts_by_category(category_order)
 
-        for account in accounts:
-            # Kategorie bestimmen
-            if account.accounttype and account.accounttype.accounttypes:
-                category_name = account.accounttype.accounttypes
-            else:
-                category_name = 'Sonstige'
-
-            # Nur relevante Kategorien
-            if category_name not in monthly_totals:
-                continue
-
-            # Berechne Kontostand für diesen Monat
-            balance = calculate_account_balance(account.id, month_end)
-            monthly_totals[category_name] += balance
-
-        # Füge zu category_data hinzu
-        for cat_name in category_order:
-            category_data[cat_name].append(float(monthly_totals[cat_name]))
+    category_data = {
+        cat_name: balances.rows([account.id for account in accounts], columns).sum(axis=0)
+        for cat_name, accounts in category_accounts.items()
+    }
 
-    # Berechne Gesamtwert (Summe aller Kategorien)
-    total_data = []
-    for i in range(len(labels)):
-        total = sum(category_data[cat][i] for cat in category_order)
-        total_data.append(total)
+    # Gesamtwert (Summe aller Kategorien)
+    total_data = sum(category_data.values())
 
     # Erstelle datasets mit zentralen Farben
     datasets = []
@@ -2281,7 +2365,7 @@ def api_asset_history(request):
 
             datasets.append({
                 'label': display_name,
-                'data': category_data[cat_name],
+                'data': [round(float(v), 2) for v in category_data[cat_name]],
                 'borderColor': f'rgb({r}, {g}, {b})',
                 'backgroundColor': f'rgba({r}, {g}, {b}, 0.2)',
                 'borderWidth': 2,
@@ -2295,7 +2379,7 @@ def api_asset_history(request):
     # Gesamtwert als separate dicke Linie (NICHT gestackt)
     datasets.append({
         'label': 'Gesamt',
-        'data': total_data,
+        'data': [round(float(v), 2) for v in total_data],
         'borderColor': 'rgb(255, 206, 86)',
         'backgroundColor': 'transparent',
         'borderWidth': 3,
@@ -2314,101 +2398,46 @@ def api_asset_history(request):
 
 
 @login_required
+@conditional_json(TRANSACTIONS)
 def api_asset_category_details(request):
-    """API: Detaillierte Vermögensentwicklung pro Kategorie mit einzelnen Accounts"""
+    """
+    API: Detaillierte Vermögensentwicklung pro Kategorie mit einzelnen Accounts.
+
+    Optional: ?category=Cash (nur eine Kategorie), ?from=YYYY-MM, ?to=YYYY-MM,
+    ?resolution=monthly|quarterly|yearly (Stand jeweils am Periodenende).
+    """
     if request.user.username == 'robert':
         return JsonResponse({'error': 'Keine Berechtigung'}, status=403)
 
-    from dateutil.relativedelta import relativedelta
-
-    # Zeitraum: Vom ersten Datensatz bis heute
-    end_date = datetime.now().date()
-    if end_date.month == 12:
-        end_date = end_date.replace(day=31)
-    else:
-        next_month = end_date.replace(month=end_date.month + 1, day=1)
-        end_date = next_month - timedelta(days=1)
-
-    # Finde früheste Transaktion
-    earliest_sigi = FactTransactionsSigi.objects.order_by('date').first()
-    earliest_robert = FactTransactionsRobert.objects.order_by('date').first()
-
-    earliest_dates = []
-    if earliest_sigi:
-        earliest_dates.append(earliest_sigi.date)
-    if earliest_robert:
-        earliest_dates.append(earliest_robert.date)
-
-    if not earliest_dates:
-        # Keine Transaktionen, Fallback auf letztes Jahr
-        start_date = end_date - relativedelta(months=12)
-    else:
-        start_date = min(earliest_dates)
-        # Setze auf ersten Tag des Monats
-        start_date = start_date.replace(day=1)
-
-    # Generiere Liste aller Monate
-    months = []
-    current = start_date
-    while current <= end_date:
-        if current.month == 12:
-            month_end = current.replace(day=31)
-        else:
-            next_month = current.replace(month=current.month + 1, day=1)
-            month_end = next_month - timedelta(days=1)
-
-        months.append(month_end)
-        current = current + relativedelta(months=1)
-
-    labels = [month.strftime('%b %Y') for month in months]
+    categories = ['Cash', 'MidtermInvest', 'LongtermInvest']
+    if request.GET.get('category') in categories:
+        categories = [request.GET['category']]
 
-    # Hole alle Accounts gruppiert nach Kategorie
-    accounts = DimAccount.objects.select_related('accounttype').all()
+    balances, columns, resolution = _asset_balances(request)
+    labels = balances.labels(columns, resolution)
+    months = balances.months(columns)
 
-    # Gruppiere Accounts nach Kategorie
-    category_accounts = {
-        'Cash': [],
-        'MidtermInvest': [],
-        'LongtermInvest': []
-    }
-
-    for account in accounts:
-        if account.accounttype and account.accounttype.accounttypes:
-            category_name = account.accounttype.accounttypes
-            if category_name in category_accounts:
-                category_accounts[category_name].append(account)
-
-    # Generiere Farbpaletten basierend auf den Hauptfarben
-    color_palettes = {}
-    for category_name in category_accounts.keys():
-        if category_name in CATEGORY_COLORS:
-            rgb = CATEGORY_COLORS[category_name]['rgb']
-            # Generiere 8 Schattierungen (sollte für die meisten Accounts reichen)
-            color_palettes[category_name] = generate_color_shades(rgb, num_shades=8)
-
-    # Erstelle Datasets für jede Kategorie
     result = {}
 
-    for category_name, accounts_list in category_accounts.items():
+    for category_name, accounts_list in _accounts_by_category(categories).items():
         if not accounts_list:
             continue
 
         datasets = []
-        colors = color_palettes.get(category_name, [])
+        # 8 Schattierungen der Kategorie-Farbe (sollte für die meisten Accounts reichen)
+        colors = []
+        if category_name in CATEGORY_COLORS:
+            colors = generate_color_shades(CATEGORY_COLORS[category_name]['rgb'], num_shades=8)
 
         # Sortiere Accounts nach Namen für konsistente Darstellung
         accounts_list.sort(key=lambda x: x.account)
+        matrix = balances.rows([account.id for account in accounts_list], columns)
 
-        # Für jeden Account: Berechne historische Daten
-        for idx, account in enumerate(accounts_list):
-            account_data = []
-
-            for month_end in months:
-                balance = calculate_account_balance(account.id, month_end)
-                account_data.append(float(balance))
+        for idx, (account, values) in enumerate(zip(accounts_list, matrix)):
+            account_data = [round(float(v), 2) for v in values]
 
             # Überspringe Accounts die immer 0 sind
-            if all(val == 0 for val in account_data):
+            if not any(account_data):
                 continue
 
             # Wähle Farbe aus den Schattierungen
@@ -2435,6 +2464,7 @@ def api_asset_category_details(request):
 
         result[category_name] = {
             'labels': labels,
+            'months': months,
             'datasets': datasets
         }
 
@@ -2442,10 +2472,11 @@ def api_asset_category_details(request):
 
 
 @login_required
-def api_income_payees(request):
+@conditional_json(TRANSACTIONS)
+async def api_income_payees(request):
     """API: Einnahmen nach Payee für gestapeltes Balkendiagramm"""
-    if request.user.username == 'robert':
-        return JsonResponse({'error': 'Keine Berechtigung'}, status=403)
+    if denied := await _deny_robert(request):
+        return denied
 
     year = request.GET.get('year', datetime.now().year)
 
@@ -2454,7 +2485,7 @@ def api_income_payees(request):
 
     # Hole alle relevanten Transaktionen ohne Gruppierung
     transactions = FactTransactionsSigi.objects.filter(
-        date__year=year
+        date__range=year_range(year)
     ).filter(
         Q(category_id=1) |  # Ready to Assign
         Q(payee__payee__icontains='Robert', inflow__gt=0)  # Robert Inflows
@@ -2466,7 +2497,7 @@ def api_income_payees(request):
     payees_data = defaultdict(lambda: defaultdict(float))
     all_months = set()
 
-    for trans in transactions:
+    async for trans in transactions:
         # Extrahiere Monat (als datetime Objekt)
         month = trans.date.replace(day=1)
         all_months.add(month)
@@ -2573,6 +2604,7 @@ def household_dashboard(request):
 
 
 @login_required
+@conditional_json(TRANSACTIONS)
 def api_household_monthly_spending(request):
     """API: Monatliche Haushaltsausgaben (Gestapelt nach Person)"""
     year = request.GET.get('year', datetime.now().year)
@@ -2585,7 +2617,7 @@ def api_household_monthly_spending(request):
     if include_sigi:
         sigi_transactions = FactTransactionsSigi.objects.filter(
             flag_id=5,
-            date__year=year
+            date__range=year_range(year)
         ).exclude(
             payee__payee_type__in=['transfer', 'kursschwankung']
         ).exclude(
@@ -2596,7 +2628,7 @@ def api_household_monthly_spending(request):
     robert_transactions = FactTransactionsRobert.objects.none()
     if include_robert:
         robert_transactions = FactTransactionsRobert.objects.filter(
-            date__year=year
+            date__range=year_range(year)
         ).exclude(
             payee__payee_type__in=['transfer', 'kursschwankung']
         ).exclude(
@@ -2666,6 +2698,7 @@ def api_household_monthly_spending(request):
 
 
 @login_required
+@conditional_json(TRANSACTIONS)
 def api_household_category_breakdown(request):
     """API: Ausgaben nach CategoryGroup für Tortendiagramm MIT DRILLDOWN"""
     year = request.GET.get('year', datetime.now().year)
@@ -2695,7 +2728,7 @@ def api_household_category_breakdown(request):
         if include_sigi:
             sigi_by_category = FactTransactionsSigi.objects.filter(
                 flag_id=5,
-                date__year=year,
+                date__range=year_range(year),
                 category__categorygroup_id=categorygroup_id  # ⚠️ KORRIGIERT
             ).exclude(
                 payee__payee_type__in=['transfer', 'kursschwankung']
@@ -2711,7 +2744,7 @@ def api_household_category_breakdown(request):
         robert_by_category = []
         if include_robert:
             robert_by_category = FactTransactionsRobert.objects.filter(
-                date__year=year,
+                date__range=year_range(year),
                 category__categorygroup_id=categorygroup_id  # ⚠️ KORRIGIERT
             ).exclude(
                 payee__payee_type__in=['transfer', 'kursschwankung']
@@ -2774,7 +2807,7 @@ def api_household_category_breakdown(request):
         if include_sigi:
             sigi_transactions = FactTransactionsSigi.objects.filter(
                 flag_id=5,
-                date__year=year,
+                date__range=year_range(year),
                 outflow__gt=0
             ).exclude(
                 payee__payee_type__in=['transfer', 'kursschwankung']
@@ -2786,7 +2819,7 @@ def api_household_category_breakdown(request):
         robert_transactions = FactTransactionsRobert.objects.none()
         if include_robert:
             robert_transactions = FactTransactionsRobert.objects.filter(
-                date__year=year,
+                date__range=year_range(year),
                 outflow__gt=0
             ).exclude(
                 payee__payee_type__in=['transfer', 'kursschwankung']
@@ -2849,6 +2882,7 @@ def api_household_category_breakdown(request):
 
 
 @login_required
+@conditional_json(TRANSACTIONS)
 def api_categorygroup_monthly_trend(request):
     """API: Monatliche Ausgaben-Entwicklung pro CategoryGroup mit Trendlinie"""
     group_id = request.GET.get('group_id')
@@ -2856,220 +2890,58 @@ def api_categorygroup_monthly_trend(request):
         return JsonResponse({'error': 'group_id required'}, status=400)
 
     group_id = int(group_id)
-    _, include_robert, include_sigi = _parse_person_filter(request)
-
-    # Hole Daten für 2024 und 2025
-    start_date = datetime(2024, 1, 1)
-    end_date = datetime(2025, 12, 31)
-    current_month = datetime.now().replace(day=1)
-
-    # Sigi: Nur mit Flag "Relevant für Haushaltsbudget"
-    sigi_data = []
-    if include_sigi:
-        sigi_data = FactTransactionsSigi.objects.filter(
-            flag_id=5,
-            date__gte=start_date,
-            date__lte=end_date,
-            category__categorygroup_id=group_id
-        ).exclude(
-            payee__payee_type__in=['transfer', 'kursschwankung']
-        ).exclude(
-            category_id=1
-        ).annotate(
-            month=TruncMonth('date')
-        ).values('month').annotate(
-            inflow=Sum('inflow'),
-            outflow=Sum('outflow')
-        ).order_by('month')
-
-    # Robert: Alle Transaktionen
-    robert_data = []
-    if include_robert:
-        robert_data = FactTransactionsRobert.objects.filter(
-            date__gte=start_date,
-            date__lte=end_date,
-            category__categorygroup_id=group_id
-        ).exclude(
-            payee__payee_type__in=['transfer', 'kursschwankung']
-        ).exclude(
-            category_id=1
-        ).annotate(
-            month=TruncMonth('date')
-        ).values('month').annotate(
-            inflow=Sum('inflow'),
-            outflow=Sum('outflow')
-        ).order_by('month')
-
-    # Aggregiere Daten nach Monat (verwende Tuple aus Jahr und Monat als Key!)
-    monthly_totals = {}
-
-    for item in sigi_data:
-        month = item['month']
-        # Verwende (Jahr, Monat) als Key statt datetime-Objekt
-        key = (month.year, month.month)
-        netto = float((item['outflow'] or 0) - (item['inflow'] or 0))
-        monthly_totals[key] = monthly_totals.get(key, 0) + netto
-
-    for item in robert_data:
-        month = item['month']
-        key = (month.year, month.month)
-        netto = float((item['outflow'] or 0) - (item['inflow'] or 0))
-        monthly_totals[key] = monthly_totals.get(key, 0) + netto
-
-    # Erstelle Monatsliste für 2024 und 2025 BIS ZUM AKTUELLEN MONAT
-    labels = []
-    data = []
-
-    current_year = 2024
-    current_month_num = 1
-
-    # Aktuelles Jahr und Monat für Vergleich
-    now = datetime.now()
-    current_year_now = now.year
-    current_month_now = now.month
-
-    # GEÄNDERT: Schleife nur bis zum aktuellen Monat
-    while (current_year < current_year_now) or (
-            current_year == current_year_now and current_month_num <= current_month_now):
-        month_date = datetime(current_year, current_month_num, 1)
-        labels.append(month_date.strftime('%b %Y'))
-
-        # Hole Wert mit (Jahr, Monat) Key
-        key = (current_year, current_month_num)
-        value = monthly_totals.get(key, 0)
-        data.append(value)
-
-        # Nächster Monat
-        if current_month_num == 12:
-            current_year += 1
-            current_month_num = 1
-        else:
-            current_month_num += 1
-
-    # Berechne Trendlinie (nur mit vollständigen Monaten, exkl. aktueller Monat)
-    current_month_key = (now.year, now.month)
-
-    complete_data_points = []
-    complete_indices = []
-
-    for i, value in enumerate(data):
-        # Berechne Jahr und Monat für diesen Index
-        year = 2024 + (i // 12)
-        month = (i % 12) + 1
-
-        # Nur vollständige Monate (nicht der aktuelle)
-        if (year, month) < current_month_key:
-            complete_data_points.append(value)
-            complete_indices.append(i)
-
-    # Lineare Regression für Trendlinie
-    trend_data = []
-    if len(complete_data_points) >= 2:
-        try:
-            import numpy as np
-            x = np.array(complete_indices)
-            y = np.array(complete_data_points)
-
-            # Berechne Steigung und Y-Achsenabschnitt
-            m, b = np.polyfit(x, y, 1)
-
-            # Erstelle Trendlinie
-            for i in range(len(data)):
-                year = 2024 + (i // 12)
-                month = (i % 12) + 1
-
-                if (year, month) < current_month_key:
-                    trend_data.append(float(m * i + b))
-                else:
-                    trend_data.append(None)
-        except ImportError:
-            trend_data = [None] * len(data)
-    else:
-        trend_data = [None] * len(data)
+    person, include_robert, include_sigi = _parse_person_filter(request)
+    start, end = _analytics_window(request)
+
+    series = cached_series(
+        f'household:group:{group_id}:{person}',
+        lambda: _household_monthly_points(
+            include_sigi, include_robert, start, end, category__categorygroup_id=group_id
+        ),
+        start, end,
+    )
 
-    return JsonResponse({
-        'labels': labels,
-        'data': data,
-        'trend_data': trend_data
-    })
+    return JsonResponse(series.analyze(forecast_months=_forecast_months(request)))
 
 
 @login_required
+@conditional_json(TRANSACTIONS)
 def api_categorygroup_year_comparison(request):
-    """API: Monatsvergleich 2024 vs 2025 pro CategoryGroup"""
+    """API: Monatsvergleich gewähltes Jahr vs. Vorjahr pro CategoryGroup"""
     group_id = request.GET.get('group_id')
     if not group_id:
         return JsonResponse({'error': 'group_id required'}, status=400)
 
     group_id = int(group_id)
-    _, include_robert, include_sigi = _parse_person_filter(request)
-
-    months_labels = [
-        'Jan', 'Feb', 'Mär', 'Apr', 'Mai', 'Jun',
-        'Jul', 'Aug', 'Sep', 'Okt', 'Nov', 'Dez'
-    ]
-
-    data_2024 = [0] * 12
-    data_2025 = [0] * 12
-
-    # Daten für beide Jahre sammeln
-    for year, data_array in [(2024, data_2024), (2025, data_2025)]:
-        # Sigi
-        sigi_monthly = []
-        if include_sigi:
-            sigi_monthly = FactTransactionsSigi.objects.filter(
-                flag_id=5,
-                date__year=year,
-                category__categorygroup_id=group_id,
-                outflow__gt=0
-            ).exclude(
-                payee__payee_type__in=['transfer', 'kursschwankung']
-            ).exclude(
-                category_id=1
-            ).annotate(
-                month=TruncMonth('date')
-            ).values('month').annotate(
-                inflow=Sum('inflow'),
-                outflow=Sum('outflow')
-            )
-
-        # Robert
-        robert_monthly = []
-        if include_robert:
-            robert_monthly = FactTransactionsRobert.objects.filter(
-                date__year=year,
-                category__categorygroup_id=group_id,
-                outflow__gt=0
-            ).exclude(
-                payee__payee_type__in=['transfer', 'kursschwankung']
-            ).exclude(
-                category_id=1
-            ).annotate(
-                month=TruncMonth('date')
-            ).values('month').annotate(
-                inflow=Sum('inflow'),
-                outflow=Sum('outflow')
-            )
-
-        # Fülle Daten
-        for item in sigi_monthly:
-            month_index = item['month'].month - 1
-            netto = float((item['outflow'] or 0) - (item['inflow'] or 0))
-            data_array[month_index] += netto
+    person, include_robert, include_sigi = _parse_person_filter(request)
+    year = _comparison_year(request)
+    start, end = date(year - 1, 1, 1), date(year, 12, 1)
+
+    series = cached_series(
+        f'household:group-outflow:{group_id}:{person}',
+        lambda: _household_monthly_points(
+            include_sigi, include_robert, start, end,
+            outflow_only=True, category__categorygroup_id=group_id
+        ),
+        start, end,
+    )
 
-        for item in robert_monthly:
-            month_index = item['month'].month - 1
-            netto = float((item['outflow'] or 0) - (item['inflow'] or 0))
-            data_array[month_index] += netto
+    data_current = series.by_year(year)
+    data_previous = series.by_year(year - 1)
 
     return JsonResponse({
-        'labels': months_labels,
-        'data_2024': data_2024,
-        'data_2025': data_2025
+        'labels': MONTH_NAMES,
+        'year': year,
+        'previous_year': year - 1,
+        'data_current': data_current,
+        'data_previous': data_previous,
+        f'data_{year}': data_current,
+        f'data_{year - 1}': data_previous,
     })
 
 
 @login_required
+@conditional_json(TRANSACTIONS)
 def api_categorygroup_quarterly_breakdown(request):
     """API: Quartalsweise gestapelte Ausgaben nach Kategorien"""
     group_id = request.GET.get('group_id')
@@ -3077,7 +2949,8 @@ def api_categorygroup_quarterly_breakdown(request):
         return JsonResponse({'error': 'group_id required'}, status=400)
 
     group_id = int(group_id)
-    _, include_robert, include_sigi = _parse_person_filter(request)
+    person, include_robert, include_sigi = _parse_person_filter(request)
+    start, end = _analytics_window(request)
 
     # Hole alle Kategorien dieser CategoryGroup
     categories = DimCategory.objects.filter(
@@ -3086,29 +2959,11 @@ def api_categorygroup_quarterly_breakdown(request):
         id=1  # "Ready to Assign"
     )
 
-    # Definiere Quartale für 2024 und 2025
-    # GEÄNDERT: Nur vollständige Quartale anzeigen
-    now = datetime.now()
-    current_quarter_start = datetime(now.year, ((now.month - 1) // 3) * 3 + 1, 1)
-
-    all_quarters = [
-        ('Q1 2024', datetime(2024, 1, 1), datetime(2024, 3, 31)),
-        ('Q2 2024', datetime(2024, 4, 1), datetime(2024, 6, 30)),
-        ('Q3 2024', datetime(2024, 7, 1), datetime(2024, 9, 30)),
-        ('Q4 2024', datetime(2024, 10, 1), datetime(2024, 12, 31)),
-        ('Q1 2025', datetime(2025, 1, 1), datetime(2025, 3, 31)),
-        ('Q2 2025', datetime(2025, 4, 1), datetime(2025, 6, 30)),
-        ('Q3 2025', datetime(2025, 7, 1), datetime(2025, 9, 30)),
-        ('Q4 2025', datetime(2025, 10, 1), datetime(2025, 12, 31)),
-    ]
-
-    # Filtere nur vollständige Quartale (Start-Datum vor dem aktuellen Quartal)
-    quarters = [q for q in all_quarters if q[1] < current_quarter_start]
-
-    labels = [q[0] for q in quarters]
-
-    # Erstelle Datasets für jede Kategorie
-    datasets = []
+    # Eine Query für alle Kategorien, gruppiert nach (Kategorie, Monat)
+    points_by_category = _household_monthly_points(
+        include_sigi, include_robert, start, end,
+        outflow_only=True, group_by='category_id', category__categorygroup_id=group_id
+    )
 
     # Farbpalette für deutliche Unterscheidung
     colors = [
@@ -3124,56 +2979,21 @@ def api_categorygroup_quarterly_breakdown(request):
         'rgb(197, 202, 233)',  # Periwinkle (Blaugrau-hell)
     ]
 
+    # Nur vollständige Quartale anzeigen
+    quarters = MonthlySeries([], start, end)
+    labels, _ = quarters.by_quarter(quarters.complete_mask())
+
+    datasets = []
     color_idx = 0  # Zähler für Farben (nur für Kategorien mit Daten)
 
     for category in categories:
-        category_data = []
-        has_data = False  # GEÄNDERT: Flag um zu prüfen ob Kategorie Daten hat
-
-        for quarter_label, start_date, end_date in quarters:
-            sigi_netto = 0.0
-            if include_sigi:
-                sigi_total = FactTransactionsSigi.objects.filter(
-                    flag_id=5,
-                    date__gte=start_date,
-                    date__lte=end_date,
-                    category_id=category.id,
-                    outflow__gt=0
-                ).exclude(
-                    payee__payee_type__in=['transfer', 'kursschwankung']
-                ).aggregate(
-                    total_inflow=Sum('inflow'),
-                    total_outflow=Sum('outflow')
-                )
-                sigi_netto = float((sigi_total['total_outflow'] or 0) - (sigi_total['total_inflow'] or 0))
-
-            robert_netto = 0.0
-            if include_robert:
-                robert_total = FactTransactionsRobert.objects.filter(
-                    date__gte=start_date,
-                    date__lte=end_date,
-                    category_id=category.id,
-                    outflow__gt=0
-                ).exclude(
-                    payee__payee_type__in=['transfer', 'kursschwankung']
-                ).aggregate(
-                    total_inflow=Sum('inflow'),
-                    total_outflow=Sum('outflow')
-                )
-                robert_netto = float((robert_total['total_outflow'] or 0) - (robert_total['total_inflow'] or 0))
+        series = MonthlySeries(points_by_category.get(category.id, []), start, end)
+        _, category_data = series.by_quarter(series.complete_mask())
 
-            total = sigi_netto + robert_netto
-            category_data.append(total)
-
-            # GEÄNDERT: Prüfe ob mindestens ein Wert > 0
-            if total > 0:
-                has_data = True
-
-        # GEÄNDERT: Nur hinzufügen wenn Kategorie tatsächlich Daten hat
-        if has_data:
-            # Wähle Farbe
+        # Nur hinzufügen wenn Kategorie tatsächlich Daten hat
+        if any(total > 0 for total in category_data):
             color = colors[color_idx % len(colors)]
-            color_idx += 1  # Erhöhe nur bei tatsächlich verwendeten Farben
+            color_idx += 1
 
             datasets.append({
                 'label': category.category,
@@ -3190,6 +3010,7 @@ def api_categorygroup_quarterly_breakdown(request):
 
 
 @login_required
+@conditional_json(TRANSACTIONS)
 def api_categorygroup_stats(request):
     """API: Statistiken für CategoryGroup (z.B. monthly average)"""
     group_id = request.GET.get('group_id')
@@ -3197,316 +3018,85 @@ def api_categorygroup_stats(request):
         return JsonResponse({'error': 'group_id required'}, status=400)
 
     group_id = int(group_id)
-    _, include_robert, include_sigi = _parse_person_filter(request)
-
-    # Berechne Monthly Average (nur vollständige Monate)
-    current_month_start = datetime.now().replace(day=1)
-    start_date = datetime(2024, 1, 1)
-
-    # Sigi
-    sigi_data = []
-    if include_sigi:
-        sigi_data = FactTransactionsSigi.objects.filter(
-            flag_id=5,
-            date__gte=start_date,
-            date__lt=current_month_start,  # Exkl. aktueller Monat
-            category__categorygroup_id=group_id,
-            outflow__gt=0
-        ).exclude(
-            payee__payee_type__in=['transfer', 'kursschwankung']
-        ).exclude(
-            category_id=1
-        ).annotate(
-            month=TruncMonth('date')
-        ).values('month').annotate(
-            inflow=Sum('inflow'),
-            outflow=Sum('outflow')
-        )
-
-    # Robert
-    robert_data = []
-    if include_robert:
-        robert_data = FactTransactionsRobert.objects.filter(
-            date__gte=start_date,
-            date__lt=current_month_start,
-            category__categorygroup_id=group_id,
-            outflow__gt=0
-        ).exclude(
-            payee__payee_type__in=['transfer', 'kursschwankung']
-        ).exclude(
-            category_id=1
-        ).annotate(
-            month=TruncMonth('date')
-        ).values('month').annotate(
-            inflow=Sum('inflow'),
-            outflow=Sum('outflow')
-        )
-
-    # Aggregiere nach Monat
-    monthly_totals = {}
-
-    for item in sigi_data:
-        month = item['month']
-        netto = float((item['outflow'] or 0) - (item['inflow'] or 0))
-        monthly_totals[month] = monthly_totals.get(month, 0) + netto
-
-    for item in robert_data:
-        month = item['month']
-        netto = float((item['outflow'] or 0) - (item['inflow'] or 0))
-        monthly_totals[month] = monthly_totals.get(month, 0) + netto
+    person, include_robert, include_sigi = _parse_person_filter(request)
+    start, end = _analytics_window(request)
+
+    series = cached_series(
+        f'household:group-outflow:{group_id}:{person}',
+        lambda: _household_monthly_points(
+            include_sigi, include_robert, start, end,
+            outflow_only=True, category__categorygroup_id=group_id
+        ),
+        start, end,
+    )
 
-    # Berechne Durchschnitt
-    if monthly_totals:
-        total_spending = sum(monthly_totals.values())
-        num_months = len(monthly_totals)
-        monthly_average = total_spending / num_months if num_months > 0 else 0
-    else:
-        monthly_average = 0
+    # Monthly Average nur über vollständige Monate mit Ausgaben
+    values = series.values[series.complete_mask()]
+    values = values[values != 0]
+    total_spending = float(values.sum())
+    num_months = int(len(values))
+    monthly_average = total_spending / num_months if num_months > 0 else 0
 
     return JsonResponse({
         'monthly_average': round(monthly_average, 2),
-        'num_months': len(monthly_totals),
-        'total_spending': round(sum(monthly_totals.values()), 2) if monthly_totals else 0
+        'num_months': num_months,
+        'total_spending': round(total_spending, 2)
     })
 
 
 # ===== SUPERMARKT-BEREICH API VIEWS (KORRIGIERT) =====
 
 @login_required
+@conditional_json(TRANSACTIONS)
 def api_supermarket_monthly_trend(request):
-    """API: Monatliche Entwicklung für Supermarkt-Kategorie (id=5) mit Trendlinie - nur 2024-2025"""
+    """API: Monatliche Entwicklung für Supermarkt-Kategorie (id=5) mit Trendlinie"""
     category_id = 5  # 1.4. Supermarkt
+    person, include_robert, include_sigi = _parse_person_filter(request)
+    start, end = _analytics_window(request)
+
+    series = cached_series(
+        f'household:category:{category_id}:{person}',
+        lambda: _household_monthly_points(
+            include_sigi, include_robert, start, end, category_id=category_id
+        ),
+        start, end,
+    )
 
-    # Zeitraum: 2024-2025, aber nur bis aktueller Monat
-    start_date = datetime(2024, 1, 1)
-    end_date = datetime(2025, 12, 31)
-    current_month = datetime.now().replace(day=1)
-    _, include_robert, include_sigi = _parse_person_filter(request)
-
-    # Sigi: Nur mit Flag "Relevant für Haushaltsbudget"
-    sigi_transactions = []
-    if include_sigi:
-        sigi_transactions = FactTransactionsSigi.objects.filter(
-            flag_id=5,
-            category_id=category_id,
-            date__gte=start_date,
-            date__lte=end_date
-        ).exclude(
-            payee__payee_type__in=['transfer', 'kursschwankung']
-        ).exclude(
-            category_id=1  # "Ready to Assign" ausschließen
-        ).values(
-            'date__year', 'date__month'
-        ).annotate(
-            total_outflow=Sum('outflow'),
-            total_inflow=Sum('inflow')
-        ).order_by('date__year', 'date__month')
-
-    # Robert: Alle Transaktionen
-    robert_transactions = []
-    if include_robert:
-        robert_transactions = FactTransactionsRobert.objects.filter(
-            category_id=category_id,
-            date__gte=start_date,
-            date__lte=end_date
-        ).exclude(
-            payee__payee_type__in=['transfer', 'kursschwankung']
-        ).exclude(
-            category_id=1  # "Ready to Assign" ausschließen
-        ).values(
-            'date__year', 'date__month'
-        ).annotate(
-            total_outflow=Sum('outflow'),
-            total_inflow=Sum('inflow')
-        ).order_by('date__year', 'date__month')
-
-    # Kombiniere beide Datensätze - verwende (Jahr, Monat) als Key
-    monthly_data = {}
-
-    for item in sigi_transactions:
-        key = (item['date__year'], item['date__month'])
-        if key not in monthly_data:
-            monthly_data[key] = {'outflow': 0, 'inflow': 0}
-        monthly_data[key]['outflow'] += float(item['total_outflow'] or 0)
-        monthly_data[key]['inflow'] += float(item['total_inflow'] or 0)
-
-    for item in robert_transactions:
-        key = (item['date__year'], item['date__month'])
-        if key not in monthly_data:
-            monthly_data[key] = {'outflow': 0, 'inflow': 0}
-        monthly_data[key]['outflow'] += float(item['total_outflow'] or 0)
-        monthly_data[key]['inflow'] += float(item['total_inflow'] or 0)
-
-    # Erstelle Monatsliste von 2024-01 bis aktueller Monat
-    labels = []
-    data = []
-    month_names = ['Jan', 'Feb', 'Mär', 'Apr', 'Mai', 'Jun', 'Jul', 'Aug', 'Sep', 'Okt', 'Nov', 'Dez']
-
-    current_year = 2024
-    current_month_num = 1
-
-    # Aktuelles Jahr und Monat für Vergleich
-    now = datetime.now()
-    current_year_now = now.year
-    current_month_now = now.month
-
-    # Schleife nur bis zum aktuellen Monat
-    while (current_year < current_year_now) or (
-            current_year == current_year_now and current_month_num <= current_month_now):
-
-        labels.append(f"{month_names[current_month_num - 1]} {current_year}")
-
-        # Hole Wert mit (Jahr, Monat) Key
-        key = (current_year, current_month_num)
-        values = monthly_data.get(key, {'outflow': 0, 'inflow': 0})
-
-        # Netto = Outflow - Inflow
-        netto = values['outflow'] - values['inflow']
-        data.append(round(netto, 2))
-
-        # Nächster Monat
-        if current_month_num == 12:
-            current_year += 1
-            current_month_num = 1
-        else:
-            current_month_num += 1
-
-    # Berechne Trendlinie (nur mit vollständigen Monaten, exkl. aktueller Monat)
-    current_month_key = (now.year, now.month)
-
-    complete_data_points = []
-    complete_indices = []
-
-    for i, value in enumerate(data):
-        # Berechne Jahr und Monat für diesen Index
-        year = 2024 + (i // 12)
-        month = (i % 12) + 1
-
-        # Nur vollständige Monate (nicht der aktuelle)
-        if (year, month) < current_month_key:
-            complete_data_points.append(value)
-            complete_indices.append(i)
-
-    # Lineare Regression für Trendlinie
-    trend_data = []
-    if len(complete_data_points) >= 2:
-        # Berechne Trendlinie mit einfacher linearer Regression
-        x = complete_indices
-        y = complete_data_points
-        n = len(x)
-
-        # Berechne Durchschnitte
-        x_mean = sum(x) / n
-        y_mean = sum(y) / n
-
-        # Berechne Steigung und Achsenabschnitt
-        numerator = sum((x[i] - x_mean) * (y[i] - y_mean) for i in range(n))
-        denominator = sum((x[i] - x_mean) ** 2 for i in range(n))
-
-        if denominator != 0:
-            slope = numerator / denominator
-            intercept = y_mean - slope * x_mean
-
-            # Erstelle Trendlinie für alle Monate (auch aktuellen)
-            for i in range(len(data)):
-                year = 2024 + (i // 12)
-                month = (i % 12) + 1
-
-                if (year, month) < current_month_key:
-                    # Vollständige Monate: Zeige Trendlinie
-                    trend_data.append(round(slope * i + intercept, 2))
-                else:
-                    # Aktueller Monat: Keine Trendlinie
-                    trend_data.append(None)
-        else:
-            trend_data = [None] * len(data)
-    else:
-        trend_data = [None] * len(data)
-
-    return JsonResponse({
-        'labels': labels,
-        'data': data,
-        'trend_data': trend_data
-    })
+    return JsonResponse(series.analyze(forecast_months=_forecast_months(request)))
 
 
 @login_required
+@conditional_json(TRANSACTIONS)
 def api_supermarket_year_comparison(request):
-    """API: Jahresvergleich 2024 vs 2025 für Supermarkt-Kategorie"""
+    """API: Jahresvergleich gewähltes Jahr vs. Vorjahr für Supermarkt-Kategorie"""
     category_id = 5  # 1.4. Supermarkt
-    years = [2024, 2025]
-    _, include_robert, include_sigi = _parse_person_filter(request)
-
-    comparison_data = {}
-
-    for year in years:
-        # Sigi - KORRIGIERT: Keine outflow__gt=0 Filterung
-        sigi_data = []
-        if include_sigi:
-            sigi_data = FactTransactionsSigi.objects.filter(
-                flag_id=5,
-                category_id=category_id,
-                date__year=year
-            ).exclude(
-                payee__payee_type__in=['transfer', 'kursschwankung']
-            ).exclude(
-                category_id=1
-            ).values(
-                'date__month'
-            ).annotate(
-                total_outflow=Sum('outflow'),
-                total_inflow=Sum('inflow')
-            )
-
-        # Robert - KORRIGIERT: Keine outflow__gt=0 Filterung
-        robert_data = []
-        if include_robert:
-            robert_data = FactTransactionsRobert.objects.filter(
-                category_id=category_id,
-                date__year=year
-            ).exclude(
-                payee__payee_type__in=['transfer', 'kursschwankung']
-            ).exclude(
-                category_id=1
-            ).values(
-                'date__month'
-            ).annotate(
-                total_outflow=Sum('outflow'),
-                total_inflow=Sum('inflow')
-            )
-
-        # Kombiniere
-        monthly_totals = {i: 0 for i in range(1, 13)}
-
-        for item in sigi_data:
-            month = item['date__month']
-            netto = float((item['total_outflow'] or 0) - (item['total_inflow'] or 0))
-            monthly_totals[month] += netto
-
-        for item in robert_data:
-            month = item['date__month']
-            netto = float((item['total_outflow'] or 0) - (item['total_inflow'] or 0))
-            monthly_totals[month] += netto
-
-        comparison_data[year] = [round(monthly_totals[i], 2) for i in range(1, 13)]
-
-    month_labels = ['Jan', 'Feb', 'Mär', 'Apr', 'Mai', 'Jun', 'Jul', 'Aug', 'Sep', 'Okt', 'Nov', 'Dez']
+    person, include_robert, include_sigi = _parse_person_filter(request)
+    year = _comparison_year(request)
+    start, end = date(year - 1, 1, 1), date(year, 12, 1)
+
+    series = cached_series(
+        f'household:category:{category_id}:{person}',
+        lambda: _household_monthly_points(
+            include_sigi, include_robert, start, end, category_id=category_id
+        ),
+        start, end,
+    )
 
     # KORRIGIERT: Farben und Reihenfolge wie bei anderen CategoryGroups
     return JsonResponse({
-        'labels': month_labels,
+        'labels': MONTH_NAMES,
         'datasets': [
             {
-                'label': '2025',
-                'data': comparison_data.get(2025, [0] * 12),
-                'backgroundColor': 'rgba(52, 168, 83, 0.7)',  # Blau
+                'label': str(year),
+                'data': series.by_year(year),
+                'backgroundColor': 'rgba(52, 168, 83, 0.7)',
                 'borderColor': 'rgba(52, 168, 83, 1)',
                 'borderWidth': 1
             },
             {
-                'label': '2024',
-                'data': comparison_data.get(2024, [0] * 12),
-                'backgroundColor': 'rgba(52, 168, 83, 0.25)',  # Grau
+                'label': str(year - 1),
+                'data': series.by_year(year - 1),
+                'backgroundColor': 'rgba(52, 168, 83, 0.25)',
                 'borderColor': 'rgba(52, 168, 83, 1)',
                 'borderWidth': 1
             }
@@ -3515,6 +3105,7 @@ def api_supermarket_year_comparison(request):
 
 
 @login_required
+@conditional_json(TRANSACTIONS)
 def api_supermarket_stats(request):
     """API: Statistiken für Supermarkt-Kategorie"""
     category_id = 5  # 1.4. Supermarkt
@@ -3579,6 +3170,7 @@ def api_supermarket_stats(request):
 
 
 @login_required
+@conditional_json(TRANSACTIONS)
 def api_billa_combined_chart(request):
     """API: Kombiniertes Diagramm - Anzahl Billa-Einkäufe + Durchschnittliche Einkaufshöhe"""
     category_id = 5  # 1.4. Supermarkt
@@ -3677,6 +3269,7 @@ def api_billa_combined_chart(request):
 # from django.db.models import Q
 
 @login_required
+@conditional_json(TRANSACTIONS)
 def api_supermarket_transactions_detail(request):
     """
     DEBUG: Zeigt alle Transaktionen die in Supermarkt-Berechnungen verwendet werden
@@ -3710,12 +3303,9 @@ def api_supermarket_transactions_detail(request):
     ).select_related('payee', 'category', 'account')
 
     # Filter nach Jahr/Monat wenn angegeben
-    if year:
-        sigi_query = sigi_query.filter(date__year=int(year))
-        robert_query = robert_query.filter(date__year=int(year))
-    if month:
-        sigi_query = sigi_query.filter(date__month=int(month))
-        robert_query = robert_query.filter(date__month=int(month))
+    if year or month:
+        sigi_query = sigi_query.filter(**period_filter(year, month))
+        robert_query = robert_query.filter(**period_filter(year, month))
 
     # Sortiere nach Datum
     sigi_query = sigi_query.order_by('-date')
@@ -3814,6 +3404,7 @@ def api_supermarket_transactions_detail(request):
 
 
 @login_required
+@conditional_json(TRANSACTIONS)
 def api_billa_transactions_detail(request):
     """
     DEBUG: Zeigt alle Billa-Transaktionen
@@ -3853,12 +3444,9 @@ def api_billa_transactions_detail(request):
     ).select_related('payee', 'category', 'account')
 
     # Filter nach Jahr/Monat
-    if year:
-        sigi_query = sigi_query.filter(date__year=int(year))
-        robert_query = robert_query.filter(date__year=int(year))
-    if month:
-        sigi_query = sigi_query.filter(date__month=int(month))
-        robert_query = robert_query.filter(date__month=int(month))
+    if year or month:
+        sigi_query = sigi_query.filter(**period_filter(year, month))
+        robert_query = robert_query.filter(**period_filter(year, month))
 
     sigi_query = sigi_query.order_by('-date')
     robert_query = robert_query.order_by('-date')
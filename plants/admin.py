@@ -40,7 +40,7 @@ class PlantImageInline(admin.TabularInline):
         if obj.image:
             return format_html(
                 '<img src="{}" style="height:60px;width:auto;border-radius:4px;object-fit:cover;" />',
-                obj.image.url
+                obj.thumb_url
             )
         return "—"
 
@@ -83,7 +83,7 @@ class PlantImageAdmin(admin.ModelAdmin):
         if obj.image:
             return format_html(
                 '<img src="{}" style="height:40px;width:auto;border-radius:3px;object-fit:cover;" />',
-                obj.image.url
+                obj.thumb_url
             )
         return "—"
 
@@ -92,6 +92,6 @@ class PlantImageAdmin(admin.ModelAdmin):
         if obj.image:
             return format_html(
                 '<img src="{}" style="max-height:240px;width:auto;border-radius:6px;object-fit:contain;" />',
-                obj.image.url
+                obj.medium_url
             )
         return "—"
@@ -0,0 +1,68 @@
+# plants/api.py
+"""
+JSON-API für Pflanzenfotos mit Cursor-Pagination (config.pagination).
+
+GET /plants/api/images/?plant=<id>|group=<id>|room=<id>&cursor=..&limit=..[&format=html]
+
+Sortierung wie die Timeline: captured_at absteigend (NULL zuletzt), dann id.
+Mit format=html enthält die Antwort zusätzlich die gerenderten
+Timeline-Karten zum direkten Einfügen.
+"""
+from django.contrib.auth.decorators import login_required
+from django.http import JsonResponse
+from django.template.loader import render_to_string
+
+from config.pagination import InvalidCursor, keyset_paginate, parse_limit
+
+from .models import PlantImage
+
+IMAGE_ORDERING = ['-captured_at', '-id']
+TIMELINE_PAGE_SIZE = 24
+
+
+def paginate_images(images, cursor=None, limit=TIMELINE_PAGE_SIZE):
+    return keyset_paginate(images, IMAGE_ORDERING, cursor, limit, nullable={'captured_at'})
+
+
+def serialize_image(image):
+    thumb = (image.derivatives or {}).get('thumb') or {}
+    return {
+        'id': image.id,
+        'plant_id': image.plant_id,
+        'plant': image.plant.name,
+        'captured_at': image.captured_at.isoformat() if image.captured_at else None,
+        'notes': image.notes,
+        'thumb_url': image.thumb_url,
+        'medium_url': image.medium_url,
+        'full_url': image.full_url,
+        'width': thumb.get('width'),
+        'height': thumb.get('height'),
+    }
+
+
+@login_required
+def plant_images_api(request):
+    """Fotos des Users, optional gefiltert nach Pflanze, Gruppe oder Raum"""
+    images = PlantImage.objects.filter(plant__user=request.user).select_related('plant')
+    filters = {'plant': 'plant_id', 'group': 'plant__group_id', 'room': 'plant__rooms__id'}
+    for param, lookup in filters.items():
+        value = request.GET.get(param)
+        if value:
+            if not value.isdigit():
+                return JsonResponse({'error': f'Ungültiger Parameter: {param}'}, status=400)
+            images = images.filter(**{lookup: int(value)})
+
+    try:
+        page = paginate_images(
+            images, request.GET.get('cursor'), parse_limit(request.GET.get('limit'), TIMELINE_PAGE_SIZE)
+        )
+    except InvalidCursor as e:
+        return JsonResponse({'error': str(e)}, status=400)
+
+    data = {
+        'results': [serialize_image(image) for image in page.items],
+        'next_cursor': page.next_cursor,
+    }
+    if request.GET.get('format') == 'html':
+        data['html'] = render_to_string('plants/_timeline_cards.html', {'images': page.items}, request)
+    return JsonResponse(data)
@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class PlantsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'plants'
+
+    def ready(self):
+        """
+        Signals für die denormalisierten Foto-Kennzahlen registrieren
+        """
+        import plants.signals  # noqa
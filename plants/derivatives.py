@@ -0,0 +1,151 @@
+# plants/derivatives.py
+"""
+Verkleinerte Varianten (thumb/medium/full) der Pflanzenfotos.
+
+Beim Upload (add_image, bulk_upload_photos) bzw. per Backfill
+(generate_plant_derivatives) wird das Original einmal geöffnet, die
+EXIF-Orientierung angewendet und pro Größe je eine WebP- und JPEG-Datei
+neben dem Original im selben Storage (PlantPhotoStorage) abgelegt:
+
+    plants/2025/10/Basilikum_20251029.jpg
+    plants/2025/10/Basilikum_20251029__thumb.webp
+    plants/2025/10/Basilikum_20251029__thumb.jpg
+    ...
+
+Die Keys landen in PlantImage.derivatives und werden von den Templates
+als srcset gerendert.
+"""
+import io
+import logging
+import os
+
+from django.core.files.base import ContentFile
+
+from config.lazy import lazy_module
+
+Image = lazy_module('PIL.Image')
+ImageOps = lazy_module('PIL.ImageOps')
+
+logger = logging.getLogger(__name__)
+
+# Name → maximale Kantenlänge in Pixel
+DERIVATIVE_SIZES = {
+    'thumb': 400,
+    'medium': 1024,
+    'full': 2048,
+}
+
+FORMATS = {
+    'webp': ('WEBP', {'quality': 80, 'method': 4}),
+    'jpeg': ('JPEG', {'quality': 82, 'optimize': True, 'progressive': True}),
+}
+
+EXTENSIONS = {'webp': 'webp', 'jpeg': 'jpg'}
+
+
+def derivative_name(original_name, size, fmt):
+    """'plants/2025/10/x.jpg' → 'plants/2025/10/x__thumb.webp'"""
+    base, _ = os.path.splitext(original_name)
+    return f'{base}__{size}.{EXTENSIONS[fmt]}'
+
+
+def _open_source(plant_image, source):
+    """Quelle öffnen: übergebene Datei/Bytes/Pfad, sonst das Original aus dem Storage"""
+    if source is None:
+        plant_image.image.open('rb')
+        try:
+            return Image.open(io.BytesIO(plant_image.image.read()))
+        finally:
+            plant_image.image.close()
+    if isinstance(source, (bytes, bytearray)):
+        return Image.open(io.BytesIO(source))
+    if hasattr(source, 'seek'):
+        source.seek(0)
+    return Image.open(source)
+
+
+def _to_rgb(image):
+    """Transparenz auf weißem Hintergrund, damit JPEG möglich ist"""
+    if image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info):
+        rgba = image.convert('RGBA')
+        background = Image.new('RGB', rgba.size, (255, 255, 255))
+        background.paste(rgba, mask=rgba.getchannel('A'))
+        return background
+    return image.convert('RGB')
+
+
+def render_derivatives(image):
+    """
+    Erzeugt alle Varianten im Speicher.
+    Rückgabe: {size: {'width', 'height', fmt: bytes, ...}}
+    """
+    image = _to_rgb(ImageOps.exif_transpose(image))
+    rendered = {}
+
+    for size, max_edge in DERIVATIVE_SIZES.items():
+        variant = image.copy()
+        # thumbnail() vergrößert nie - kleine Originale bleiben wie sie sind
+        variant.thumbnail((max_edge, max_edge), Image.LANCZOS)
+
+        entry = {'width': variant.width, 'height': variant.height}
+        for fmt, (pil_format, params) in FORMATS.items():
+            buffer = io.BytesIO()
+            variant.save(buffer, pil_format, **params)
+            entry[fmt] = buffer.getvalue()
+        rendered[size] = entry
+
+    return rendered
+
+
+def generate_derivatives(plant_image, source=None, save=True):
+    """
+    Varianten für ein PlantImage erzeugen, im Storage des Originals
+    ablegen und die Keys in plant_image.derivatives speichern.
+
+    source: optional die bereits geladene Datei (Upload, Pfad oder Bytes),
+    damit das Original nicht erneut aus R2 geladen werden muss.
+    """
+    storage = plant_image.image.storage
+    original_name = plant_image.image.name
+
+    with _open_source(plant_image, source) as image:
+        original_size = image.size
+        rendered = render_derivatives(image)
+
+    # Alte Varianten ersetzen (z.B. bei --force im Backfill)
+    delete_derivatives(plant_image)
+
+    derivatives = {'original': {'width': original_size[0], 'height': original_size[1]}}
+    for size, entry in rendered.items():
+        stored = {'width': entry['width'], 'height': entry['height']}
+        for fmt in FORMATS:
+            name = derivative_name(original_name, size, fmt)
+            stored[fmt] = storage.save(name, ContentFile(entry[fmt]))
+        derivatives[size] = stored
+
+    plant_image.derivatives = derivatives
+    if save:
+        plant_image.save(update_fields=['derivatives'])
+    return derivatives
+
+
+def delete_derivatives(plant_image):
+    """Gespeicherte Varianten aus dem Storage entfernen"""
+    storage = plant_image.image.storage
+    for size in DERIVATIVE_SIZES:
+        entry = (plant_image.derivatives or {}).get(size) or {}
+        for fmt in FORMATS:
+            if entry.get(fmt):
+                try:
+                    storage.delete(entry[fmt])
+                except Exception as e:
+                    logger.warning(f'Variante {entry[fmt]} konnte nicht gelöscht werden: {e}')
+
+
+def safe_generate_derivatives(plant_image, source=None):
+    """Wie generate_derivatives, aber ein Fehler bricht den Upload nicht ab"""
+    try:
+        return generate_derivatives(plant_image, source=source)
+    except Exception as e:
+        logger.warning(f'Varianten für PlantImage {plant_image.pk} fehlgeschlagen: {e}')
+        return None
@@ -1,15 +1,37 @@
 # plants/management/commands/bulk_upload_photos.py
-
+"""
+Bulk-Upload von Pflanzenfotos (Dateiname: pflanze_JJJJMMTT[_NN].jpg).
+
+Ablauf:
+1. Planung (Hauptthread): Dateinamen parsen, Gruppen/Pflanzen zuordnen,
+   bereits vorhandene Bilder mit EINER Abfrage über (plant_id, Dateiname)
+   aussortieren.
+2. Upload (--workers Threads): Datei + Varianten in den Storage schreiben.
+   S3Boto3Storage hält pro Thread einen eigenen boto3-Client, jeder Worker
+   verwendet seinen Client für alle weiteren Dateien wieder.
+3. Speichern (Hauptthread): PlantImage-Zeilen per bulk_create in Batches,
+   danach Cover/Zähler der betroffenen Pflanzen/Gruppen neu berechnen.
+
+Hochgeladene, aber noch nicht gespeicherte Bilder stehen in der
+Fortschrittsdatei (--state-file). Ein abgebrochener Lauf speichert sie
+beim nächsten Start ohne erneuten Upload; fertige Bilder werden über die
+Existenzprüfung übersprungen.
+"""
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from django.core.management.base import BaseCommand
 from django.core.files import File
 from django.contrib.auth.models import User
 from django.utils import timezone
+from django.utils.dateparse import parse_datetime
 from pathlib import Path
 from datetime import datetime
+import os
 import re
 import json
 
-from plants.models import Plant, PlantImage, PlantGroup
+from plants.derivatives import generate_derivatives
+from plants.models import Plant, PlantImage, PlantGroup, plant_image_upload_to
+from plants.stats import refresh_group_stats, refresh_plant_stats
 
 
 class Command(BaseCommand):
@@ -43,6 +65,24 @@ class Command(BaseCommand):
             action='store_true',
             help='Erstellt fehlende Pflanzen automatisch'
         )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=4,
+            help='Parallele Uploads (Standard: 4, 1 = sequenziell)'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=50,
+            help='PlantImage-Zeilen pro bulk_create (Standard: 50)'
+        )
+        parser.add_argument(
+            '--state-file',
+            type=str,
+            default=None,
+            help='Fortschrittsdatei für Wiederaufnahme (Standard: <Ordner>/.bulk_upload_state.json)'
+        )
         parser.add_argument(
             '--case-insensitive',
             action='store_true',
@@ -68,6 +108,7 @@ class Command(BaseCommand):
 
         # Gruppen-Mapping laden
         group_mapping_file = options['group_mapping']
+        self.plant_to_group = {}
         self.group_mapping = self._load_group_mapping(group_mapping_file)
         if self.group_mapping is None:
             self.stdout.write(self.style.WARNING(
@@ -110,25 +151,38 @@ class Command(BaseCommand):
             'created_groups': 0
         }
 
+        # 1. Planung
+        existing = self._existing_keys(user)
+        jobs = []
         for idx, image_file in enumerate(image_files, 1):
-            self.stdout.write(f'\n[{idx:3d}/{len(image_files)}] {image_file.name}')
-
-            result = self._process_image(image_file, user)
-
-            if result['status'] == 'success':
-                stats['success'] += 1
-                if result.get('plant_created'):
-                    stats['created_plants'] += 1
-                if result.get('group_created'):
-                    stats['created_groups'] += 1
-                self.stdout.write(self.style.SUCCESS(f'  ✅ {result["message"]}'))
+            result = self._plan_image(image_file, user, existing)
+            if result.get('plant_created'):
+                stats['created_plants'] += 1
+            if result.get('group_created'):
+                stats['created_groups'] += 1
+
+            if result['status'] == 'planned':
+                jobs.append(result)
+                if self.dry_run:
+                    stats['success'] += 1
+                    self.stdout.write(f'[{idx:3d}/{len(image_files)}] {image_file.name}')
+                    self.stdout.write(self.style.SUCCESS(f'  ✅ {result["message"]}'))
             elif result['status'] == 'skipped':
                 stats['skipped'] += 1
+                self.stdout.write(f'[{idx:3d}/{len(image_files)}] {image_file.name}')
                 self.stdout.write(self.style.WARNING(f'  ⊘ {result["message"]}'))
             else:
                 stats['errors'] += 1
+                self.stdout.write(f'[{idx:3d}/{len(image_files)}] {image_file.name}')
                 self.stdout.write(self.style.ERROR(f'  ❌ {result["message"]}'))
 
+        # 2./3. Upload und Speichern
+        if not self.dry_run:
+            state_file = Path(options['state_file'] or (
+                (source_path if source_path.is_dir() else source_path.parent) / '.bulk_upload_state.json'
+            ))
+            self._upload_jobs(jobs, stats, state_file, max(1, options['workers']), max(1, options['batch_size']))
+
         # Zusammenfassung
         self.stdout.write('\n' + '=' * 70)
         self.stdout.write(self.style.SUCCESS('📊 Zusammenfassung'))
@@ -234,8 +288,13 @@ class Command(BaseCommand):
         images = {p.resolve() for ext in exts for p in path.glob(f'*{ext}')}
         return sorted(images, key=lambda p: p.name.lower())
 
-    def _process_image(self, image_file, user):
-        """Verarbeitet ein einzelnes Bild"""
+    def _existing_keys(self, user):
+        """(plant_id, dateiname) aller vorhandenen Bilder des Users - eine Abfrage"""
+        names = PlantImage.objects.filter(plant__user=user).values_list('plant_id', 'image')
+        return {(plant_id, os.path.basename(name).lower()) for plant_id, name in names}
+
+    def _plan_image(self, image_file, user, existing):
+        """Ordnet ein Bild Pflanze/Gruppe zu und prüft, ob es schon existiert"""
         try:
             # Dateinamen parsen: pflanze_JJJJMMTT_NN.jpg
             parsed = self._parse_filename(image_file.stem)
@@ -266,45 +325,28 @@ class Command(BaseCommand):
             if not plant_result['plant']:
                 return {
                     'status': 'skipped',
-                    'message': f'Pflanze "{plant_name}" nicht gefunden (nutze --create-missing)'
+                    'message': f'Pflanze "{plant_name}" nicht gefunden (nutze --create-missing)',
+                    'group_created': group_created
                 }
 
             plant = plant_result['plant']
-            plant_created = plant_result.get('created', False)
 
-            # Prüfe ob Bild bereits existiert
-            existing = PlantImage.objects.filter(
-                plant=plant,
-                image__icontains=image_file.name
-            ).exists()
-
-            if existing and not self.dry_run:
+            # Prüfe ob Bild bereits existiert (aus dem Vorab-Set)
+            if (plant.id, image_file.name.lower()) in existing and not self.dry_run:
                 return {
                     'status': 'skipped',
                     'message': f'{plant.name} - Datei "{image_file.name}" bereits vorhanden'
                 }
 
-            # Upload durchführen
-            if not self.dry_run:
-                with open(image_file, 'rb') as f:
-                    plant_image = PlantImage(
-                        plant=plant,
-                        captured_at=captured_date
-                    )
-                    plant_image.image.save(
-                        image_file.name,
-                        File(f),
-                        save=True
-                    )
-
             # Message mit Gruppen-Info
             group_info = f" [{group_name}]" if group_name else ""
-            message = f'{plant.name}{group_info} am {captured_date.strftime("%d.%m.%Y")}'
-
             return {
-                'status': 'success',
-                'message': message,
-                'plant_created': plant_created,
+                'status': 'planned',
+                'path': image_file,
+                'plant': plant,
+                'captured_at': captured_date,
+                'message': f'{plant.name}{group_info} am {captured_date.strftime("%d.%m.%Y")}',
+                'plant_created': plant_result.get('created', False),
                 'group_created': group_created
             }
 
@@ -314,6 +356,114 @@ class Command(BaseCommand):
                 'message': f'Fehler: {str(e)}'
             }
 
+    def _upload(self, job):
+        """Worker: Original + Varianten hochladen, PlantImage noch NICHT speichern"""
+        plant_image = PlantImage(plant=job['plant'], captured_at=job['captured_at'])
+        storage = plant_image.image.storage
+        with open(job['path'], 'rb') as f:
+            name = plant_image_upload_to(plant_image, job['path'].name)
+            plant_image.image.name = storage.save(name, File(f))
+        try:
+            # Varianten aus der lokalen Datei erzeugen
+            generate_derivatives(plant_image, source=job['path'], save=False)
+        except Exception as e:
+            self.stderr.write(f'  ⚠️  Varianten für {job["path"].name} fehlgeschlagen: {e}')
+        return plant_image
+
+    def _upload_jobs(self, jobs, stats, state_file, workers, batch_size):
+        """Parallele Uploads, Speichern in Batches, Fortschritt in state_file"""
+        pending = self._load_state(state_file)
+        batch = []
+
+        def flush():
+            if not batch:
+                return
+            PlantImage.objects.bulk_create(batch)
+            # bulk_create löst keine Signals aus
+            plant_ids = {img.plant_id for img in batch}
+            refresh_plant_stats(plant_ids)
+            refresh_group_stats(Plant.objects.filter(pk__in=plant_ids).values_list('group_id', flat=True))
+            for img in batch:
+                pending.pop(img._state_key, None)
+            batch.clear()
+            self._save_state(state_file, pending)
+
+        # Reste eines abgebrochenen Laufs: bereits hochgeladen, nur speichern
+        jobs_by_key = {str(job['path']): job for job in jobs}
+        for key, entry in list(pending.items()):
+            job = jobs_by_key.pop(key, None)
+            if job is None:
+                continue
+            plant_image = PlantImage(
+                plant=job['plant'],
+                captured_at=parse_datetime(entry['captured_at']),
+                image=entry['image'],
+                derivatives=entry.get('derivatives') or {},
+            )
+            plant_image._state_key = key
+            batch.append(plant_image)
+            stats['success'] += 1
+            self.stdout.write(self.style.SUCCESS(f'  ↻ {job["path"].name} (aus abgebrochenem Lauf)'))
+        flush()
+
+        remaining = list(jobs_by_key.values())
+        if remaining:
+            self.stdout.write(f'\n⬆️  Lade {len(remaining)} Bilder mit {workers} Worker(n) hoch...')
+
+        pool = ThreadPoolExecutor(max_workers=workers)
+        try:
+            futures = {pool.submit(self._upload, job): job for job in remaining}
+            for idx, future in enumerate(as_completed(futures), 1):
+                job = futures[future]
+                self.stdout.write(f'\n[{idx:3d}/{len(remaining)}] {job["path"].name}')
+                try:
+                    plant_image = future.result()
+                except Exception as e:
+                    stats['errors'] += 1
+                    self.stdout.write(self.style.ERROR(f'  ❌ Fehler: {e}'))
+                    continue
+
+                key = str(job['path'])
+                plant_image._state_key = key
+                pending[key] = {
+                    'captured_at': plant_image.captured_at.isoformat(),
+                    'image': plant_image.image.name,
+                    'derivatives': plant_image.derivatives,
+                }
+                self._save_state(state_file, pending)
+                batch.append(plant_image)
+                stats['success'] += 1
+                self.stdout.write(self.style.SUCCESS(f'  ✅ {job["message"]}'))
+
+                if len(batch) >= batch_size:
+                    flush()
+        finally:
+            # Bei Abbruch (Strg+C) keine weiteren Uploads starten
+            pool.shutdown(wait=True, cancel_futures=True)
+            flush()
+
+    def _load_state(self, state_file):
+        if not state_file.exists():
+            return {}
+        try:
+            data = json.loads(state_file.read_text(encoding='utf-8'))
+        except (OSError, json.JSONDecodeError):
+            return {}
+        pending = data.get('pending', {})
+        if pending:
+            self.stdout.write(self.style.WARNING(
+                f'\n↻ Fortschrittsdatei gefunden: {len(pending)} hochgeladene, noch nicht gespeicherte Bilder'
+            ))
+        return pending
+
+    def _save_state(self, state_file, pending):
+        if not pending:
+            state_file.unlink(missing_ok=True)
+            return
+        tmp = state_file.with_suffix('.tmp')
+        tmp.write_text(json.dumps({'pending': pending}, indent=2), encoding='utf-8')
+        tmp.replace(state_file)
+
     def _parse_filename(self, filename):
         """
         Parst Dateinamen im Format: pflanze_JJJJMMTT oder pflanze_JJJJMMTT_NN
@@ -0,0 +1,65 @@
+# plants/management/commands/generate_plant_derivatives.py
+"""
+Backfill: erzeugt thumb/medium/full-Varianten (WebP + JPEG) für bestehende
+Pflanzenfotos, die noch keine haben.
+
+Beispiel:
+    python manage.py generate_plant_derivatives --dry-run
+    python manage.py generate_plant_derivatives --plant 12 --force
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from plants.derivatives import generate_derivatives
+from plants.models import PlantImage
+
+
+class Command(BaseCommand):
+    help = 'Erzeugt verkleinerte Varianten für bestehende Pflanzenfotos'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help='Auch Bilder mit vorhandenen Varianten neu erzeugen')
+        parser.add_argument('--plant', type=int, help='Nur Bilder dieser Pflanze (ID)')
+        parser.add_argument('--limit', type=int, help='Maximal so viele Bilder verarbeiten')
+        parser.add_argument('--dry-run', action='store_true', help='Nur anzeigen, was verarbeitet würde')
+
+    def handle(self, *args, **options):
+        images = PlantImage.objects.select_related('plant').order_by('id')
+        if options['plant']:
+            images = images.filter(plant_id=options['plant'])
+        if not options['force']:
+            images = images.filter(derivatives={})
+        if options['limit']:
+            images = images[:options['limit']]
+
+        images = list(images)
+        self.stdout.write('=' * 70)
+        self.stdout.write(self.style.SUCCESS(f'🖼️  Varianten-Backfill: {len(images)} Bilder'))
+        self.stdout.write('=' * 70)
+
+        if options['dry_run']:
+            for image in images:
+                self.stdout.write(f'  • {image.image.name}')
+            self.stdout.write(self.style.WARNING('\n⚠️  DRY RUN - nichts erzeugt'))
+            return
+
+        done = errors = 0
+        start = time.perf_counter()
+        for idx, image in enumerate(images, 1):
+            try:
+                derivatives = generate_derivatives(image)
+                done += 1
+                thumb = derivatives['thumb']
+                self.stdout.write(
+                    f'[{idx:4d}/{len(images)}] ✅ {image.image.name} '
+                    f'({derivatives["original"]["width"]}x{derivatives["original"]["height"]} → '
+                    f'thumb {thumb["width"]}x{thumb["height"]})'
+                )
+            except Exception as e:
+                errors += 1
+                self.stdout.write(self.style.ERROR(f'[{idx:4d}/{len(images)}] ❌ {image.image.name}: {e}'))
+
+        self.stdout.write(f'\n✅ Erzeugt: {done}')
+        self.stdout.write(f'❌ Fehler: {errors}')
+        self.stdout.write(f'⏱️  Dauer: {time.perf_counter() - start:.1f}s')
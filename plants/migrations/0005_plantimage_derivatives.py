@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 09:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('plants', '0004_plantroom_plant_rooms'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='plantimage',
+            name='derivatives',
+            field=models.JSONField(blank=True, default=dict, verbose_name='Varianten'),
+        ),
+    ]
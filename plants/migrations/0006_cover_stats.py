@@ -0,0 +1,82 @@
+# Generated by Django 5.2.18 on 2026-10-19 09:44
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, F, IntegerField, Max, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_cover_stats(apps, schema_editor):
+    """Einmalig befüllen - entspricht plants.stats.refresh_all()"""
+    Plant = apps.get_model('plants', 'Plant')
+    PlantGroup = apps.get_model('plants', 'PlantGroup')
+    PlantImage = apps.get_model('plants', 'PlantImage')
+
+    images = PlantImage.objects.filter(plant_id=OuterRef('pk'))
+    per_plant = images.order_by().values('plant_id')
+    Plant.objects.update(
+        cover_image=Subquery(
+            images.order_by(F('captured_at').desc(nulls_last=True), '-id').values('pk')[:1]
+        ),
+        photo_count=Coalesce(
+            Subquery(per_plant.annotate(n=Count('pk')).values('n'), output_field=IntegerField()),
+            Value(0),
+        ),
+        last_photo_at=Subquery(per_plant.annotate(last=Max('captured_at')).values('last')),
+    )
+
+    plants = Plant.objects.filter(group_id=OuterRef('pk'))
+    per_group = plants.order_by().values('group_id')
+    PlantGroup.objects.update(
+        cover_image=Subquery(
+            plants.filter(cover_image__isnull=False)
+            .order_by(F('last_photo_at').desc(nulls_last=True), '-cover_image_id')
+            .values('cover_image_id')[:1]
+        ),
+        photo_count=Coalesce(
+            Subquery(per_group.annotate(n=Sum('photo_count')).values('n'), output_field=IntegerField()),
+            Value(0),
+        ),
+        last_photo_at=Subquery(per_group.annotate(last=Max('last_photo_at')).values('last')),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('plants', '0005_plantimage_derivatives'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='plant',
+            name='cover_image',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='plants.plantimage', verbose_name='Cover-Bild'),
+        ),
+        migrations.AddField(
+            model_name='plant',
+            name='last_photo_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True, verbose_name='Letztes Foto'),
+        ),
+        migrations.AddField(
+            model_name='plant',
+            name='photo_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Anzahl Fotos'),
+        ),
+        migrations.AddField(
+            model_name='plantgroup',
+            name='cover_image',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='plants.plantimage', verbose_name='Cover-Bild'),
+        ),
+        migrations.AddField(
+            model_name='plantgroup',
+            name='last_photo_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True, verbose_name='Letztes Foto'),
+        ),
+        migrations.AddField(
+            model_name='plantgroup',
+            name='photo_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Anzahl Fotos'),
+        ),
+        migrations.RunPython(backfill_cover_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-19 09:50
+#
+# NULLS LAST im Index nur auf PostgreSQL; andere Datenbanken (z.B. SQLite)
+# erlauben den Modifier in CREATE INDEX nicht und bekommen einen einfachen
+# Index auf denselben Spalten.
+
+from django.db import migrations, models
+
+TIMELINE_INDEX = models.Index(models.F('plant'), models.OrderBy(models.F('captured_at'), descending=True, nulls_last=True), models.OrderBy(models.F('id'), descending=True), name='plantimage_plant_timeline_idx')
+
+
+def add_index(apps, schema_editor):
+    model = apps.get_model('plants', 'PlantImage')
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.add_index(model, TIMELINE_INDEX)
+    else:
+        schema_editor.add_index(model, models.Index(fields=['plant', '-captured_at', '-id'], name=TIMELINE_INDEX.name))
+
+
+def remove_index(apps, schema_editor):
+    schema_editor.remove_index(apps.get_model('plants', 'PlantImage'), TIMELINE_INDEX)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('plants', '0006_cover_stats'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AddIndex(model_name='plantimage', index=TIMELINE_INDEX),
+            ],
+            database_operations=[
+                migrations.RunPython(add_index, remove_index),
+            ],
+        ),
+    ]
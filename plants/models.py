@@ -4,21 +4,25 @@ from django.contrib.auth.models import User
 from django.utils import timezone
 from django.conf import settings
 
+from finance.storages import LazyStorage, r2_configured
+
+
+class LazyPlantPhotoStorage(LazyStorage):
+    storage_class = "plants.storage.PlantPhotoStorage"
+
 
 def get_plant_storage():
     """
     Liefert den Storage für Plant-Fotos (R2, falls aktiviert).
     Bei fehlender Konfiguration: None => Django FileSystemStorage.
+    R2 wird erst beim ersten Zugriff instanziiert (boto3 nicht beim Start laden).
     """
     if not settings.configured or not getattr(settings, "USE_R2_STORAGE", False):
         return None
-
-    from .storage import PlantPhotoStorage  # Lazy import
-    try:
-        return PlantPhotoStorage()
-    except ValueError:
+    if not r2_configured():
         # Fallback auf Default-Storage (lokal), wenn Credentials fehlen
         return None
+    return LazyPlantPhotoStorage()
 
 
 def plant_image_upload_to(instance, filename: str) -> str:
@@ -57,6 +61,13 @@ class PlantGroup(models.Model):
     description = models.TextField(blank=True, verbose_name="Beschreibung")
     created_at = models.DateTimeField(auto_now_add=True)
     user = models.ForeignKey(User, on_delete=models.CASCADE)
+    # Denormalisiert, gepflegt über plants/signals.py (siehe plants/stats.py)
+    cover_image = models.ForeignKey(
+        "PlantImage", on_delete=models.SET_NULL, null=True, blank=True,
+        related_name="+", editable=False, verbose_name="Cover-Bild",
+    )
+    photo_count = models.PositiveIntegerField(default=0, editable=False, verbose_name="Anzahl Fotos")
+    last_photo_at = models.DateTimeField(null=True, blank=True, editable=False, verbose_name="Letztes Foto")
 
     class Meta:
         ordering = ["name"]
@@ -90,6 +101,13 @@ class Plant(models.Model):
     )
     created_at = models.DateTimeField(auto_now_add=True)
     user = models.ForeignKey(User, on_delete=models.CASCADE)
+    # Denormalisiert, gepflegt über plants/signals.py (siehe plants/stats.py)
+    cover_image = models.ForeignKey(
+        "PlantImage", on_delete=models.SET_NULL, null=True, blank=True,
+        related_name="+", editable=False, verbose_name="Cover-Bild",
+    )
+    photo_count = models.PositiveIntegerField(default=0, editable=False, verbose_name="Anzahl Fotos")
+    last_photo_at = models.DateTimeField(null=True, blank=True, editable=False, verbose_name="Letztes Foto")
 
     class Meta:
         ordering = ["group__name", "name"]
@@ -100,10 +118,10 @@ class Plant(models.Model):
         return f"{self.group.name} → {self.name}" if self.group else self.name
 
     def latest_image(self):
-        return self.images.first()
+        return self.cover_image
 
     def image_count(self):
-        return self.images.count()
+        return self.photo_count
 
 
 class PlantImage(models.Model):
@@ -114,12 +132,60 @@ class PlantImage(models.Model):
     )
     captured_at = models.DateTimeField(null=True, blank=True, db_index=True, verbose_name="Aufnahmedatum")
     notes = models.TextField(blank=True, verbose_name="Notizen")
+    # Keys der verkleinerten Varianten (siehe plants/derivatives.py):
+    # {"thumb": {"width": .., "height": .., "webp": key, "jpeg": key}, "medium": {..}, "full": {..}}
+    derivatives = models.JSONField(default=dict, blank=True, verbose_name="Varianten")
 
     class Meta:
         ordering = ["-captured_at"]
+        # Keyset-Pagination der Timeline (plants/api.py)
+        indexes = [
+            models.Index(
+                "plant", models.F("captured_at").desc(nulls_last=True), models.F("id").desc(),
+                name="plantimage_plant_timeline_idx",
+            ),
+        ]
         verbose_name = "Pflanzenbild"
         verbose_name_plural = "Pflanzenbilder"
 
     def __str__(self):
         ts = (self.captured_at or timezone.now()).strftime("%d.%m.%Y %H:%M")
-        return f"{self.plant.name} - {ts}"
\ No newline at end of file
+        return f"{self.plant.name} - {ts}"
+
+    def variant_url(self, size="medium", fmt="jpeg"):
+        """URL einer Variante; Fallback auf das Original, solange keine existiert"""
+        key = (self.derivatives or {}).get(size, {}).get(fmt)
+        return self.image.storage.url(key) if key else self.image.url
+
+    def srcset(self, fmt="jpeg"):
+        """srcset-String über alle vorhandenen Varianten ('' ohne Varianten)"""
+        entries = [
+            (entry["width"], entry[fmt])
+            for entry in (self.derivatives or {}).values()
+            if isinstance(entry, dict) and entry.get(fmt)
+        ]
+        return ", ".join(f"{self.image.storage.url(key)} {width}w" for width, key in sorted(entries))
+
+    @property
+    def has_derivatives(self):
+        return bool((self.derivatives or {}).get("thumb"))
+
+    @property
+    def thumb_url(self):
+        return self.variant_url("thumb")
+
+    @property
+    def medium_url(self):
+        return self.variant_url("medium")
+
+    @property
+    def full_url(self):
+        return self.variant_url("full")
+
+    @property
+    def webp_srcset(self):
+        return self.srcset("webp")
+
+    @property
+    def jpeg_srcset(self):
+        return self.srcset("jpeg")
\ No newline at end of file
@@ -0,0 +1,62 @@
+# plants/signals.py
+"""
+Hält die denormalisierten Foto-Kennzahlen (cover_image, photo_count,
+last_photo_at) von Plant und PlantGroup aktuell, siehe plants/stats.py.
+"""
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .models import Plant, PlantGroup, PlantImage
+from .stats import refresh_group_stats, refresh_plant_stats
+
+# Änderungen an diesen Feldern beeinflussen Cover/Anzahl/Datum nicht
+_IRRELEVANT_FIELDS = {'derivatives', 'notes'}
+_STATS_FIELDS = {'cover_image', 'photo_count', 'last_photo_at'}
+
+
+def _refresh_for_plant(plant_id):
+    refresh_plant_stats([plant_id])
+    group_id = Plant.objects.filter(pk=plant_id).values_list('group_id', flat=True).first()
+    refresh_group_stats([group_id])
+
+
+@receiver(post_save, sender=PlantImage)
+def plant_image_saved(sender, instance, update_fields=None, raw=False, **kwargs):
+    if raw or (update_fields and set(update_fields) <= _IRRELEVANT_FIELDS):
+        return
+    _refresh_for_plant(instance.plant_id)
+
+
+@receiver(post_delete, sender=PlantImage)
+def plant_image_deleted(sender, instance, **kwargs):
+    _refresh_for_plant(instance.plant_id)
+
+
+@receiver(pre_save, sender=Plant)
+def remember_previous_group(sender, instance, raw=False, **kwargs):
+    instance._previous_group_id = None
+    if instance.pk and not raw:
+        instance._previous_group_id = (
+            Plant.objects.filter(pk=instance.pk).values_list('group_id', flat=True).first()
+        )
+
+
+@receiver(post_save, sender=Plant)
+def plant_saved(sender, instance, update_fields=None, raw=False, **kwargs):
+    if raw or (update_fields and not set(update_fields) & (_STATS_FIELDS | {'group'})):
+        return
+    # save() schreibt die (evtl. veralteten) Kennzahlen der Instanz zurück
+    refresh_plant_stats([instance.pk])
+    refresh_group_stats({getattr(instance, '_previous_group_id', None), instance.group_id})
+
+
+@receiver(post_save, sender=PlantGroup)
+def plant_group_saved(sender, instance, created=False, update_fields=None, raw=False, **kwargs):
+    if raw or created or (update_fields and not set(update_fields) & _STATS_FIELDS):
+        return
+    refresh_group_stats([instance.pk])
+
+
+@receiver(post_delete, sender=Plant)
+def plant_deleted(sender, instance, **kwargs):
+    refresh_group_stats([instance.group_id])
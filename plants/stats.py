@@ -0,0 +1,69 @@
+# plants/stats.py
+"""
+Denormalisierte Foto-Kennzahlen für Plant und PlantGroup.
+
+cover_image, photo_count und last_photo_at werden bei jeder Änderung an
+PlantImage/Plant (siehe plants/signals.py) nur für die betroffenen
+Pflanzen bzw. Gruppen neu berechnet - jeweils ein UPDATE mit korrelierten
+Subqueries. Die Übersichten lesen die Felder dann direkt und kosten
+O(Gruppen) statt O(Bilder).
+
+Reihenfolge "neuestes Bild": captured_at absteigend (NULL zuletzt), dann id.
+"""
+from django.db.models import Count, F, IntegerField, Max, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+from .models import Plant, PlantGroup, PlantImage
+
+
+def _ids(ids):
+    return {i for i in ids if i is not None}
+
+
+def refresh_plant_stats(plant_ids):
+    """Cover, Anzahl und letztes Aufnahmedatum der Pflanzen neu berechnen"""
+    plant_ids = _ids(plant_ids)
+    if not plant_ids:
+        return
+
+    images = PlantImage.objects.filter(plant_id=OuterRef('pk'))
+    newest = images.order_by(F('captured_at').desc(nulls_last=True), '-id')
+    per_plant = images.order_by().values('plant_id')
+
+    Plant.objects.filter(pk__in=plant_ids).update(
+        cover_image=Subquery(newest.values('pk')[:1]),
+        photo_count=Coalesce(
+            Subquery(per_plant.annotate(n=Count('pk')).values('n'), output_field=IntegerField()),
+            Value(0),
+        ),
+        last_photo_at=Subquery(per_plant.annotate(last=Max('captured_at')).values('last')),
+    )
+
+
+def refresh_group_stats(group_ids):
+    """Gruppenwerte aus den (bereits aktuellen) Pflanzenwerten ableiten"""
+    group_ids = _ids(group_ids)
+    if not group_ids:
+        return
+
+    plants = Plant.objects.filter(group_id=OuterRef('pk'))
+    per_group = plants.order_by().values('group_id')
+
+    PlantGroup.objects.filter(pk__in=group_ids).update(
+        cover_image=Subquery(
+            plants.filter(cover_image__isnull=False)
+            .order_by(F('last_photo_at').desc(nulls_last=True), '-cover_image_id')
+            .values('cover_image_id')[:1]
+        ),
+        photo_count=Coalesce(
+            Subquery(per_group.annotate(n=Sum('photo_count')).values('n'), output_field=IntegerField()),
+            Value(0),
+        ),
+        last_photo_at=Subquery(per_group.annotate(last=Max('last_photo_at')).values('last')),
+    )
+
+
+def refresh_all():
+    """Alle Pflanzen und Gruppen neu berechnen (Backfill/Reparatur)"""
+    refresh_plant_stats(Plant.objects.values_list('pk', flat=True))
+    refresh_group_stats(PlantGroup.objects.values_list('pk', flat=True))
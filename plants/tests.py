@@ -1,3 +1,196 @@
-from django.test import TestCase
+import io
+import json
+import tempfile
+from datetime import datetime, timezone
+from pathlib import Path
+from unittest.mock import patch
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+from django.core.management import call_command
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from PIL import Image
+
+from .derivatives import DERIVATIVE_SIZES, derivative_name, render_derivatives
+from .models import Plant, PlantGroup, PlantImage
+from .api import paginate_images, plant_images_api
+from .views import image_upload_confirm, image_upload_url
+
+
+class DerivativeTests(SimpleTestCase):
+    def test_render_derivatives_downscales_and_keeps_aspect(self):
+        image = Image.new('RGBA', (3000, 1500), (0, 128, 0, 128))
+
+        rendered = render_derivatives(image)
+
+        self.assertEqual(set(rendered), set(DERIVATIVE_SIZES))
+        self.assertEqual((rendered['thumb']['width'], rendered['thumb']['height']), (400, 200))
+        self.assertEqual(rendered['full']['width'], 2048)
+        self.assertEqual(Image.open(io.BytesIO(rendered['thumb']['webp'])).format, 'WEBP')
+        self.assertEqual(Image.open(io.BytesIO(rendered['medium']['jpeg'])).size, (1024, 512))
+
+    def test_small_originals_are_not_upscaled(self):
+        rendered = render_derivatives(Image.new('RGB', (300, 200)))
+        self.assertEqual((rendered['full']['width'], rendered['full']['height']), (300, 200))
+
+    def test_derivative_name(self):
+        self.assertEqual(derivative_name('plants/2025/10/x.jpeg', 'thumb', 'jpeg'), 'plants/2025/10/x__thumb.jpg')
+        self.assertEqual(derivative_name('plants/2025/10/x.jpg', 'full', 'webp'), 'plants/2025/10/x__full.webp')
+
+
+class CoverStatsTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('sigi', password='x')
+        self.group = PlantGroup.objects.create(name='Kräuter', user=self.user)
+        self.other = PlantGroup.objects.create(name='Balkon', user=self.user)
+        self.plant = Plant.objects.create(name='Basilikum', group=self.group, user=self.user)
+
+    def add_image(self, day):
+        return PlantImage.objects.create(
+            plant=self.plant, image=f'plants/2025/10/b_{day}.jpg',
+            captured_at=datetime(2025, 10, day, tzinfo=timezone.utc),
+        )
+
+    def test_stats_follow_image_changes(self):
+        self.add_image(1)
+        newest = self.add_image(5)
+        self.add_image(3)
+
+        self.plant.refresh_from_db()
+        self.group.refresh_from_db()
+        self.assertEqual(self.plant.photo_count, 3)
+        self.assertEqual(self.plant.cover_image_id, newest.id)
+        self.assertEqual(self.group.cover_image_id, newest.id)
+        self.assertEqual(self.group.last_photo_at.day, 5)
+
+        newest.delete()
+        self.group.refresh_from_db()
+        self.assertEqual(self.group.photo_count, 2)
+        self.assertEqual(self.group.last_photo_at.day, 3)
+
+    def test_group_change_moves_stats(self):
+        image = self.add_image(2)
+        self.plant.group = self.other
+        self.plant.save()
+
+        self.group.refresh_from_db()
+        self.other.refresh_from_db()
+        self.assertEqual((self.group.photo_count, self.group.cover_image_id), (0, None))
+        self.assertEqual((self.other.photo_count, self.other.cover_image_id), (1, image.id))
+
+
+class BulkUploadPhotosTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('sigi', password='x')
+        self.media = tempfile.TemporaryDirectory()
+        self.source = tempfile.TemporaryDirectory()
+        self.addCleanup(self.media.cleanup)
+        self.addCleanup(self.source.cleanup)
+        for name in ['Basilikum_20251001.jpg', 'Basilikum_20251003_01.jpg', 'Minze_20251002.jpg']:
+            Image.new('RGB', (800, 600), (0, 120, 0)).save(Path(self.source.name) / name)
+
+    def upload(self, *args):
+        with override_settings(MEDIA_ROOT=self.media.name):
+            call_command(
+                'bulk_upload_photos', self.source.name, '--create-missing',
+                '--group-mapping', str(Path(self.source.name) / 'fehlt.json'), *args,
+                stdout=io.StringIO(),
+            )
+
+    def test_parallel_upload_is_idempotent(self):
+        self.upload('--workers', '3', '--batch-size', '2')
+        self.upload('--workers', '3')
+
+        self.assertEqual(PlantImage.objects.count(), 3)
+        basilikum = Plant.objects.get(name='Basilikum')
+        self.assertEqual(basilikum.photo_count, 2)
+        self.assertIn('Basilikum_20251003_01', basilikum.cover_image.image.name)
+        self.assertTrue(all(img.has_derivatives for img in PlantImage.objects.all()))
+        self.assertFalse((Path(self.source.name) / '.bulk_upload_state.json').exists())
+
+    def test_resume_saves_pending_uploads_without_reupload(self):
+        plant = Plant.objects.create(name='Minze', user=self.user)
+        state_file = Path(self.source.name) / '.bulk_upload_state.json'
+        state_file.write_text(json.dumps({'pending': {
+            str((Path(self.source.name) / 'Minze_20251002.jpg').resolve()): {
+                'captured_at': '2025-10-02T00:00:00+02:00',
+                'image': 'plants/2025/10/Minze_20251002.jpg',
+                'derivatives': {},
+            },
+        }}))
+
+        self.upload('--workers', '2')
+
+        minze = PlantImage.objects.get(plant=plant)
+        self.assertEqual(minze.image.name, 'plants/2025/10/Minze_20251002.jpg')
+        self.assertEqual(PlantImage.objects.count(), 3)
+        self.assertFalse(state_file.exists())
+
+
+class DirectUploadFallbackTests(TestCase):
+    def test_upload_url_without_r2_falls_back(self):
+        user = User.objects.create_user('sigi', password='x')
+        plant = Plant.objects.create(name='Minze', user=user)
+        request = RequestFactory().post('/', {'content_type': 'image/jpeg'})
+        request.user = user
+
+        response = image_upload_url(request, plant.id)
+
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(json.loads(response.content), {'direct': False})
+
+    def test_confirm_token_is_single_use(self):
+        user = User.objects.create_user('sigi', password='x')
+        plant = Plant.objects.create(name='Minze', user=user)
+        payload = {'name': 'plants/2025/10/Minze.jpg', 'plant': plant.id, 'captured_at': '2025-10-01T12:00:00+00:00'}
+
+        with tempfile.TemporaryDirectory() as root:
+            storage = FileSystemStorage(location=root)
+            buffer = io.BytesIO()
+            Image.new('RGB', (40, 30)).save(buffer, 'JPEG')
+            storage.save(payload['name'], ContentFile(buffer.getvalue()))
+
+            with patch('plants.views._plant_photo_storage', return_value=storage), \
+                    patch('plants.views.confirm_upload', return_value=payload), \
+                    patch('plants.views.safe_generate_derivatives'):
+                responses = []
+                for _ in range(2):
+                    request = RequestFactory().post('/', {'token': 'signed'})
+                    request.user = user
+                    responses.append(image_upload_confirm(request, plant.id))
+
+        self.assertEqual([r.status_code for r in responses], [200, 409])
+        self.assertEqual(PlantImage.objects.filter(plant=plant).count(), 1)
+
+
+class ImagePaginationTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('sigi', password='x')
+        self.plant = Plant.objects.create(name='Basilikum', user=self.user)
+        same = datetime(2025, 10, 2, 12, 0, 0, 123456, tzinfo=timezone.utc)
+        captured = [datetime(2025, 10, 1, tzinfo=timezone.utc), same, same, None, datetime(2025, 10, 3, tzinfo=timezone.utc)]
+        self.images = [
+            PlantImage.objects.create(plant=self.plant, image=f'plants/{i}.jpg', captured_at=c)
+            for i, c in enumerate(captured)
+        ]
+
+    def test_cursor_walks_all_images_in_timeline_order(self):
+        seen, cursor = [], None
+        while True:
+            page = paginate_images(self.plant.images.all(), cursor, limit=2)
+            seen += [img.id for img in page.items]
+            if not page.has_next:
+                break
+            cursor = page.next_cursor
+
+        i = [img.id for img in self.images]
+        self.assertEqual(seen, [i[4], i[2], i[1], i[0], i[3]])
+
+    def test_api_rejects_invalid_cursor(self):
+        request = RequestFactory().get('/', {'plant': self.plant.id, 'cursor': 'kaputt'})
+        request.user = self.user
+
+        response = plant_images_api(request)
+
+        self.assertEqual(response.status_code, 400)
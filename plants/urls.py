@@ -1,5 +1,5 @@
 from django.urls import path
-from . import views
+from . import api, views
 
 app_name = 'plants'
 
@@ -9,6 +9,9 @@ urlpatterns = [
     path('', views.plant_list, name='plant_list'),
     path('<int:plant_id>/', views.plant_timeline, name='plant_timeline'),
     path('<int:plant_id>/add-image/', views.add_image, name='add_image'),
+    path('<int:plant_id>/upload-url/', views.image_upload_url, name='image_upload_url'),
+    path('<int:plant_id>/upload-confirm/', views.image_upload_confirm, name='image_upload_confirm'),
+    path('api/images/', api.plant_images_api, name='plant_images_api'),
     path('create/', views.create_plant, name='create_plant'),
     path('<int:plant_id>/edit/', views.edit_plant, name='edit_plant'),        # ← NEU
     path('<int:plant_id>/delete/', views.delete_plant, name='delete_plant'),  # ← NEU
@@ -1,14 +1,22 @@
-from django.http import HttpResponseBadRequest
+from django.http import HttpResponseBadRequest, JsonResponse
+from django.views.decorators.http import require_POST
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.utils import timezone
 from .models import Plant, PlantImage, PlantGroup, PlantRoom
+from .api import paginate_images
+from .derivatives import safe_generate_derivatives
+from finance.storages.presigned import UploadTokenError, confirm_upload, issue_upload, supports_presigned
 from django.core.files.base import ContentFile
-from django.db.models import Count, Max
-from PIL import Image, ExifTags
-import base64, os, re
+from django.db import transaction
+from django.db.models import Count
+from config.lazy import lazy_module
+import base64, io, os, re
 from datetime import datetime
 
+Image = lazy_module('PIL.Image')
+ExifTags = lazy_module('PIL.ExifTags')
+
 @login_required
 def plant_group_list(request):
     """
@@ -18,32 +26,15 @@ def plant_group_list(request):
     - Letztes Foto-Datum
     - Cover-Bild (letztes Bild aus der Gruppe, wenn vorhanden)
     """
+    # photo_count, last_photo_at und cover_image sind denormalisiert
+    # (plants/stats.py) - die Seite kostet O(Gruppen) statt O(Bilder)
     groups = (
         PlantGroup.objects
-        .annotate(
-            plant_count=Count("plants", distinct=True),
-            photo_count=Count("plants__images", distinct=True),
-            last_photo_at=Max("plants__images__captured_at"),
-        )
+        .select_related("cover_image")
+        .annotate(plant_count=Count("plants"))
         .order_by("name")
     )
-
-    # Cover-Bilder minimalinvasiv bestimmen (vermeidet komplexe Subqueries):
-    # hole für Gruppen mit Fotos jeweils 1 jüngstes Bild
-    cover_map = {}
-    cover_qs = (
-        PlantImage.objects
-        .select_related("plant", "plant__group")
-        .order_by("plant__group_id", "-captured_at")
-    )
-    for img in cover_qs:
-        gid = img.plant.group_id
-        if gid and gid not in cover_map:
-            cover_map[gid] = img
-    # mappen
-    groups_with_cover = [
-        (g, cover_map.get(g.id)) for g in groups
-    ]
+    groups_with_cover = [(g, g.cover_image) for g in groups]
 
     return render(request, "plants/plant_group_list.html", {
         "groups_with_cover": groups_with_cover,
@@ -63,7 +54,8 @@ def plant_list(request, group_id=None):
     qs = (
         Plant.objects
         .filter(user=request.user)
-        .prefetch_related("images", "group", "rooms")
+        .select_related("group", "cover_image")
+        .prefetch_related("rooms")
         .order_by("group__name", "name")
     )
 
@@ -79,7 +71,7 @@ def plant_list(request, group_id=None):
         qs = qs.filter(id=selected_plant)
 
     plants = list(qs.distinct())
-    total_images = sum(p.images.count() for p in plants)
+    total_images = sum(p.photo_count for p in plants)
 
     # Plant-Options (wie zuvor)
     if selected_group:
@@ -104,10 +96,12 @@ def plant_list(request, group_id=None):
 def plant_timeline(request, plant_id):
     """Timeline für einzelne Pflanze"""
     plant = get_object_or_404(Plant, id=plant_id)
-    images = plant.images.all()  # Bereits sortiert durch Meta ordering
+    # Erste Seite; den Rest lädt die Timeline beim Scrollen über plant_images_api
+    page = paginate_images(plant.images.select_related('plant'))
     return render(request, 'plants/plant_timeline.html', {
         'plant': plant,
-        'images': images
+        'images': page.items,
+        'next_cursor': page.next_cursor,
     })
 
 
@@ -219,7 +213,7 @@ def add_image(request, plant_id):
             raw = base64.b64decode(b64)
             content = ContentFile(raw, name=filename)
 
-            PlantImage.objects.create(
+            plant_image = PlantImage.objects.create(
                 plant=plant,
                 image=content,          # upload_to nutzt captured_at (siehe unten)
                 captured_at=captured_at,
@@ -228,6 +222,9 @@ def add_image(request, plant_id):
         except Exception as e:
             return HttpResponseBadRequest(f"Kamera-Upload fehlgeschlagen: {e}")
 
+        # Varianten aus den bereits geladenen Bytes (kein erneuter R2-Download)
+        safe_generate_derivatives(plant_image, source=raw)
+
         return redirect('plants:plant_timeline', plant_id=plant_id)
 
     # Fall 2: klassischer Datei-Upload (Galerie)
@@ -250,17 +247,86 @@ def add_image(request, plant_id):
         # WICHTIG: dem Upload das neue .name geben, damit S3/R2-Key stimmt
         up_file.name = filename
 
-        PlantImage.objects.create(
+        plant_image = PlantImage.objects.create(
             plant=plant,
             image=up_file,
             captured_at=captured_at,
             notes=notes,
         )
+        safe_generate_derivatives(plant_image, source=up_file.file)
         return redirect('plants:plant_timeline', plant_id=plant_id)
 
     return HttpResponseBadRequest("Kein Bild gefunden.")
 
 
+def _plant_photo_storage():
+    return PlantImage._meta.get_field("image").storage
+
+
+@login_required
+@require_POST
+def image_upload_url(request, plant_id):
+    """
+    Direkt-Upload, Schritt 1: presigned PUT-URL für ein neues Foto.
+    Ohne R2-Storage 409 -> das Template nutzt dann add_image.
+    """
+    plant = get_object_or_404(Plant, id=plant_id, user=request.user)
+    storage = _plant_photo_storage()
+    if not supports_presigned(storage):
+        return JsonResponse({"direct": False}, status=409)
+
+    content_type = request.POST.get("content_type") or "image/jpeg"
+    if not content_type.startswith("image/"):
+        return JsonResponse({"error": "Nur Bilder erlaubt."}, status=400)
+
+    # Key wie bei add_image; das EXIF-Datum ist erst nach dem Upload bekannt
+    captured_at = timezone.now()
+    ext = content_type.split("/")[-1].replace("jpeg", "jpg")
+    filename = build_filename(plant, captured_at, ext, next_index_for_day(plant, captured_at))
+    probe = PlantImage(plant=plant, captured_at=captured_at)
+    upload = issue_upload(
+        storage, probe.image.field.generate_filename(probe, filename), content_type,
+        purpose="plant_image", user_id=request.user.id,
+        extra={"plant": plant.id, "captured_at": captured_at.isoformat()},
+    )
+    return JsonResponse({"direct": True, **upload})
+
+
+@login_required
+@require_POST
+def image_upload_confirm(request, plant_id):
+    """
+    Direkt-Upload, Schritt 2: Objekt registrieren, EXIF-Datum lesen und
+    Varianten erzeugen.
+    """
+    plant = get_object_or_404(Plant, id=plant_id, user=request.user)
+    storage = _plant_photo_storage()
+    try:
+        payload = confirm_upload(storage, request.POST.get("token", ""), "plant_image", request.user.id)
+    except UploadTokenError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+    if payload.get("plant") != plant.id:
+        return JsonResponse({"error": "Upload gehört zu einer anderen Pflanze."}, status=400)
+
+    with storage.open(payload["name"], "rb") as f:
+        raw = f.read()
+    captured_at = exif_datetime(io.BytesIO(raw)) or datetime.fromisoformat(payload["captured_at"])
+
+    # Token nur einmal einlösen: Pflanze sperren, dann auf bestehendes Bild prüfen
+    with transaction.atomic():
+        Plant.objects.select_for_update(of=("self",)).filter(id=plant.id).first()
+        if PlantImage.objects.filter(plant=plant, image=payload["name"]).exists():
+            return JsonResponse({"error": "Upload wurde bereits bestätigt."}, status=409)
+        plant_image = PlantImage.objects.create(
+            plant=plant,
+            image=payload["name"],
+            captured_at=captured_at,
+            notes=request.POST.get("notes", "").strip(),
+        )
+    safe_generate_derivatives(plant_image, source=raw)
+    return JsonResponse({"id": plant_image.id, "thumb_url": plant_image.thumb_url})
+
+
 @login_required
 def create_plant(request):
     """Neue Pflanze anlegen"""
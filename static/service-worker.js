@@ -1,4 +1,49 @@
-const CACHE_NAME = 'finance-dashboard-v3';
+const CACHE_NAME = 'finance-dashboard-v4';
+// Eigener Cache für JSON-Chart-APIs (Stale-While-Revalidate)
+// v2: v1 konnte Login-Seiten unter API-URLs enthalten
+const API_CACHE_NAME = 'finance-api-v2';
+
+// Chart-APIs: Antwort sofort aus dem Cache, im Hintergrund per ETag
+// (If-None-Match → meist 304) aktualisieren
+const API_PREFIXES = ['/api/', '/billa/api/', '/bitpanda/api/'];
+// Status-Abfragen, Autocomplete und Cron-Endpoints immer frisch vom Server
+const API_EXCLUDES = ['/api/analyze-receipt/', '/api/payee-suggestions/', '/api/cron/', '/bitpanda/api/prices/'];
+
+// Nur echte JSON-Antworten cachen - nach Ablauf der Session folgt fetch dem
+// Login-Redirect (bzw. die Geräte-Prüfung liefert HTML) mit Status 200
+function isCacheableJson(response) {
+  const contentType = response.headers.get('Content-Type') || '';
+  return response.ok && !response.redirected && contentType.startsWith('application/json');
+}
+
+function isChartApi(url) {
+  return url.origin === self.location.origin &&
+    API_PREFIXES.some(prefix => url.pathname.startsWith(prefix)) &&
+    !API_EXCLUDES.some(prefix => url.pathname.startsWith(prefix));
+}
+
+async function staleWhileRevalidate(event, request) {
+  const cache = await caches.open(API_CACHE_NAME);
+  const cachedResponse = await cache.match(request);
+
+  const networkFetch = fetch(request).then(response => {
+    if (isCacheableJson(response)) {
+      cache.put(request, response.clone());
+    } else if (response.redirected) {
+      // Nicht mehr angemeldet: alte Daten nicht weiter ausliefern
+      cache.delete(request);
+    }
+    return response;
+  });
+
+  if (cachedResponse) {
+    event.waitUntil(networkFetch.catch(err =>
+      console.warn('[Service Worker] Revalidierung fehlgeschlagen:', err)
+    ));
+    return cachedResponse;
+  }
+  return networkFetch;
+}
 
 // URLs die gecacht werden sollen
 const urlsToCache = [
@@ -47,7 +92,7 @@ self.addEventListener('activate', event => {
     caches.keys().then(cacheNames => {
       return Promise.all(
         cacheNames.map(cacheName => {
-          if (cacheName !== CACHE_NAME) {
+          if (cacheName !== CACHE_NAME && cacheName !== API_CACHE_NAME) {
             console.log('[Service Worker] Lösche alten Cache:', cacheName);
             return caches.delete(cacheName);
           }
@@ -80,11 +125,23 @@ self.addEventListener('fetch', event => {
     return;
   }
 
+  // Beim Logout gecachte (private) API-Antworten verwerfen
+  if (url.origin === self.location.origin && url.pathname === '/logout/') {
+    event.waitUntil(caches.delete(API_CACHE_NAME));
+    return;
+  }
+
   // Ignoriere POST, PUT, DELETE requests
   if (request.method !== 'GET') {
     return;
   }
 
+  // JSON-Chart-APIs: Stale-While-Revalidate
+  if (isChartApi(url)) {
+    event.respondWith(staleWhileRevalidate(event, request));
+    return;
+  }
+
   event.respondWith(
     (async () => {
       // Für HTML-Seiten: Network First Strategy